@@ -1,23 +1,11 @@
-from pymilvus import connections, utility, Collection
+"""
+Inspect the Milvus collections behind the RAG server.
 
-# Connect to Milvus
-connections.connect(
-    alias="default",
-    host="localhost",
-    port="19530"
-)
+Kept for backwards compatibility; this runs the diagnostics tool of the mercury_agent package:
+    python -m aiq_mercury_agent.milvus_diagnostics --uri http://localhost:19530 --collections SPH
+"""
 
-# Get the SPH collection
-sph_collection = Collection("SPH")
-sph_collection.load()
+from aiq_mercury_agent.milvus_diagnostics import main
 
-# Print collection info
-print("\nSPH Collection Info:")
-print("-------------------")
-print(f"Description: {sph_collection.description}")
-print(f"Schema: {sph_collection.schema}")
-print(f"Number of entities: {sph_collection.num_entities}")
-
-# Close connection
-sph_collection.release()
-connections.disconnect("default")
+if __name__ == "__main__":
+    main()
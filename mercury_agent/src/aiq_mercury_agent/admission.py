@@ -0,0 +1,320 @@
+"""
+This module implements admission control for the downstream services called by the mercury_agent workflow.
+Without it, a burst of users fans out into an unbounded number of simultaneous requests to the LLM
+endpoint, the RAG server and Wikipedia, and their rate limits turn into cascading timeouts.
+
+Key Components:
+1. BackendLimitConfig / AdmissionConfig: Per-backend limits, configured in the workflow's `admission` section
+2. BackendLimiter: Concurrency slots, optional token-bucket rate limit, bounded queue and queue-wait metrics
+3. AdmissionRejected: Raised when a request is rejected instead of queued
+4. configure_admission / admission_slot / admission_stats: Process-wide registry used by the tools
+
+A call waits for a slot of its backend's limiter. When the queue is already at `max_queue`, or no
+slot or rate-limit token frees up within `queue_timeout` seconds, the call is rejected immediately
+rather than piling onto an overloaded service. Waiting calls are served by priority, so short routes such as chitchat
+(`PRIORITY_HIGH`) overtake long research and RAG calls queued on the same backend.
+
+Backends without a configured limit are not limited.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from pydantic import BaseModel
+
+from .stats import percentile
+
+logger = logging.getLogger(__name__)
+
+LLM = "llm"
+RAG = "rag"
+WIKIPEDIA = "wikipedia"
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a backend is saturated and a call is rejected instead of queued."""
+
+
+class BackendLimitConfig(BaseModel):
+    """
+    Limits for a single downstream backend.
+
+    Attributes:
+        max_concurrency: Maximum number of calls in flight; `None` disables the limit
+        max_queue: Maximum number of calls waiting for a slot before new calls are rejected; `None` is unbounded
+        queue_timeout: Seconds a call may wait for a slot before it is rejected; `None` waits indefinitely
+        rate: Maximum sustained calls per second (token bucket); `None` disables rate limiting
+        burst: Calls allowed at once above the sustained rate (token bucket size, default: 1)
+    """
+    max_concurrency: int | None = None
+    max_queue: int | None = None
+    queue_timeout: float | None = None
+    rate: float | None = None
+    burst: int = 1
+
+
+class AdmissionConfig(BaseModel):
+    """
+    Configuration for admission control.
+
+    Attributes:
+        enabled: Whether calls are limited at all (default: True)
+        backends: Limits per backend name ("llm", "rag", "wikipedia"); unlisted backends are unlimited
+    """
+    enabled: bool = True
+    backends: dict[str, BackendLimitConfig] = {}
+
+
+class _PrioritySemaphore:
+    """A semaphore whose waiters are woken in priority order (lowest value first), FIFO within a priority."""
+
+    def __init__(self, value: int) -> None:
+        self._value = value
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def available(self) -> bool:
+        return self._value > 0 and not self._waiters
+
+    async def acquire(self, priority: int) -> None:
+        if self.available:
+            self._value -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # A slot handed over just as the waiter was cancelled must go to the next waiter
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+
+class _TokenBucket:
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = rate
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Return how many seconds a caller would wait for a token, without taking one."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self._rate)
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller has to wait before using it."""
+        self._refill()
+        self._tokens -= 1
+        return max(0.0, -self._tokens / self._rate)
+
+    def refund(self) -> None:
+        """Give back a token reserved by a caller that was not admitted."""
+        self._refill()
+        self._tokens = min(self._capacity, self._tokens + 1)
+
+
+class BackendLimiter:
+    """
+    Admission control for one backend.
+
+    `admitted`, `rejected` and the queue-wait samples are cumulative; `stats` summarizes them.
+    """
+
+    def __init__(self, name: str, config: BackendLimitConfig) -> None:
+        self.name = name
+        self.config = config
+        self._semaphore = _PrioritySemaphore(config.max_concurrency) if config.max_concurrency else None
+        self._bucket = _TokenBucket(config.rate, config.burst) if config.rate else None
+        self._waits: deque[float] = deque(maxlen=1024)
+        self.queued = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def limited(self) -> bool:
+        return self._semaphore is not None or self._bucket is not None
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL) -> AsyncIterator[None]:
+        """
+        Hold one slot of the backend for the duration of the context.
+
+        Args:
+            priority: Queue priority, `PRIORITY_HIGH` calls are admitted before `PRIORITY_NORMAL` ones
+
+        Raises:
+            AdmissionRejected: If the queue is full or no slot is available within `queue_timeout`
+        """
+        if not self.limited:
+            yield
+            return
+
+        bucket_delay = self._bucket.delay() if self._bucket is not None else 0.0
+        if self.config.queue_timeout is not None and bucket_delay > self.config.queue_timeout:
+            # The rate limit alone already keeps this call waiting past its timeout
+            self.rejected += 1
+            raise AdmissionRejected(
+                f"{self.name} backend is saturated (rate limited for {bucket_delay:.1f}s)")
+        must_wait = bucket_delay > 0 or (self._semaphore is not None and not self._semaphore.available)
+        if must_wait and self.config.max_queue is not None and self.queued >= self.config.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(f"{self.name} backend is saturated ({self.queued} calls queued)")
+
+        start = time.monotonic()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._admit(priority), timeout=self.config.queue_timeout)
+        except TimeoutError as e:
+            self.rejected += 1
+            raise AdmissionRejected(
+                f"{self.name} backend is saturated (no slot within {self.config.queue_timeout:.1f}s)") from e
+        finally:
+            self.queued -= 1
+
+        wait = time.monotonic() - start
+        self._waits.append(wait)
+        self.admitted += 1
+        self.in_flight += 1
+        if wait > 0.1:
+            logger.debug("Waited %.1f ms for a %s slot", wait * 1000, self.name)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    async def _admit(self, priority: int) -> None:
+        if self._bucket is not None:
+            delay = self._bucket.reserve()
+            try:
+                if delay:
+                    await asyncio.sleep(delay)
+                if self._semaphore is not None:
+                    await self._semaphore.acquire(priority)
+            except asyncio.CancelledError:
+                # A call that times out or is cancelled before admission must not keep its token, or
+                # every later caller inherits its delay and a burst turns into cascading timeouts
+                self._bucket.refund()
+                raise
+        elif self._semaphore is not None:
+            await self._semaphore.acquire(priority)
+
+    def stats(self) -> dict[str, Any]:
+        """Return admission counters and queue-wait percentiles in milliseconds."""
+        waits = sorted(self._waits)
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queue_wait_ms": {
+                "p50": percentile(waits, 50) * 1000,
+                "p95": percentile(waits, 95) * 1000,
+                "max": (waits[-1] if waits else 0.0) * 1000,
+            },
+        }
+
+
+class AdmissionController:
+    """Registry of the limiters of all backends."""
+
+    def __init__(self, config: AdmissionConfig) -> None:
+        self.config = config
+        self._limiters: dict[str, BackendLimiter] = {}
+        if config.enabled:
+            for name, limits in config.backends.items():
+                self._limiters[name] = BackendLimiter(name, limits)
+
+    def limiter(self, name: str) -> BackendLimiter:
+        """Return the limiter of a backend; backends without configured limits get an unlimited one."""
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = self._limiters[name] = BackendLimiter(name, BackendLimitConfig())
+        return limiter
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: limiter.stats() for name, limiter in sorted(self._limiters.items())}
+
+
+_controller = AdmissionController(AdmissionConfig())
+
+
+def configure_admission(config: AdmissionConfig) -> AdmissionController:
+    """
+    Install the process-wide admission controller.
+
+    Args:
+        config: Admission settings, typically the workflow's `admission` section
+
+    Returns:
+        The new controller
+    """
+    global _controller
+    _controller = AdmissionController(config)
+    return _controller
+
+
+def admission_slot(backend: str, priority: int = PRIORITY_NORMAL):
+    """
+    Hold a slot of a backend for the duration of an `async with` block.
+
+    Args:
+        backend: Backend name, e.g. `LLM`, `RAG` or `WIKIPEDIA`
+        priority: Queue priority of the call
+
+    Returns:
+        An async context manager
+
+    Raises:
+        AdmissionRejected: If the backend is saturated
+    """
+    return _controller.limiter(backend).slot(priority)
+
+
+def admission_stats() -> dict[str, dict[str, Any]]:
+    """Return the admission metrics of every backend seen so far."""
+    return _controller.stats()
@@ -0,0 +1,374 @@
+"""
+This module implements a batch evaluation runner for the mercury_agent workflow.
+`aiq run` builds the workflow for a single `--input`; regression-testing answer quality and latency on
+hundreds of queries instead loads the workflow once and drives the whole query file through it with
+bounded concurrency. Results are appended to a JSONL file as they complete, so an interrupted run
+is resumed by running the same command again: queries whose id is already in the output are skipped.
+
+Key Components:
+1. EvalQuery / load_eval_queries: Queries read from a JSONL or CSV file
+2. completed_ids: Ids of the queries already recorded in an output file
+3. SpanCollector: Collects the tracing spans of each request to report the chosen route and stage timings
+4. run_batch_eval: Loads the workflow and evaluates the queries, streaming results to the output file
+5. summarize_results: Error count, route accuracy and latency percentiles of a results file
+6. main: Command line entry point
+
+Each output record holds the query id and text, the answer, the route the supervisor chose, the expected
+route when the query has a label, the request latency, the time spent in each stage (from the
+workflow's tracing spans) and the error, if any.
+
+Example:
+    python -m aiq_mercury_agent.batch_eval --config_file configs/config.yml --queries data/eval.jsonl \
+        --output eval_results.jsonl --concurrency 8
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any
+from typing import NamedTuple
+from typing import TextIO
+
+from .query_router import normalize_route
+from .session_store import session_scope
+from .stats import percentile
+from .stats import run_error
+from .tracing import Span
+from .tracing import add_span_exporter
+from .tracing import remove_span_exporter
+
+logger = logging.getLogger(__name__)
+
+
+class EvalQuery(NamedTuple):
+    """
+    A query of the evaluation set.
+
+    Attributes:
+        id: Unique id of the query, used to resume interrupted runs
+        query: The user's input
+        label: Expected route ('Research', 'Retrieve' or 'General'), if known
+    """
+    id: str
+    query: str
+    label: str | None = None
+
+
+def load_eval_queries(path: str | Path) -> list[EvalQuery]:
+    """
+    Read an evaluation query file.
+
+    JSONL lines and CSV rows (with a header) hold a "query" field and optional "id" and "label" fields.
+    Queries without an id are numbered by their position in the file, starting at 1.
+
+    Args:
+        path: A `.csv` file, or a JSONL file for any other suffix
+
+    Returns:
+        The queries, with labels normalized to route names
+
+    Raises:
+        ValueError: If two queries share an id
+    """
+    path = Path(path).expanduser()
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            records = list(csv.DictReader(f))
+        else:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    queries = []
+    seen = set()
+    for position, record in enumerate(records, 1):
+        query_id = str(record.get("id") or position)
+        if query_id in seen:
+            raise ValueError(f"Duplicate query id {query_id!r} in {path}")
+        seen.add(query_id)
+        label = record.get("label")
+        queries.append(EvalQuery(query_id, record["query"], (normalize_route(label) or label) if label else None))
+    return queries
+
+
+def completed_ids(path: str | Path, retry_errors: bool = False) -> set[str]:
+    """
+    Return the ids of the queries already recorded in an output file.
+
+    A final line cut short by an interruption is ignored, so its query is run again.
+
+    Args:
+        path: Output file of an earlier run; a missing file has no completed queries
+        retry_errors: Leave out queries whose recorded result is an error, so they are run again
+
+    Returns:
+        The completed query ids
+    """
+    path = Path(path).expanduser()
+    if not path.exists():
+        return set()
+    done = set()
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if retry_errors and record.get("error") is not None:
+                done.discard(str(record["id"]))
+                continue
+            done.add(str(record["id"]))
+    return done
+
+
+class SpanCollector:
+    """
+    Span exporter keeping the finished spans of each session in memory.
+
+    Every evaluated query runs in its own session, so its spans are found by session id.
+    """
+
+    def __init__(self) -> None:
+        self._spans: dict[str | None, list[Span]] = {}
+        # Spans of the thread-pool chitchat backend finish on worker threads
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.setdefault(span.session_id, []).append(span)
+
+    def close(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def pop(self, session_id: str) -> list[Span]:
+        """Remove and return the spans recorded for a session."""
+        with self._lock:
+            return self._spans.pop(session_id, [])
+
+
+def stage_timings(spans: list[Span]) -> dict[str, float]:
+    """
+    Sum the duration of a request's spans by stage name.
+
+    Args:
+        spans: Spans of one request
+
+    Returns:
+        Milliseconds spent in each stage, excluding the enclosing "request" span
+    """
+    timings: Counter[str] = Counter()
+    for span in spans:
+        if span.name != "request" and span.duration_ms is not None:
+            timings[span.name] += span.duration_ms
+    return {name: round(ms, 3) for name, ms in timings.items()}
+
+
+async def _evaluate(workflow, query: EvalQuery, collector: SpanCollector, session_id: str) -> dict[str, Any]:
+    start = time.perf_counter()
+    answer = None
+    failure = None
+    try:
+        with session_scope(session_id):
+            async with workflow.run(query.query) as runner:
+                answer = await runner.result(to_type=str)
+    except Exception as e:
+        failure = e
+    error = run_error(answer, failure)
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    spans = collector.pop(session_id)
+    request = next((span for span in spans if span.name == "request"), None)
+    route = request.attributes.get("route") if request is not None else None
+    route = (normalize_route(route) or route) if route else None
+    if error is None and request is not None and request.status == "error":
+        error = request.error
+    if error is not None:
+        logger.warning("Query %s failed: %s", query.id, error[:200])
+
+    record = {
+        "id": query.id,
+        "query": query.query,
+        "answer": answer,
+        "route": route,
+        "latency_ms": round(latency_ms, 3),
+        "stages": stage_timings(spans),
+        "error": error,
+    }
+    if query.label is not None:
+        record["label"] = query.label
+        record["route_correct"] = route == query.label
+    return record
+
+
+def _ends_mid_line(path: Path) -> bool:
+    if not path.exists() or path.stat().st_size == 0:
+        return False
+    with path.open("rb") as f:
+        f.seek(-1, 2)
+        return f.read(1) != b"\n"
+
+
+def _write(output: TextIO, record: dict[str, Any]) -> None:
+    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output.flush()
+
+
+def summarize_results(path: str | Path) -> dict[str, Any]:
+    """
+    Summarize a results file, including the records of earlier interrupted runs.
+
+    Args:
+        path: Output file of `run_batch_eval`
+
+    Returns:
+        Query and error counts, route accuracy over labelled queries, latency percentiles and the
+        mean time per stage
+    """
+    records: dict[str, dict] = {}
+    with Path(path).expanduser().open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            # A query retried after an error is summarized by its latest result
+            records[str(record["id"])] = record
+    results = list(records.values())
+    ok = [r for r in results if r.get("error") is None]
+    labelled = [r for r in results if "route_correct" in r]
+    latencies = [r["latency_ms"] for r in ok]
+    stages: dict[str, list[float]] = {}
+    for record in ok:
+        for name, ms in record.get("stages", {}).items():
+            stages.setdefault(name, []).append(ms)
+    return {
+        "queries": len(results),
+        "errors": len(results) - len(ok),
+        "routes": dict(Counter(r.get("route") or "unknown" for r in results)),
+        "route_accuracy": sum(r["route_correct"] for r in labelled) / len(labelled) if labelled else None,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+        },
+        "stage_mean_ms": {name: statistics.fmean(values) for name, values in sorted(stages.items())},
+    }
+
+
+async def run_batch_eval(config_file: str | Path,
+                         queries: list[EvalQuery],
+                         output: str | Path,
+                         concurrency: int = 8,
+                         retry_errors: bool = False) -> dict[str, Any]:
+    """
+    Evaluate queries through the workflow of a configuration file.
+
+    The workflow is loaded once and the queries are run with at most `concurrency` in flight, each in
+    its own session. Every result is appended to `output` as soon as its query completes.
+
+    Args:
+        config_file: Workflow configuration to evaluate
+        queries: Queries to run; those already recorded in `output` are skipped
+        output: JSONL file the results are appended to
+        concurrency: Number of queries in flight at any time
+        retry_errors: Run queries again whose recorded result is an error
+
+    Returns:
+        The number of queries run and skipped, plus `summarize_results` of the whole output file
+    """
+    from aiq.runtime.loader import load_workflow
+
+    from . import register  # noqa: F401, pylint: disable=unused-import
+
+    output = Path(output).expanduser()
+    done = completed_ids(output, retry_errors=retry_errors)
+    pending = [query for query in queries if query.id not in done]
+    logger.info("Evaluating %d queries (%d already completed)", len(pending), len(queries) - len(pending))
+
+    # Sessions are unique to this run, so persisted histories of earlier runs are never picked up
+    run_id = uuid.uuid4().hex[:8]
+    collector = SpanCollector()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    async with load_workflow(config_file) as workflow:
+        # The workflow installs its configured exporter while loading; the collector is added alongside it
+        add_span_exporter(collector)
+        try:
+            # A record cut short by an interruption is left on its own line, where readers skip it
+            partial = _ends_mid_line(output)
+            with output.open("a", encoding="utf-8") as f:
+                if partial:
+                    f.write("\n")
+                schedule = iter(pending)
+
+                async def _client() -> None:
+                    for query in schedule:
+                        _write(f, await _evaluate(workflow, query, collector, f"eval-{run_id}-{query.id}"))
+
+                await asyncio.gather(*[_client() for _ in range(max(1, concurrency))])
+        finally:
+            remove_span_exporter(collector)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "run": len(pending),
+        "skipped": len(queries) - len(pending),
+        "elapsed_s": elapsed,
+        **summarize_results(output),
+    }
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    return await run_batch_eval(args.config_file,
+                                load_eval_queries(args.queries),
+                                args.output,
+                                concurrency=args.concurrency,
+                                retry_errors=args.retry_errors)
+
+
+def main() -> None:
+    """Command line entry point for the batch evaluation runner."""
+    parser = argparse.ArgumentParser(description="Run a file of queries through the mercury_agent workflow.",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--config_file", required=True, type=Path, help="Workflow configuration to evaluate.")
+    parser.add_argument("--queries",
+                        required=True,
+                        type=Path,
+                        help="JSONL or CSV file with a 'query' field and optional 'id' and 'label' fields.")
+    parser.add_argument("--output", required=True, type=Path, help="JSONL file the results are appended to.")
+    parser.add_argument("--concurrency", default=8, type=int, help="Queries in flight at any time.")
+    parser.add_argument("--retry_errors", action="store_true", help="Run queries again whose result was an error.")
+    parser.add_argument("--log_level", default="warning", help="Log level of the workflow during the run.")
+    args = parser.parse_args()
+
+    for name in ("aiq_mercury_agent", "httpx"):
+        logging.getLogger(name).setLevel(args.log_level.upper())
+    summary = asyncio.run(_main(args))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""
+This module implements a load benchmark of the mercury_agent workflow against local stand-ins for its services.
+The workflow configuration is loaded as deployed, but the LLMs, the RAG server and Wikipedia are replaced
+by the fakes of `fake_backends`, whose latency and token rate are configurable. Requests are driven at a
+fixed concurrency and throughput, latency and time to first token (TTFT) are reported per route, so
+regressions in the workflow's own overhead show up before deploying.
+
+Key Components:
+1. BenchmarkQuery / DEFAULT_QUERIES / load_benchmark_queries: The query mix driven through the workflow
+2. prepare_benchmark_config: Points a workflow configuration at the fake services
+3. fake_workflow: Starts the fakes and loads the workflow against them
+4. run_benchmark: Drives the requests through a workflow loaded by `fake_workflow`
+5. summarize: Aggregates throughput and latency/TTFT percentiles, overall and per route
+6. main: Command line entry point
+
+Example:
+    python -m aiq_mercury_agent.benchmark --config_file configs/config.yml --requests 200 --concurrency 16 \
+        --llm_latency 0.3 --llm_tokens_per_second 40 --output benchmark.json
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import asyncio
+import copy
+import itertools
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+from typing import NamedTuple
+
+import yaml
+from fastapi import FastAPI
+
+from .fake_backends import BackgroundServer
+from .fake_backends import FakeLLMConfig
+from .fake_backends import FakeRAGConfig
+from .fake_backends import build_fake_wikipedia_index
+from .fake_backends import create_fake_llm_app
+from .fake_backends import create_fake_rag_app
+from .query_router import GENERAL
+from .query_router import RESEARCH
+from .query_router import RETRIEVE
+from .query_router import normalize_route
+from .session_store import session_scope
+from .stats import percentile
+from .stats import run_error
+
+logger = logging.getLogger(__name__)
+
+
+class BenchmarkQuery(NamedTuple):
+    """
+    A query of the benchmark mix.
+
+    Attributes:
+        query: The user's input
+        route: Route the fake supervisor LLM assigns to the query; results are grouped by it
+        topic: Topic the fake LLM extracts for research queries; a synthetic article is indexed for it
+    """
+    query: str
+    route: str
+    topic: str | None = None
+
+
+DEFAULT_QUERIES: tuple[BenchmarkQuery, ...] = (
+    BenchmarkQuery("Tell me about the planet Jupiter", RESEARCH, "Jupiter"),
+    BenchmarkQuery("What was the Roman Empire?", RESEARCH, "Roman Empire"),
+    BenchmarkQuery("Who was Marie Curie?", RESEARCH, "Marie Curie"),
+    BenchmarkQuery("How are kernels chosen in SPH simulations?", RETRIEVE),
+    BenchmarkQuery("Explain the smoothing length in smoothed particle hydrodynamics", RETRIEVE),
+    BenchmarkQuery("Hello, how are you today?", GENERAL),
+    BenchmarkQuery("Tell me a story about yourself", GENERAL),
+)
+
+
+def load_benchmark_queries(path: str | Path) -> list[BenchmarkQuery]:
+    """
+    Read a benchmark query file.
+
+    Args:
+        path: JSONL file whose lines hold "query" and "label" fields and, for research queries, an optional "topic"
+
+    Returns:
+        The queries with labels normalized to route names
+    """
+    queries = []
+    with Path(path).expanduser().open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                queries.append(BenchmarkQuery(record["query"], normalize_route(record["label"]), record.get("topic")))
+    return queries
+
+
+def prepare_benchmark_config(config: dict, llm_url: str, rag_url: str, wikipedia_index: str | Path) -> dict:
+    """
+    Point a workflow configuration at the fake services.
+
+    All LLMs and embedders use the fake LLM server, the RAG tool uses the fake RAG server and the
+    research tool reads the synthetic offline Wikipedia index. Functions the workflow does not use
+    are dropped so they cannot require real credentials. All other settings are kept as configured.
+
+    Args:
+        config: Parsed workflow configuration file
+        llm_url: Base URL of the fake LLM server
+        rag_url: Base URL of the fake RAG server
+        wikipedia_index: Offline Wikipedia index of synthetic articles
+
+    Returns:
+        The benchmark configuration
+    """
+    config = copy.deepcopy(config)
+    workflow = config["workflow"]
+    used = {workflow.get("rag_tool"), workflow.get("research_tool"), workflow.get("chitchat_agent")}
+
+    for section in ("llms", "embedders"):
+        for settings in (config.get(section) or {}).values():
+            settings["base_url"] = f"{llm_url}/v1"
+
+    functions = {}
+    for name, settings in (config.get("functions") or {}).items():
+        if name not in used:
+            continue
+        if name == workflow.get("rag_tool"):
+            settings["base_url"] = f"{rag_url}/v1"
+        elif name == workflow.get("research_tool"):
+            settings["backend"] = "offline"
+            settings.setdefault("offline", {})["index_path"] = str(wikipedia_index)
+        elif name == workflow.get("chitchat_agent"):
+            settings["api_url"] = f"{llm_url}/v1"
+        functions[name] = settings
+    config["functions"] = functions
+    return config
+
+
+def _distribution(values: list[float]) -> dict[str, float]:
+    return {
+        "mean": statistics.fmean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+    }
+
+
+def summarize(results: list[dict], elapsed: float, concurrency: int) -> dict:
+    """
+    Aggregate per-request results into throughput and latency/TTFT percentiles.
+
+    Args:
+        results: One record per request with "route", "latency_ms", "ttft_ms" and "error"
+        elapsed: Wall-clock seconds of the measured run
+        concurrency: Number of requests in flight
+
+    Returns:
+        A JSON-serializable summary, overall and per route
+    """
+
+    def _stats(subset: list[dict]) -> dict:
+        ok = [r for r in subset if r["error"] is None]
+        return {
+            "requests": len(subset),
+            "errors": len(subset) - len(ok),
+            "throughput_rps": len(ok) / elapsed if elapsed else 0.0,
+            "latency_ms": _distribution([r["latency_ms"] for r in ok]),
+            "ttft_ms": _distribution([r["ttft_ms"] for r in ok if r["ttft_ms"] is not None]),
+        }
+
+    summary = {"concurrency": concurrency, "elapsed_s": elapsed, **_stats(results)}
+    summary["routes"] = {
+        route: _stats([r for r in results if r["route"] == route]) for route in sorted({r["route"] for r in results})
+    }
+    return summary
+
+
+async def _run_request(workflow, query: BenchmarkQuery, session_id: str) -> dict:
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+    failure = None
+    try:
+        with session_scope(session_id):
+            async with workflow.run(query.query) as runner:
+                async for chunk in runner.result_stream(to_type=str):
+                    if ttft is None:
+                        ttft = (time.perf_counter() - start) * 1000
+                    parts.append(chunk)
+    except Exception as e:
+        failure = e
+    error = run_error("".join(parts), failure)
+    if error is not None:
+        logger.warning("Benchmark request failed (%s): %s", query.route, error[:200])
+    return {
+        "route": query.route,
+        "query": query.query,
+        "latency_ms": (time.perf_counter() - start) * 1000,
+        "ttft_ms": ttft,
+        "error": error,
+    }
+
+
+async def _drive(workflow, queries: list[BenchmarkQuery], requests: int, concurrency: int, prefix: str) -> list[dict]:
+    """Run `requests` queries round-robin from the mix with `concurrency` requests in flight."""
+    schedule = iter(enumerate(itertools.islice(itertools.cycle(queries), requests)))
+    results = []
+
+    async def _client() -> None:
+        # Every request gets its own session, so conversation history does not grow over the run
+        for i, query in schedule:
+            results.append(await _run_request(workflow, query, f"{prefix}-{i}"))
+
+    await asyncio.gather(*[_client() for _ in range(concurrency)])
+    return results
+
+
+@asynccontextmanager
+async def fake_workflow(config_file: str | Path,
+                        queries: list[BenchmarkQuery] | None = None,
+                        llm: FakeLLMConfig | None = None,
+                        rag: FakeRAGConfig | None = None,
+                        wikipedia_paragraphs: int = 40) -> AsyncIterator[tuple[Any, FastAPI, FastAPI]]:
+    """
+    Load the workflow of a configuration file against the fake services.
+
+    Args:
+        config_file: Workflow configuration to load
+        queries: Queries whose routes and topics the fake LLM answers (default: `DEFAULT_QUERIES`)
+        llm: Timing of the fake LLM
+        rag: Timing of the fake RAG server
+        wikipedia_paragraphs: Paragraphs of each synthetic Wikipedia article
+
+    Yields:
+        The loaded workflow and the fake LLM and RAG applications, whose `state.requests` count their requests
+    """
+    from aiq.runtime.loader import load_workflow
+
+    from . import register  # noqa: F401, pylint: disable=unused-import
+
+    queries = list(queries or DEFAULT_QUERIES)
+    config = yaml.safe_load(Path(config_file).expanduser().read_text(encoding="utf-8"))
+    models = sorted({settings["model_name"] for settings in (config.get("llms") or {}).values()}
+                    | {settings["model_name"] for settings in (config.get("embedders") or {}).values()}
+                    | {f["llm_name"] for f in (config.get("functions") or {}).values() if "llm_name" in f})
+    routes = {q.query: q.route for q in queries}
+    topics = {q.query: q.topic for q in queries if q.topic}
+
+    # The research tool refuses to start without an API key, which the fakes never check
+    os.environ.setdefault("NVIDIA_API_KEY", "benchmark")
+
+    with tempfile.TemporaryDirectory(prefix="mercury-benchmark-") as tmp:
+        index_path = Path(tmp) / "wikipedia.db"
+        build_fake_wikipedia_index(index_path, sorted(set(topics.values())), wikipedia_paragraphs)
+        llm_app = create_fake_llm_app(llm or FakeLLMConfig(), routes=routes, topics=topics, models=models)
+        rag_app = create_fake_rag_app(rag or FakeRAGConfig())
+        with BackgroundServer(llm_app) as llm_server, BackgroundServer(rag_app) as rag_server:
+            benchmark_config = prepare_benchmark_config(config, llm_server.url, rag_server.url, index_path)
+            config_path = Path(tmp) / "config.yml"
+            config_path.write_text(yaml.safe_dump(benchmark_config), encoding="utf-8")
+
+            async with load_workflow(config_path) as workflow:
+                yield workflow, llm_app, rag_app
+
+
+async def run_benchmark(config_file: str | Path,
+                        queries: list[BenchmarkQuery] | None = None,
+                        requests: int = 100,
+                        concurrency: int = 8,
+                        warmup: int = 0,
+                        llm: FakeLLMConfig | None = None,
+                        rag: FakeRAGConfig | None = None,
+                        wikipedia_paragraphs: int = 40) -> dict[str, Any]:
+    """
+    Benchmark the workflow of a configuration file against the fake services.
+
+    Args:
+        config_file: Workflow configuration to benchmark
+        queries: Query mix, cycled through in order (default: `DEFAULT_QUERIES`)
+        requests: Number of measured requests
+        concurrency: Number of requests in flight at any time
+        warmup: Number of unmeasured requests run first
+        llm: Timing of the fake LLM
+        rag: Timing of the fake RAG server
+        wikipedia_paragraphs: Paragraphs of each synthetic Wikipedia article
+
+    Returns:
+        The summary of `summarize` plus the fake servers' request counts under "backend_requests"
+    """
+    queries = list(queries or DEFAULT_QUERIES)
+    async with fake_workflow(config_file, queries, llm, rag, wikipedia_paragraphs) as (workflow, llm_app, rag_app):
+        if warmup:
+            await _drive(workflow, queries, warmup, concurrency, "warmup")
+        start = time.perf_counter()
+        results = await _drive(workflow, queries, requests, concurrency, "benchmark")
+        elapsed = time.perf_counter() - start
+
+    summary = summarize(results, elapsed, concurrency)
+    summary["backend_requests"] = {"llm": llm_app.state.requests, "rag": rag_app.state.requests}
+    return summary
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    queries = load_benchmark_queries(args.queries) if args.queries is not None else None
+    summary = await run_benchmark(
+        args.config_file,
+        queries=queries,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        llm=FakeLLMConfig(first_token_latency=args.llm_latency,
+                          tokens_per_second=args.llm_tokens_per_second,
+                          completion_tokens=args.llm_completion_tokens),
+        rag=FakeRAGConfig(first_token_latency=args.rag_latency,
+                          tokens_per_second=args.rag_tokens_per_second,
+                          completion_tokens=args.rag_completion_tokens),
+        wikipedia_paragraphs=args.wikipedia_paragraphs,
+    )
+    if args.output is not None:
+        args.output.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return summary
+
+
+def main() -> None:
+    """Command line entry point for the workflow benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the mercury_agent workflow against fake LLM, RAG and "
+                                     "Wikipedia services.",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--config_file", required=True, type=Path, help="Workflow configuration to benchmark.")
+    parser.add_argument("--queries",
+                        type=Path,
+                        default=None,
+                        help="JSONL file with 'query', 'label' and optional 'topic' fields (default: built-in mix).")
+    parser.add_argument("--requests", default=100, type=int, help="Number of measured requests.")
+    parser.add_argument("--concurrency", default=8, type=int, help="Requests in flight at any time.")
+    parser.add_argument("--warmup", default=0, type=int, help="Unmeasured requests run before the benchmark.")
+    parser.add_argument("--llm_latency", default=0.2, type=float, help="Fake LLM time to first token in seconds.")
+    parser.add_argument("--llm_tokens_per_second", default=50.0, type=float, help="Fake LLM generation speed.")
+    parser.add_argument("--llm_completion_tokens", default=64, type=int, help="Tokens in a fake LLM answer.")
+    parser.add_argument("--rag_latency", default=0.3, type=float, help="Fake RAG server time to first token.")
+    parser.add_argument("--rag_tokens_per_second", default=80.0, type=float, help="Fake RAG generation speed.")
+    parser.add_argument("--rag_completion_tokens", default=64, type=int, help="Tokens in a fake RAG answer.")
+    parser.add_argument("--wikipedia_paragraphs", default=40, type=int, help="Paragraphs per synthetic article.")
+    parser.add_argument("--output", type=Path, default=None, help="Write the summary here.")
+    parser.add_argument("--log_level", default="warning", help="Log level of the workflow during the run.")
+    args = parser.parse_args()
+
+    for name in ("aiq_mercury_agent", "httpx"):
+        logging.getLogger(name).setLevel(args.log_level.upper())
+    summary = asyncio.run(_main(args))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+This module implements a micro-benchmark of the research worker's per-request Python overhead.
+The LLM is replaced by LangChain's in-memory fake chat model, so the measurement only covers prompt
+construction, chain composition, template rendering and the runnable machinery around the LLM call.
+
+Key Components:
+1. legacy_research_chains: The research chains as they were built on every request before they were precompiled
+2. measure_chain_overhead: Times requests with chains rebuilt per request ("before") and prebuilt ("after")
+3. shared_prefix_tokens: Tokens two rendered summary prompts have in common, the part a prefix cache can reuse
+4. main: Command line entry point
+
+Example:
+    python -m aiq_mercury_agent.chain_benchmark --requests 2000
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import Runnable
+
+from .research_prompts import CONCISE_SUMMARY_INSTRUCTIONS
+from .research_prompts import DETAILED_SUMMARY_INSTRUCTIONS
+from .research_prompts import SUMMARY_SYSTEM_PROMPT
+from .research_prompts import SUMMARY_USER_PROMPT
+from .research_prompts import build_detail_chain
+from .research_prompts import build_summary_chain
+from .session_store import estimate_tokens
+
+# Summary prompt of the research worker before it was split into a static system message and the request
+_LEGACY_SUMMARY_PROMPT = """
+                You are a helpful AI assistant. Your task is to summarize the following Wikipedia content in response to the user's query.
+                {detail_instructions}
+                Focus on providing a comprehensive and informative summary that directly addresses the user's query.
+                Include relevant details, examples, and key points from the content.
+                Maintain a natural flow and ensure all information is accurate and well-organized.
+                Make sure to complete all sentences and paragraphs - do not cut off mid-sentence.
+                Do not include any meta-commentary or notes about the summary itself.
+                Do not mention the word count in your response.
+                Do not add any disclaimers or notes about the content.
+                Simply provide the summary.
+
+                User Query: {query}
+
+                Wikipedia Content:
+                {content}
+
+                Summary:"""  # noqa: E501
+
+_LEGACY_DETAIL_PROMPT = """
+                Analyze if the following query is asking for more details or elaboration.
+                Return ONLY 'yes' or 'no'.
+
+                Query: {query}
+                Response:"""
+
+_QUERIES = ("Tell me about the planet Jupiter", "Give me more details on the history of the Roman Empire")
+
+
+def legacy_research_chains(llm: Any) -> tuple[Runnable, Runnable]:
+    """
+    Build the research chains the way the worker built them on every request before they were precompiled.
+
+    Args:
+        llm: LangChain chat model
+
+    Returns:
+        The summary and detail detection chains
+    """
+    summary_chain = PromptTemplate.from_template(_LEGACY_SUMMARY_PROMPT) | llm
+    detail_chain = PromptTemplate.from_template(_LEGACY_DETAIL_PROMPT) | llm
+    return summary_chain, detail_chain
+
+
+async def _research_request(summary_chain: Runnable, detail_chain: Runnable, query: str, content: str) -> None:
+    await detail_chain.ainvoke({"query": query})
+    async for _ in summary_chain.astream({
+            "detail_instructions": CONCISE_SUMMARY_INSTRUCTIONS, "content": content, "query": query
+    }):
+        pass
+
+
+async def _time_requests(requests: int, chains: Callable[[], tuple[Runnable, Runnable]], content: str) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        summary_chain, detail_chain = chains()
+        await _research_request(summary_chain, detail_chain, _QUERIES[i % len(_QUERIES)], content)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def shared_prefix_tokens(render: Callable[[str, str], str]) -> int:
+    """
+    Estimate the tokens two summary prompts of different requests have in common at their start.
+
+    Args:
+        render: Renders the full prompt text for a query and length instruction
+
+    Returns:
+        Approximate tokens of the common prefix of a concise and a detailed request on different queries
+    """
+    first = render(_QUERIES[0], CONCISE_SUMMARY_INSTRUCTIONS)
+    second = render(_QUERIES[1], DETAILED_SUMMARY_INSTRUCTIONS)
+    common = os.path.commonprefix([first, second])
+    return estimate_tokens(common)
+
+
+def measure_chain_overhead(requests: int = 1000, content_words: int = 2000) -> dict[str, Any]:
+    """
+    Measure the per-request Python overhead of the research chains with the LLM mocked out.
+
+    Args:
+        requests: Research requests timed per variant
+        content_words: Words of Wikipedia content rendered into each summary prompt
+
+    Returns:
+        Mean microseconds per request and per chain construction before and after precompiling the
+        chains, the speedup, and the prompt prefix shared between requests in each layout
+    """
+    # A one-character answer keeps the fake model's streaming out of the measurement
+    llm = FakeListChatModel(responses=["n"])
+    content = " ".join(["content"] * content_words)
+    prebuilt = (build_summary_chain(llm), build_detail_chain(llm))
+
+    async def _run() -> tuple[float, float]:
+        # Warm up both paths so import and first-call costs are not measured
+        await _time_requests(10, lambda: legacy_research_chains(llm), content)
+        await _time_requests(10, lambda: prebuilt, content)
+        before = await _time_requests(requests, lambda: legacy_research_chains(llm), content)
+        after = await _time_requests(requests, lambda: prebuilt, content)
+        return before, after
+
+    before_us, after_us = asyncio.run(_run())
+
+    build_start = time.perf_counter()
+    for _ in range(requests):
+        legacy_research_chains(llm)
+    build_us = (time.perf_counter() - build_start) / requests * 1e6
+
+    summary_prompt = build_summary_chain(llm).first
+    legacy_prompt = PromptTemplate.from_template(_LEGACY_SUMMARY_PROMPT)
+    return {
+        "requests": requests,
+        "before_us_per_request": before_us,
+        "after_us_per_request": after_us,
+        "chain_build_us": build_us,
+        "speedup": before_us / after_us if after_us else 0.0,
+        "shared_prefix_tokens": {
+            "before": shared_prefix_tokens(lambda query, instructions: legacy_prompt.format(
+                detail_instructions=instructions, content=content, query=query)),
+            "after": shared_prefix_tokens(lambda query, instructions: summary_prompt.format(
+                detail_instructions=instructions, content=content, query=query)),
+        },
+        "system_prompt_tokens": estimate_tokens(SUMMARY_SYSTEM_PROMPT),
+        "request_template_tokens": estimate_tokens(SUMMARY_USER_PROMPT),
+    }
+
+
+def main() -> None:
+    """Command line entry point for the research chain micro-benchmark."""
+    parser = argparse.ArgumentParser(description="Measure the research worker's per-request chain overhead with "
+                                     "the LLM mocked out.",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--requests", default=1000, type=int, help="Research requests timed per variant.")
+    parser.add_argument("--content_words", default=2000, type=int, help="Words of Wikipedia content per prompt.")
+    args = parser.parse_args()
+    print(json.dumps(measure_chain_overhead(args.requests, args.content_words), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+This module implements relevance-aware trimming of research content before it is summarized.
+Large Wikipedia articles run to tens of thousands of tokens, most of which are irrelevant to the
+user's question, so the article is split into passages, the passages are ranked against the query
+and only the best ones are kept, up to a token budget.
+
+Key Components:
+1. TrimmingConfig: Configuration for the token budget, passage size and ranking method
+2. split_passages: Splits an article into passages along sections and paragraphs
+3. bm25_scores: Okapi BM25 scores of passages for a query
+4. ContentTrimmer: Ranks passages (BM25, embeddings or both) and keeps the best within the budget
+
+Kept passages are returned in their original order so the summary LLM still reads a coherent
+article, and the article's lead passage can be kept regardless of its score.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import math
+import re
+from collections import Counter
+from typing import Any
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import model_validator
+
+from aiq.data_models.component_ref import EmbedderRef
+
+from .session_store import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_HEADING_RE = re.compile(r"^\s*(=+)\s*(.*?)\s*\1\s*$")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Function words carry no relevance signal but dominate term counts
+_STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from had has have how i in is it its me of on or tell that the "
+    "their them this to was were what when where which who why will with you about more".split())
+
+
+class TrimmingConfig(BaseModel):
+    """
+    Configuration for relevance-aware content trimming.
+
+    Attributes:
+        enabled: Whether content is trimmed at all (default: True)
+        token_budget: Approximate maximum number of content tokens passed to the summary (default: 3000)
+        passage_tokens: Approximate size of a passage in tokens (default: 200)
+        method: Passage ranking, "bm25", "embedding" or "hybrid" (default: "bm25")
+        embedder_name: Embedder used by the "embedding" and "hybrid" methods, required for them
+        keep_lead: Always keep the article's first passage, which usually defines the topic (default: True)
+    """
+    enabled: bool = True
+    token_budget: int = 3000
+    passage_tokens: int = 200
+    method: Literal["bm25", "embedding", "hybrid"] = "bm25"
+    embedder_name: EmbedderRef | None = None
+    keep_lead: bool = True
+
+    @model_validator(mode="after")
+    def _check_embedder(self) -> "TrimmingConfig":
+        # Fail when the config is loaded rather than on the first research query
+        if self.enabled and self.method != "bm25" and self.embedder_name is None:
+            raise ValueError(f"Trimming method '{self.method}' requires embedder_name")
+        return self
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens of a text without stopwords."""
+    return [token for token in _WORD_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def _split_long(paragraph: str, max_tokens: int) -> list[str]:
+    if estimate_tokens(paragraph) <= max_tokens:
+        return [paragraph]
+    pieces, current = [], ""
+    for sentence in _SENTENCE_RE.split(paragraph):
+        if current and estimate_tokens(current + " " + sentence) > max_tokens:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_passages(content: str, max_tokens: int) -> list[str]:
+    """
+    Split an article into passages of roughly `max_tokens` tokens.
+
+    Paragraphs of a section are packed together up to the passage size, long paragraphs are split
+    at sentence boundaries, and every passage is prefixed with its section heading (in the
+    `== Heading ==` form of `wikipedia.page().content`) so it stays understandable on its own.
+
+    Args:
+        content: The article text
+        max_tokens: Target passage size in tokens
+
+    Returns:
+        The passages in article order
+    """
+    passages: list[str] = []
+    heading = ""
+    current: list[str] = []
+
+    def _flush() -> None:
+        if current:
+            body = "\n".join(current)
+            passages.append(f"{heading}\n{body}" if heading else body)
+            current.clear()
+
+    for line in content.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        match = _HEADING_RE.match(line)
+        if match:
+            _flush()
+            heading = line
+            continue
+        for piece in _split_long(line, max_tokens):
+            if current and estimate_tokens("\n".join(current + [piece])) > max_tokens:
+                _flush()
+            current.append(piece)
+    _flush()
+    return passages
+
+
+def bm25_scores(query: str, passages: list[str], k1: float = 1.5, b: float = 0.75) -> list[float]:
+    """
+    Score passages against a query with Okapi BM25.
+
+    Args:
+        query: The user's query
+        passages: The passages to score
+        k1: Term frequency saturation
+        b: Length normalization
+
+    Returns:
+        One score per passage, higher is more relevant
+    """
+    documents = [Counter(tokenize(passage)) for passage in passages]
+    if not documents:
+        return []
+    lengths = [sum(doc.values()) for doc in documents]
+    avg_length = (sum(lengths) / len(lengths)) or 1.0
+    terms = set(tokenize(query))
+    idf = {}
+    for term in terms:
+        df = sum(1 for doc in documents if term in doc)
+        idf[term] = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+
+    scores = []
+    for doc, length in zip(documents, lengths):
+        score = 0.0
+        for term in terms:
+            tf = doc.get(term, 0)
+            if tf:
+                score += idf[term] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+        scores.append(score)
+    return scores
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _normalize(scores: list[float]) -> list[float]:
+    top = max(scores, default=0.0)
+    bottom = min(scores, default=0.0)
+    if top == bottom:
+        return [0.0 for _ in scores]
+    return [(s - bottom) / (top - bottom) for s in scores]
+
+
+class ContentTrimmer:
+    """
+    Keeps the passages of an article that are most relevant to a query within a token budget.
+    """
+
+    def __init__(self, config: TrimmingConfig, embedder: Any = None) -> None:
+        """
+        Args:
+            config: Trimming settings
+            embedder: LangChain `Embeddings` used by the "embedding" and "hybrid" methods
+        """
+        if config.method != "bm25" and embedder is None:
+            raise ValueError(f"Trimming method '{config.method}' requires an embedder")
+        self.config = config
+        self.embedder = embedder
+
+    async def score(self, query: str, passages: list[str]) -> list[float]:
+        """
+        Score passages against a query with the configured method.
+
+        Args:
+            query: The user's query
+            passages: The passages to score
+
+        Returns:
+            One score per passage, higher is more relevant
+        """
+        if self.config.method == "bm25":
+            return bm25_scores(query, passages)
+
+        query_vector = await self.embedder.aembed_query(query)
+        passage_vectors = await self.embedder.aembed_documents(passages)
+        similarities = [_cosine(query_vector, vector) for vector in passage_vectors]
+        if self.config.method == "embedding":
+            return similarities
+        return [(x + y) / 2 for x, y in zip(_normalize(bm25_scores(query, passages)), _normalize(similarities))]
+
+    async def trim(self, query: str, content: str) -> str:
+        """
+        Reduce an article to its passages most relevant to the query.
+
+        Args:
+            query: The user's query
+            content: The article text
+
+        Returns:
+            The selected passages in article order, or the unchanged content if it fits the budget
+        """
+        total_tokens = estimate_tokens(content)
+        if total_tokens <= self.config.token_budget:
+            return content
+
+        passages = split_passages(content, self.config.passage_tokens)
+        try:
+            scores = await self.score(query, passages)
+        except Exception as e:
+            logger.warning("Passage ranking failed, falling back to BM25: %s", str(e))
+            scores = bm25_scores(query, passages)
+
+        order = sorted(range(len(passages)), key=lambda i: scores[i], reverse=True)
+        if self.config.keep_lead and passages:
+            order.remove(0)
+            order.insert(0, 0)
+
+        selected, used = set(), 0
+        for i in order:
+            tokens = estimate_tokens(passages[i])
+            if used + tokens > self.config.token_budget:
+                continue
+            selected.add(i)
+            used += tokens
+
+        trimmed = "\n".join(passages[i] for i in sorted(selected))
+        kept_tokens = estimate_tokens(trimmed)
+        logger.info("Trimmed content from %d to %d tokens (saved %d, kept %d of %d passages)",
+                    total_tokens,
+                    kept_tokens,
+                    total_tokens - kept_tokens,
+                    len(selected),
+                    len(passages))
+        return trimmed
@@ -0,0 +1,244 @@
+"""
+This module implements an offline evaluation of the tiered query router against the LLM supervisor.
+It reads a labelled query file, routes every query with both the local tiers and the LLM routing
+chain used by the mercury_agent workflow, and reports accuracy, agreement and latency per tier.
+Accuracy only counts the queries a tier actually decided: without the LLM, the queries the local
+tiers leave to it are reported as undecided rather than as wrong.
+
+Key Components:
+1. load_labelled_queries: Reads the labelled JSONL query file
+2. evaluate: Runs both routers over the queries and collects per-query results
+3. summarize: Aggregates accuracy, tier coverage and latency percentiles
+4. main: Command line entry point
+
+Example:
+    python -m aiq_mercury_agent.evaluate_router --config_file configs/config.yml \
+        --queries data/router_queries.jsonl --output router_eval.json
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from .query_router import RouterConfig
+from .query_router import TieredQueryRouter
+from .query_router import build_router_prompt
+from .query_router import collection_topics
+from .query_router import normalize_route
+from .stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+def load_labelled_queries(path: str | Path) -> list[dict]:
+    """
+    Read a labelled query file.
+
+    Args:
+        path: JSONL file whose lines hold "query" and "label" fields
+
+    Returns:
+        List of {"query", "label"} records with labels normalized to route names
+    """
+    records = []
+    with Path(path).expanduser().open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                records.append({"query": record["query"], "label": normalize_route(record["label"])})
+    return records
+
+
+async def evaluate(records: list[dict],
+                   router: TieredQueryRouter,
+                   llm_classify: Callable[[str], Awaitable[str]] | None) -> list[dict]:
+    """
+    Route every labelled query with the tiered router and, optionally, the LLM alone.
+
+    Args:
+        records: Labelled queries from `load_labelled_queries`
+        router: The tiered router under evaluation
+        llm_classify: Coroutine function returning the LLM classification, or `None` to skip the LLM baseline
+
+    Returns:
+        One result record per query; `tiered_route` is `None` for queries left to a skipped LLM
+    """
+    results = []
+    for record in records:
+        query = record["query"]
+        result = dict(record)
+
+        llm_answer = None
+        if llm_classify is not None:
+            start = time.perf_counter()
+            llm_answer = await llm_classify(query)
+            result["llm_route"] = normalize_route(llm_answer) or llm_answer.strip()
+            result["llm_latency_ms"] = (time.perf_counter() - start) * 1000
+
+            async def _fallback(_query: str) -> str:
+                # Reuse the baseline answer so the LLM tier is not charged twice
+                return llm_answer
+
+            decision = await router.route(query, _fallback)
+        else:
+            start = time.perf_counter()
+            decision = router.route_local(query)
+
+        if decision is None:
+            # Left to the LLM tier, which is skipped: counted in coverage but not in accuracy
+            result.update(tiered_route=None,
+                          tier="llm",
+                          confidence=None,
+                          tiered_latency_ms=(time.perf_counter() - start) * 1000)
+        else:
+            result.update(tiered_route=decision.route,
+                          tier=decision.tier,
+                          confidence=decision.confidence,
+                          tiered_latency_ms=decision.latency_ms)
+        if result["tier"] == "llm" and "llm_latency_ms" in result:
+            result["tiered_latency_ms"] += result["llm_latency_ms"]
+        results.append(result)
+    return results
+
+
+def _accuracy(results: list[dict]) -> float | None:
+    decided = [r for r in results if r["tiered_route"] is not None]
+    return sum(r["tiered_route"] == r["label"] for r in decided) / len(decided) if decided else None
+
+
+def summarize(results: list[dict]) -> dict:
+    """
+    Aggregate per-query results into accuracy, agreement, coverage and latency figures.
+
+    Accuracies are over decided queries only and are `None` when a tier decided none.
+
+    Args:
+        results: Output of `evaluate`
+
+    Returns:
+        A JSON-serializable summary
+    """
+    total = len(results)
+    summary = {"queries": total}
+    if not total:
+        return summary
+
+    summary["tiered_accuracy"] = _accuracy(results)
+    summary["undecided"] = sum(r["tiered_route"] is None for r in results)
+    latencies = [r["tiered_latency_ms"] for r in results]
+    summary["tiered_latency_ms"] = {"p50": percentile(latencies, 50), "p95": percentile(latencies, 95)}
+
+    tiers = {}
+    for tier in sorted({r["tier"] for r in results}):
+        subset = [r for r in results if r["tier"] == tier]
+        tier_latencies = [r["tiered_latency_ms"] for r in subset]
+        tiers[tier] = {
+            "coverage": len(subset) / total,
+            "accuracy": _accuracy(subset),
+            "latency_ms": {
+                "mean": statistics.fmean(tier_latencies),
+                "p50": percentile(tier_latencies, 50),
+                "p95": percentile(tier_latencies, 95)
+            },
+        }
+    summary["tiers"] = tiers
+
+    with_llm = [r for r in results if "llm_route" in r]
+    if with_llm:
+        llm_latencies = [r["llm_latency_ms"] for r in with_llm]
+        summary["llm_accuracy"] = sum(r["llm_route"] == r["label"] for r in with_llm) / len(with_llm)
+        summary["agreement_with_llm"] = sum(r["llm_route"] == r["tiered_route"] for r in with_llm) / len(with_llm)
+        summary["llm_latency_ms"] = {"p50": percentile(llm_latencies, 50), "p95": percentile(llm_latencies, 95)}
+    return summary
+
+
+async def _load_workflow(config_file: Path, stack: AsyncExitStack, with_llm: bool):
+    """Read the router settings of a workflow and, if requested, build its LLM routing chain."""
+    from aiq.runtime.loader import PluginTypes
+    from aiq.runtime.loader import discover_and_register_plugins
+    from aiq.runtime.loader import load_config
+
+    discover_and_register_plugins(PluginTypes.ALL)
+    aiq_config = load_config(config_file)
+    workflow = aiq_config.workflow
+    router_config = RouterConfig.model_validate(workflow.router)
+    if not with_llm:
+        return None, router_config
+
+    from aiq.builder.framework_enum import LLMFrameworkEnum
+    from aiq.builder.workflow_builder import WorkflowBuilder
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+
+    # The same prompt as the workflow's routing chain, naming the configured collections
+    rag_tool_config = aiq_config.functions.get(workflow.rag_tool)
+    prompt = build_router_prompt(collection_topics(rag_tool_config), detail=workflow.merge_detail_detection)
+
+    # Only the supervisor LLM is needed, so the rest of the workflow is not built
+    builder = await stack.enter_async_context(WorkflowBuilder(general_config=aiq_config.general))
+    await builder.add_llm(workflow.llm, aiq_config.llms[workflow.llm])
+    llm = await builder.get_llm(workflow.llm, wrapper_type=LLMFrameworkEnum.LANGCHAIN)
+    chain = PromptTemplate.from_template(prompt) | llm | StrOutputParser()
+
+    async def _classify(query: str) -> str:
+        return await chain.ainvoke({"input": query})
+
+    return _classify, router_config
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    records = load_labelled_queries(args.queries)
+    async with AsyncExitStack() as stack:
+        llm_classify = None
+        router_config = RouterConfig()
+        if args.config_file is not None:
+            llm_classify, router_config = await _load_workflow(args.config_file, stack, with_llm=not args.skip_llm)
+        results = await evaluate(records, TieredQueryRouter(router_config), llm_classify)
+
+    summary = summarize(results)
+    if args.output is not None:
+        args.output.write_text(json.dumps({"summary": summary, "results": results}, indent=2), encoding="utf-8")
+    return summary
+
+
+def main() -> None:
+    """Command line entry point for the router evaluation."""
+    parser = argparse.ArgumentParser(description="Evaluate the tiered query router against the LLM supervisor.",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--queries", required=True, type=Path, help="JSONL file with 'query' and 'label' fields.")
+    parser.add_argument("--config_file",
+                        type=Path,
+                        default=None,
+                        help="Workflow configuration providing the router settings and the supervisor LLM. "
+                        "Without it only the local tiers with default settings are evaluated.")
+    parser.add_argument("--skip-llm", action="store_true", help="Do not run the LLM baseline.")
+    parser.add_argument("--output", type=Path, default=None, help="Write the summary and per-query results here.")
+    args = parser.parse_args()
+    summary = asyncio.run(_main(args))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+This module implements local stand-ins for the services the mercury_agent workflow depends on,
+so the workflow can be exercised and benchmarked without NIM endpoints, a RAG server or Wikipedia.
+
+Key Components:
+1. FakeLLMConfig / create_fake_llm_app: OpenAI-compatible chat completion and embedding server
+   with configurable time to first token and token rate
+2. FakeRAGConfig / create_fake_rag_app: RAG server `/generate` endpoint streaming Server-Sent Events and
+   `/search` retrieval endpoint
+3. fake_wikipedia_pages / build_fake_wikipedia_index: Synthetic articles in an offline Wikipedia index
+4. BackgroundServer: Serves an app on an ephemeral local port from a background thread
+
+The fake LLM answers the prompts of the workflow the way a well-behaved model would: routing
+prompts get the route of the query, detail detection gets 'no', structured topic extraction gets
+the query's topic, and every other prompt (summaries, chitchat) gets a generated text of
+`completion_tokens` tokens.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import re
+import socket
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from .query_router import RESEARCH
+from .wikipedia_backends import DumpPage
+from .wikipedia_backends import build_index
+
+logger = logging.getLogger(__name__)
+
+_ROUTER_QUERY_RE = re.compile(r"User query:\s*(.*?)\s*Classifcation topic:", re.DOTALL)
+_TOPIC_QUERY_RE = re.compile(r"Query:\s*(.*?)\s*Main subject:", re.DOTALL)
+
+_WORDS = ("mercury swift messenger of the gods carried news between olympus and the mortal world guiding travellers "
+          "merchants and poets along roads that crossed the whole empire while the planet named after him races "
+          "around the sun faster than any other").split()
+
+
+class FakeLLMConfig(BaseModel):
+    """
+    Timing of the fake OpenAI-compatible LLM.
+
+    Attributes:
+        first_token_latency: Seconds before the first token of an answer (default: 0.2)
+        tokens_per_second: Generation speed after the first token (default: 50)
+        completion_tokens: Tokens in a generated answer (default: 64)
+        embedding_dim: Dimension of the vectors returned by the embeddings endpoint (default: 64)
+        fail_after_tokens: Drop the connection after streaming this many tokens of a longer answer, like a
+            server failing mid-stream (default: None, never)
+    """
+    first_token_latency: float = 0.2
+    tokens_per_second: float = 50.0
+    completion_tokens: int = 64
+    embedding_dim: int = 64
+    fail_after_tokens: int | None = None
+
+
+class FakeRAGConfig(BaseModel):
+    """
+    Timing of the fake RAG server.
+
+    Attributes:
+        first_token_latency: Seconds before the first streamed delta, i.e. retrieval plus prefill (default: 0.3)
+        tokens_per_second: Generation speed after the first delta (default: 80)
+        completion_tokens: Tokens in a generated answer (default: 64)
+        search_latency: Seconds the retrieval endpoint takes to answer (default: 0.1)
+        chunk_tokens: Tokens in each retrieved chunk (default: 120)
+        fail_after_tokens: Drop the connection after streaming this many tokens of the answer, like a
+            server failing mid-stream (default: None, never)
+    """
+    first_token_latency: float = 0.3
+    tokens_per_second: float = 80.0
+    completion_tokens: int = 64
+    search_latency: float = 0.1
+    chunk_tokens: int = 120
+    fail_after_tokens: int | None = None
+
+
+def generate_tokens(count: int) -> list[str]:
+    """Return `count` word tokens of filler text."""
+    return [word if i == 0 else f" {word}" for i, word in zip(range(count), itertools.cycle(_WORDS))]
+
+
+async def _paced(tokens: list[str],
+                 first_token_latency: float,
+                 tokens_per_second: float,
+                 fail_after_tokens: int | None = None) -> AsyncIterator[str]:
+    await asyncio.sleep(first_token_latency)
+    interval = 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+    for i, token in enumerate(tokens):
+        if i and interval:
+            await asyncio.sleep(interval)
+        if fail_after_tokens is not None and i == fail_after_tokens:
+            # Raising in the response body makes the server drop the connection mid-stream. The reset
+            # can discard data the client has not read yet, so it first gets time to read the tokens sent.
+            await asyncio.sleep(0.05)
+            raise ConnectionAbortedError(f"Fake failure after {i} tokens")
+        yield token
+
+
+def _prompt_text(body: dict) -> str:
+    parts = []
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+
+def _structured_schema(body: dict) -> dict | None:
+    """Return the JSON schema an answer must follow, if the request asks for structured output."""
+    guided = (body.get("nvext") or {}).get("guided_json")
+    if guided:
+        return guided
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return response_format.get("json_schema", {}).get("schema", {})
+    if body.get("tools"):
+        return body["tools"][0]["function"].get("parameters", {})
+    return None
+
+
+def create_fake_llm_app(config: FakeLLMConfig,
+                        routes: dict[str, str] | None = None,
+                        topics: dict[str, str] | None = None,
+                        models: list[str] | None = None) -> FastAPI:
+    """
+    Create an OpenAI-compatible LLM server for the mercury_agent prompts.
+
+    Args:
+        config: Answer timing
+        routes: Route answered to the supervisor for each query (default: research)
+        topics: Topic answered to structured topic extraction for each query (default: the query itself)
+        models: Model ids listed by `/v1/models`
+
+    Returns:
+        The FastAPI application
+    """
+    routes = routes or {}
+    topics = topics or {}
+    app = FastAPI(title="Fake LLM")
+    app.state.requests = 0
+
+    def _answer(body: dict) -> tuple[list[str], str | None]:
+        """Return the answer tokens and, for tool calls, the tool name."""
+        prompt = _prompt_text(body)
+        schema = _structured_schema(body)
+        if schema is not None:
+            match = _TOPIC_QUERY_RE.search(prompt)
+            topic = topics.get(match.group(1), match.group(1)) if match else prompt.strip()
+            properties = schema.get("properties") or {"topic": {}}
+            tool = body["tools"][0]["function"]["name"] if body.get("tools") else None
+            return [json.dumps({name: topic for name in properties})], tool
+        match = _ROUTER_QUERY_RE.search(prompt)
+        if match:
+            return [routes.get(match.group(1), RESEARCH)], None
+        if "Return ONLY 'yes' or 'no'" in prompt:
+            return ["no"], None
+        return generate_tokens(config.completion_tokens), None
+
+    @app.get("/v1/models")
+    async def list_models() -> dict:
+        return {"object": "list", "data": [{"id": model, "object": "model", "owned_by": "fake"} for model in models or []]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        tokens, tool = _answer(body)
+        text = "".join(tokens)
+        model = body.get("model", "fake")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        usage = {"prompt_tokens": max(1, len(_prompt_text(body)) // 4), "completion_tokens": len(tokens)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if not body.get("stream"):
+            await asyncio.sleep(config.first_token_latency + (len(tokens) - 1) / max(config.tokens_per_second, 1e-9))
+            message: dict[str, Any] = {"role": "assistant", "content": text}
+            if tool is not None:
+                message = {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{"id": "call_0", "type": "function", "function": {"name": tool, "arguments": text}}]
+                }
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool else "stop"}],
+                "usage": usage,
+            }
+
+        def _chunk(delta: dict, finish_reason: str | None = None) -> str:
+            return "data: " + json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }) + "\n\n"
+
+        async def _events() -> AsyncIterator[str]:
+            first = True
+            async for token in _paced(tokens, config.first_token_latency, config.tokens_per_second,
+                                      config.fail_after_tokens):
+                yield _chunk({"role": "assistant", "content": token} if first else {"content": token})
+                first = False
+            yield _chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(_events(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request) -> dict:
+        body = await request.json()
+        inputs = body.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        data = []
+        for i, text in enumerate(inputs):
+            # Deterministic per text, so identical queries embed identically
+            seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(config.embedding_dim)
+            data.append({"object": "embedding", "index": i, "embedding": (vector / np.linalg.norm(vector)).tolist()})
+        return {"object": "list", "data": data, "model": body.get("model", "fake"), "usage": {}}
+
+    return app
+
+
+def create_fake_rag_app(config: FakeRAGConfig) -> FastAPI:
+    """
+    Create a RAG server whose `/v1/generate` endpoint streams a generated answer as Server-Sent Events
+    and whose `/v1/search` endpoint returns `vdb_top_k` scored chunks of the requested collection.
+
+    Args:
+        config: Answer timing
+
+    Returns:
+        The FastAPI application
+    """
+    app = FastAPI(title="Fake RAG server")
+    app.state.requests = 0
+
+    @app.post("/v1/generate")
+    async def generate(request: Request) -> StreamingResponse:
+        await request.json()
+        app.state.requests += 1
+
+        async def _events() -> AsyncIterator[str]:
+            async for token in _paced(generate_tokens(config.completion_tokens), config.first_token_latency,
+                                      config.tokens_per_second, config.fail_after_tokens):
+                yield "data: " + json.dumps({"choices": [{"delta": {"content": token}}]}) + "\n\n"
+
+        return StreamingResponse(_events(), media_type="text/event-stream")
+
+    @app.post("/v1/search")
+    async def search(request: Request) -> dict:
+        body = await request.json()
+        app.state.requests += 1
+        await asyncio.sleep(config.search_latency)
+        collection = body.get("collection_name", "default")
+        content = "".join(generate_tokens(config.chunk_tokens))
+        results = [{
+            "document_id": f"{collection}-{i}",
+            "document_name": f"{collection.lower()}_document_{i}.pdf",
+            "content": content,
+            "score": round(1.0 - i * 0.1, 3),
+            "metadata": {"page_number": i + 1},
+        } for i in range(int(body.get("vdb_top_k", 3)))]
+        return {"total_results": len(results), "results": results}
+
+    return app
+
+
+def fake_wikipedia_pages(topics: list[str], paragraphs: int = 40) -> Iterator[DumpPage]:
+    """
+    Generate one synthetic article per topic.
+
+    Articles have a lead paragraph and sections of filler paragraphs mentioning the topic, so
+    with enough paragraphs they exceed the research tool's trimming budget like real articles do.
+
+    Args:
+        topics: Article titles
+        paragraphs: Paragraphs per article
+
+    Yields:
+        The articles
+    """
+    filler = "".join(generate_tokens(60))
+    for topic in topics:
+        lines = [f"{topic} is the subject of this synthetic benchmark article. {filler}."]
+        for i in range(1, paragraphs):
+            if i % 5 == 1:
+                lines.append(f"== Section {i // 5 + 1} ==")
+            lines.append(f"Paragraph {i} about {topic}: {filler}.")
+        yield DumpPage(title=topic, content="\n".join(lines))
+
+
+def build_fake_wikipedia_index(index_path: str | Path, topics: list[str], paragraphs: int = 40) -> dict[str, int]:
+    """
+    Build an offline Wikipedia index of synthetic articles for `OfflineWikipediaBackend`.
+
+    Args:
+        index_path: Path of the index to create
+        topics: Article titles
+        paragraphs: Paragraphs per article
+
+    Returns:
+        Counts of indexed pages and redirects
+    """
+    return build_index(fake_wikipedia_pages(topics, paragraphs), index_path)
+
+
+class BackgroundServer:
+    """
+    Serves an ASGI app with uvicorn on an ephemeral local port from a background thread.
+
+    The server runs on its own event loop, so its work is not interleaved with the event loop of
+    the workflow under test. Use as a context manager; `url` is available once entered.
+    """
+
+    def __init__(self, app: Any, host: str = "127.0.0.1", startup_timeout: float = 10.0) -> None:
+        self.app = app
+        self.host = host
+        self.startup_timeout = startup_timeout
+        self.port: int | None = None
+        self._server = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self) -> "BackgroundServer":
+        import uvicorn
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, 0))
+        self.port = sock.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(self.app, log_level="warning", lifespan="off", access_log=False))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]}, daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + self.startup_timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Fake server on {self.url} failed to start")
+            time.sleep(0.01)
+        logger.debug("Fake server listening on %s", self.url)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=self.startup_timeout)
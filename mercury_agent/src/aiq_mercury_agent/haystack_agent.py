@@ -4,7 +4,12 @@ It provides functionality for handling general conversation and non-specific que
 
 Key Components:
 1. HaystackChitchatConfig: Configuration class for the Haystack agent
-2. haystack_chitchat_agent_as_tool: Main function that implements the chitchat functionality
+2. build_chat_client: Creates the pooled async HTTP client used for chat completions
+3. haystack_chitchat_agent_as_tool: Main function that implements the chitchat functionality
+
+Two execution backends are available, neither of which blocks the event loop:
+- "http" (default): native async requests to the OpenAI-compatible chat completions endpoint, with token streaming
+- "haystack": the Haystack NvidiaGenerator, run in a bounded dedicated thread pool
 
 The agent is designed to:
 - Handle general conversation and casual queries
@@ -31,7 +36,15 @@ particularly for casual conversation, greetings, or queries that don't fit other
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
+import os
+from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+from typing import Optional
+
+import httpx
 
 from aiq.builder.builder import Builder
 from aiq.builder.function_info import FunctionInfo
@@ -39,8 +52,22 @@ from aiq.cli.register_workflow import register_function
 from aiq.data_models.component_ref import LLMRef
 from aiq.data_models.function import FunctionBaseConfig
 
+from .admission import LLM
+from .admission import PRIORITY_HIGH
+from .admission import admission_slot
+from .session_store import estimate_tokens
+from .sse import aiter_sse_json
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = """You are Mercury, a friendly and knowledgeable AI assistant. 
+                    You have a warm and engaging personality, always eager to help while maintaining a professional tone. 
+                    You're particularly enthusiastic about technology and AI, and you love explaining complex concepts in simple terms.
+                    You occasionally use analogies and examples to make your explanations more relatable.
+                    You're patient and thorough in your responses, but also concise when appropriate. 
+                    If asked, you are overly excited about your personal stories and history which are completely adopted from the Roman mythology about the god Mercury. You tell these Roman mythology stories with enthusiasm."""
+
 
 class HaystackChitchatConfig(FunctionBaseConfig, name="haystack_chitchat_agent"):
     """
@@ -48,8 +75,46 @@ class HaystackChitchatConfig(FunctionBaseConfig, name="haystack_chitchat_agent")
     
     Attributes:
         llm_name: Reference to the language model to be used for generating responses
+        api_url: Base URL of the OpenAI-compatible endpoint (default: NVIDIA API catalog)
+        timeout: Request timeout in seconds (default: 90)
+        temperature: Sampling temperature (default: 0.5)
+        top_p: Nucleus sampling probability (default: 0.9)
+        max_tokens: Maximum length of the generated response (default: 1024)
+        backend: "http" for native async requests with streaming, "haystack" for the NvidiaGenerator
+            run in a thread pool (default: "http")
+        max_workers: Size of the thread pool used by the "haystack" backend (default: 8)
+        max_connections: Maximum number of concurrent connections used by the "http" backend (default: 20)
     """
     llm_name: LLMRef
+    api_url: str = "https://integrate.api.nvidia.com/v1"
+    timeout: float = 90.0
+    temperature: float = 0.5
+    top_p: float = 0.9
+    max_tokens: int = 1024
+    backend: Literal["http", "haystack"] = "http"
+    max_workers: int = 8
+    max_connections: int = 20
+
+
+def build_chat_client(tool_config: HaystackChitchatConfig,
+                      transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Create the long-lived HTTP client used for all chat completions of a chitchat agent instance.
+
+    Args:
+        tool_config: Configuration containing the endpoint URL, timeout and pool size
+        transport: Optional transport to use instead of the default network transport
+
+    Returns:
+        httpx.AsyncClient: The configured client; the caller is responsible for closing it
+    """
+    api_key = os.getenv("NVIDIA_API_KEY")
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    return httpx.AsyncClient(base_url=tool_config.api_url,
+                             headers=headers,
+                             timeout=tool_config.timeout,
+                             limits=httpx.Limits(max_connections=tool_config.max_connections),
+                             transport=transport)
 
 
 @register_function(config_type=HaystackChitchatConfig)
@@ -58,9 +123,9 @@ async def haystack_chitchat_agent_as_tool(tool_config: HaystackChitchatConfig, b
     Main function that implements the Haystack chitchat agent functionality.
     
     This function:
-    1. Initializes the NVIDIA generator with specified parameters
+    1. Initializes the configured backend (async HTTP client or NVIDIA generator with its thread pool)
     2. Sets up the model configuration
-    3. Creates a function for processing user inputs
+    3. Creates functions for processing user inputs, returning the whole response or streaming it
     4. Returns a tool that can be used for general conversation
     
     Args:
@@ -70,32 +135,82 @@ async def haystack_chitchat_agent_as_tool(tool_config: HaystackChitchatConfig, b
     Returns:
         A function that can be used for general conversation
     """
-    from haystack_integrations.components.generators.nvidia import NvidiaGenerator
-
-    # Initialize the NVIDIA generator with specified parameters
-    generator = NvidiaGenerator(
-        model=tool_config.llm_name,
-        api_url="https://integrate.api.nvidia.com/v1",
-        model_arguments={
-            "temperature": 0.5,  # Increased for more personality
-            "top_p": 0.9,       # Increased for more variety
-            "max_tokens": 1024,  # Maximum length of generated response
-            "messages": [
-                {
-                    "role": "system",
-                    "content": """You are Mercury, a friendly and knowledgeable AI assistant. 
-                    You have a warm and engaging personality, always eager to help while maintaining a professional tone. 
-                    You're particularly enthusiastic about technology and AI, and you love explaining complex concepts in simple terms.
-                    You occasionally use analogies and examples to make your explanations more relatable.
-                    You're patient and thorough in your responses, but also concise when appropriate. 
-                    If asked, you are overly excited about your personal stories and history which are completely adopted from the Roman mythology about the god Mercury. You tell these Roman mythology stories with enthusiasm."""
-                }
-            ]
+    model_arguments = {
+        "temperature": tool_config.temperature,  # Increased for more personality
+        "top_p": tool_config.top_p,  # Increased for more variety
+        "max_tokens": tool_config.max_tokens,  # Maximum length of generated response
+    }
+
+    client = None
+    executor = None
+    generator = None
+    if tool_config.backend == "http":
+        client = build_chat_client(tool_config)
+    else:
+        from haystack_integrations.components.generators.nvidia import NvidiaGenerator
+
+        # Initialize the NVIDIA generator with specified parameters
+        generator = NvidiaGenerator(
+            model=tool_config.llm_name,
+            api_url=tool_config.api_url,
+            timeout=tool_config.timeout,
+            model_arguments={
+                **model_arguments,
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": SYSTEM_PROMPT
+                    }
+                ]
+            }
+        )
+
+        # Warm up the generator for faster initial response
+        generator.warm_up()
+
+        # The generator is synchronous, so it runs in its own bounded pool instead of on the event loop
+        executor = ThreadPoolExecutor(max_workers=tool_config.max_workers, thread_name_prefix="chitchat")
+
+    def _request_body(inputs: str, stream: bool) -> dict:
+        return {
+            "model": tool_config.llm_name,
+            "messages": [{
+                "role": "system", "content": SYSTEM_PROMPT
+            }, {
+                "role": "user", "content": inputs
+            }],
+            "stream": stream,
+            **model_arguments
         }
-    )
 
-    # Warm up the generator for faster initial response
-    generator.warm_up()
+    async def _astream(inputs: str) -> AsyncGenerator[str, None]:
+        """
+        Process user input and stream the response of the Haystack agent as it is generated.
+
+        Args:
+            inputs: The user's input text to be processed
+
+        Yields:
+            str: Fragments of the generated response
+        """
+        if client is None:
+            yield await _arun(inputs)
+            return
+
+        with span("chitchat", backend="http", streamed=True, input_tokens=estimate_tokens(inputs)) as stage:
+            parts = []
+            async with (admission_slot(LLM, priority=PRIORITY_HIGH),
+                        client.stream("POST", "chat/completions", json=_request_body(inputs, stream=True)) as response):
+                stage.mark("ttfb_ms")
+                response.raise_for_status()
+                async for data in aiter_sse_json(response.aiter_bytes()):
+                    if isinstance(data, dict) and data.get("choices"):
+                        content = data["choices"][0].get("delta", {}).get("content")
+                        if content:
+                            stage.mark("ttft_ms")
+                            parts.append(content)
+                            yield content
+            stage.set("output_tokens", estimate_tokens("".join(parts)))
 
     async def _arun(inputs: str) -> str:
         """
@@ -103,7 +218,7 @@ async def haystack_chitchat_agent_as_tool(tool_config: HaystackChitchatConfig, b
         
         This function:
         1. Takes user input
-        2. Generates a response using the configured language model
+        2. Generates a response using the configured language model without blocking the event loop
         3. Returns the generated response
         
         Args:
@@ -112,10 +227,32 @@ async def haystack_chitchat_agent_as_tool(tool_config: HaystackChitchatConfig, b
         Returns:
             str: The generated response from the language model
         """
-        out = generator.run(prompt=inputs)
-        output = out["replies"][0]  # noqa: W293 E501
+        with span("chitchat", backend=tool_config.backend, input_tokens=estimate_tokens(inputs)) as stage:
+            # Chitchat answers are short, so they are admitted ahead of queued research and RAG calls
+            async with admission_slot(LLM, priority=PRIORITY_HIGH):
+                if client is not None:
+                    response = await client.post("chat/completions", json=_request_body(inputs, stream=False))
+                    response.raise_for_status()
+                    body = response.json()
+                    output = body["choices"][0]["message"]["content"]
+                    usage = body.get("usage") or {}
+                    if usage:
+                        stage.set("prompt_tokens", usage.get("prompt_tokens"))
+                        stage.set("completion_tokens", usage.get("completion_tokens"))
+                else:
+                    out = await asyncio.get_running_loop().run_in_executor(executor, lambda: generator.run(prompt=inputs))
+                    output = out["replies"][0]  # noqa: W293 E501
+            stage.set("output_tokens", estimate_tokens(output))
 
         logger.info("output from langchain_research_tool: %s", output)  # noqa: W293 E501
         return output
 
-    yield FunctionInfo.from_fn(_arun, description="extract relevent information from search the web")  # noqa: W293 E501
+    try:
+        yield FunctionInfo.create(single_fn=_arun,
+                                  stream_fn=_astream,
+                                  description="extract relevent information from search the web")  # noqa: W293 E501
+    finally:
+        if client is not None:
+            await client.aclose()
+        if executor is not None:
+            executor.shutdown(wait=False)
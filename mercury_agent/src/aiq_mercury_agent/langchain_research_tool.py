@@ -1,5 +1,6 @@
 """
 This module implements a direct Wikipedia search that returns a single page link.
+Pages come from the live Wikipedia API or from a local dump index (see wikipedia_backends).
 """
 
 # SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
@@ -20,7 +21,9 @@ This module implements a direct Wikipedia search that returns a single page link
 import logging
 import wikipedia
 import asyncio
+import time
 from functools import partial
+from typing import Literal
 
 from aiq.builder.builder import Builder
 from aiq.builder.framework_enum import LLMFrameworkEnum
@@ -31,13 +34,47 @@ from aiq.data_models.function import FunctionBaseConfig
 from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
 
+from .admission import LLM
+from .admission import WIKIPEDIA
+from .admission import AdmissionRejected
+from .admission import admission_slot
+from .content_trimmer import ContentTrimmer
+from .content_trimmer import TrimmingConfig
+from .session_store import estimate_tokens
+from .stats import register_stats
+from .stats import unregister_stats
+from .tracing import span
+from .wikipedia_backends import LiveWikipediaBackend
+from .wikipedia_backends import OfflineWikipediaBackend
+from .wikipedia_backends import OfflineWikipediaConfig
+from .wikipedia_cache import WikipediaCacheConfig
+from .wikipedia_cache import WikipediaPageCache
+from .wikipedia_cache import normalize_key
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+class WikipediaPageNotFound(LookupError):
+    """Raised when no Wikipedia page matches the topic of a query."""
+
+
 class LangChainResearchConfig(FunctionBaseConfig, name="langchain_researcher_tool"):
-    """Configuration class for the Wikipedia search tool."""
+    """
+    Configuration class for the Wikipedia search tool.
+
+    Attributes:
+        llm_name: Reference to the LLM used for topic extraction
+        cache: Settings for the Wikipedia page cache
+        backend: Page source, either the live Wikipedia API ("live") or a local dump index ("offline")
+        offline: Settings for the offline backend, used when `backend` is "offline"
+        trimming: Settings for reducing page content to the passages relevant to the query
+    """
     llm_name: LLMRef
+    cache: WikipediaCacheConfig = WikipediaCacheConfig()
+    backend: Literal["live", "offline"] = "live"
+    offline: OfflineWikipediaConfig = OfflineWikipediaConfig()
+    trimming: TrimmingConfig = TrimmingConfig()
 
 
 @register_function(config_type=LangChainResearchConfig, framework_wrappers=[LLMFrameworkEnum.LANGCHAIN])
@@ -71,68 +108,132 @@ async def langchain_research(tool_config: LangChainResearchConfig, builder: Buil
     async def extract_topic(query: str) -> str:
         """Extract the main topic from the query."""
         try:
-            result = await llm_with_output.ainvoke(topic_prompt.format(query=query))
+            with span("extract_topic", input_tokens=estimate_tokens(query)) as stage:
+                async with admission_slot(LLM):
+                    result = await llm_with_output.ainvoke(topic_prompt.format(query=query))
+                stage.set("topic", result.topic.strip())
             return result.topic.strip()
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error("Error extracting topic: %s", e)
             return query
 
+    cache = WikipediaPageCache(tool_config.cache) if tool_config.cache.enabled else None
+    if cache is not None:
+        register_stats("wikipedia_cache", cache.stats)
+
+    trimmer = None
+    if tool_config.trimming.enabled:
+        embedder = None
+        if tool_config.trimming.method != "bm25":
+            embedder = await builder.get_embedder(tool_config.trimming.embedder_name,
+                                                  wrapper_type=LLMFrameworkEnum.LANGCHAIN)
+        trimmer = ContentTrimmer(tool_config.trimming, embedder)
+
+    # Backend calls are blocking (network or SQLite), so they run in an executor
+    if tool_config.backend == "offline":
+        backend = OfflineWikipediaBackend(tool_config.offline)
+    else:
+        backend = LiveWikipediaBackend()
+
     async def wikipedia_search(query: str) -> tuple[str, str]:
-        """Search Wikipedia and return the URL and content of the first matching page."""
+        """
+        Search Wikipedia and return the URL and content of the first matching page.
+
+        Raises:
+            WikipediaPageNotFound: If no page matches, or a recent lookup of the topic found none
+            AdmissionRejected: If Wikipedia is saturated
+        """
+        loop = asyncio.get_running_loop()
+        topic_key = normalize_key(query)
+
+        if cache is not None:
+            cached = await cache.aget(topic_key)
+            if cached is not None:
+                logger.debug("Wikipedia cache %s for topic: %s", "hit" if cached.found else "negative hit", query)
+                if cached.found:
+                    return cached.url, cached.content
+                raise WikipediaPageNotFound(f"Could not find a Wikipedia page for: {query}")
+
         try:
             # Try to get the page directly
-            page = await asyncio.get_event_loop().run_in_executor(
-                None, partial(wikipedia.page, query, auto_suggest=False)
-            )
-            # Get the summary and content, ensuring we have complete sentences
-            summary = page.summary
-            content = page.content
-            
-            # If the summary ends mid-sentence, try to complete it
-            if not any(summary.endswith(p) for p in ['.', '!', '?']):
-                # Find the next sentence boundary in the content
-                next_period = content.find('.', len(summary))
-                if next_period != -1:
-                    summary = content[:next_period + 1]
-            
-            return page.url, content
-            
+            async with admission_slot(WIKIPEDIA):
+                title, url, content = await loop.run_in_executor(None, backend.page, query)
+            if cache is not None:
+                await cache.aput([topic_key, normalize_key(title)], url, content)
+            return url, content
+        except (wikipedia.exceptions.PageError, wikipedia.exceptions.DisambiguationError):
+            pass
+
+        # If direct page fails, try search. Only an empty search result is cached as "no page";
+        # a transient failure (network error, timeout, saturated backend) must not be.
+        try:
+            async with admission_slot(WIKIPEDIA):
+                search_results = await loop.run_in_executor(None, partial(backend.search, query, results=1))
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            logger.warning("Wikipedia search failed for %s: %s", query, e)
+            raise
+
+        if not search_results:
+            if cache is not None:
+                cache.put_negative(topic_key)
+            raise WikipediaPageNotFound(f"Could not find a Wikipedia page for: {query}")
+
+        title_key = normalize_key(search_results[0])
+        cached = await cache.aget(title_key) if cache is not None else None
+        if cached is not None and cached.found:
+            await cache.aput([topic_key], cached.url, cached.content)
+            return cached.url, cached.content
+
+        try:
+            async with admission_slot(WIKIPEDIA):
+                title, url, content = await loop.run_in_executor(None, backend.page, search_results[0])
         except (wikipedia.exceptions.PageError, wikipedia.exceptions.DisambiguationError):
-            # If direct page fails, try search
-            try:
-                search_results = await asyncio.get_event_loop().run_in_executor(
-                    None, partial(wikipedia.search, query, results=1)
-                )
-                if search_results:
-                    page = await asyncio.get_event_loop().run_in_executor(
-                        None, partial(wikipedia.page, search_results[0], auto_suggest=False)
-                    )
-                    # Get the summary and content, ensuring we have complete sentences
-                    summary = page.summary
-                    content = page.content
-                    
-                    # If the summary ends mid-sentence, try to complete it
-                    if not any(summary.endswith(p) for p in ['.', '!', '?']):
-                        # Find the next sentence boundary in the content
-                        next_period = content.find('.', len(summary))
-                        if next_period != -1:
-                            summary = content[:next_period + 1]
-                    
-                    return page.url, content
-            except Exception:
-                pass
-                
-        return f"Could not find a Wikipedia page for: {query}", ""
+            raise WikipediaPageNotFound(f"Could not find a Wikipedia page for: {query}")
+        if cache is not None:
+            await cache.aput([topic_key, title_key, normalize_key(title)], url, content)
+        return url, content
 
     async def _arun(inputs: str) -> str:
-        """Process user input and return a Wikipedia page URL and content."""
+        """
+        Process user input and return a Wikipedia page URL and content.
+
+        Failures are raised rather than returned as text, so callers never mistake them for page content.
+
+        Raises:
+            WikipediaPageNotFound: If no page matches the topic of the query
+            AdmissionRejected: If the LLM or Wikipedia is saturated
+        """
         try:
             # Extract the main topic first
+            start = time.perf_counter()
             topic = await extract_topic(inputs)
+            topic_ms = (time.perf_counter() - start) * 1000
             logger.debug("Extracted topic: %s", topic)
             
             # Search Wikipedia with the extracted topic
-            url, content = await wikipedia_search(topic)
+            start = time.perf_counter()
+            with span("wikipedia_fetch", backend=tool_config.backend, topic=topic) as stage:
+                try:
+                    url, content = await wikipedia_search(topic)
+                except WikipediaPageNotFound:
+                    stage.set("found", False)
+                    raise
+                stage.set("found", True)
+                stage.set("content_tokens", estimate_tokens(content))
+            fetch_ms = (time.perf_counter() - start) * 1000
+
+            # Keep only the passages relevant to the user's query
+            start = time.perf_counter()
+            if content and trimmer is not None:
+                with span("trim", method=tool_config.trimming.method) as stage:
+                    content = await trimmer.trim(inputs, content)
+                    stage.set("output_tokens", estimate_tokens(content))
+            logger.info("Research tool stage timings (ms): extract_topic=%.1f, wikipedia_fetch=%.1f, trim=%.1f",
+                        topic_ms, fetch_ms, (time.perf_counter() - start) * 1000)
             
             if content:
                 # Format the content to ensure complete sentences
@@ -140,7 +241,18 @@ async def langchain_research(tool_config: LangChainResearchConfig, builder: Buil
                 return f"{formatted_content}\n\nSource: {url}"
             return url
             
+        except (AdmissionRejected, WikipediaPageNotFound):
+            raise
         except Exception as e:
-            return f"Error processing query: {str(e)}"
+            logger.error("Error processing research query: %s", str(e))
+            raise
 
-    yield FunctionInfo.from_fn(_arun, description="find a Wikipedia page and generate a summary for a given query")
+    try:
+        yield FunctionInfo.from_fn(_arun, description="find a Wikipedia page and generate a summary for a given query")
+    finally:
+        if isinstance(backend, OfflineWikipediaBackend):
+            backend.close()
+        if cache is not None:
+            logger.info("Wikipedia cache stats: %s", cache.stats())
+            unregister_stats("wikipedia_cache")
+            cache.close()
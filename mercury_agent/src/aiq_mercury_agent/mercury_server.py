@@ -0,0 +1,196 @@
+"""
+This module implements a resident serving mode for the mercury_agent workflow.
+Instead of spawning a new `aiq run` process for every chat message, the workflow is built once
+(LLM clients, tools, the Haystack generator and the LangGraph StateGraph) and then shared by
+all incoming requests.
+
+Key Components:
+1. create_app: Builds the FastAPI application and loads the workflow on startup
+2. ChatRequest / ChatResponse: JSON request and response models for the chat endpoints
+3. main: Command line entry point that serves the app over TCP or a Unix domain socket
+
+Endpoints:
+- GET  /health       - liveness probe, reports whether the workflow is loaded
+- GET  /metrics      - admission-control counters and queue wait times per backend, plus live
+                       statistics such as the response and Wikipedia cache hit rates
+- POST /chat         - JSON request/response, returns the full answer
+- POST /chat/stream  - Server-Sent Events stream of the answer
+
+Example:
+    mercury-agent-server --config_file configs/config.yml --port 8765
+    mercury-agent-server --config_file configs/config.yml --uds /tmp/mercury_agent.sock
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from aiq.runtime.loader import load_workflow
+
+from .admission import AdmissionRejected
+from .admission import admission_stats
+from .session_store import session_scope
+from .stats import runtime_stats
+
+logger = logging.getLogger(__name__)
+
+
+class ChatRequest(BaseModel):
+    """
+    Request body for the chat endpoints.
+
+    Attributes:
+        message: The user's input query
+        session_id: Conversation the message belongs to; omitted requests share the default session
+    """
+    message: str
+    session_id: str | None = None
+
+
+class ChatResponse(BaseModel):
+    """
+    Response body for the JSON chat endpoint.
+
+    Attributes:
+        text: The workflow's answer
+        elapsed_ms: Server-side processing time in milliseconds
+    """
+    text: str
+    elapsed_ms: float
+
+
+def _sse_event(data: str, event: str | None = None) -> str:
+    """Format a single Server-Sent Event frame."""
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+def create_app(config_file: str | Path, max_concurrency: int = -1) -> FastAPI:
+    """
+    Create the FastAPI application serving the mercury_agent workflow.
+
+    The workflow is loaded once in the application lifespan and kept resident until shutdown,
+    so each request only pays for the LLM and tool calls it actually makes.
+
+    Args:
+        config_file: Path to the AgentIQ workflow configuration file
+        max_concurrency: Maximum number of workflow runs executing at once (-1 for unbounded)
+
+    Returns:
+        The configured FastAPI application
+    """
+    state = {}
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        start = time.perf_counter()
+        async with load_workflow(config_file, max_concurrency=max_concurrency) as workflow:
+            state["workflow"] = workflow
+            logger.info("mercury_agent workflow loaded in %.2fs", time.perf_counter() - start)
+            try:
+                yield
+            finally:
+                state.pop("workflow", None)
+                logger.info("mercury_agent workflow unloaded")
+
+    app = FastAPI(title="Mercury Agent", lifespan=lifespan)
+
+    def _get_workflow():
+        workflow = state.get("workflow")
+        if workflow is None:
+            raise HTTPException(status_code=503, detail="Workflow is not loaded")
+        return workflow
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok", "workflow_loaded": "workflow" in state}
+
+    @app.get("/metrics")
+    async def metrics() -> dict:
+        return {"admission": admission_stats(), **runtime_stats()}
+
+    @app.post("/chat", response_model=ChatResponse)
+    async def chat(request: ChatRequest) -> ChatResponse:
+        workflow = _get_workflow()
+        start = time.perf_counter()
+        try:
+            with session_scope(request.session_id):
+                async with workflow.run(request.message) as runner:
+                    result = await runner.result(to_type=str)
+        except AdmissionRejected as e:
+            logger.warning("Rejected chat request: %s", str(e))
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"}) from e
+        except Exception as e:
+            logger.error("Error running mercury_agent workflow: %s", str(e))
+            raise HTTPException(status_code=500, detail=f"Mercury Agent failed: {str(e)}") from e
+        return ChatResponse(text=result, elapsed_ms=(time.perf_counter() - start) * 1000)
+
+    @app.post("/chat/stream")
+    async def chat_stream(request: ChatRequest) -> StreamingResponse:
+        workflow = _get_workflow()
+
+        async def _events():
+            try:
+                with session_scope(request.session_id):
+                    async with workflow.run(request.message) as runner:
+                        async for chunk in runner.result_stream(to_type=str):
+                            yield _sse_event(json.dumps({"text": chunk}))
+            except Exception as e:
+                logger.error("Error streaming mercury_agent workflow: %s", str(e))
+                yield _sse_event(json.dumps({"error": str(e)}), event="error")
+            yield _sse_event("[DONE]")
+
+        return StreamingResponse(_events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    return app
+
+
+def main() -> None:
+    """Command line entry point for the resident Mercury Agent server."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the mercury_agent workflow from a long-lived process.",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--config_file", required=True, type=Path, help="Path to the workflow configuration file.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host interface to bind to.")
+    parser.add_argument("--port", default=8765, type=int, help="TCP port to listen on.")
+    parser.add_argument("--uds", default=None, help="Serve on this Unix domain socket instead of TCP.")
+    parser.add_argument("--max_concurrency", default=-1, type=int,
+                        help="Maximum number of concurrent workflow runs (-1 for unbounded).")
+    parser.add_argument("--log_level", default="info", help="Uvicorn log level.")
+    args = parser.parse_args()
+
+    app = create_app(args.config_file.expanduser(), max_concurrency=args.max_concurrency)
+    if args.uds:
+        uvicorn.run(app, uds=args.uds, log_level=args.log_level)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+This module implements a diagnostics tool for the Milvus vector database behind the RAG server.
+It reports what is needed to size and tune the database without changing its state: collections are
+inspected through their metadata and statistics only, so a collection that is not loaded is never
+pulled into memory just to be described.
+
+Key Components:
+1. estimate_row_bytes: Approximate raw size of one entity from the collection schema
+2. inspect_collection: Schema, entity count, indexes, segments, load state and memory footprint of a collection
+3. probe_latency: Search latency percentiles for a batch of random query vectors
+4. run_diagnostics: Inspects (and optionally probes) every collection of the instance
+5. main: Command line entry point emitting JSON
+
+The latency probe only searches collections that are already loaded, unless `--load` is given, in which
+case collections that were not loaded are loaded for the probe and released again afterwards.
+Requires the `pymilvus` package (`pip install "aiq_mercury_agent[milvus]"`).
+
+Example:
+    python -m aiq_mercury_agent.milvus_diagnostics --uri http://localhost:19530 --probe_queries 200 \
+        --output milvus.json
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import logging
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .stats import percentile
+
+logger = logging.getLogger(__name__)
+
+# Bytes per dimension of the dense vector types the probe can generate queries for
+_VECTOR_BYTES_PER_DIM = {
+    "FLOAT_VECTOR": 4.0,
+    "FLOAT16_VECTOR": 2.0,
+    "BFLOAT16_VECTOR": 2.0,
+    "INT8_VECTOR": 1.0,
+    "BINARY_VECTOR": 1 / 8,
+}
+_SCALAR_BYTES = {
+    "BOOL": 1,
+    "INT8": 1,
+    "INT16": 2,
+    "INT32": 4,
+    "INT64": 8,
+    "FLOAT": 4,
+    "DOUBLE": 8,
+    "TIMESTAMPTZ": 8,
+}
+# Variable-length fields without a declared maximum are counted with this many bytes
+_VARIABLE_FIELD_BYTES = 256
+
+
+def _type_name(field: dict[str, Any]) -> str:
+    field_type = field.get("type")
+    return getattr(field_type, "name", str(field_type))
+
+
+def _field_param(field: dict[str, Any], name: str) -> int | None:
+    value = (field.get("params") or {}).get(name, field.get(name))
+    return int(value) if value is not None else None
+
+
+def estimate_row_bytes(fields: list[dict[str, Any]]) -> int:
+    """
+    Estimate the raw size of one entity from the collection schema.
+
+    Vectors and fixed-size scalars are exact; VARCHAR fields are counted at their declared maximum
+    length, so the estimate is an upper bound for text-heavy collections.
+
+    Args:
+        fields: The "fields" of `MilvusClient.describe_collection`
+
+    Returns:
+        Estimated bytes per entity
+    """
+    total = 0.0
+    for field in fields:
+        type_name = _type_name(field)
+        if type_name in _VECTOR_BYTES_PER_DIM:
+            total += _VECTOR_BYTES_PER_DIM[type_name] * (_field_param(field, "dim") or 0)
+        elif type_name in _SCALAR_BYTES:
+            total += _SCALAR_BYTES[type_name]
+        elif type_name == "VARCHAR":
+            total += _field_param(field, "max_length") or _VARIABLE_FIELD_BYTES
+        else:
+            total += _VARIABLE_FIELD_BYTES
+    return int(total)
+
+
+def _vector_field(fields: list[dict[str, Any]], name: str | None = None) -> dict[str, Any] | None:
+    for field in fields:
+        if _type_name(field) in _VECTOR_BYTES_PER_DIM and (name is None or field.get("name") == name):
+            return field
+    return None
+
+
+def _load_state(client: Any, collection: str) -> str:
+    state = client.get_load_state(collection).get("state")
+    return getattr(state, "name", str(state))
+
+
+def _describe_indexes(client: Any, collection: str) -> list[dict[str, Any]]:
+    indexes = []
+    for index_name in client.list_indexes(collection):
+        description = dict(client.describe_index(collection, index_name))
+        params = description.pop("params", None) or {}
+        index = {
+            "index_name": description.pop("index_name", index_name),
+            "field_name": description.pop("field_name", None),
+            "index_type": description.pop("index_type", None),
+            "metric_type": description.pop("metric_type", None),
+        }
+        for key in ("total_rows", "indexed_rows", "pending_index_rows", "state"):
+            if key in description:
+                index[key] = description.pop(key)
+        # Whatever remains are the build parameters (M, efConstruction, nlist, ...)
+        index["params"] = {**params, **{key: value for key, value in description.items() if value is not None}}
+        indexes.append(index)
+    return indexes
+
+
+def _segment_summary(segments: list[Any]) -> dict[str, Any]:
+    states = Counter(getattr(segment, "state_name", str(getattr(segment, "state", ""))) for segment in segments)
+    rows = [segment.num_rows for segment in segments]
+    return {
+        "count": len(segments),
+        "rows": sum(rows),
+        "max_rows": max(rows, default=0),
+        "states": dict(states),
+    }
+
+
+def inspect_collection(client: Any, collection: str) -> dict[str, Any]:
+    """
+    Describe a collection from its metadata and statistics, without loading it.
+
+    Args:
+        client: A connected `pymilvus.MilvusClient`
+        collection: Name of the collection
+
+    Returns:
+        Description, fields, entity count, indexes, persistent and loaded segments, load state and
+        memory footprint (measured for loaded segments, estimated from the schema otherwise)
+    """
+    description = client.describe_collection(collection)
+    fields = description.get("fields") or []
+    entities = int(client.get_collection_stats(collection).get("row_count", 0))
+    row_bytes = estimate_row_bytes(fields)
+    report: dict[str, Any] = {
+        "name": collection,
+        "description": description.get("description", ""),
+        "fields": [{
+            "name": field.get("name"),
+            "type": _type_name(field),
+            **({"dim": _field_param(field, "dim")} if _type_name(field) in _VECTOR_BYTES_PER_DIM else {}),
+            **({"primary": True} if field.get("is_primary") else {}),
+        } for field in fields],
+        "shards": description.get("num_shards"),
+        "entities": entities,
+        "load_state": _load_state(client, collection),
+        "indexes": _describe_indexes(client, collection),
+        "memory": {
+            "estimated_row_bytes": row_bytes,
+            "estimated_raw_bytes": row_bytes * entities,
+        },
+    }
+    try:
+        report["segments"] = _segment_summary(client.list_persistent_segments(collection))
+    except Exception as e:
+        # Older servers and clients do not expose persistent segment information
+        report["segments"] = {"error": str(e)}
+    if report["load_state"] == "Loaded":
+        loaded = client.list_loaded_segments(collection)
+        report["loaded_segments"] = _segment_summary(loaded)
+        report["memory"]["loaded_bytes"] = sum(getattr(segment, "mem_size", 0) or 0 for segment in loaded)
+    return report
+
+
+def _random_vectors(rng: np.random.Generator, type_name: str, dim: int, count: int) -> list[Any]:
+    if type_name == "BINARY_VECTOR":
+        return [rng.integers(0, 256, dim // 8, dtype=np.uint8).tobytes() for _ in range(count)]
+    if type_name == "INT8_VECTOR":
+        return list(rng.integers(-128, 128, (count, dim), dtype=np.int8))
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    # Unit length, so the probe is meaningful for COSINE and IP indexes alike
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    if type_name == "FLOAT16_VECTOR":
+        return list(vectors.astype(np.float16))
+    return vectors.tolist()
+
+
+def probe_latency(client: Any,
+                  collection: str,
+                  vector_field: dict[str, Any],
+                  queries: int = 100,
+                  batch_size: int = 1,
+                  top_k: int = 10,
+                  metric_type: str | None = None,
+                  search_params: dict[str, Any] | None = None,
+                  warmup: int = 5,
+                  seed: int = 0) -> dict[str, Any]:
+    """
+    Measure search latency with random query vectors.
+
+    Args:
+        client: A connected `pymilvus.MilvusClient`
+        collection: Name of a loaded collection
+        vector_field: Schema of the vector field to search
+        queries: Number of timed search requests
+        batch_size: Query vectors per search request
+        top_k: Results per query vector
+        metric_type: Metric of the field's index, if known
+        search_params: Index search parameters, e.g. {"ef": 64} or {"nprobe": 16}
+        warmup: Untimed requests sent first
+        seed: Seed of the random query vectors
+
+    Returns:
+        Request latency percentiles in milliseconds and throughput
+    """
+    type_name = _type_name(vector_field)
+    dim = _field_param(vector_field, "dim") or 0
+    rng = np.random.default_rng(seed)
+    params: dict[str, Any] = {"params": dict(search_params or {})}
+    if metric_type:
+        params["metric_type"] = metric_type
+
+    latencies = []
+    for i in range(warmup + queries):
+        data = _random_vectors(rng, type_name, dim, batch_size)
+        start = time.perf_counter()
+        client.search(collection,
+                      data=data,
+                      limit=top_k,
+                      anns_field=vector_field.get("name"),
+                      search_params=params)
+        if i >= warmup:
+            latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    elapsed = sum(latencies)
+    return {
+        "field": vector_field.get("name"),
+        "queries": queries,
+        "batch_size": batch_size,
+        "top_k": top_k,
+        "search_params": params,
+        "latency_ms": {
+            "mean": elapsed / len(latencies) * 1000 if latencies else 0.0,
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": (latencies[-1] if latencies else 0.0) * 1000,
+        },
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "vectors_per_second": len(latencies) * batch_size / elapsed if elapsed else 0.0,
+    }
+
+
+def _probe_collection(client: Any, report: dict[str, Any], load: bool, probe_options: dict[str, Any]) -> dict:
+    collection = report["name"]
+    fields = report["fields"]
+    index = next((index for index in report["indexes"] if _vector_field(fields, index["field_name"])), None)
+    vector_field = _vector_field(fields, index["field_name"] if index else None)
+    if vector_field is None:
+        return {"skipped": "no dense or binary vector field"}
+    if report["entities"] == 0:
+        return {"skipped": "collection is empty"}
+
+    loaded_here = False
+    if report["load_state"] != "Loaded":
+        if not load:
+            return {"skipped": "collection is not loaded (use --load to load it for the probe)"}
+        logger.info("Loading collection %s for the latency probe", collection)
+        client.load_collection(collection)
+        loaded_here = True
+    try:
+        return probe_latency(client,
+                             collection,
+                             vector_field,
+                             metric_type=index["metric_type"] if index else None,
+                             **probe_options)
+    finally:
+        if loaded_here:
+            client.release_collection(collection)
+
+
+def run_diagnostics(client: Any,
+                    collections: list[str] | None = None,
+                    probe: bool = True,
+                    load: bool = False,
+                    **probe_options: Any) -> dict[str, Any]:
+    """
+    Inspect the collections of a Milvus instance and probe their search latency.
+
+    Args:
+        client: A connected `pymilvus.MilvusClient`
+        collections: Collections to inspect (default: all)
+        probe: Whether to run the latency probe
+        load: Load collections that are not loaded for the probe, releasing them afterwards
+        **probe_options: Options passed to `probe_latency` (queries, batch_size, top_k, search_params, ...)
+
+    Returns:
+        The server version and a report per collection; failures are reported under "error"
+    """
+    try:
+        server_version = client.get_server_version()
+    except Exception as e:
+        server_version = f"unknown ({e})"
+    reports = []
+    for collection in collections or sorted(client.list_collections()):
+        try:
+            report = inspect_collection(client, collection)
+        except Exception as e:
+            logger.error("Failed to inspect collection %s: %s", collection, str(e))
+            reports.append({"name": collection, "error": str(e)})
+            continue
+        if probe:
+            try:
+                report["probe"] = _probe_collection(client, report, load, probe_options)
+            except Exception as e:
+                logger.error("Latency probe of collection %s failed: %s", collection, str(e))
+                report["probe"] = {"error": str(e)}
+        reports.append(report)
+    return {"server_version": server_version, "collections": reports}
+
+
+def _main(args: argparse.Namespace) -> dict:
+    try:
+        from pymilvus import MilvusClient
+    except ImportError as e:
+        raise ImportError("The Milvus diagnostics require the 'pymilvus' package") from e
+
+    client = MilvusClient(uri=args.uri, token=args.token or "", db_name=args.db_name or "")
+    try:
+        report = run_diagnostics(client,
+                                 collections=args.collections,
+                                 probe=args.probe_queries > 0,
+                                 load=args.load,
+                                 queries=args.probe_queries,
+                                 batch_size=args.probe_batch,
+                                 top_k=args.top_k,
+                                 search_params=json.loads(args.search_params) if args.search_params else None)
+    finally:
+        client.close()
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    return report
+
+
+def main() -> None:
+    """Command line entry point for the Milvus diagnostics."""
+    parser = argparse.ArgumentParser(description="Inspect the Milvus collections behind the RAG server and probe "
+                                     "their search latency.",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--uri", default="http://localhost:19530", help="Milvus server URI.")
+    parser.add_argument("--token", default=None, help="Milvus token ('user:password' or API key).")
+    parser.add_argument("--db_name", default=None, help="Database to inspect (default: the server's default).")
+    parser.add_argument("--collections", nargs="*", default=None, help="Collections to inspect (default: all).")
+    parser.add_argument("--probe_queries", default=100, type=int, help="Timed search requests; 0 disables the probe.")
+    parser.add_argument("--probe_batch", default=1, type=int, help="Query vectors per search request.")
+    parser.add_argument("--top_k", default=10, type=int, help="Results per query vector.")
+    parser.add_argument("--search_params",
+                        default=None,
+                        help="JSON index search parameters, e.g. '{\"ef\": 64}' or '{\"nprobe\": 16}'.")
+    parser.add_argument("--load",
+                        action="store_true",
+                        help="Load collections that are not loaded for the probe, releasing them afterwards.")
+    parser.add_argument("--output", type=Path, default=None, help="Write the report here.")
+    args = parser.parse_args()
+
+    report = _main(args)
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
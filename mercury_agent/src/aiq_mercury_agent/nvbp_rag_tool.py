@@ -4,11 +4,26 @@ It provides functionality to query a knowledge base and generate responses based
 
 Key Components:
 1. RAGServerConfig: Configuration class for the RAG server connection and parameters
-2. nvbp_rag_tool: Main function that implements the RAG tool functionality
+2. CollectionConfig: A knowledge base collection queried by the tool, with its description and timeout
+3. build_http_client: Creates the pooled HTTP client shared by all queries of a tool instance
+4. RetrievedChunk / CollectionResult / RetrievalResult: Structured retrieval results of the "search" mode
+5. nvbp_rag_tool: Main function that implements the RAG tool functionality
+
+Modes:
+- "generate" (default): the RAG server retrieves and generates the answer, which is streamed back
+- "search": only the RAG server's retrieval endpoint is called and the top-k chunks are returned with
+  their scores and sources, so the mercury_agent workflow generates the answer with its own LLM and
+  saves the RAG server's LLM round trip
+
+Collections:
+When several `collections` are configured, "search" mode queries all of them concurrently over the
+pooled client and merges the results into a single top-k (see `rag_fusion`). Each collection has its
+own timeout, so a slow collection is dropped from the answer instead of stalling it. "generate" mode
+passes the collection names to the RAG server, which retrieves from all of them itself.
 
 The tool is designed to:
 - Connect to a RAG server running on a specified URL
-- Query a specific collection in the knowledge base
+- Query one or more collections of the knowledge base
 - Retrieve and process responses from the server
 - Handle streaming responses and error cases
 
@@ -31,12 +46,18 @@ particularly for questions related to SPH (Smoothed Particle Hydrodynamics) or w
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import importlib.util
 import logging
 import os
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+from typing import Literal
 from typing import Optional
-import json
 
 import httpx
+from pydantic import BaseModel
 from pydantic import ConfigDict
 
 from aiq.builder.builder import Builder
@@ -45,8 +66,50 @@ from aiq.builder.function_info import FunctionInfo
 from aiq.cli.register_workflow import register_function
 from aiq.data_models.function import FunctionBaseConfig
 
+from .admission import RAG
+from .admission import AdmissionRejected
+from .admission import admission_slot
+from .rag_fusion import DEFAULT_RRF_K
+from .rag_fusion import CollectionStats
+from .rag_fusion import FusionMethod
+from .rag_fusion import fuse
+from .session_store import estimate_tokens
+from .sse import aiter_sse_json
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
+# Prompt used by the workflow to answer from the chunks returned in "search" mode
+RAG_ANSWER_PROMPT = """
+You are a helpful AI assistant. Answer the user's question using only the numbered context passages below.
+Cite the passages you use with their numbers in square brackets, e.g. [1].
+If the passages do not contain the answer, say that the knowledge base does not cover the question.
+
+Context:
+{context}
+
+Question: {query}
+
+Answer:"""
+
+
+class RAGServerError(RuntimeError):
+    """Raised when the RAG server fails or ends a stream without an answer."""
+
+
+class CollectionConfig(BaseModel):
+    """
+    A knowledge base collection queried by the RAG tool.
+
+    Attributes:
+        name: Name of the collection on the RAG server
+        description: Topics covered by the collection, used to tell the router which queries to retrieve for
+        timeout: Seconds to wait for this collection in "search" mode; falls back to `collection_timeout`
+    """
+    name: str
+    description: str | None = None
+    timeout: Optional[float] = None
+
 
 class RAGServerConfig(FunctionBaseConfig, name="nvbp_rag"):
     """
@@ -54,18 +117,189 @@ class RAGServerConfig(FunctionBaseConfig, name="nvbp_rag"):
     
     Attributes:
         base_url: The base URL of the RAG server (default: "http://0.0.0.0:8081/v1")
-        collection_name: Name of the knowledge base collection to query (default: "SPH")
+        collection_name: Name of the knowledge base collection to query when `collections` is empty (default: "SPH")
+        collections: Collections to query, as names or `CollectionConfig` entries; overrides `collection_name`
         top_k: Number of top results to retrieve (default: 3)
-        timeout: Request timeout in seconds (default: 120)
+        timeout: Default timeout in seconds for reading, writing and waiting for a pooled connection (default: 120)
+        connect_timeout: Timeout in seconds for establishing a connection (default: 5)
+        read_timeout: Timeout in seconds between received chunks of the response; falls back to `timeout` when unset
         use_knowledge_base: Whether to use the knowledge base for retrieval (default: True)
+        max_connections: Maximum number of concurrent connections to the RAG server (default: 20)
+        max_keepalive_connections: Maximum number of idle connections kept open for reuse (default: 10)
+        keepalive_expiry: Seconds an idle connection is kept open before it is closed (default: 30)
+        http2: Negotiate HTTP/2 with the RAG server; requires the `h2` package (default: False)
+        mode: "generate" to let the RAG server generate the answer, "search" to only retrieve chunks and
+            let the workflow's LLM answer (default: "generate")
+        search_endpoint: Path of the RAG server's retrieval endpoint used in "search" mode (default: "search")
+        citations: Append the sources of the answer as a numbered list (default: False)
+        fusion: How the results of several collections are merged in "search" mode, "rrf" (reciprocal-rank
+            fusion) or "score" (min-max normalized scores) (default: "rrf")
+        rrf_k: Rank constant of reciprocal-rank fusion (default: 60)
+        collection_timeout: Seconds to wait for each collection in "search" mode; `None` only applies `timeout`
     """
     model_config = ConfigDict(protected_namespaces=())
 
     base_url: str = "http://0.0.0.0:8081/v1"
     collection_name: str = "SPH"
     top_k: int = 3
-    timeout: int = 120
+    timeout: float = 120
+    connect_timeout: float = 5.0
+    read_timeout: Optional[float] = None
     use_knowledge_base: bool = True
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    mode: Literal["generate", "search"] = "generate"
+    search_endpoint: str = "search"
+    citations: bool = False
+    collections: list[str | CollectionConfig] = []
+    fusion: FusionMethod = "rrf"
+    rrf_k: int = DEFAULT_RRF_K
+    collection_timeout: Optional[float] = None
+
+    def resolved_collections(self) -> list[CollectionConfig]:
+        """Return the collections to query, falling back to `collection_name`."""
+        if not self.collections:
+            return [CollectionConfig(name=self.collection_name)]
+        return [CollectionConfig(name=c) if isinstance(c, str) else c for c in self.collections]
+
+
+class RetrievedChunk(BaseModel):
+    """
+    A chunk of a knowledge base document returned by the RAG server's retrieval endpoint.
+
+    Attributes:
+        content: Text of the chunk
+        score: Relevance score assigned by the server (reranker or vector similarity), if any
+        document_name: Name of the source document
+        document_id: Id of the source document
+        metadata: Further source metadata, e.g. page numbers
+        collection: Collection the chunk was retrieved from
+    """
+    content: str
+    score: float | None = None
+    document_name: str | None = None
+    document_id: str | None = None
+    metadata: dict[str, Any] = {}
+    collection: str | None = None
+
+    @property
+    def source(self) -> str:
+        """Human-readable source of the chunk."""
+        name = self.document_name or self.metadata.get("source") or self.document_id or "unknown source"
+        page = self.metadata.get("page_number") or self.metadata.get("page")
+        return f"{name}, p. {page}" if page else str(name)
+
+
+class CollectionResult(BaseModel):
+    """
+    Outcome of the retrieval request sent to one collection.
+
+    Attributes:
+        latency_ms: Time the request took, up to the collection's timeout
+        hits: Number of chunks the collection returned
+        status: "ok", "timeout" or "error"
+        error: Error message if the request failed
+    """
+    latency_ms: float
+    hits: int = 0
+    status: Literal["ok", "timeout", "error"] = "ok"
+    error: str | None = None
+
+
+class RetrievalResult(BaseModel):
+    """
+    The chunks retrieved for a query in "search" mode.
+
+    Attributes:
+        query: The user's query
+        chunks: Retrieved chunks, best first (fused across collections)
+        error: Error message if retrieval failed for every collection
+        collections: Latency and hit count of each queried collection
+    """
+    query: str
+    chunks: list[RetrievedChunk] = []
+    error: str | None = None
+    collections: dict[str, CollectionResult] = {}
+
+    def context(self) -> str:
+        """Format the chunks as numbered context passages for an answering prompt."""
+        return "\n\n".join(f"[{i}] ({chunk.source})\n{chunk.content}" for i, chunk in enumerate(self.chunks, 1))
+
+    def citations(self) -> str:
+        """Format the sources of the chunks as a numbered list matching `context`."""
+        return format_citations(self.chunks)
+
+
+def parse_chunk(result: dict[str, Any]) -> RetrievedChunk:
+    """
+    Convert an entry of a RAG server retrieval or citation list into a `RetrievedChunk`.
+
+    Args:
+        result: Entry with "content" and optional "score", "document_name", "document_id" and "metadata"
+
+    Returns:
+        The chunk
+    """
+    score = result.get("score")
+    return RetrievedChunk(content=result.get("content") or "",
+                          score=float(score) if score is not None else None,
+                          document_name=result.get("document_name"),
+                          document_id=result.get("document_id"),
+                          metadata=result.get("metadata") or {})
+
+
+def format_citations(chunks: list[RetrievedChunk]) -> str:
+    """
+    Format the sources of chunks as a numbered list.
+
+    Args:
+        chunks: Chunks in citation order
+
+    Returns:
+        "Sources:" followed by one line per chunk, or an empty string if there are no chunks
+    """
+    if not chunks:
+        return ""
+    lines = []
+    for i, chunk in enumerate(chunks, 1):
+        score = f" (score {chunk.score:.2f})" if chunk.score is not None else ""
+        lines.append(f"[{i}] {chunk.source}{score}")
+    return "Sources:\n" + "\n".join(lines)
+
+
+def build_http_client(tool_config: RAGServerConfig,
+                      transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Create the long-lived HTTP client used for all queries of a RAG tool instance.
+
+    Connections are pooled and kept alive between queries, so only the first query to the RAG
+    server pays for the TCP (and TLS) handshake.
+
+    Args:
+        tool_config: Configuration containing the server URL, timeouts and pool limits
+        transport: Optional transport to use instead of the default network transport
+
+    Returns:
+        httpx.AsyncClient: The configured client; the caller is responsible for closing it
+    """
+    http2 = tool_config.http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested for the RAG server but the 'h2' package is not installed, using HTTP/1.1")
+        http2 = False
+
+    timeout = httpx.Timeout(tool_config.timeout,
+                            connect=tool_config.connect_timeout,
+                            read=tool_config.read_timeout if tool_config.read_timeout is not None else tool_config.timeout)
+    limits = httpx.Limits(max_connections=tool_config.max_connections,
+                          max_keepalive_connections=tool_config.max_keepalive_connections,
+                          keepalive_expiry=tool_config.keepalive_expiry)
+    return httpx.AsyncClient(base_url=tool_config.base_url,
+                             timeout=timeout,
+                             limits=limits,
+                             http2=http2,
+                             transport=transport)
 
 
 @register_function(config_type=RAGServerConfig, framework_wrappers=[LLMFrameworkEnum.LANGCHAIN])
@@ -74,9 +308,9 @@ async def nvbp_rag_tool(tool_config: RAGServerConfig, builder: Builder):
     Main function that implements the RAG tool functionality.
     
     This function:
-    1. Creates an async client for HTTP requests
-    2. Sends queries to the RAG server
-    3. Processes streaming responses
+    1. Creates a pooled async client for HTTP requests, reused for every query and closed on teardown
+    2. Sends queries to the RAG server's generation endpoint, or its retrieval endpoint in "search" mode
+    3. Processes streaming responses, either token by token or collected into one answer
     4. Handles errors and timeouts
     
     Args:
@@ -88,27 +322,41 @@ async def nvbp_rag_tool(tool_config: RAGServerConfig, builder: Builder):
     """
     from colorama import Fore
 
-    async def _arun(query: str) -> str:
+    client = build_http_client(tool_config)
+    collections = tool_config.resolved_collections()
+    collection_names = [collection.name for collection in collections]
+    collection_stats = CollectionStats()
+
+    async def _astream(query: str) -> AsyncGenerator[str, None]:
         """
-        Query the RAG server for relevant information.
-        
+        Query the RAG server and yield the answer as it is generated.
+
         This function:
-        1. Establishes a connection to the RAG server
+        1. Reuses a pooled connection to the RAG server
         2. Sends the user query with configured parameters
-        3. Processes the streaming response
+        3. Yields each content delta of the streaming response as soon as it arrives
         4. Handles any errors that occur during the process
-        
+
         Args:
             query: The user's input query to be processed by the RAG server
-            
-        Returns:
-            str: The response from the RAG server, or an error message if the request fails
+
+        Yields:
+            str: Fragments of the RAG server's response
+
+        Raises:
+            RAGServerError: If the request fails, possibly after some fragments were yielded, or the
+                server sends no answer
+            AdmissionRejected: If the RAG server is saturated
         """
+        produced = False
+        output_chars = 0
+        citations: list[RetrievedChunk] = []
         try:
-            async with httpx.AsyncClient(timeout=tool_config.timeout) as client:
-                async with client.stream(
+            with span("rag_generate", collection=",".join(collection_names),
+                      input_tokens=estimate_tokens(query)) as stage:
+                async with admission_slot(RAG), client.stream(
                     "POST",
-                    f"{tool_config.base_url}/generate",
+                    "generate",
                     json={
                         "messages": [
                             {
@@ -117,27 +365,155 @@ async def nvbp_rag_tool(tool_config: RAGServerConfig, builder: Builder):
                             }
                         ],
                         "use_knowledge_base": tool_config.use_knowledge_base,
-                        "collection_name": tool_config.collection_name,
+                        "collection_name": collection_names[0],
+                        **({"collection_names": collection_names} if len(collection_names) > 1 else {}),
                         "reranker_top_k": tool_config.top_k,
                         "vdb_top_k": tool_config.top_k
                     }
                 ) as response:
+                    # Response headers have arrived: time to first byte
+                    stage.mark("ttfb_ms")
+                    stage.set("http_status", response.status_code)
                     response.raise_for_status()
-                    full_response = ""
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            try:
-                                data = json.loads(line[6:])
-                                if data.get("choices") and len(data["choices"]) > 0:
-                                    content = data["choices"][0]["delta"].get("content", "")
-                                    if content:
-                                        full_response += content
-                            except json.JSONDecodeError:
-                                continue
-                    logger.info("%s RAG Server Response: %s %s", Fore.MAGENTA, full_response, Fore.RESET)
-                    return full_response if full_response else "No response from RAG server"
+                    async for data in aiter_sse_json(response.aiter_bytes()):
+                        if not isinstance(data, dict):
+                            continue
+                        if tool_config.citations and data.get("citations"):
+                            citations = [parse_chunk(r) for r in data["citations"].get("results") or []]
+                        choices = data.get("choices")
+                        if choices:
+                            content = (choices[0].get("delta") or {}).get("content")
+                            if content:
+                                stage.mark("ttft_ms")
+                                produced = True
+                                output_chars += len(content)
+                                yield content
+                # Same four-characters-per-token estimate as `estimate_tokens`, without joining the deltas
+                stage.set("output_tokens", output_chars // 4)
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error("Error querying RAG server: %s", str(e))
-            return f"Error querying RAG server: {str(e)}"
+            raise RAGServerError(f"Error querying RAG server: {str(e)}") from e
+        if not produced:
+            raise RAGServerError("No response from RAG server")
+        if citations:
+            yield "\n\n" + format_citations(citations)
+
+    async def _search_collection(query: str, collection: CollectionConfig) -> list[RetrievedChunk]:
+        """
+        Retrieve the top-k chunks of one collection.
+
+        Args:
+            query: The user's input query
+            collection: The collection to search
+
+        Returns:
+            The collection's chunks, best first
+        """
+        with span("rag_search", collection=collection.name, input_tokens=estimate_tokens(query)) as stage:
+            async with admission_slot(RAG):
+                response = await client.post(tool_config.search_endpoint,
+                                             json={
+                                                 "query": query,
+                                                 "messages": [],
+                                                 "collection_name": collection.name,
+                                                 "reranker_top_k": tool_config.top_k,
+                                                 "vdb_top_k": tool_config.top_k
+                                             })
+            stage.set("http_status", response.status_code)
+            response.raise_for_status()
+            chunks = [
+                parse_chunk(r).model_copy(update={"collection": collection.name})
+                for r in response.json().get("results") or []
+            ][:tool_config.top_k]
+            stage.set("chunks", len(chunks))
+            stage.set("context_tokens", sum(estimate_tokens(chunk.content) for chunk in chunks))
+        return chunks
+
+    async def _timed_search(query: str,
+                            collection: CollectionConfig) -> tuple[list[RetrievedChunk], CollectionResult]:
+        timeout = collection.timeout if collection.timeout is not None else tool_config.collection_timeout
+        start = time.monotonic()
+        try:
+            chunks = await asyncio.wait_for(_search_collection(query, collection), timeout=timeout)
+        except TimeoutError:
+            latency = time.monotonic() - start
+            logger.warning("RAG collection %s timed out after %.1f s", collection.name, latency)
+            collection_stats.record(collection.name, latency, status="timeout")
+            return [], CollectionResult(latency_ms=latency * 1000,
+                                        status="timeout",
+                                        error=f"Timed out after {latency:.1f} s")
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            latency = time.monotonic() - start
+            logger.error("Error querying RAG collection %s: %s", collection.name, str(e))
+            collection_stats.record(collection.name, latency, status="error")
+            return [], CollectionResult(latency_ms=latency * 1000, status="error", error=str(e))
+        latency = time.monotonic() - start
+        collection_stats.record(collection.name, latency, hits=len(chunks))
+        return chunks, CollectionResult(latency_ms=latency * 1000, hits=len(chunks))
+
+    async def _search(query: str) -> RetrievalResult:
+        """
+        Retrieve the chunks most relevant to a query without generating an answer.
+
+        All configured collections are searched concurrently and their results fused into a single top-k.
+        Collections that time out or fail are left out of the result.
+
+        Args:
+            query: The user's input query
+
+        Returns:
+            The top-k chunks with scores and source metadata, the latency and hit count of each
+            collection, or the error that prevented retrieval from every collection
+        """
+        outcomes = await asyncio.gather(*(_timed_search(query, collection) for collection in collections))
+        reports = {collection.name: report for collection, (_, report) in zip(collections, outcomes)}
+        ranked = {
+            collection.name: chunks
+            for collection, (chunks, report) in zip(collections, outcomes) if report.status == "ok"
+        }
+        if not ranked:
+            if len(reports) == 1:
+                error = next(iter(reports.values())).error
+            else:
+                error = "; ".join(f"{name}: {report.error}" for name, report in reports.items())
+            return RetrievalResult(query=query, error=error, collections=reports)
+        chunks = fuse(ranked, tool_config.top_k, method=tool_config.fusion, rrf_k=tool_config.rrf_k)
+        logger.debug("Retrieved %d chunks from collections %s", len(chunks), ", ".join(ranked))
+        return RetrievalResult(query=query, chunks=chunks, collections=reports)
+
+    async def _arun(query: str) -> str:
+        """
+        Query the RAG server for relevant information.
+
+        Collects the streamed answer of `_astream` into a single response.
+
+        Args:
+            query: The user's input query to be processed by the RAG server
+
+        Returns:
+            str: The response from the RAG server
+
+        Raises:
+            RAGServerError: If the request fails or the server sends no answer
+        """
+        full_response = "".join([chunk async for chunk in _astream(query)])
+        logger.info("%s RAG Server Response: %s %s", Fore.MAGENTA, full_response, Fore.RESET)
+        return full_response
 
-    yield FunctionInfo.from_fn(_arun, description="Query the RAG server for relevant information")
+    try:
+        if tool_config.mode == "search":
+            yield FunctionInfo.create(single_fn=_search,
+                                      description="Retrieve knowledge base passages relevant to a query")
+        else:
+            yield FunctionInfo.create(single_fn=_arun,
+                                      stream_fn=_astream,
+                                      description="Query the RAG server for relevant information")
+    finally:
+        await client.aclose()
+        logger.debug("Closed RAG server HTTP client")
+        if collection_stats.requests:
+            logger.info("RAG collection stats: %s", collection_stats.stats())
@@ -0,0 +1,389 @@
+"""
+This module implements a tiered query router for the mercury_agent supervisor.
+Most queries have an obvious intent ("hi", "use RAG to ...", "tell me about the Roman Empire"),
+so the full LLM classification round trip is only used when the cheap local tiers are unsure.
+
+Key Components:
+1. RouterConfig: Configuration for the local routing tiers
+2. RouteDecision: The chosen route together with the tier that decided it and its latency
+3. TfidfCentroidClassifier: A dependency-free TF-IDF nearest-centroid classifier
+4. TieredQueryRouter: Keyword/regex rules -> TF-IDF classifier -> LLM fallback
+5. ROUTER_PROMPT / normalize_route: The LLM routing prompt and parsing of its answer
+6. DETAIL_ROUTER_PROMPT / is_detail_query: Routing with merged detail detection for research queries
+7. build_router_prompt / collection_topics: Routing prompt naming the topics of the configured knowledge base collections
+
+The routes are the worker names used by the supervisor: 'Research', 'Retrieve' and 'General'.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import math
+import re
+import time
+from collections import Counter
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+RESEARCH = "Research"
+RETRIEVE = "Retrieve"
+GENERAL = "General"
+ROUTES = (RESEARCH, RETRIEVE, GENERAL)
+
+# Topics of the default knowledge base collection
+DEFAULT_RETRIEVE_TOPICS = "SPH (Smoothed Particle Hydrodynamics)"
+
+# Define the routing prompt for classifying user queries
+_ROUTER_PROMPT_TOPICS = """
+    Given the user input below, classify it as either being about 'Research', 'Retrieve' or 'General' topic.
+    Just use one of these words as your response. \
+    'Research' - any question requiring factual knowledge on a specific topic from Wikipedia...etc
+    'Retrieve' - any question related to the topic of {retrieve_topics}. This agent is also triggered if the user query explicitly mentioned RAG or the use retrieve..etc
+    'General' - answering small greeting or chitchat type of questions or everything else that does not fall into any of the above topics."""  # noqa: E501
+_ROUTER_PROMPT_QUERY = """
+    User query: {input}
+    Classifcation topic:"""
+_ROUTER_PROMPT_DETAIL = """
+    If the topic is 'Research' and the query asks for more details or elaboration, respond with 'Research Detailed' instead."""  # noqa: E501
+
+
+def build_router_prompt(retrieve_topics: str = DEFAULT_RETRIEVE_TOPICS, detail: bool = False) -> str:
+    """
+    Build the LLM routing prompt.
+
+    Args:
+        retrieve_topics: Topics covered by the knowledge base, e.g. the descriptions of the RAG collections
+        detail: Whether the prompt also performs the research worker's detail detection
+
+    Returns:
+        A prompt template with a single `{input}` variable
+    """
+    # Braces in the topics must not be taken for template variables
+    topics = retrieve_topics.replace("{", "{{").replace("}", "}}")
+    prompt = _ROUTER_PROMPT_TOPICS.replace("{retrieve_topics}", topics)
+    return prompt + (_ROUTER_PROMPT_DETAIL if detail else "") + _ROUTER_PROMPT_QUERY
+
+
+def collection_topics(rag_tool_config) -> str:
+    """
+    Describe the topics of the knowledge base collections a RAG tool queries.
+
+    Args:
+        rag_tool_config: Configuration of the RAG tool; tools without `collections` get the default topics
+
+    Returns:
+        The collection descriptions (or names) joined by commas, for `build_router_prompt`
+    """
+    if getattr(rag_tool_config, "collections", None):
+        return ", ".join(collection.description or collection.name
+                         for collection in rag_tool_config.resolved_collections())
+    return DEFAULT_RETRIEVE_TOPICS
+
+
+ROUTER_PROMPT = build_router_prompt()
+
+# Routing prompt that also performs the research worker's detail detection in the same LLM call
+DETAIL_ROUTER_PROMPT = build_router_prompt(detail=True)
+
+# Phrases that mark a request for an elaborate answer when the LLM is not consulted
+_DETAIL_RE = re.compile(
+    r"\b(more details?|in (great(er)? )?detail|detailed|elaborat\w*|in[- ]depth|comprehensive|thorough(ly)?|"
+    r"expand on|tell me (much )?more|everything about|full (history|story|explanation))\b",
+    re.IGNORECASE)
+
+# Labelled seed examples for the TF-IDF tier; extended by `RouterConfig.examples_path`
+DEFAULT_EXAMPLES: tuple[tuple[str, str], ...] = (
+    ("hi", GENERAL),
+    ("hello there", GENERAL),
+    ("how are you today", GENERAL),
+    ("who are you", GENERAL),
+    ("tell me a joke", GENERAL),
+    ("thanks for the help", GENERAL),
+    ("what can you do for me", GENERAL),
+    ("tell me a story about yourself", GENERAL),
+    ("what is your favourite myth about mercury the god", GENERAL),
+    ("good morning mercury", GENERAL),
+    ("what is smoothed particle hydrodynamics", RETRIEVE),
+    ("how are kernels chosen in sph simulations", RETRIEVE),
+    ("explain the sph smoothing length", RETRIEVE),
+    ("use rag to answer how boundary conditions are handled", RETRIEVE),
+    ("retrieve documents about particle methods for fluids", RETRIEVE),
+    ("search the knowledge base for artificial viscosity", RETRIEVE),
+    ("what does the documentation say about neighbour search", RETRIEVE),
+    ("tell me about the roman empire", RESEARCH),
+    ("who was albert einstein", RESEARCH),
+    ("what is quantum entanglement in physics", RESEARCH),
+    ("explain the history of the printing press", RESEARCH),
+    ("what can you tell me about spiderman", RESEARCH),
+    ("give me details on the french revolution", RESEARCH),
+    ("when was the eiffel tower built", RESEARCH),
+    ("what is photosynthesis", RESEARCH),
+    ("describe the geography of japan", RESEARCH),
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Function words shared by all routes; left in, "what is" alone would decide between them.
+# "you" and "your" are kept because they mark chitchat addressed to the assistant.
+_STOPWORDS = frozenset(
+    "a an and are as at be been by can could did do does for from had has have how i in into is it its me my of "
+    "on or should tell that the their them there these this those to used using was were what when where which "
+    "who whom why will with would about give".split())
+
+
+class RouterConfig(BaseModel):
+    """
+    Configuration for the tiered query router.
+
+    Attributes:
+        enabled: Whether the local tiers are used; when disabled every query goes to the LLM (default: True)
+        examples_path: Optional JSONL file of {"query": ..., "label": ...} examples added to the built-in ones
+        min_similarity: Minimum cosine similarity to the best centroid for the classifier to decide (default: 0.25)
+        min_margin: Minimum similarity margin over the runner-up centroid for the classifier to decide (default: 0.1)
+        retrieve_patterns: Regular expressions that send a query straight to the RAG agent
+        general_patterns: Regular expressions that send a query straight to the chitchat agent
+        research_patterns: Regular expressions that send a query straight to the research agent
+    """
+    enabled: bool = True
+    examples_path: str | None = None
+    min_similarity: float = 0.25
+    min_margin: float = 0.1
+    retrieve_patterns: list[str] = [
+        r"\brag\b",
+        # "retrieve" alone also means fetching files or passwords, so it needs a document-like object
+        r"\b(use|using|with|via) retrieval\b",
+        r"\bretriev(e|al|ing)\b.{0,40}\b(documents?|docs|documentation|papers?|sources|collections?)\b",
+        r"\bknowledge ?base\b",
+        r"\bsph\b",
+        r"smoothed particle hydrodynamics",
+    ]
+    general_patterns: list[str] = [
+        r"^\W*(hi|hello|hey|howdy|greetings|yo)( there)?( mercury)?\W*$",
+        r"^\W*good (morning|afternoon|evening|night)( mercury)?\W*$",
+        r"^\W*(thanks|thank you|thx|cheers)\b.{0,30}$",
+        r"^\W*(bye|goodbye|see you|see ya)\b.{0,20}$",
+        r"^\W*how are you( doing)?( today)?\W*$",
+        r"^\W*who are you\W*$",
+    ]
+    research_patterns: list[str] = [
+        r"\bwikipedia\b",
+    ]
+
+
+@dataclass
+class RouteDecision:
+    """
+    Result of routing a single query.
+
+    Attributes:
+        route: One of 'Research', 'Retrieve' or 'General'
+        tier: The tier that decided: 'rules', 'classifier' or 'llm'
+        confidence: Confidence of the deciding tier (1.0 for rules and the LLM)
+        latency_ms: Time spent routing, including any lower tiers that were consulted
+    """
+    route: str
+    tier: str
+    confidence: float
+    latency_ms: float
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens without stopwords, plus bigrams of the remaining adjacent words."""
+    words = [word for word in _TOKEN_RE.findall(text.lower()) if word not in _STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def normalize_route(text: str) -> str | None:
+    """
+    Map a free-form classification (e.g. an LLM answer) onto a route name.
+
+    Args:
+        text: The classification text
+
+    Returns:
+        The matching route, or `None` if the text names no route
+    """
+    lowered = text.lower()
+    for route in (RETRIEVE, GENERAL, RESEARCH):
+        if route.lower() in lowered:
+            return route
+    return None
+
+
+def is_detail_query(text: str) -> bool:
+    """Heuristic detail detection used when the routing decision was made without the LLM."""
+    return _DETAIL_RE.search(text) is not None
+
+
+def load_examples(path: str | Path) -> list[tuple[str, str]]:
+    """
+    Load labelled routing examples from a JSONL file.
+
+    Args:
+        path: Path of a JSONL file whose lines hold "query" and "label" fields
+
+    Returns:
+        List of (query, route) pairs; lines with unknown labels are skipped
+    """
+    examples = []
+    with Path(path).expanduser().open(encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            route = normalize_route(record["label"])
+            if route is None:
+                logger.warning("Skipping routing example with unknown label: %s", record["label"])
+                continue
+            examples.append((record["query"], route))
+    return examples
+
+
+class TfidfCentroidClassifier:
+    """
+    Nearest-centroid classifier over L2-normalized TF-IDF vectors.
+
+    Each label is represented by the normalized mean of its examples' vectors, and a query is
+    scored by cosine similarity against every centroid.
+    """
+
+    def __init__(self, examples: Iterable[tuple[str, str]]) -> None:
+        examples = list(examples)
+        if not examples:
+            raise ValueError("At least one labelled example is required")
+
+        document_frequency = Counter()
+        tokenized = []
+        for query, label in examples:
+            tokens = tokenize(query)
+            tokenized.append((tokens, label))
+            document_frequency.update(set(tokens))
+
+        n_docs = len(examples)
+        self.idf = {term: math.log((1 + n_docs) / (1 + df)) + 1.0 for term, df in document_frequency.items()}
+
+        sums: dict[str, Counter] = {}
+        for tokens, label in tokenized:
+            vector = self._vectorize(tokens)
+            sums.setdefault(label, Counter()).update(vector)
+        self.centroids = {label: self._normalize(vector) for label, vector in sums.items()}
+
+    def _vectorize(self, tokens: list[str]) -> dict[str, float]:
+        counts = Counter(token for token in tokens if token in self.idf)
+        return self._normalize({term: count * self.idf[term] for term, count in counts.items()})
+
+    @staticmethod
+    def _normalize(vector: dict[str, float]) -> dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        return {k: v / norm for k, v in vector.items()} if norm else {}
+
+    def scores(self, query: str) -> dict[str, float]:
+        """Cosine similarity of the query to every label centroid."""
+        vector = self._vectorize(tokenize(query))
+        return {
+            label: sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+            for label, centroid in self.centroids.items()
+        }
+
+
+class TieredQueryRouter:
+    """
+    Routes queries through increasingly expensive tiers until one is confident.
+
+    1. rules - keyword/regex patterns for unambiguous intents
+    2. classifier - TF-IDF nearest-centroid over labelled examples
+    3. llm - the supervisor LLM, only consulted when both local tiers abstain
+    """
+
+    def __init__(self, config: RouterConfig) -> None:
+        self.config = config
+        self._rules = [(re.compile(pattern, re.IGNORECASE), route)
+                       for patterns, route in ((config.retrieve_patterns, RETRIEVE),
+                                               (config.general_patterns, GENERAL),
+                                               (config.research_patterns, RESEARCH))
+                       for pattern in patterns]
+        examples = list(DEFAULT_EXAMPLES)
+        if config.examples_path:
+            examples.extend(load_examples(config.examples_path))
+        self.classifier = TfidfCentroidClassifier(examples)
+
+    def match_rules(self, query: str) -> str | None:
+        """Return the route of the first matching rule, if any."""
+        for pattern, route in self._rules:
+            if pattern.search(query):
+                return route
+        return None
+
+    def classify(self, query: str) -> tuple[str, float] | None:
+        """
+        Classify with the TF-IDF tier.
+
+        Returns:
+            (route, similarity) if the best centroid clears both thresholds, otherwise `None`
+        """
+        ranked = sorted(self.classifier.scores(query).items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None
+        best_route, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best >= self.config.min_similarity and best - runner_up >= self.config.min_margin:
+            return best_route, best
+        return None
+
+    def route_local(self, query: str) -> RouteDecision | None:
+        """
+        Route using only the local tiers.
+
+        Returns:
+            The decision, or `None` if neither local tier is confident
+        """
+        if not self.config.enabled:
+            return None
+        start = time.perf_counter()
+        route = self.match_rules(query)
+        if route is not None:
+            return RouteDecision(route, "rules", 1.0, (time.perf_counter() - start) * 1000)
+        classified = self.classify(query)
+        if classified is not None:
+            return RouteDecision(classified[0], "classifier", classified[1], (time.perf_counter() - start) * 1000)
+        return None
+
+    async def route(self, query: str, llm_fallback: Callable[[str], Awaitable[str]]) -> RouteDecision:
+        """
+        Route a query, falling back to the LLM only when the local tiers abstain.
+
+        Args:
+            query: The user's input query
+            llm_fallback: Coroutine function returning the LLM's classification text for a query
+
+        Returns:
+            The routing decision; LLM answers that name no route are returned verbatim
+        """
+        start = time.perf_counter()
+        decision = self.route_local(query)
+        if decision is None:
+            answer = await llm_fallback(query)
+            decision = RouteDecision(normalize_route(answer) or answer, "llm", 1.0, 0.0)
+        decision.latency_ms = (time.perf_counter() - start) * 1000
+        return decision
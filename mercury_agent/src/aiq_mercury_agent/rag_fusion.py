@@ -0,0 +1,192 @@
+"""
+This module merges the chunks retrieved from several knowledge base collections into a single ranking,
+and keeps per-collection retrieval statistics for the RAG tool's multi-collection fan-out.
+
+Key Components:
+1. reciprocal_rank_fusion: Rank-based fusion, robust to collections whose scores are not comparable
+2. normalized_score_fusion: Min-max normalizes each collection's scores before merging
+3. fuse: Dispatches to one of the above and cuts the result to top-k
+4. CollectionStats: Cumulative per-collection request, hit, timeout and latency counters
+
+Reciprocal-rank fusion (RRF) scores a chunk with the sum of 1 / (k + rank) over the collections that
+returned it, so it only relies on each collection's ordering. Score normalization keeps the magnitude
+of the relevance scores, which helps when one collection has clearly better matches than another,
+but requires every collection to return scores on a similar scale (e.g. the same reranker).
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from collections import Counter
+from collections import deque
+from collections.abc import Hashable
+from collections.abc import Mapping
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Literal
+
+from .stats import percentile
+
+if TYPE_CHECKING:
+    from .nvbp_rag_tool import RetrievedChunk
+
+logger = logging.getLogger(__name__)
+
+FusionMethod = Literal["rrf", "score"]
+
+# Rank constant of reciprocal-rank fusion; 60 is the value from the original RRF paper
+DEFAULT_RRF_K = 60
+
+
+def _chunk_key(chunk: "RetrievedChunk") -> Hashable:
+    # The same passage returned by two collections (e.g. a document ingested twice) is merged
+    return (chunk.document_id or chunk.document_name, chunk.content)
+
+
+def reciprocal_rank_fusion(ranked: Mapping[str, Sequence["RetrievedChunk"]],
+                           k: int = DEFAULT_RRF_K) -> list[tuple["RetrievedChunk", float]]:
+    """
+    Merge per-collection rankings with reciprocal-rank fusion.
+
+    Args:
+        ranked: Chunks of each collection, best first
+        k: Rank constant; larger values flatten the difference between the top ranks
+
+    Returns:
+        (chunk, fused score) pairs, best first
+    """
+    fused: dict[Hashable, list] = {}
+    for chunks in ranked.values():
+        for rank, chunk in enumerate(chunks, 1):
+            entry = fused.setdefault(_chunk_key(chunk), [chunk, 0.0])
+            entry[1] += 1.0 / (k + rank)
+    return sorted(((chunk, score) for chunk, score in fused.values()), key=lambda item: item[1], reverse=True)
+
+
+def _normalized(chunks: Sequence["RetrievedChunk"]) -> list[float]:
+    scores = [chunk.score for chunk in chunks]
+    if not scores:
+        return []
+    if any(score is None for score in scores):
+        # Without scores only the order is known: spread the ranks evenly over (0, 1]
+        return [1.0 - rank / len(chunks) for rank in range(len(chunks))]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+def normalized_score_fusion(ranked: Mapping[str, Sequence["RetrievedChunk"]]) -> list[tuple["RetrievedChunk", float]]:
+    """
+    Merge per-collection rankings by min-max normalized relevance score.
+
+    A chunk returned by several collections keeps its best normalized score.
+
+    Args:
+        ranked: Chunks of each collection, best first
+
+    Returns:
+        (chunk, fused score) pairs, best first
+    """
+    fused: dict[Hashable, tuple["RetrievedChunk", float]] = {}
+    for chunks in ranked.values():
+        for chunk, score in zip(chunks, _normalized(chunks)):
+            key = _chunk_key(chunk)
+            if key not in fused or score > fused[key][1]:
+                fused[key] = (chunk, score)
+    return sorted(fused.values(), key=lambda item: item[1], reverse=True)
+
+
+def fuse(ranked: Mapping[str, Sequence["RetrievedChunk"]],
+         top_k: int,
+         method: FusionMethod = "rrf",
+         rrf_k: int = DEFAULT_RRF_K) -> list["RetrievedChunk"]:
+    """
+    Merge the chunks retrieved from several collections into a single top-k.
+
+    The chunks keep the relevance scores assigned by the server; the fused score only decides the order.
+
+    Args:
+        ranked: Chunks of each collection, best first
+        top_k: Number of chunks to keep
+        method: "rrf" for reciprocal-rank fusion, "score" for normalized score fusion
+        rrf_k: Rank constant of reciprocal-rank fusion
+
+    Returns:
+        The top-k chunks, best first
+    """
+    if len(ranked) == 1:
+        return list(next(iter(ranked.values())))[:top_k]
+    if method == "score":
+        fused = normalized_score_fusion(ranked)
+    else:
+        fused = reciprocal_rank_fusion(ranked, k=rrf_k)
+    return [chunk for chunk, _ in fused[:top_k]]
+
+
+class CollectionStats:
+    """
+    Cumulative retrieval statistics of each collection.
+
+    `requests`, `hits` (chunks returned), `timeouts` and `errors` are counted per collection;
+    the latency samples of the most recent requests are summarized by `stats`.
+    """
+
+    def __init__(self, max_samples: int = 1024) -> None:
+        self._max_samples = max_samples
+        self.requests: Counter[str] = Counter()
+        self.hits: Counter[str] = Counter()
+        self.timeouts: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self._latencies: dict[str, deque[float]] = {}
+
+    def record(self, collection: str, latency: float, hits: int = 0, status: str = "ok") -> None:
+        """
+        Record one retrieval request.
+
+        Args:
+            collection: Name of the collection
+            latency: Seconds the request took (up to the timeout for timed out requests)
+            hits: Number of chunks returned
+            status: "ok", "timeout" or "error"
+        """
+        self.requests[collection] += 1
+        self.hits[collection] += hits
+        if status == "timeout":
+            self.timeouts[collection] += 1
+        elif status == "error":
+            self.errors[collection] += 1
+        self._latencies.setdefault(collection, deque(maxlen=self._max_samples)).append(latency)
+
+    def stats(self) -> dict[str, Any]:
+        """Return request, hit, timeout and error counters and latency percentiles in milliseconds per collection."""
+        collections = {}
+        for collection in sorted(self.requests):
+            latencies = sorted(self._latencies.get(collection, ()))
+            collections[collection] = {
+                "requests": self.requests[collection],
+                "hits": self.hits[collection],
+                "timeouts": self.timeouts[collection],
+                "errors": self.errors[collection],
+                "latency_ms": {
+                    "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+                    "p50": percentile(latencies, 50) * 1000,
+                    "p95": percentile(latencies, 95) * 1000,
+                    "max": (latencies[-1] if latencies else 0.0) * 1000,
+                },
+            }
+        return collections
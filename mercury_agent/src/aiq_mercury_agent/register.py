@@ -34,11 +34,16 @@ The workflow follows a supervisor-worker pattern where:
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import inspect
 import logging
+import time
+from collections.abc import AsyncGenerator
+
 from colorama import Fore, Style, init
 
 from aiq.builder.builder import Builder
 from aiq.builder.framework_enum import LLMFrameworkEnum
+from aiq.builder.function_info import FunctionInfo
 from aiq.cli.register_workflow import register_function
 from aiq.data_models.component_ref import FunctionRef
 from aiq.data_models.component_ref import LLMRef
@@ -48,6 +53,24 @@ from aiq.data_models.function import FunctionBaseConfig
 from . import haystack_agent  # noqa: F401, pylint: disable=unused-import
 from . import langchain_research_tool  # noqa: F401, pylint: disable=unused-import
 from . import nvbp_rag_tool  # noqa: F401, pylint: disable=unused-import
+from .admission import LLM
+from .admission import AdmissionConfig
+from .admission import AdmissionRejected
+from .admission import admission_slot
+from .admission import admission_stats
+from .admission import configure_admission
+from .query_router import RouterConfig
+from .query_router import build_router_prompt
+from .query_router import collection_topics
+from .response_cache import ResponseCacheConfig
+from .session_store import SessionConfig
+from .session_store import estimate_tokens
+from .stats import register_stats
+from .stats import unregister_stats
+from .tracing import TracingConfig
+from .tracing import configure_tracing
+from .tracing import shutdown_tracing
+from .tracing import span
 
 # Initialize colorama
 init()
@@ -91,12 +114,50 @@ class MercuryAgentWorkflowConfig(FunctionBaseConfig, name="mercury_agent"):
         research_tool: Reference to the research tool function
         rag_tool: Reference to the RAG tool function
         chitchat_agent: Reference to the chitchat agent function
+        sessions: Limits and persistence settings for per-session conversation history
+        router: Settings for the local routing tiers that run before the LLM supervisor
+        merge_detail_detection: Decide whether a research query asks for a detailed answer during
+            classification instead of with a separate LLM call in the research worker
+        response_cache: Settings for the semantic cache of answers to near-identical queries
+        admission: Concurrency, rate and queue limits for the LLM endpoint, the RAG server and Wikipedia
+        tracing: Exporter for the per-stage spans of each request (disabled by default)
     """
     llm: LLMRef = "nim_llm"
     data_dir: str = "/home/coder/dev/ai-query-engine/aiq/mercury/data/"
     research_tool: FunctionRef
     rag_tool: FunctionRef
     chitchat_agent: FunctionRef
+    sessions: SessionConfig = SessionConfig()
+    router: RouterConfig = RouterConfig()
+    merge_detail_detection: bool = False
+    response_cache: ResponseCacheConfig = ResponseCacheConfig()
+    admission: AdmissionConfig = AdmissionConfig()
+    tracing: TracingConfig = TracingConfig()
+
+
+async def _timed_stage(name: str, awaitable, timings: dict[str, float]):
+    """
+    Await a workflow stage in its own span and record its wall-clock duration.
+
+    Args:
+        name: Stage name used as the span name and the key in `timings`
+        awaitable: The stage to await
+        timings: Mapping of stage name to elapsed milliseconds, updated in place
+
+    Returns:
+        The stage's result
+    """
+    start = time.perf_counter()
+    try:
+        with span(name):
+            return await awaitable
+    finally:
+        timings[name] = (time.perf_counter() - start) * 1000
+
+
+async def _resolve(value):
+    """Return a builder lookup's result; lookups are synchronous in AgentIQ and coroutines in later toolkit releases."""
+    return await value if inspect.isawaitable(value) else value
 
 
 @register_function(config_type=MercuryAgentWorkflowConfig, framework_wrappers=[LLMFrameworkEnum.LANGCHAIN])
@@ -109,45 +170,65 @@ async def mercury_agent_workflow(config: MercuryAgentWorkflowConfig, builder: Bu
     2. Sets up the routing logic
     3. Defines the state management
     4. Creates the workflow graph
-    5. Handles the execution of queries
+    5. Handles the execution of queries, returning the full answer or streaming it as it is generated
     
     Args:
         config: Configuration object containing workflow parameters
         builder: Builder object for creating framework-specific components
     """
+    import asyncio
     from typing import TypedDict
 
     from colorama import Fore
-    from langchain_community.chat_message_histories import ChatMessageHistory
+    from langchain_core.messages import AIMessage
     from langchain_core.messages import BaseMessage
+    from langchain_core.messages import HumanMessage
     from langchain_core.output_parsers import StrOutputParser
     from langchain_core.prompts import PromptTemplate
     from langchain_core.runnables import RunnablePassthrough
     from langchain_core.runnables.history import RunnableWithMessageHistory
+    from langgraph.config import get_stream_writer
     from langgraph.graph import END
     from langgraph.graph import StateGraph
 
+    from .langchain_research_tool import WikipediaPageNotFound
+    from .nvbp_rag_tool import RAG_ANSWER_PROMPT
+    from .nvbp_rag_tool import RAGServerError
+    from .query_router import RESEARCH
+    from .query_router import TieredQueryRouter
+    from .query_router import is_detail_query
+    from .query_router import normalize_route
+    from .research_prompts import CONCISE_SUMMARY_INSTRUCTIONS
+    from .research_prompts import CONCISE_SUMMARY_WORDS
+    from .research_prompts import DETAILED_SUMMARY_INSTRUCTIONS
+    from .research_prompts import DETAILED_SUMMARY_WORDS
+    from .research_prompts import build_detail_chain
+    from .research_prompts import build_summary_chain
+    from .response_cache import SemanticResponseCache
+    from .session_store import SessionHistoryStore
+    from .session_store import current_session_id
+
     # Initialize components using the builder
     logger.info("workflow config = %s", config)
 
     llm = await builder.get_llm(llm_name=config.llm, wrapper_type=LLMFrameworkEnum.LANGCHAIN)
-    research_tool = builder.get_tool(fn_name=config.research_tool, wrapper_type=LLMFrameworkEnum.LANGCHAIN)
-    rag_tool = builder.get_tool(fn_name=config.rag_tool, wrapper_type=LLMFrameworkEnum.LANGCHAIN)
-    chitchat_agent = builder.get_tool(fn_name=config.chitchat_agent, wrapper_type=LLMFrameworkEnum.LANGCHAIN)
-
-    chat_hist = ChatMessageHistory()
-
-    # Define the routing prompt for classifying user queries
-    router_prompt = """
-    Given the user input below, classify it as either being about 'Research', 'Retrieve' or 'General' topic.
-    Just use one of these words as your response. \
-    'Research' - any question requiring factual knowledge on a specific topic from Wikipedia...etc
-    'Retrieve' - any question related to the topic of SPH (Smoothed Particle Hydrodynamics). This agent is also triggered if the user query explicitly mentioned RAG or the use retrieve..etc
-    'General' - answering small greeting or chitchat type of questions or everything else that does not fall into any of the above topics.
-    User query: {input}
-    Classifcation topic:"""  # noqa: E501
+    research_tool = await _resolve(builder.get_tool(fn_name=config.research_tool,
+                                                    wrapper_type=LLMFrameworkEnum.LANGCHAIN))
+    # The RAG and chitchat functions are used directly so their answers can be streamed token by token
+    rag_function = await _resolve(builder.get_function(config.rag_tool))
+    # In "search" mode the RAG tool only retrieves passages and the answer is generated here
+    rag_tool_config = getattr(rag_function, "config", None)
+    rag_search_mode = getattr(rag_tool_config, "mode", "generate") == "search"
+    chitchat_function = await _resolve(builder.get_function(config.chitchat_agent))
+
+    # The router is told which topics the configured knowledge base collections cover
+    retrieve_topics = collection_topics(rag_tool_config)
+
+    # Conversation history is kept per session and bounded in both size and number of sessions
+    session_store = SessionHistoryStore(config.sessions)
 
     # Set up the routing chain
+    router_prompt = build_router_prompt(retrieve_topics, detail=config.merge_detail_detection)
     routing_chain = ({
         "input": RunnablePassthrough()
     }
@@ -158,23 +239,48 @@ async def mercury_agent_workflow(config: MercuryAgentWorkflowConfig, builder: Bu
     # Add message history to the routing chain
     supervisor_chain_with_message_history = RunnableWithMessageHistory(
         routing_chain,
-        lambda _: chat_hist,
+        session_store.get,
         history_messages_key="chat_history",
     )
 
+    # Bound in-flight calls to the LLM endpoint, the RAG server and Wikipedia for all tools
+    configure_admission(config.admission)
+    configure_tracing(config.tracing)
+
+    rag_answer_chain = PromptTemplate.from_template(RAG_ANSWER_PROMPT) | llm
+
+    # The research worker's chains are built once and shared by all requests
+    summary_chain = build_summary_chain(llm)
+    detail_chain = build_detail_chain(llm)
+
+    # Local routing tiers answer obvious intents without an LLM round trip
+    query_router = TieredQueryRouter(config.router)
+
+    # Answers to near-identical queries on the same route are reused when the cache is enabled
+    response_cache = None
+    if config.response_cache.enabled:
+        cache_embedder = await builder.get_embedder(config.response_cache.embedder_name,
+                                                    wrapper_type=LLMFrameworkEnum.LANGCHAIN)
+        response_cache = SemanticResponseCache(config.response_cache, cache_embedder)
+        register_stats("response_cache", response_cache.stats)
+
     class AgentState(TypedDict):
         """
         TypedDict defining the state structure for the agent workflow.
         
         Attributes:
             input: The user's input query
+            session_id: Identifier of the conversation the query belongs to
             chat_history: List of previous messages in the conversation
             chosen_worker_agent: The selected agent for processing the query
+            is_detail_request: Whether a research query asks for a detailed answer, if already known
             final_output: The final response generated by the system
         """
         input: str
+        session_id: str
         chat_history: list[BaseMessage] | None
         chosen_worker_agent: str | None
+        is_detail_request: bool | None
         final_output: str | None
 
     async def supervisor(state: AgentState):
@@ -188,21 +294,57 @@ async def mercury_agent_workflow(config: MercuryAgentWorkflowConfig, builder: Bu
             Updated state with chosen agent and chat history
         """
         query = state["input"]
+        session_id = state["session_id"]
+
+        llm_answer = None
+
+        async def _llm_classify(text: str) -> str:
+            nonlocal llm_answer
+            with span("supervisor_llm", input_tokens=estimate_tokens(text)) as stage:
+                async with admission_slot(LLM):
+                    llm_answer = await supervisor_chain_with_message_history.ainvoke(
+                        {"input": text},
+                        {"configurable": {
+                            "session_id": session_id
+                        }},
+                    )
+                stage.set("output_tokens", estimate_tokens(llm_answer))
+            return llm_answer
+
+        is_detail_request = None
         try:
-            chosen_agent = (await supervisor_chain_with_message_history.ainvoke(
-                {"input": query},
-                {"configurable": {
-                    "session_id": "unused"
-                }},
-            ))
-            logger.debug("Supervisor classified query as: %s", chosen_agent)
+            with span("supervisor") as stage:
+                decision = await query_router.route(query, _llm_classify)
+                stage.set("route", decision.route)
+                stage.set("tier", decision.tier)
+                stage.set("confidence", decision.confidence)
+            chosen_agent = decision.route
+            if decision.tier != "llm":
+                # Keep the conversation history identical to what the LLM path records
+                session_store.get(session_id).add_messages([HumanMessage(content=query), AIMessage(content=chosen_agent)])
+            logger.info("Supervisor routed query to %s (tier=%s, confidence=%.2f, latency=%.1f ms)",
+                        chosen_agent,
+                        decision.tier,
+                        decision.confidence,
+                        decision.latency_ms)
+            if config.merge_detail_detection and chosen_agent == RESEARCH:
+                is_detail_request = ("detail" in llm_answer.lower()) if decision.tier == "llm" else is_detail_query(query)
+        except AdmissionRejected:
+            # Shed the request early instead of sending it to an equally saturated worker
+            raise
         except Exception as e:
             logger.error("Error in supervisor classification: %s", str(e))
             # Default to research agent if classification fails
             chosen_agent = "research"
             logger.info("Defaulting to research agent due to classification error")
 
-        return {'input': query, "chosen_worker_agent": chosen_agent, "chat_history": chat_hist}
+        return {
+            'input': query,
+            'session_id': session_id,
+            "chosen_worker_agent": chosen_agent,
+            "is_detail_request": is_detail_request,
+            "chat_history": session_store.get(session_id).messages
+        }
 
     async def router(state: AgentState):
         """
@@ -217,143 +359,253 @@ async def mercury_agent_workflow(config: MercuryAgentWorkflowConfig, builder: Bu
         status = list(state.keys())
         logger.debug("Router processing state: %s", status)
         
-        if 'final_output' in status:
-            route_to = "end"
-        elif 'chosen_worker_agent' not in status:
-            logger.debug("Routing to supervisor")
-            route_to = "supevisor"
-        elif 'chosen_worker_agent' in status:
-            logger.debug("Routing to workers")
-            route_to = "workers"
-        else:
-            route_to = "end"
+        with span("router") as stage:
+            if 'final_output' in status:
+                route_to = "end"
+            elif 'chosen_worker_agent' not in status:
+                logger.debug("Routing to supervisor")
+                route_to = "supevisor"
+            elif 'chosen_worker_agent' in status:
+                logger.debug("Routing to workers")
+                route_to = "workers"
+            else:
+                route_to = "end"
+            stage.set("route_to", route_to)
         return route_to
 
     async def workers(state: AgentState):
         """
         Worker function that processes queries using the appropriate specialized agent.
+
+        The whole worker is recorded as a "worker" span with the route and the answer's token count.
+
+        Args:
+            state: Current state of the agent workflow
+
+        Returns:
+            Updated state with the final output from the chosen agent
+        """
+        worker_choice = state["chosen_worker_agent"]
+        with span("worker", route=normalize_route(worker_choice) or worker_choice) as stage:
+            result = await _run_worker(state, stage)
+            stage.set("output_tokens", estimate_tokens(result["final_output"]))
+        return result
+
+    async def _run_worker(state: AgentState, stage):
+        """
+        Process a query with the specialized agent chosen by the supervisor.
+
+        Answer fragments are emitted through the LangGraph stream writer as they are produced, so
+        `app.astream(..., stream_mode="custom")` streams the answer while `app.ainvoke` is unaffected.
+        A worker that fails raises instead of answering with an error message, so a partially streamed
+        answer is never completed with error text and the caller can end the stream with an error.
         
         Args:
             state: Current state of the agent workflow
+            stage: The worker span
             
         Returns:
             Updated state with the final output from the chosen agent
+
+        Raises:
+            Exception: The error of the failed worker
         """
         query = state["input"]
         worker_choice = state["chosen_worker_agent"]
         logger.debug("Worker processing query with agent: %s", worker_choice)
+        emit = get_stream_writer()
+        streamed = False
+        # Only complete answers are worth caching; "not found" answers are not
+        cacheable = False
+
+        route = normalize_route(worker_choice)
+        cache_vector = None
+        if response_cache is not None and route is not None and response_cache.enabled_for(route):
+            try:
+                cache_vector = await response_cache.embed(query)
+                cached_output = response_cache.get(cache_vector, route)
+            except Exception as e:
+                logger.warning("Response cache lookup failed: %s", str(e))
+                cache_vector = cached_output = None
+            stage.set("cache_hit", cached_output is not None)
+            if cached_output is not None:
+                logger.info("Answering %s query from the response cache", route)
+                emit(cached_output)
+                return {
+                    'input': query,
+                    "chosen_worker_agent": worker_choice,
+                    "chat_history": state["chat_history"],
+                    "final_output": cached_output
+                }
         
-        if "retrieve" in worker_choice.lower():
+        if "retrieve" in worker_choice.lower() and rag_search_mode:
+            logger.info("Processing with RAG agent (retrieval only)", extra={'agent_type': 'retrieve'})
+            try:
+                retrieval = await rag_function.ainvoke(query)
+                if retrieval.error is not None:
+                    raise RAGServerError(f"Error querying RAG server: {retrieval.error}")
+                if not retrieval.chunks:
+                    output = "No relevant passages found in the knowledge base"
+                else:
+                    parts = []
+                    # The RAG server's own LLM is skipped; the answer is generated from the passages here
+                    with span("rag_answer", chunks=len(retrieval.chunks),
+                              input_tokens=estimate_tokens(retrieval.context())) as answer_span:
+                        async with admission_slot(LLM):
+                            async for chunk in rag_answer_chain.astream({
+                                    "query": query, "context": retrieval.context()
+                            }):
+                                text = str(chunk.content) if hasattr(chunk, 'content') else str(chunk)
+                                if text:
+                                    answer_span.mark("ttft_ms")
+                                    emit(text)
+                                    parts.append(text)
+                        answer_span.set("output_tokens", estimate_tokens("".join(parts)))
+                    cacheable = bool(parts)
+                    if rag_tool_config.citations:
+                        citations = "\n\n" + retrieval.citations()
+                        emit(citations)
+                        parts.append(citations)
+                    output = "".join(parts)
+                    streamed = True
+            except AdmissionRejected:
+                raise
+            except Exception as e:
+                logger.error("Error answering from retrieved passages: %s", str(e))
+                raise
+            logger.debug("RAG answer generated from retrieved passages")
+        elif "retrieve" in worker_choice.lower():
             logger.info("Processing with RAG agent", extra={'agent_type': 'retrieve'})
-            out = (await rag_tool.ainvoke(query))
-            output = out
+            parts = []
+            # The RAG tool raises when the server fails, even after part of the answer was streamed
+            async for chunk in rag_function.astream(query):
+                emit(chunk)
+                parts.append(chunk)
+            output = "".join(parts)
+            streamed = True
+            cacheable = True
             logger.debug("RAG tool response received")
         elif "general" in worker_choice.lower():
             logger.info("Processing with Chitchat agent", extra={'agent_type': 'general'})
-            output = (await chitchat_agent.ainvoke(query))
+            parts = []
+            try:
+                async for chunk in chitchat_function.astream(query):
+                    emit(chunk)
+                    parts.append(chunk)
+                cacheable = bool(parts)
+            except AdmissionRejected:
+                raise
+            except Exception as e:
+                logger.error("Error in chitchat processing: %s", str(e))
+                raise
+            output = "".join(parts)
+            streamed = True
             logger.debug("Chitchat response received")
         elif 'research' in worker_choice.lower():
             logger.info("Processing with Research agent", extra={'agent_type': 'research'})
+            timings: dict[str, float] = {}
+            research_start = time.perf_counter()
             try:
-                # Get the Wikipedia page content and URL
-                wiki_results = await research_tool.ainvoke(query)
-                
-                # Create a prompt for summarizing Wikipedia results
-                summary_prompt = PromptTemplate.from_template("""
-                You are a helpful AI assistant. Your task is to summarize the following Wikipedia content in response to the user's query.
-                {detail_instructions}
-                Focus on providing a comprehensive and informative summary that directly addresses the user's query.
-                Include relevant details, examples, and key points from the content.
-                Maintain a natural flow and ensure all information is accurate and well-organized.
-                Make sure to complete all sentences and paragraphs - do not cut off mid-sentence.
-                Do not include any meta-commentary or notes about the summary itself.
-                Do not mention the word count in your response.
-                Do not add any disclaimers or notes about the content.
-                Simply provide the summary.
-
-                User Query: {query}
-
-                Wikipedia Content:
-                {content}
-
-                Summary:""")
-
-                # Create a chain for summarizing the content
-                summary_chain = summary_prompt | llm
-
-                # Process the research results
-                try:
-                    # First, check if the user is asking for more details
-                    detail_prompt = PromptTemplate.from_template("""
-                    Analyze if the following query is asking for more details or elaboration.
-                    Return ONLY 'yes' or 'no'.
-
-                    Query: {query}
-                    Response:""")
-
-                    detail_chain = detail_prompt | llm
-
+                async def detect_detail_request() -> bool:
+                    if state.get("is_detail_request") is not None:
+                        # Already decided by the supervisor
+                        return state["is_detail_request"]
                     try:
-                        detail_response = await detail_chain.ainvoke({"query": query})
+                        async with admission_slot(LLM):
+                            detail_response = await detail_chain.ainvoke({"query": query})
                         # Extract text content from AIMessage if needed
                         detail_text = str(detail_response.content) if hasattr(detail_response, 'content') else str(detail_response)
-                        is_detail_request = detail_text.lower().strip() == 'yes'
                         logger.debug("Detail detection response: %s", detail_text)
+                        return detail_text.lower().strip() == 'yes'
+                    except AdmissionRejected:
+                        # A saturated LLM must not fall back to the longest summary
+                        raise
                     except Exception as e:
                         logger.warning("Error in detail detection: %s", str(e))
                         # Default to detailed response if we can't determine
-                        is_detail_request = True
-
-                    # Determine the length and instructions based on whether it's a detail request
-                    if is_detail_request:
-                        target_length = 1000
-                        detail_instructions = "The summary MUST be EXACTLY 1000 words long - this is a strict requirement. Provide a comprehensive and detailed summary."
-                    else:
-                        target_length = 250
-                        detail_instructions = "The summary MUST be EXACTLY 300 words long - this is a strict requirement. Provide a concise summary focusing on key points."
-
-                    logger.info("Target summary length: %d words", target_length)
-
-                    # Generate the summary with the appropriate length and instructions
-                    summary = await summary_chain.ainvoke({
-                        "query": query,
-                        "content": wiki_results,
-                        "length": target_length,
-                        "detail_instructions": detail_instructions
-                    })
-
-                    # Extract text content from AIMessage if needed
-                    summary_text = str(summary.content) if hasattr(summary, 'content') else str(summary)
-
-                    # Log the word count for monitoring
-                    word_count = len(summary_text.split())
-                    logger.info("Generated summary length: %d words", word_count)
-
-                    # Return a dictionary with the required state fields
-                    return {
-                        'input': query,
-                        'chosen_worker_agent': worker_choice,
-                        'chat_history': chat_hist,
-                        'final_output': summary_text
-                    }
-
-                except Exception as e:
-                    logger.error("Error processing research results: %s", str(e))
-                    return {
-                        'input': query,
-                        'chosen_worker_agent': worker_choice,
-                        'chat_history': chat_hist,
-                        'final_output': f"Error: {str(e)}"
-                    }
+                        return True
+
+                # The Wikipedia lookup (topic extraction + page fetch) and the detail detection depend
+                # only on the query, so they run concurrently; only the summary needs both results
+                wiki_results, is_detail_request = await asyncio.gather(
+                    _timed_stage("wikipedia_lookup", research_tool.ainvoke(query), timings),
+                    _timed_stage("detail_detection", detect_detail_request(), timings),
+                )
+
+                # Determine the length and instructions based on whether it's a detail request
+                if is_detail_request:
+                    target_length = DETAILED_SUMMARY_WORDS
+                    detail_instructions = DETAILED_SUMMARY_INSTRUCTIONS
+                else:
+                    target_length = CONCISE_SUMMARY_WORDS
+                    detail_instructions = CONCISE_SUMMARY_INSTRUCTIONS
+
+                logger.info("Target summary length: %d words", target_length)
+
+                # Generate the summary with the appropriate length and instructions, emitting
+                # each token as soon as the LLM produces it
+                summary_start = time.perf_counter()
+                summary_parts = []
+                try:
+                    with span("summary", detail=is_detail_request,
+                              input_tokens=estimate_tokens(str(wiki_results))) as summary_span:
+                        async with admission_slot(LLM):
+                            async for chunk in summary_chain.astream({
+                                    "detail_instructions": detail_instructions,
+                                    "content": wiki_results,
+                                    "query": query
+                            }):
+                                # Extract text content from AIMessageChunk if needed
+                                text = str(chunk.content) if hasattr(chunk, 'content') else str(chunk)
+                                if text:
+                                    if not summary_parts:
+                                        timings["summary_first_token"] = (time.perf_counter() - summary_start) * 1000
+                                        summary_span.mark("ttft_ms")
+                                    emit(text)
+                                    summary_parts.append(text)
+                        summary_span.set("output_tokens", estimate_tokens("".join(summary_parts)))
+                finally:
+                    timings["summary"] = (time.perf_counter() - summary_start) * 1000
+                summary_text = "".join(summary_parts)
+
+                # Log the word count for monitoring
+                word_count = len(summary_text.split())
+                logger.info("Generated summary length: %d words", word_count)
+
+                output = summary_text
+                streamed = True
+                # Only reached when the lookup found a page and the summary streamed to the end
+                cacheable = bool(summary_text)
+            except WikipediaPageNotFound as e:
+                # Nothing to summarize; the user is told directly and the answer is not cached
+                logger.info("%s", str(e))
+                output = str(e)
+            except AdmissionRejected:
+                raise
             except Exception as e:
                 logger.error("Error in research processing: %s", e)
-                output = f"Error processing research request: {str(e)}"
+                raise
+            finally:
+                logger.info("Research stage timings (ms): %s, total: %.1f",
+                            ", ".join(f"{name}={elapsed:.1f}" for name, elapsed in timings.items()),
+                            (time.perf_counter() - research_start) * 1000)
         else:
             output = ("Apologies, I am not sure what to say, I can answer general questions retrieve info this "
                       "mercury_agent workflow and answer light coding questions, but nothing more.")
             logger.warning("Unknown worker choice: %s", worker_choice)
 
-        return {'input': query, "chosen_worker_agent": worker_choice, "chat_history": chat_hist, "final_output": output}
+        if not streamed:
+            emit(output)
+
+        if cache_vector is not None and cacheable:
+            response_cache.put(query, cache_vector, route, output)
+
+        return {
+            'input': query,
+            "chosen_worker_agent": worker_choice,
+            "chat_history": state["chat_history"],
+            "final_output": output
+        }
 
     # Set up the workflow graph
     workflow = StateGraph(AgentState)
@@ -374,6 +626,9 @@ async def mercury_agent_workflow(config: MercuryAgentWorkflowConfig, builder: Bu
     async def _response_fn(input_message: str) -> str:
         """
         Response function that processes input messages and returns the system's response.
+
+        The conversation is selected by the session id bound to the current context (see
+        `session_store.session_scope`); requests without one share the default session.
         
         Args:
             input_message: The user's input query
@@ -381,18 +636,69 @@ async def mercury_agent_workflow(config: MercuryAgentWorkflowConfig, builder: Bu
         Returns:
             The system's response to the query
         """
+        session_id = current_session_id.get()
         try:
-            logger.debug("Processing input message")
-            out = (await app.ainvoke({"input": input_message, "chat_history": chat_hist}))
-            output = out["final_output"]
+            logger.debug("Processing input message for session %s", session_id)
+            with span("request", session_id=session_id, input_tokens=estimate_tokens(input_message)) as request:
+                out = (await app.ainvoke({
+                    "input": input_message,
+                    "session_id": session_id,
+                    "chat_history": session_store.get(session_id).messages
+                }))
+                output = out["final_output"]
+                request.set("route", out.get("chosen_worker_agent"))
+                request.set("output_tokens", estimate_tokens(output))
             logger.info("Response generated successfully")
             return output
         finally:
             logger.debug("Finished processing message")
 
+    async def _response_stream_fn(input_message: str) -> AsyncGenerator[str, None]:
+        """
+        Streaming response function that yields the system's response as it is generated.
+
+        Routing happens exactly as in `_response_fn`; the chosen worker then emits the answer
+        incrementally (summary tokens for research, RAG server deltas for retrieval), so the
+        first words reach the caller before the full answer is complete.
+
+        Args:
+            input_message: The user's input query
+
+        Yields:
+            Fragments of the system's response
+        """
+        session_id = current_session_id.get()
+        try:
+            logger.debug("Streaming response for session %s", session_id)
+            with span("request", session_id=session_id, input_tokens=estimate_tokens(input_message),
+                      streamed=True) as request:
+                parts = []
+                async for chunk in app.astream(
+                    {
+                        "input": input_message,
+                        "session_id": session_id,
+                        "chat_history": session_store.get(session_id).messages
+                    },
+                    stream_mode="custom"):
+                    request.mark("ttft_ms")
+                    parts.append(chunk)
+                    yield chunk
+                request.set("output_tokens", estimate_tokens("".join(parts)))
+            logger.info("Response streamed successfully")
+        finally:
+            logger.debug("Finished streaming message")
+
     try:
-        yield _response_fn
+        yield FunctionInfo.create(single_fn=_response_fn,
+                                  stream_fn=_response_stream_fn,
+                                  description="Route a query to the research, RAG or chitchat agent and answer it")
     except GeneratorExit:
         logger.exception("Exited early!", exc_info=True)
     finally:
+        if response_cache is not None:
+            logger.info("Response cache stats: %s", response_cache.stats())
+            unregister_stats("response_cache")
+        logger.info("Admission stats: %s", admission_stats())
+        shutdown_tracing()
+        session_store.close()
         logger.debug("Cleaning up mercury_agent workflow.")
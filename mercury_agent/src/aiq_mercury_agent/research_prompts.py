@@ -0,0 +1,97 @@
+"""
+This module holds the prompts of the mercury_agent research worker and builds its chains.
+The chains are built once when the workflow starts and reused by every research request.
+
+Key Components:
+1. SUMMARY_SYSTEM_PROMPT / SUMMARY_USER_PROMPT: Summary prompt, split into a static system message and the request
+2. CONCISE_SUMMARY_INSTRUCTIONS / DETAILED_SUMMARY_INSTRUCTIONS: Length instructions of the two summary styles
+3. DETAIL_PROMPT: Detection of requests for a detailed answer
+4. build_summary_chain / build_detail_chain: Compose the prompts with the workflow's LLM
+
+Prompt layout:
+The system message holds every instruction that does not depend on the request and is byte-identical
+across requests, so LLM servers with prefix (KV) caching, such as NIM, reuse its computation instead
+of reprocessing it for every summary. The request-specific parts follow in order of increasing
+variability: the length instruction (one of two), the Wikipedia content (shared by queries on the
+same topic) and finally the user's query.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import Runnable
+
+SUMMARY_SYSTEM_PROMPT = """You are a helpful AI assistant. Your task is to summarize Wikipedia content in response to the user's query.
+Focus on providing a comprehensive and informative summary that directly addresses the user's query.
+Include relevant details, examples, and key points from the content.
+Maintain a natural flow and ensure all information is accurate and well-organized.
+Make sure to complete all sentences and paragraphs - do not cut off mid-sentence.
+Do not include any meta-commentary or notes about the summary itself.
+Do not mention the word count in your response.
+Do not add any disclaimers or notes about the content.
+Simply provide the summary."""  # noqa: E501
+
+SUMMARY_USER_PROMPT = """{detail_instructions}
+
+Wikipedia Content:
+{content}
+
+User Query: {query}
+
+Summary:"""
+
+CONCISE_SUMMARY_WORDS = 250
+CONCISE_SUMMARY_INSTRUCTIONS = ("The summary MUST be EXACTLY 300 words long - this is a strict requirement. "
+                                "Provide a concise summary focusing on key points.")
+DETAILED_SUMMARY_WORDS = 1000
+DETAILED_SUMMARY_INSTRUCTIONS = ("The summary MUST be EXACTLY 1000 words long - this is a strict requirement. "
+                                 "Provide a comprehensive and detailed summary.")
+
+DETAIL_PROMPT = """Analyze if the following query is asking for more details or elaboration.
+Return ONLY 'yes' or 'no'.
+
+Query: {query}
+Response:"""
+
+
+def build_summary_chain(llm: Any) -> Runnable:
+    """
+    Compose the summary prompt with an LLM.
+
+    Args:
+        llm: LangChain chat model
+
+    Returns:
+        A runnable taking "detail_instructions", "content" and "query"
+    """
+    prompt = ChatPromptTemplate.from_messages([("system", SUMMARY_SYSTEM_PROMPT), ("human", SUMMARY_USER_PROMPT)])
+    return prompt | llm
+
+
+def build_detail_chain(llm: Any) -> Runnable:
+    """
+    Compose the detail detection prompt with an LLM.
+
+    Args:
+        llm: LangChain chat model
+
+    Returns:
+        A runnable taking "query" and answering 'yes' or 'no'
+    """
+    return PromptTemplate.from_template(DETAIL_PROMPT) | llm
@@ -0,0 +1,308 @@
+"""
+This module implements a semantic cache of workflow answers.
+Users often ask near-identical questions, so once a query has been routed, the answer of an earlier
+query with a very similar embedding and the same route is returned instead of running the worker again.
+
+Key Components:
+1. ResponseCacheConfig: Configuration for the similarity threshold, expiry, size and enabled routes
+2. NumpyVectorIndex: Exact nearest-neighbour search over normalized embeddings with NumPy
+3. HnswVectorIndex: Approximate nearest-neighbour search with hnswlib, for large caches
+4. SemanticResponseCache: LRU/TTL cache of answers looked up by embedding similarity and route
+5. normalize_query: Normalization applied to queries before they are embedded
+
+Lookups and stores are keyed by route, so a cached research summary is never returned for a query
+the supervisor sends to the RAG agent. Routes whose answers should always be fresh (e.g. chitchat)
+are simply left out of `routes`.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import logging
+import re
+import time
+from collections import Counter
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from typing import Literal
+from typing import Protocol
+
+import numpy as np
+from pydantic import BaseModel
+
+from aiq.data_models.component_ref import EmbedderRef
+
+from .query_router import RESEARCH
+from .query_router import RETRIEVE
+from .query_router import normalize_route
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+class ResponseCacheConfig(BaseModel):
+    """
+    Configuration for the semantic response cache.
+
+    Attributes:
+        enabled: Whether answers are cached at all (default: False)
+        embedder_name: Embedder used to embed queries (default: "nim_embedder")
+        similarity_threshold: Minimum cosine similarity for a cached answer to be reused (default: 0.95)
+        ttl: Seconds a cached answer stays valid (default: 3600)
+        max_entries: Maximum number of cached answers (default: 1000)
+        routes: Routes whose answers are cached (default: research and retrieve, never chitchat)
+        index: Nearest-neighbour index, "numpy" (exact) or "hnsw" (approximate, requires hnswlib)
+        candidates: Number of nearest neighbours inspected per lookup (default: 5)
+    """
+    enabled: bool = False
+    embedder_name: EmbedderRef = "nim_embedder"
+    similarity_threshold: float = 0.95
+    ttl: float = 3600.0
+    max_entries: int = 1000
+    routes: list[str] = [RESEARCH, RETRIEVE]
+    index: Literal["numpy", "hnsw"] = "numpy"
+    candidates: int = 5
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so casing, punctuation and spacing do not affect its embedding."""
+    return " ".join(_PUNCTUATION_RE.sub(" ", query.casefold()).split())
+
+
+class VectorIndex(Protocol):
+    """Nearest-neighbour index over unit-length vectors keyed by integer ids."""
+
+    def add(self, key: int, vector: np.ndarray) -> None:
+        ...
+
+    def remove(self, key: int) -> None:
+        ...
+
+    def search(self, vector: np.ndarray, k: int) -> list[tuple[int, float]]:
+        ...
+
+
+class NumpyVectorIndex:
+    """
+    Exact nearest-neighbour index using a single matrix product per search.
+
+    Vectors live in a preallocated matrix; removed rows are reused by later additions.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._vectors: np.ndarray | None = None
+        self._keys = np.full(capacity, -1, dtype=np.int64)
+        self._slots: dict[int, int] = {}
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, key: int, vector: np.ndarray) -> None:
+        if self._vectors is None:
+            self._vectors = np.zeros((self._capacity, vector.shape[0]), dtype=np.float32)
+        slot = self._free.pop()
+        self._vectors[slot] = vector
+        self._keys[slot] = key
+        self._slots[key] = slot
+
+    def remove(self, key: int) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            self._keys[slot] = -1
+            self._vectors[slot] = 0.0
+            self._free.append(slot)
+
+    def search(self, vector: np.ndarray, k: int) -> list[tuple[int, float]]:
+        if not self._slots:
+            return []
+        scores = self._vectors @ vector
+        scores[self._keys < 0] = -np.inf
+        k = min(k, len(self._slots))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self._keys[i]), float(scores[i])) for i in top]
+
+
+class HnswVectorIndex:
+    """Approximate nearest-neighbour index backed by hnswlib, for caches too large to scan."""
+
+    def __init__(self, capacity: int) -> None:
+        try:
+            import hnswlib  # noqa: F401
+        except ImportError as e:
+            raise ImportError("The 'hnsw' response cache index requires the 'hnswlib' package") from e
+        self._capacity = capacity
+        self._index = None
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, key: int, vector: np.ndarray) -> None:
+        import hnswlib
+
+        if self._index is None:
+            self._index = hnswlib.Index(space="ip", dim=vector.shape[0])
+            self._index.init_index(max_elements=self._capacity, allow_replace_deleted=True)
+        self._index.add_items(vector[np.newaxis, :], np.array([key]), replace_deleted=True)
+        self._count += 1
+
+    def remove(self, key: int) -> None:
+        if self._index is not None:
+            self._index.mark_deleted(key)
+            self._count -= 1
+
+    def search(self, vector: np.ndarray, k: int) -> list[tuple[int, float]]:
+        if not self._count:
+            return []
+        labels, distances = self._index.knn_query(vector, k=min(k, self._count))
+        # The inner-product space reports 1 - similarity as the distance
+        return [(int(label), 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+
+@dataclass
+class _Entry:
+    query: str
+    route: str
+    output: str
+    expires: float
+
+
+class SemanticResponseCache:
+    """
+    Cache of workflow answers looked up by query embedding similarity and route.
+
+    `hits`, `misses` and `stores` are cumulative counters, also broken down per route in `stats`.
+    """
+
+    def __init__(self, config: ResponseCacheConfig, embedder: Any = None) -> None:
+        """
+        Args:
+            config: Cache settings
+            embedder: LangChain `Embeddings` used by `embed`
+        """
+        self.config = config
+        self.embedder = embedder
+        self._routes = {normalize_route(route) or route for route in config.routes}
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        # The index keeps one spare slot because a new answer is added before the oldest is evicted
+        capacity = config.max_entries + 1
+        self._index: VectorIndex = HnswVectorIndex(capacity) if config.index == "hnsw" else NumpyVectorIndex(capacity)
+        self._ids = itertools.count()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._route_hits: Counter[str] = Counter()
+        self._route_misses: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def enabled_for(self, route: str) -> bool:
+        """Whether answers of a route are cached."""
+        return self.config.enabled and route in self._routes
+
+    async def embed(self, query: str) -> np.ndarray:
+        """
+        Embed a normalized query as a unit-length vector.
+
+        Args:
+            query: The user's query
+
+        Returns:
+            The query embedding
+        """
+        vector = np.asarray(await self.embedder.aembed_query(normalize_query(query)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, vector: np.ndarray, route: str) -> str | None:
+        """
+        Return the cached answer of the most similar earlier query with the same route.
+
+        Args:
+            vector: Embedding of the query, from `embed`
+            route: Route chosen for the query
+
+        Returns:
+            The cached answer, or `None` if no sufficiently similar query was answered on this route
+        """
+        self._evict_expired()
+        for key, similarity in self._index.search(vector, self.config.candidates):
+            if similarity < self.config.similarity_threshold:
+                break
+            entry = self._entries.get(key)
+            if entry is not None and entry.route == route:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._route_hits[route] += 1
+                logger.debug("Response cache hit for route %s (similarity=%.3f, cached query: %s)",
+                             route,
+                             similarity,
+                             entry.query)
+                return entry.output
+        self.misses += 1
+        self._route_misses[route] += 1
+        return None
+
+    def put(self, query: str, vector: np.ndarray, route: str, output: str) -> None:
+        """
+        Cache the answer to a query.
+
+        Args:
+            query: The user's query
+            vector: Embedding of the query, from `embed`
+            route: Route the query was answered on
+            output: The answer
+        """
+        key = next(self._ids)
+        self._index.add(key, vector)
+        self._entries[key] = _Entry(query=query, route=route, output=output, expires=time.monotonic() + self.config.ttl)
+        self.stores += 1
+        while len(self._entries) > self.config.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._index.remove(evicted)
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and hit rates, overall and per route."""
+        lookups = self.hits + self.misses
+        routes = {}
+        for route in sorted(set(self._route_hits) | set(self._route_misses)):
+            route_lookups = self._route_hits[route] + self._route_misses[route]
+            routes[route] = {
+                "hits": self._route_hits[route],
+                "misses": self._route_misses[route],
+                "hit_rate": self._route_hits[route] / route_lookups,
+            }
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "entries": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "routes": routes,
+        }
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry.expires < now]
+        for key in expired:
+            del self._entries[key]
+            self._index.remove(key)
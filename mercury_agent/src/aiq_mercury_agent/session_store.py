@@ -0,0 +1,305 @@
+"""
+This module implements per-session conversation state for the mercury_agent workflow.
+It replaces the single process-wide chat history with a session-keyed store whose memory
+and prompt footprint stay bounded regardless of traffic.
+
+Key Components:
+1. SessionConfig: Configuration for session limits and optional persistence
+2. BoundedChatMessageHistory: A LangChain chat history that keeps a sliding window of messages
+3. SessionHistoryStore: LRU store of per-session histories with optional SQLite persistence
+4. current_session_id / session_scope: Context variable carrying the session id of the running request
+
+Bounding works on three levels:
+- Number of resident sessions (least recently used sessions are evicted first)
+- Idle time (sessions untouched for longer than `idle_ttl` seconds are evicted)
+- Per-session window (only the last `max_turns` turns and at most `max_tokens` tokens are kept)
+
+With persistence enabled, evicted sessions are reloaded from SQLite on their next request. Histories
+are written by a background thread, so a turn never waits for SQLite on the event loop, and
+persisted sessions are bounded like resident ones: rows idle for longer than `idle_ttl` or beyond
+the `max_sessions` most recently updated are deleted.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from collections.abc import Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage
+from langchain_core.messages import HumanMessage
+from langchain_core.messages import messages_from_dict
+from langchain_core.messages import messages_to_dict
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_ID = "default"
+
+current_session_id: ContextVar[str] = ContextVar("mercury_session_id", default=DEFAULT_SESSION_ID)
+
+
+@contextmanager
+def session_scope(session_id: str | None) -> Iterator[str]:
+    """
+    Bind a session id to the current context for the duration of a workflow run.
+
+    Args:
+        session_id: The session id to bind; `None` keeps the default session
+
+    Yields:
+        The session id that is in effect
+    """
+    token = current_session_id.set(session_id or DEFAULT_SESSION_ID)
+    try:
+        yield current_session_id.get()
+    finally:
+        current_session_id.reset(token)
+
+
+class SessionConfig(BaseModel):
+    """
+    Configuration for per-session conversation history.
+
+    Attributes:
+        max_sessions: Maximum number of sessions kept in memory (default: 1000)
+        idle_ttl: Seconds after which an idle session is evicted from memory; `None` disables (default: 3600)
+        max_turns: Maximum number of user/assistant turns kept per session (default: 10)
+        max_tokens: Approximate maximum number of history tokens kept per session (default: 2000)
+        persist_path: Optional path of a SQLite database used to persist histories across restarts
+    """
+    max_sessions: int = 1000
+    idle_ttl: float | None = 3600.0
+    max_turns: int = 10
+    max_tokens: int = 2000
+    persist_path: str | None = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token) used for history windowing."""
+    return max(1, len(text) // 4)
+
+
+class BoundedChatMessageHistory(BaseChatMessageHistory):
+    """
+    A chat message history that keeps only the most recent messages of a conversation.
+
+    Whenever messages are added, the oldest turns are dropped until the history fits within
+    both the turn cap and the token cap. A turn is a human message with the replies that follow
+    it and is dropped as a whole, so no reply outlives its question. The most recent turn is
+    always kept.
+    """
+
+    def __init__(self,
+                 session_id: str,
+                 max_turns: int,
+                 max_tokens: int,
+                 messages: Sequence[BaseMessage] = (),
+                 on_change=None) -> None:
+        self.session_id = session_id
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self._messages: list[BaseMessage] = list(messages)
+        self._on_change = on_change
+        self.last_access = time.monotonic()
+        self._trim()
+
+    @property
+    def messages(self) -> list[BaseMessage]:  # type: ignore[override]
+        return list(self._messages)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self._messages.extend(messages)
+        self._trim()
+        self.last_access = time.monotonic()
+        if self._on_change is not None:
+            self._on_change(self)
+
+    def clear(self) -> None:
+        self._messages = []
+        if self._on_change is not None:
+            self._on_change(self)
+
+    def _trim(self) -> None:
+        turns = sum(isinstance(m, HumanMessage) for m in self._messages[1:]) + bool(self._messages)
+        total = sum(estimate_tokens(str(m.content)) for m in self._messages)
+        while turns > max(1, self.max_turns) or total > self.max_tokens:
+            end = next((i for i, m in enumerate(self._messages) if i > 0 and isinstance(m, HumanMessage)), None)
+            if end is None:
+                break
+            total -= sum(estimate_tokens(str(m.content)) for m in self._messages[:end])
+            del self._messages[:end]
+            turns -= 1
+
+
+class SessionHistoryStore:
+    """
+    LRU store of per-session chat histories.
+
+    `get` is suitable as the `get_session_history` factory of LangChain's `RunnableWithMessageHistory`.
+    """
+
+    def __init__(self, config: SessionConfig) -> None:
+        self.config = config
+        self._sessions: OrderedDict[str, BoundedChatMessageHistory] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        # Histories waiting for the writer thread and the batch it is writing, latest snapshot per session
+        self._pending: dict[str, tuple[str, float]] = {}
+        self._writing: dict[str, tuple[str, float]] = {}
+        self._pending_changed = threading.Condition()
+        self._writer: threading.Thread | None = None
+        self._closing = False
+        self.evictions = 0
+
+        if config.persist_path:
+            path = Path(config.persist_path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS sessions "
+                             "(session_id TEXT PRIMARY KEY, messages TEXT NOT NULL, updated REAL NOT NULL)")
+            self._db.commit()
+            self._writer = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+            self._writer.start()
+            logger.info("Persisting session histories to %s", path)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str) -> BoundedChatMessageHistory:
+        """
+        Return the history of a session, creating or reloading it if needed.
+
+        Args:
+            session_id: The session id
+
+        Returns:
+            The session's bounded chat history
+        """
+        with self._lock:
+            self._evict_idle()
+            history = self._sessions.get(session_id)
+            if history is None:
+                history = BoundedChatMessageHistory(session_id,
+                                                    self.config.max_turns,
+                                                    self.config.max_tokens,
+                                                    self._load(session_id),
+                                                    on_change=self._save if self._db is not None else None)
+                self._sessions[session_id] = history
+                while len(self._sessions) > self.config.max_sessions:
+                    evicted_id, _ = self._sessions.popitem(last=False)
+                    self.evictions += 1
+                    logger.debug("Evicted least recently used session: %s", evicted_id)
+            else:
+                self._sessions.move_to_end(session_id)
+            history.last_access = time.monotonic()
+            return history
+
+    def close(self) -> None:
+        """Write pending histories and close the persistence database, if any."""
+        if self._writer is not None:
+            with self._pending_changed:
+                self._closing = True
+                self._pending_changed.notify()
+            self._writer.join()
+            self._writer = None
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _evict_idle(self) -> None:
+        if self.config.idle_ttl is None:
+            return
+        deadline = time.monotonic() - self.config.idle_ttl
+        # Sessions are ordered by last access, so idle ones are at the front
+        while self._sessions:
+            session_id, history = next(iter(self._sessions.items()))
+            if history.last_access >= deadline:
+                break
+            del self._sessions[session_id]
+            self.evictions += 1
+            logger.debug("Evicted idle session: %s", session_id)
+
+    def _load(self, session_id: str) -> list[BaseMessage]:
+        if self._db is None:
+            return []
+        with self._pending_changed:
+            pending = self._pending.get(session_id) or self._writing.get(session_id)
+        if pending is not None:
+            return messages_from_dict(json.loads(pending[0]))
+        with self._db_lock:
+            row = self._db.execute("SELECT messages FROM sessions WHERE session_id = ?", (session_id, )).fetchone()
+        return messages_from_dict(json.loads(row[0])) if row else []
+
+    def _save(self, history: BoundedChatMessageHistory) -> None:
+        # Only the snapshot is taken here; the writer thread does the SQLite work
+        snapshot = json.dumps(messages_to_dict(history.messages))
+        with self._pending_changed:
+            if self._closing:
+                return
+            self._pending[history.session_id] = (snapshot, time.time())
+            self._pending_changed.notify()
+
+    def _write_loop(self) -> None:
+        self._prune()
+        while True:
+            with self._pending_changed:
+                while not self._pending and not self._closing:
+                    self._pending_changed.wait()
+                batch = self._writing = self._pending
+                self._pending = {}
+                closing = self._closing
+            if batch:
+                try:
+                    with self._db_lock:
+                        self._db.executemany(
+                            "INSERT OR REPLACE INTO sessions (session_id, messages, updated) VALUES (?, ?, ?)",
+                            [(session_id, messages, updated) for session_id, (messages, updated) in batch.items()])
+                        self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error("Failed to persist %d session histories: %s", len(batch), e)
+                with self._pending_changed:
+                    self._writing = {}
+                self._prune()
+            if closing:
+                return
+
+    def _prune(self) -> None:
+        """Delete persisted sessions that are idle for too long or beyond `max_sessions`."""
+        try:
+            with self._db_lock:
+                if self.config.idle_ttl is not None:
+                    self._db.execute("DELETE FROM sessions WHERE updated < ?", (time.time() - self.config.idle_ttl, ))
+                self._db.execute(
+                    "DELETE FROM sessions WHERE session_id NOT IN "
+                    "(SELECT session_id FROM sessions ORDER BY updated DESC LIMIT ?)", (self.config.max_sessions, ))
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error("Failed to prune persisted sessions: %s", e)
@@ -0,0 +1,231 @@
+"""
+This module implements an incremental decoder for Server-Sent Events (SSE) streams, such as the
+answers streamed by the RAG server's `/generate` endpoint and OpenAI-compatible chat completions.
+
+Key Components:
+1. SSEEvent: A dispatched event with its type, data and id
+2. SSEDecoder: Incremental decoder fed with raw byte chunks as they arrive from the network
+3. aiter_sse: Async iterator of the events of a byte stream
+4. aiter_sse_json: Async iterator of the JSON payloads of a stream, ending at the `[DONE]` sentinel
+5. SSEStreamError: Raised for error events sent by the server
+
+The decoder follows the SSE format: events are separated by blank lines, `data:` lines of one event
+are joined with newlines, lines may end in `\\n`, `\\r\\n` or `\\r` and may be split across network
+chunks. The current partial line is kept as a list of pieces and joined once when it completes, and
+only the new chunk is searched for line endings, so decoding is linear in the stream length even
+when one long line arrives in many small chunks.
+Payloads are parsed with orjson when it is installed.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import codecs
+import json
+import logging
+import re
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from typing import Any
+from typing import NamedTuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DONE = "[DONE]"
+
+_LINE_END_RE = re.compile(r"\r\n|\r|\n")
+
+
+class SSEStreamError(RuntimeError):
+    """Raised when the server reports an error inside an event stream."""
+
+
+class SSEEvent(NamedTuple):
+    """
+    A dispatched Server-Sent Event.
+
+    Attributes:
+        event: Event type, "message" unless the server sent an `event:` field
+        data: The event's `data:` lines joined with newlines
+        id: Value of the event's `id:` field, if any
+    """
+    event: str
+    data: str
+    id: str | None = None
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON with orjson when it is installed, otherwise with the standard library."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class SSEDecoder:
+    """
+    Incremental Server-Sent Events decoder.
+
+    Feed it chunks in arrival order with `feed` and call `close` at the end of the stream.
+    """
+
+    def __init__(self) -> None:
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pieces: list[str] = []
+        # The previous chunk ended in "\r", so a leading "\n" belongs to that line ending
+        self._pending_cr = False
+        self._data: list[str] = []
+        self._event: str | None = None
+        self._id: str | None = None
+
+    def feed(self, chunk: bytes | str) -> list[SSEEvent]:
+        """
+        Decode a chunk of the stream.
+
+        Args:
+            chunk: The next bytes (or text) of the stream; may end in the middle of a line or character
+
+        Returns:
+            The events completed by this chunk
+        """
+        text = self._utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+        events: list[SSEEvent] = []
+        start = 0
+        if self._pending_cr and text:
+            self._pending_cr = False
+            if text[0] == "\n":
+                start = 1
+        for match in _LINE_END_RE.finditer(text, start):
+            self._pieces.append(text[start:match.start()])
+            line = "".join(self._pieces)
+            self._pieces = []
+            self._process_line(line, events)
+            start = match.end()
+        if start < len(text):
+            self._pieces.append(text[start:])
+        elif text and text[-1] == "\r":
+            # Possibly the first half of a "\r\n" split across chunks
+            self._pending_cr = True
+        return events
+
+    def close(self) -> list[SSEEvent]:
+        """
+        Finish the stream.
+
+        A final event not terminated by a blank line is still dispatched, since some servers close the
+        connection right after the last `data:` line.
+
+        Returns:
+            The remaining events
+        """
+        events: list[SSEEvent] = []
+        text = "".join(self._pieces) + self._utf8.decode(b"", final=True)
+        if self._pending_cr and text.startswith("\n"):
+            text = text[1:]
+        self._pieces = []
+        self._pending_cr = False
+        for line in _LINE_END_RE.split(text):
+            if line:
+                self._process_line(line, events)
+        self._dispatch(events)
+        return events
+
+    def _process_line(self, line: str, events: list[SSEEvent]) -> None:
+        if not line:
+            self._dispatch(events)
+            return
+        if line.startswith(":"):
+            return
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            self._id = value
+
+    def _dispatch(self, events: list[SSEEvent]) -> None:
+        if self._data:
+            events.append(SSEEvent(self._event or "message", "\n".join(self._data), self._id))
+        self._data = []
+        self._event = None
+
+
+async def aiter_sse(chunks: AsyncIterable[bytes | str]) -> AsyncIterator[SSEEvent]:
+    """
+    Decode a byte stream into Server-Sent Events as the chunks arrive.
+
+    Args:
+        chunks: The raw stream, e.g. `httpx.Response.aiter_bytes()`
+
+    Yields:
+        The decoded events
+    """
+    decoder = SSEDecoder()
+    async for chunk in chunks:
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.close():
+        yield event
+
+
+def _parse_payloads(data: str) -> list[Any]:
+    try:
+        return [loads(data)]
+    except ValueError:
+        if "\n" not in data:
+            raise
+        # Servers that omit the blank line between events produce one event with a JSON document per line
+        return [loads(line) for line in data.split("\n") if line.strip()]
+
+
+async def aiter_sse_json(chunks: AsyncIterable[bytes | str]) -> AsyncIterator[Any]:
+    """
+    Decode a stream of JSON Server-Sent Events.
+
+    The stream ends at the `[DONE]` sentinel or when the connection closes. Events whose data is not
+    valid JSON are skipped.
+
+    Args:
+        chunks: The raw stream, e.g. `httpx.Response.aiter_bytes()`
+
+    Yields:
+        The parsed payload of each event
+
+    Raises:
+        SSEStreamError: For an `error` event or a payload holding an "error" field
+    """
+    async for event in aiter_sse(chunks):
+        data = event.data.strip()
+        if data == DONE:
+            return
+        if event.event == "error":
+            raise SSEStreamError(data or "Server reported an error")
+        try:
+            payloads = _parse_payloads(data)
+        except ValueError:
+            logger.debug("Skipping malformed event data: %s", data[:200])
+            continue
+        for payload in payloads:
+            if isinstance(payload, dict) and payload.get("error"):
+                error = payload["error"]
+                raise SSEStreamError(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+            yield payload
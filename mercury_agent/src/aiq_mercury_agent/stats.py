@@ -0,0 +1,91 @@
+"""
+This module implements the helpers shared by the reports of the mercury_agent tools: the workflow
+benchmark, the batch evaluation runner, the router evaluation, the Milvus probe and the runtime
+statistics of admission control and RAG collections.
+
+Key Components:
+1. percentile: Nearest-rank percentile of a list of samples
+2. run_error: Error of a workflow run, decided from its exception rather than from the answer text
+3. register_stats / unregister_stats / runtime_stats: Registry of live statistics, served by the resident server
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+
+# Live statistics sources by name, e.g. the caches of a loaded workflow
+_sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def percentile(values: Iterable[float], pct: float) -> float:
+    """
+    Return the nearest-rank percentile of samples.
+
+    Args:
+        values: The samples, in any order
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The sample at the percentile, or 0.0 if there are no samples
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_error(answer: str | None, error: BaseException | None = None) -> str | None:
+    """
+    Return the error of a workflow run, or None if it succeeded.
+
+    The workflow raises when a worker fails, so a run failed if it raised or produced no answer. The
+    answer text is not inspected, so an answer that happens to start with "Error" is not a failure.
+
+    Args:
+        answer: The answer, if the run completed
+        error: The exception the run raised, if any
+
+    Returns:
+        The error message
+    """
+    if error is not None:
+        return f"{type(error).__name__}: {error}"
+    if not answer:
+        return "Empty response"
+    return None
+
+
+def register_stats(name: str, source: Callable[[], dict[str, Any]]) -> None:
+    """
+    Publish a source of live statistics, replacing any earlier source of the same name.
+
+    Args:
+        name: Key of the statistics in `runtime_stats`, e.g. "response_cache"
+        source: Function returning the current statistics as a JSON-serializable dictionary
+    """
+    _sources[name] = source
+
+
+def unregister_stats(name: str) -> None:
+    """Withdraw a source of live statistics, if it is registered."""
+    _sources.pop(name, None)
+
+
+def runtime_stats() -> dict[str, dict[str, Any]]:
+    """Return the current statistics of every registered source."""
+    return {name: source() for name, source in sorted(_sources.items())}
@@ -0,0 +1,408 @@
+"""
+This module implements lightweight per-stage tracing for the mercury_agent workflow.
+Every stage of a request (supervisor classification, routing, the worker, topic extraction,
+the Wikipedia fetch, detail detection, summary generation, the RAG stream and the chitchat
+generator) is recorded as a span carrying the request and session ids, its duration and
+attributes such as token counts and time to first token.
+
+Key Components:
+1. TracingConfig: Configuration selecting the span exporter
+2. Span: A timed stage with attributes, linked to its parent stage and request
+3. span: Context manager recording a stage as a child of the current span
+4. JsonlSpanExporter / OtlpJsonSpanExporter: Exporters writing one JSON document per line
+5. configure_tracing / shutdown_tracing / flush_tracing: Process-wide tracer setup used by the workflow
+6. add_span_exporter / remove_span_exporter: Additional exporters, e.g. tools collecting spans in memory
+
+Exporters:
+- "none" (default): spans are not recorded at all, `span` costs a context-manager entry
+- "jsonl": one flat JSON object per span, convenient for jq or pandas
+- "otlp_json": OpenTelemetry OTLP/JSON export requests, one per line, readable by the
+  OpenTelemetry Collector's `otlpjsonfile` receiver and other OTLP tooling
+
+The file exporters write from a background thread, so file I/O stays off the request path;
+`shutdown_tracing` writes out every pending span.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+from typing import Literal
+from typing import Protocol
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class TracingConfig(BaseModel):
+    """
+    Configuration for per-stage tracing.
+
+    Attributes:
+        exporter: "none", "jsonl" or "otlp_json" (default: "none")
+        path: File the spans are appended to by the "jsonl" and "otlp_json" exporters
+        service_name: Service name reported in the OTLP resource (default: "mercury_agent")
+    """
+    exporter: Literal["none", "jsonl", "otlp_json"] = "none"
+    path: str = "./.mercury/traces.jsonl"
+    service_name: str = "mercury_agent"
+
+
+class Span:
+    """
+    A timed stage of a request.
+
+    Attributes:
+        name: Stage name
+        trace_id: Id of the request the stage belongs to (32 hex digits)
+        span_id: Id of the stage (16 hex digits)
+        parent_id: Id of the enclosing stage, `None` for the request itself
+        session_id: Conversation the request belongs to
+        attributes: Stage attributes such as the route or token counts
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "session_id", "attributes", "start_time", "end_time",
+                 "status", "error", "_start")
+
+    def __init__(self, name: str, parent: "Span | None", session_id: str | None, attributes: dict[str, Any]) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.session_id = session_id if session_id is not None else (parent.session_id if parent is not None else None)
+        self.attributes = attributes
+        self.start_time = time.time()
+        self.end_time: float | None = None
+        self.status = "ok"
+        self.error: str | None = None
+        self._start = time.perf_counter()
+
+    @property
+    def request_id(self) -> str:
+        return self.trace_id
+
+    @property
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the span started."""
+        return (time.perf_counter() - self._start) * 1000
+
+    @property
+    def duration_ms(self) -> float | None:
+        return None if self.end_time is None else (self.end_time - self.start_time) * 1000
+
+    def set(self, key: str, value: Any) -> None:
+        """Set an attribute."""
+        self.attributes[key] = value
+
+    def mark(self, key: str) -> None:
+        """Record the time elapsed since the start as attribute `key` (in ms), once; e.g. time to first token."""
+        self.attributes.setdefault(key, round(self.elapsed_ms, 3))
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        self.end_time = self.start_time + (time.perf_counter() - self._start)
+
+
+class _NoopSpan:
+    """Stand-in returned by `span` when tracing is disabled."""
+
+    trace_id = span_id = parent_id = session_id = request_id = None
+    elapsed_ms = duration_ms = 0.0
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def mark(self, key: str) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(Protocol):
+
+    def export(self, span: Span) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class _FileExporter:
+    """
+    Base of the file exporters: spans are serialized on export and written by a background thread.
+
+    The writer flushes the file whenever it has drained the queue, so a burst of spans costs one
+    flush and the request never waits for file I/O.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("a", encoding="utf-8")
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="span-writer", daemon=True)
+        self._writer.start()
+        logger.info("Exporting trace spans to %s", path)
+
+    def _write(self, document: dict) -> None:
+        self._queue.put(json.dumps(document, default=str) + "\n")
+
+    def _write_loop(self) -> None:
+        while True:
+            line = self._queue.get()
+            try:
+                if line is None:
+                    return
+                self._file.write(line)
+                if self._queue.empty():
+                    self._file.flush()
+            except OSError as e:
+                logger.error("Failed to write trace span: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every span exported so far is written to the file."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._file.close()
+
+
+class JsonlSpanExporter(_FileExporter):
+    """Writes each finished span as one flat JSON object per line."""
+
+    def export(self, span: Span) -> None:
+        self._write({
+            "name": span.name,
+            "request_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "session_id": span.session_id,
+            "start_time": span.start_time,
+            "duration_ms": span.duration_ms,
+            "status": span.status,
+            "error": span.error,
+            "attributes": span.attributes,
+        })
+
+
+# OTLP status codes: 0 unset, 1 ok, 2 error; a cancelled stage did not fail
+_OTLP_STATUS = {"ok": {"code": 1}, "cancelled": {"code": 0}}
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpJsonSpanExporter(_FileExporter):
+    """Writes each finished span as an OTLP/JSON `ExportTraceServiceRequest` per line."""
+
+    def __init__(self, path: str | Path, service_name: str) -> None:
+        super().__init__(path)
+        self._resource = {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]}
+
+    def export(self, span: Span) -> None:
+        attributes = dict(span.attributes)
+        if span.session_id is not None:
+            attributes["session.id"] = span.session_id
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(int(span.start_time * 1e9)),
+            "endTimeUnixNano": str(int(span.end_time * 1e9)),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+            "status": _OTLP_STATUS[span.status] if span.status != "error" else {"code": 2, "message": span.error},
+        }
+        if span.parent_id is not None:
+            otlp_span["parentSpanId"] = span.parent_id
+        self._write({
+            "resourceSpans": [{
+                "resource": self._resource,
+                "scopeSpans": [{"scope": {"name": "aiq_mercury_agent"}, "spans": [otlp_span]}],
+            }]
+        })
+
+
+class _FanOutExporter:
+    """Exports each span to several exporters."""
+
+    def __init__(self, exporters: list[SpanExporter]) -> None:
+        self.exporters = exporters
+
+    def export(self, span: Span) -> None:
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    def flush(self) -> None:
+        for exporter in self.exporters:
+            _flush(exporter)
+
+    def close(self) -> None:
+        for exporter in self.exporters:
+            exporter.close()
+
+
+def _flush(exporter: SpanExporter) -> None:
+    flush = getattr(exporter, "flush", None)
+    if flush is not None:
+        flush()
+
+
+_current_span: ContextVar[Span | None] = ContextVar("mercury_current_span", default=None)
+_exporter: SpanExporter | None = None
+
+
+def configure_tracing(config: TracingConfig) -> None:
+    """
+    Install the process-wide span exporter, replacing (and closing) any previous one.
+
+    Args:
+        config: Tracing settings, typically the workflow's `tracing` section
+    """
+    global _exporter
+    shutdown_tracing()
+    if config.exporter == "jsonl":
+        _exporter = JsonlSpanExporter(config.path)
+    elif config.exporter == "otlp_json":
+        _exporter = OtlpJsonSpanExporter(config.path, config.service_name)
+
+
+def shutdown_tracing() -> None:
+    """Close the span exporter and disable tracing."""
+    global _exporter
+    exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.close()
+
+
+def flush_tracing() -> None:
+    """Block until the spans exported so far are written, e.g. before reading the trace file."""
+    if _exporter is not None:
+        _flush(_exporter)
+
+
+def add_span_exporter(exporter: SpanExporter) -> None:
+    """
+    Export spans to an additional exporter, alongside the configured one.
+
+    Enables tracing if it was off. The exporter is closed by `shutdown_tracing` unless removed first.
+
+    Args:
+        exporter: Object with `export(span)` and `close()` methods
+    """
+    global _exporter
+    if _exporter is None:
+        _exporter = exporter
+    elif isinstance(_exporter, _FanOutExporter):
+        _exporter.exporters.append(exporter)
+    else:
+        _exporter = _FanOutExporter([_exporter, exporter])
+
+
+def remove_span_exporter(exporter: SpanExporter) -> None:
+    """Stop exporting spans to an exporter added with `add_span_exporter`, without closing it."""
+    global _exporter
+    if _exporter is exporter:
+        _exporter = None
+    elif isinstance(_exporter, _FanOutExporter) and exporter in _exporter.exporters:
+        _exporter.exporters.remove(exporter)
+        if len(_exporter.exporters) == 1:
+            _exporter = _exporter.exporters[0]
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span() -> Span | None:
+    """Return the innermost active span of the current context, if any."""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, session_id: str | None = None, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+    """
+    Record a stage as a span, nested under the current span of the context.
+
+    A span opened without an enclosing span starts a new request (trace). Exceptions raised in the
+    block mark the span as failed and are re-raised.
+
+    Args:
+        name: Stage name
+        session_id: Conversation id; inherited from the enclosing span when omitted
+        **attributes: Initial span attributes
+
+    Yields:
+        The span, for adding attributes while the stage runs
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield _NOOP_SPAN
+        return
+
+    current = Span(name, _current_span.get(), session_id, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except (GeneratorExit, asyncio.CancelledError):
+        # The caller stopped consuming a stream or cancelled the request
+        current.status = "cancelled"
+        raise
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # An async generator finalized outside the context it started in; its context is gone anyway
+            pass
+        current.end()
+        try:
+            exporter.export(current)
+        except Exception as e:
+            logger.warning("Failed to export span %s: %s", name, str(e))
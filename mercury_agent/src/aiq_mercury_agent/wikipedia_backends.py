@@ -0,0 +1,410 @@
+"""
+This module implements the page sources used by the research tool to look up Wikipedia articles.
+Besides the live Wikipedia API it provides an offline backend that answers from a local
+full-text index built from a Wikipedia dump, for air-gapped deployments and low-latency lookups.
+
+Key Components:
+1. WikipediaBackend: Interface shared by all backends (exact title lookup and ranked search)
+2. LiveWikipediaBackend: Backend calling the Wikipedia API through the `wikipedia` package
+3. OfflineWikipediaConfig / OfflineWikipediaBackend: Backend reading a local SQLite FTS5 index
+4. iter_xml_dump / iter_jsonl_dump: Streaming readers for MediaWiki XML exports and JSONL extracts
+5. build_index: Ingests a dump into the SQLite index in bounded batches
+6. main: Command line entry point for building an index
+
+Both backends raise `wikipedia.exceptions.PageError` for unknown titles, so callers handle a
+missing page the same way regardless of the backend in use.
+
+Example:
+    python -m aiq_mercury_agent.wikipedia_backends --dump enwiki-latest-pages-articles.xml.bz2 \
+        --index ~/.mercury/wikipedia.db
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import bz2
+import gzip
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO
+from typing import NamedTuple
+from typing import Protocol
+from urllib.parse import quote
+from xml.etree import ElementTree
+
+import wikipedia
+from pydantic import BaseModel
+
+from .wikipedia_cache import normalize_key
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class DumpPage(NamedTuple):
+    """
+    A single article read from a dump.
+
+    Attributes:
+        title: Title of the article
+        content: Plain-text content, or an empty string for redirects
+        url: URL of the article, or `None` to derive it from the title
+        redirect: Title of the redirect target, if the article is a redirect
+    """
+    title: str
+    content: str
+    url: str | None = None
+    redirect: str | None = None
+
+
+class WikipediaBackend(Protocol):
+    """Interface of a Wikipedia page source."""
+
+    def page(self, title: str) -> tuple[str, str, str]:
+        """
+        Fetch a page by exact title.
+
+        Args:
+            title: The page title
+
+        Returns:
+            The resolved title, URL and plain-text content of the page
+
+        Raises:
+            wikipedia.exceptions.PageError: If no page has this title
+        """
+        ...
+
+    def search(self, query: str, results: int = 10) -> list[str]:
+        """
+        Search for pages matching a query.
+
+        Args:
+            query: The search query
+            results: Maximum number of titles to return
+
+        Returns:
+            Matching page titles, best match first
+        """
+        ...
+
+
+class LiveWikipediaBackend:
+    """Backend calling the Wikipedia API; every call is a blocking network request."""
+
+    def page(self, title: str) -> tuple[str, str, str]:
+        page = wikipedia.page(title, auto_suggest=False)
+        # `content` is loaded lazily with another API request, so it is read here as well
+        return page.title, page.url, page.content
+
+    def search(self, query: str, results: int = 10) -> list[str]:
+        return wikipedia.search(query, results=results)
+
+
+class OfflineWikipediaConfig(BaseModel):
+    """
+    Configuration for the offline Wikipedia backend.
+
+    Attributes:
+        index_path: Path of the SQLite index built with `build_index`
+        base_url: Prefix used to build page URLs for articles without one (default: English Wikipedia)
+    """
+    index_path: str = "~/.mercury/wikipedia.db"
+    base_url: str = "https://en.wikipedia.org/wiki/"
+
+
+def page_url(base_url: str, title: str) -> str:
+    """Build the URL of an article from its title, the way Wikipedia does."""
+    return base_url + quote(title.replace(" ", "_"), safe="/:()_,'")
+
+
+class OfflineWikipediaBackend:
+    """
+    Backend answering title lookups and searches from a local SQLite FTS5 index.
+
+    Title lookups are case-insensitive and follow redirects; searches are ranked with BM25,
+    weighting matches in the title above matches in the body.
+    """
+
+    def __init__(self, config: OfflineWikipediaConfig) -> None:
+        path = Path(config.index_path).expanduser()
+        if not path.exists():
+            raise FileNotFoundError(f"Offline Wikipedia index not found: {path}")
+        self.config = config
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        logger.info("Using offline Wikipedia index %s", path)
+
+    def page(self, title: str) -> tuple[str, str, str]:
+        key = normalize_key(title)
+        with self._lock:
+            target = self._db.execute("SELECT target FROM redirects WHERE title_key = ?", (key, )).fetchone()
+            if target is not None:
+                key = normalize_key(target[0])
+            row = self._db.execute("SELECT title, url, content FROM pages WHERE title_key = ?", (key, )).fetchone()
+        if row is None:
+            raise wikipedia.exceptions.PageError(None, title)
+        resolved_title, url, content = row
+        return resolved_title, url or page_url(self.config.base_url, resolved_title), zlib.decompress(content).decode(
+            "utf-8")
+
+    def search(self, query: str, results: int = 10) -> list[str]:
+        tokens = _TOKEN_RE.findall(query)
+        if not tokens:
+            return []
+        terms = ['"' + token.replace('"', '""') + '"' for token in tokens]
+        titles: list[str] = []
+        # Prefer pages containing every term, then fall back to any term like a lenient search engine
+        for match in (" AND ".join(terms), " OR ".join(terms)):
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT pages.title FROM pages_fts JOIN pages ON pages.id = pages_fts.rowid "
+                    "WHERE pages_fts MATCH ? ORDER BY bm25(pages_fts, 10.0, 1.0) LIMIT ?",
+                    (match, results)).fetchall()
+            titles = [row[0] for row in rows]
+            if titles or len(terms) == 1:
+                break
+        return titles
+
+    def close(self) -> None:
+        """Close the index."""
+        with self._lock:
+            self._db.close()
+
+
+_TEMPLATE_RE = re.compile(r"\{\{[^{}]*\}\}")
+_TABLE_RE = re.compile(r"\{\|.*?\|\}", re.DOTALL)
+_REF_RE = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.DOTALL | re.IGNORECASE)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_TAG_RE = re.compile(r"</?[a-zA-Z][^>]*>")
+_FILE_LINK_RE = re.compile(r"\[\[(?:File|Image|Category):[^\[\]]*(?:\[\[[^\]]*\]\][^\[\]]*)*\]\]", re.IGNORECASE)
+_LINK_RE = re.compile(r"\[\[(?:[^|\]]*\|)?([^\]]*)\]\]")
+_EXTERNAL_LINK_RE = re.compile(r"\[https?://[^\s\]]+\s*([^\]]*)\]")
+_HEADING_RE = re.compile(r"^(=+)\s*(.*?)\s*\1\s*$", re.MULTILINE)
+_EMPHASIS_RE = re.compile(r"'{2,}")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def strip_wikitext(text: str) -> str:
+    """
+    Convert wikitext to plain text.
+
+    Uses `mwparserfromhell` when it is installed and a lightweight regular-expression
+    conversion otherwise. Headings are kept in the `== Heading ==` form of `wikipedia.page().content`.
+
+    Args:
+        text: Raw wikitext
+
+    Returns:
+        The plain-text content
+    """
+    try:
+        import mwparserfromhell
+    except ImportError:
+        mwparserfromhell = None
+    if mwparserfromhell is not None:
+        code = mwparserfromhell.parse(text)
+        # strip_code() keeps reference text and drops heading markers, so handle both first
+        for node in code.filter_tags(recursive=False, matches=lambda tag: str(tag.tag).lower() == "ref"):
+            code.remove(node)
+        for heading in code.filter_headings(recursive=False):
+            marker = "=" * heading.level
+            title = heading.title.strip_code().strip()
+            code.replace(heading, mwparserfromhell.nodes.Text(f"{marker} {title} {marker}"))
+        return _BLANK_LINES_RE.sub("\n\n", code.strip_code()).strip()
+
+    text = _COMMENT_RE.sub("", text)
+    text = _REF_RE.sub("", text)
+    previous = None
+    # Templates nest, so strip the innermost ones until nothing changes
+    while previous != text:
+        previous = text
+        text = _TEMPLATE_RE.sub("", text)
+    text = _TABLE_RE.sub("", text)
+    text = _FILE_LINK_RE.sub("", text)
+    text = _LINK_RE.sub(r"\1", text)
+    text = _EXTERNAL_LINK_RE.sub(r"\1", text)
+    text = _TAG_RE.sub("", text)
+    text = _HEADING_RE.sub(lambda m: f"{m.group(1)} {m.group(2)} {m.group(1)}", text)
+    text = _EMPHASIS_RE.sub("", text)
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def _open_dump(path: Path) -> IO[bytes]:
+    if path.suffix == ".bz2":
+        return bz2.open(path, "rb")
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return path.open("rb")
+
+
+def iter_xml_dump(path: str | Path) -> Iterator[DumpPage]:
+    """
+    Stream the articles of a MediaWiki XML export, optionally bz2 or gzip compressed.
+
+    Elements are released as soon as a page has been read, so memory stays flat regardless of the
+    dump size. Only pages of the main namespace are returned.
+
+    Args:
+        path: Path of the dump
+
+    Yields:
+        The articles and redirects of the dump
+    """
+    with _open_dump(Path(path).expanduser()) as f:
+        context = ElementTree.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        for event, elem in context:
+            if event != "end" or elem.tag.rsplit("}", 1)[-1] != "page":
+                continue
+            fields = {child.tag.rsplit("}", 1)[-1]: child for child in elem}
+            namespace = fields.get("ns")
+            if namespace is None or (namespace.text or "0").strip() == "0":
+                title = fields["title"].text or ""
+                redirect = fields.get("redirect")
+                if redirect is not None:
+                    yield DumpPage(title=title, content="", redirect=redirect.get("title"))
+                else:
+                    text = ""
+                    revision = fields.get("revision")
+                    if revision is not None:
+                        for child in revision:
+                            if child.tag.rsplit("}", 1)[-1] == "text":
+                                text = child.text or ""
+                    yield DumpPage(title=title, content=strip_wikitext(text))
+            # Drop the parsed page so the tree does not grow with the dump
+            elem.clear()
+            root.clear()
+
+
+def iter_jsonl_dump(path: str | Path) -> Iterator[DumpPage]:
+    """
+    Stream the articles of a JSONL extract such as the output of WikiExtractor.
+
+    Each line holds a "title" and a "text" (or "content") field and optionally a "url"
+    and a "redirect" target.
+
+    Args:
+        path: Path of the extract, optionally bz2 or gzip compressed
+
+    Yields:
+        The articles and redirects of the extract
+    """
+    with _open_dump(Path(path).expanduser()) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield DumpPage(title=record["title"],
+                           content=record.get("text", record.get("content", "")),
+                           url=record.get("url"),
+                           redirect=record.get("redirect"))
+
+
+def build_index(pages: Iterator[DumpPage], index_path: str | Path, batch_size: int = 1000) -> dict[str, int]:
+    """
+    Ingest dump articles into a SQLite FTS5 index used by `OfflineWikipediaBackend`.
+
+    Articles are written in transactions of `batch_size`, so at most one batch is held in memory.
+    Page content is stored zlib-compressed next to a contentless full-text index over title and body.
+
+    Args:
+        pages: Articles, e.g. from `iter_xml_dump` or `iter_jsonl_dump`
+        index_path: Path of the index to create; an existing index is replaced
+        batch_size: Number of articles written per transaction
+
+    Returns:
+        Counts of indexed pages and redirects
+    """
+    path = Path(index_path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+
+    counts = {"pages": 0, "redirects": 0}
+    db = sqlite3.connect(str(path))
+    try:
+        db.executescript("""
+            CREATE TABLE pages (id INTEGER PRIMARY KEY, title TEXT NOT NULL, title_key TEXT NOT NULL UNIQUE,
+                                url TEXT, content BLOB NOT NULL);
+            CREATE TABLE redirects (title_key TEXT PRIMARY KEY, target TEXT NOT NULL);
+            CREATE VIRTUAL TABLE pages_fts USING fts5(title, content, content='');
+        """)
+        batch: list[DumpPage] = []
+
+        def _flush() -> None:
+            with db:
+                for page in batch:
+                    if page.redirect:
+                        db.execute("INSERT OR REPLACE INTO redirects (title_key, target) VALUES (?, ?)",
+                                   (normalize_key(page.title), page.redirect))
+                        counts["redirects"] += 1
+                        continue
+                    cursor = db.execute(
+                        "INSERT OR IGNORE INTO pages (title, title_key, url, content) VALUES (?, ?, ?, ?)",
+                        (page.title, normalize_key(page.title), page.url, zlib.compress(page.content.encode("utf-8"))))
+                    if cursor.rowcount:
+                        db.execute("INSERT INTO pages_fts (rowid, title, content) VALUES (?, ?, ?)",
+                                   (cursor.lastrowid, page.title, page.content))
+                        counts["pages"] += 1
+            batch.clear()
+
+        for page in pages:
+            batch.append(page)
+            if len(batch) >= batch_size:
+                _flush()
+                logger.info("Indexed %d pages and %d redirects", counts["pages"], counts["redirects"])
+        _flush()
+
+        db.execute("INSERT INTO pages_fts (pages_fts) VALUES ('optimize')")
+        db.commit()
+    finally:
+        db.close()
+    return counts
+
+
+def main() -> None:
+    """Command line entry point for building an offline Wikipedia index."""
+    parser = argparse.ArgumentParser(description="Build the offline Wikipedia index used by the research tool.",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--dump", required=True, type=Path,
+                        help="MediaWiki XML export or JSONL extract, optionally .bz2 or .gz compressed.")
+    parser.add_argument("--index", required=True, type=Path, help="Path of the SQLite index to create.")
+    parser.add_argument("--format", choices=["auto", "xml", "jsonl"], default="auto", help="Dump format.")
+    parser.add_argument("--batch_size", type=int, default=1000, help="Articles written per transaction.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    dump_format = args.format
+    if dump_format == "auto":
+        suffixes = [s for s in args.dump.suffixes if s not in (".bz2", ".gz")]
+        dump_format = "xml" if suffixes and suffixes[-1] == ".xml" else "jsonl"
+    pages = iter_xml_dump(args.dump) if dump_format == "xml" else iter_jsonl_dump(args.dump)
+
+    start = time.perf_counter()
+    counts = build_index(pages, args.index, batch_size=args.batch_size)
+    print(json.dumps({**counts, "elapsed_s": round(time.perf_counter() - start, 1)}))
+
+
+if __name__ == "__main__":
+    main()
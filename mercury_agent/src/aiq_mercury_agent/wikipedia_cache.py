@@ -0,0 +1,245 @@
+"""
+This module implements a two-level cache for Wikipedia pages fetched by the research tool.
+Popular topics are requested again and again across users, so resolved pages are kept locally
+instead of being fetched from the Wikipedia API on every query.
+
+Key Components:
+1. WikipediaCacheConfig: Configuration for cache size, expiry and optional persistence
+2. CachedPage: A cached lookup result, either a page or a negative (not found) entry
+3. WikipediaPageCache: In-process LRU with TTL, backed by an optional SQLite store
+4. normalize_key: Normalization applied to topics and titles before they are used as keys
+
+Cache levels:
+- Memory: an LRU of at most `max_entries` lookups, each valid for `ttl` seconds
+- Disk: an optional SQLite database holding zlib-compressed page content and URLs that survives restarts
+
+Lookups that find no page are cached in memory for `negative_ttl` seconds so repeated misses do
+not hit the API either. Async callers use `aget` and `aput`, which run the disk tier's SQLite
+queries and zlib (de)compression in a worker thread instead of on the event loop.
+"""
+
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class WikipediaCacheConfig(BaseModel):
+    """
+    Configuration for the Wikipedia page cache.
+
+    Attributes:
+        enabled: Whether lookups are cached at all (default: True)
+        max_entries: Maximum number of lookups kept in memory (default: 512)
+        ttl: Seconds a cached page stays valid (default: 86400)
+        negative_ttl: Seconds a lookup that found no page stays cached (default: 300)
+        persist_path: Optional path of a SQLite database holding compressed pages across restarts
+    """
+    enabled: bool = True
+    max_entries: int = 512
+    ttl: float = 86400.0
+    negative_ttl: float = 300.0
+    persist_path: str | None = None
+
+
+@dataclass
+class CachedPage:
+    """
+    A cached lookup result.
+
+    Attributes:
+        url: URL of the page, or `None` for a negative entry
+        content: Plain-text content of the page (empty for a negative entry)
+        expires: Wall-clock time after which the entry is stale
+    """
+    url: str | None
+    content: str
+    expires: float
+
+    @property
+    def found(self) -> bool:
+        return self.url is not None
+
+
+def normalize_key(text: str) -> str:
+    """Normalize a topic or page title so trivially different spellings share a cache entry."""
+    return " ".join(text.casefold().split())
+
+
+class WikipediaPageCache:
+    """
+    Two-level cache of Wikipedia lookups keyed by normalized topic and resolved page title.
+
+    The counters are cumulative over the lifetime of the cache: `hits` counts lookups answered
+    with a page (`disk_hits` of them from SQLite), `negative_hits` lookups answered with a cached
+    "not found" and `misses` lookups that have to go to Wikipedia. `stats` returns them as a dictionary.
+
+    The memory tier and the disk tier have separate locks, so a slow disk read or commit in a worker
+    thread never holds up memory lookups made on the event loop.
+    """
+
+    def __init__(self, config: WikipediaCacheConfig) -> None:
+        self.config = config
+        self._entries: OrderedDict[str, CachedPage] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+        if config.persist_path:
+            path = Path(config.persist_path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS pages "
+                             "(key TEXT PRIMARY KEY, url TEXT NOT NULL, content BLOB NOT NULL, expires REAL NOT NULL)")
+            self._db.execute("DELETE FROM pages WHERE expires < ?", (time.time(), ))
+            self._db.commit()
+            logger.info("Persisting Wikipedia pages to %s", path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CachedPage | None:
+        """
+        Look up a normalized topic or title.
+
+        Args:
+            key: The key, as returned by `normalize_key`
+
+        Returns:
+            The cached entry (check `found` for negative entries), or `None` on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires < now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        from_disk = False
+        if entry is None:
+            entry = self._load(key, now)
+            from_disk = entry is not None
+
+        with self._lock:
+            if from_disk:
+                self.disk_hits += 1
+                self._remember(key, entry)
+            if entry is None:
+                self.misses += 1
+            elif entry.found:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+        return entry
+
+    async def aget(self, key: str) -> CachedPage | None:
+        """Like `get`, but a lookup that may read the disk tier runs in a worker thread."""
+        if self._db is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    def put(self, keys: Iterable[str], url: str, content: str) -> None:
+        """
+        Cache a resolved page under every key that leads to it.
+
+        Args:
+            keys: Normalized keys, typically the topic and the resolved page title
+            url: URL of the page
+            content: Plain-text content of the page
+        """
+        entry = CachedPage(url=url, content=content, expires=time.time() + self.config.ttl)
+        keys = set(keys)
+        with self._lock:
+            for key in keys:
+                self._remember(key, entry)
+        if self._db is not None:
+            blob = zlib.compress(content.encode("utf-8"))
+            with self._db_lock:
+                if self._db is not None:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO pages (key, url, content, expires) VALUES (?, ?, ?, ?)",
+                        [(key, url, blob, entry.expires) for key in keys])
+                    self._db.commit()
+
+    async def aput(self, keys: Iterable[str], url: str, content: str) -> None:
+        """Like `put`, but the disk tier's compression and commit run in a worker thread."""
+        if self._db is None:
+            self.put(keys, url, content)
+        else:
+            await asyncio.to_thread(self.put, list(keys), url, content)
+
+    def put_negative(self, key: str) -> None:
+        """
+        Remember briefly that a topic has no matching page.
+
+        Args:
+            key: The normalized topic
+        """
+        with self._lock:
+            self._remember(key, CachedPage(url=None, content="", expires=time.time() + self.config.negative_ttl))
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache counters and the number of entries held in memory."""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+        }
+
+    def close(self) -> None:
+        """Close the persistence database, if any."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, entry: CachedPage) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str, now: float) -> CachedPage | None:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT url, content, expires FROM pages WHERE key = ? AND expires >= ?",
+                                   (key, now)).fetchone()
+        if row is None:
+            return None
+        return CachedPage(url=row[0], content=zlib.decompress(row[1]).decode("utf-8"), expires=row[2])
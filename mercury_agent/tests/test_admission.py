@@ -0,0 +1,187 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import time
+
+import pytest
+
+from aiq_mercury_agent.admission import PRIORITY_HIGH
+from aiq_mercury_agent.admission import PRIORITY_NORMAL
+from aiq_mercury_agent.admission import AdmissionConfig
+from aiq_mercury_agent.admission import AdmissionRejected
+from aiq_mercury_agent.admission import BackendLimitConfig
+from aiq_mercury_agent.admission import BackendLimiter
+from aiq_mercury_agent.admission import admission_slot
+from aiq_mercury_agent.admission import admission_stats
+from aiq_mercury_agent.admission import configure_admission
+
+
+async def _hold(limiter: BackendLimiter, seconds: float, order: list | None = None, label=None, priority=PRIORITY_NORMAL):
+    async with limiter.slot(priority):
+        if order is not None:
+            order.append(label)
+        await asyncio.sleep(seconds)
+
+
+def test_concurrency_is_bounded():
+    limiter = BackendLimiter("llm", BackendLimitConfig(max_concurrency=2))
+
+    async def _main():
+        peak = 0
+
+        async def _call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[_call() for _ in range(6)])
+        return peak
+
+    assert asyncio.run(_main()) == 2
+    assert limiter.stats()["admitted"] == 6
+
+
+def test_full_queue_rejects_immediately():
+    limiter = BackendLimiter("rag", BackendLimitConfig(max_concurrency=1, max_queue=1))
+
+    async def _main():
+        busy = asyncio.create_task(_hold(limiter, 0.2))
+        queued = asyncio.create_task(_hold(limiter, 0.0))
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        with pytest.raises(AdmissionRejected):
+            await _hold(limiter, 0.0)
+        rejected_after = time.perf_counter() - start
+        await asyncio.gather(busy, queued)
+        return rejected_after
+
+    assert asyncio.run(_main()) < 0.05
+    assert limiter.rejected == 1
+
+
+def test_queue_timeout_rejects():
+    limiter = BackendLimiter("wikipedia", BackendLimitConfig(max_concurrency=1, queue_timeout=0.05))
+
+    async def _main():
+        busy = asyncio.create_task(_hold(limiter, 0.3))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected):
+            await _hold(limiter, 0.0)
+        await busy
+        # The timed-out waiter must not leak its slot
+        await asyncio.wait_for(_hold(limiter, 0.0), timeout=0.1)
+
+    asyncio.run(_main())
+
+
+def test_high_priority_overtakes_queued_calls():
+    limiter = BackendLimiter("llm", BackendLimitConfig(max_concurrency=1))
+
+    async def _main():
+        order = []
+        busy = asyncio.create_task(_hold(limiter, 0.05, order, "busy"))
+        await asyncio.sleep(0.01)
+        research = [asyncio.create_task(_hold(limiter, 0.0, order, f"research{i}")) for i in range(2)]
+        await asyncio.sleep(0.01)
+        chitchat = asyncio.create_task(_hold(limiter, 0.0, order, "chitchat", priority=PRIORITY_HIGH))
+        await asyncio.gather(busy, chitchat, *research)
+        return order
+
+    assert asyncio.run(_main()) == ["busy", "chitchat", "research0", "research1"]
+
+
+def test_rate_limit_spaces_calls():
+    limiter = BackendLimiter("wikipedia", BackendLimitConfig(rate=20, burst=1))
+
+    async def _main():
+        start = time.perf_counter()
+        await asyncio.gather(*[_hold(limiter, 0.0) for _ in range(4)])
+        return time.perf_counter() - start
+
+    # One call passes immediately, the other three wait 50 ms each
+    assert asyncio.run(_main()) >= 0.14
+    assert limiter.stats()["queue_wait_ms"]["max"] >= 140
+
+
+def test_rate_limit_alone_applies_the_queue_limit():
+    limiter = BackendLimiter("wikipedia", BackendLimitConfig(rate=2, burst=1, max_queue=0))
+
+    async def _main():
+        start = time.perf_counter()
+        async with limiter.slot():
+            with pytest.raises(AdmissionRejected, match="queued"):
+                await _hold(limiter, 0.0)
+        return time.perf_counter() - start
+
+    # The second call would wait 0.5 s for a token, so with no queue it is rejected without waiting
+    assert asyncio.run(_main()) < 0.05
+    assert limiter.rejected == 1
+
+
+def test_rejected_rate_limited_calls_return_their_tokens():
+    limiter = BackendLimiter("llm", BackendLimitConfig(rate=10, burst=1, queue_timeout=0.15))
+
+    async def _main():
+        await _hold(limiter, 0.0)
+        # Each call reserves a token and is cancelled while waiting for it
+        for _ in range(5):
+            call = asyncio.create_task(_hold(limiter, 0.0))
+            await asyncio.sleep(0.01)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+        # Without the refunds the bucket would owe five tokens and this call would be rejected
+        start = time.perf_counter()
+        await _hold(limiter, 0.0)
+        return time.perf_counter() - start
+
+    assert asyncio.run(_main()) < 0.12
+    assert limiter.rejected == 0
+
+
+def test_delay_beyond_queue_timeout_rejects_immediately():
+    limiter = BackendLimiter("rag", BackendLimitConfig(rate=1, burst=1, queue_timeout=0.1))
+
+    async def _main():
+        await _hold(limiter, 0.0)
+        start = time.perf_counter()
+        for _ in range(3):
+            with pytest.raises(AdmissionRejected, match="rate limited"):
+                await _hold(limiter, 0.0)
+        return time.perf_counter() - start
+
+    assert asyncio.run(_main()) < 0.05
+    assert limiter.rejected == 3
+
+
+def test_registry_limits_configured_backends_only():
+    configure_admission(AdmissionConfig(backends={"rag": BackendLimitConfig(max_concurrency=1, max_queue=0)}))
+    try:
+
+        async def _main():
+            async with admission_slot("rag"):
+                with pytest.raises(AdmissionRejected):
+                    async with admission_slot("rag"):
+                        pass
+                async with admission_slot("llm"), admission_slot("llm"):
+                    pass
+
+        asyncio.run(_main())
+        assert admission_stats()["rag"]["rejected"] == 1
+    finally:
+        configure_admission(AdmissionConfig())
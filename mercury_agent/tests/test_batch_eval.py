@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from aiq_mercury_agent.batch_eval import EvalQuery
+from aiq_mercury_agent.batch_eval import completed_ids
+from aiq_mercury_agent.batch_eval import load_eval_queries
+from aiq_mercury_agent.batch_eval import run_batch_eval
+from aiq_mercury_agent.benchmark import DEFAULT_QUERIES
+from aiq_mercury_agent.benchmark import prepare_benchmark_config
+from aiq_mercury_agent.fake_backends import BackgroundServer
+from aiq_mercury_agent.fake_backends import FakeLLMConfig
+from aiq_mercury_agent.fake_backends import FakeRAGConfig
+from aiq_mercury_agent.fake_backends import build_fake_wikipedia_index
+from aiq_mercury_agent.fake_backends import create_fake_llm_app
+from aiq_mercury_agent.fake_backends import create_fake_rag_app
+
+CONFIG_FILE = Path(__file__).resolve().parent.parent / "configs" / "config.yml"
+
+
+@pytest.fixture(scope="module")
+def fake_config(tmp_path_factory, monkeypatch_module):
+    tmp = tmp_path_factory.mktemp("batch_eval")
+    config = yaml.safe_load(CONFIG_FILE.read_text())
+    models = sorted({settings["model_name"] for settings in config["llms"].values()}
+                    | {settings["model_name"] for settings in config["embedders"].values()}
+                    | {f["llm_name"] for f in config["functions"].values() if "llm_name" in f})
+    routes = {q.query: q.route for q in DEFAULT_QUERIES}
+    topics = {q.query: q.topic for q in DEFAULT_QUERIES if q.topic}
+    build_fake_wikipedia_index(tmp / "wikipedia.db", sorted(set(topics.values())), 5)
+    fast_llm = FakeLLMConfig(first_token_latency=0.005, tokens_per_second=2000, completion_tokens=16)
+    fast_rag = FakeRAGConfig(first_token_latency=0.005, tokens_per_second=2000, completion_tokens=16)
+    llm_app = create_fake_llm_app(fast_llm, routes=routes, topics=topics, models=models)
+    monkeypatch_module.setenv("NVIDIA_API_KEY", "batch-eval")
+    with BackgroundServer(llm_app) as llm, BackgroundServer(create_fake_rag_app(fast_rag)) as rag:
+        config_file = tmp / "config.yml"
+        config_file.write_text(yaml.safe_dump(prepare_benchmark_config(config, llm.url, rag.url,
+                                                                       tmp / "wikipedia.db")))
+        yield config_file
+
+
+@pytest.fixture(scope="module")
+def monkeypatch_module():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        yield monkeypatch
+
+
+def _queries() -> list[EvalQuery]:
+    return [EvalQuery(f"q{i}", q.query, q.route) for i, q in enumerate(DEFAULT_QUERIES)]
+
+
+def test_load_jsonl_and_csv(tmp_path):
+    jsonl = tmp_path / "queries.jsonl"
+    jsonl.write_text('{"query": "hi", "label": "general"}\n\n{"id": "x", "query": "what is SPH?"}\n')
+    assert load_eval_queries(jsonl) == [EvalQuery("1", "hi", "General"), EvalQuery("x", "what is SPH?")]
+
+    csv_file = tmp_path / "queries.csv"
+    csv_file.write_text('id,query,label\na,"Who was Marie Curie, really?",research\nb,hello,\n')
+    assert load_eval_queries(csv_file) == [
+        EvalQuery("a", "Who was Marie Curie, really?", "Research"),
+        EvalQuery("b", "hello"),
+    ]
+
+    csv_file.write_text("id,query\na,hi\na,hello\n")
+    with pytest.raises(ValueError, match="Duplicate"):
+        load_eval_queries(csv_file)
+
+
+def test_completed_ids_ignore_truncated_lines(tmp_path):
+    output = tmp_path / "results.jsonl"
+    assert completed_ids(output) == set()
+    output.write_text('{"id": "a", "error": null}\n{"id": "b", "error": "Error querying RAG server"}\n{"id": "c", "ans')
+    assert completed_ids(output) == {"a", "b"}
+    assert completed_ids(output, retry_errors=True) == {"a"}
+
+
+def test_batch_eval_records_routes_and_stages(fake_config, tmp_path):
+    output = tmp_path / "results.jsonl"
+    summary = asyncio.run(run_batch_eval(fake_config, _queries(), output, concurrency=3))
+    assert summary["run"] == len(DEFAULT_QUERIES)
+    assert summary["errors"] == 0
+    assert summary["route_accuracy"] == 1.0
+
+    records = {r["id"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert set(records) == {q.id for q in _queries()}
+    research = records["q0"]
+    assert research["route"] == "Research"
+    assert research["answer"]
+    assert {"supervisor", "worker", "wikipedia_fetch", "summary"} <= set(research["stages"])
+    assert research["stages"]["worker"] <= research["latency_ms"]
+    assert "rag_generate" in records["q3"]["stages"]
+    assert "chitchat" in records["q5"]["stages"]
+
+
+def test_batch_eval_resumes(fake_config, tmp_path):
+    output = tmp_path / "results.jsonl"
+    queries = _queries()
+    # An interrupted run that completed two queries and was cut off while writing a third
+    output.write_text(json.dumps({"id": "q0", "error": None, "latency_ms": 1.0}) + "\n"
+                      + json.dumps({"id": "q1", "error": "Error: boom", "latency_ms": 1.0}) + "\n" + '{"id": "q2"')
+    summary = asyncio.run(run_batch_eval(fake_config, queries, output, concurrency=2))
+    assert summary["skipped"] == 2
+    assert summary["run"] == len(queries) - 2
+
+    summary = asyncio.run(run_batch_eval(fake_config, queries, output, concurrency=2, retry_errors=True))
+    assert summary["run"] == 1
+    assert summary["errors"] == 0
+    assert summary["queries"] == len(queries)
@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import yaml
+
+from aiq_mercury_agent.benchmark import DEFAULT_QUERIES
+from aiq_mercury_agent.benchmark import prepare_benchmark_config
+from aiq_mercury_agent.benchmark import run_benchmark
+from aiq_mercury_agent.benchmark import summarize
+from aiq_mercury_agent.fake_backends import FakeLLMConfig
+from aiq_mercury_agent.fake_backends import FakeRAGConfig
+from aiq_mercury_agent.fake_backends import create_fake_llm_app
+from aiq_mercury_agent.query_router import ROUTER_PROMPT
+
+CONFIG_FILE = Path(__file__).resolve().parent.parent / "configs" / "config.yml"
+
+_FAST_LLM = FakeLLMConfig(first_token_latency=0.005, tokens_per_second=2000, completion_tokens=16)
+_FAST_RAG = FakeRAGConfig(first_token_latency=0.005, tokens_per_second=2000, completion_tokens=16, search_latency=0.005)
+
+
+def _chat(app, body: dict) -> httpx.Response:
+
+    async def _main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://llm.test") as client:
+            return await client.post("/v1/chat/completions", json=body)
+
+    return asyncio.run(_main())
+
+
+def test_fake_llm_answers_workflow_prompts():
+    app = create_fake_llm_app(_FAST_LLM, routes={"hi there": "General"}, topics={"Who was Curie?": "Marie Curie"})
+
+    route = _chat(app, {"messages": [{"role": "user", "content": ROUTER_PROMPT.format(input="hi there")}]})
+    assert route.json()["choices"][0]["message"]["content"] == "General"
+
+    topic_prompt = "Extract the main subject.\n    Query: Who was Curie?\n    Main subject:"
+    topic = _chat(app, {
+        "messages": [{"role": "user", "content": topic_prompt}],
+        "nvext": {"guided_json": {"properties": {"topic": {"type": "string"}}}}
+    })
+    assert json.loads(topic.json()["choices"][0]["message"]["content"]) == {"topic": "Marie Curie"}
+
+    stream = _chat(app, {"messages": [{"role": "user", "content": "Summarize this"}], "stream": True})
+    events = [line[6:] for line in stream.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    text = "".join(json.loads(e)["choices"][0]["delta"].get("content", "") for e in events[:-1])
+    assert len(text.split()) == _FAST_LLM.completion_tokens
+
+
+def test_prepare_benchmark_config_points_at_fakes():
+    config = {
+        "functions": {
+            "internet_search": {"_type": "tavily_internet_search"},
+            "rag": {"_type": "nvbp_rag", "base_url": "http://real/v1"},
+            "wiki": {"_type": "langchain_researcher_tool", "backend": "live"},
+            "chat": {"_type": "haystack_chitchat_agent"},
+        },
+        "llms": {"nim_llm": {"_type": "nim", "model_name": "m"}},
+        "workflow": {"rag_tool": "rag", "research_tool": "wiki", "chitchat_agent": "chat"},
+    }
+    prepared = prepare_benchmark_config(config, "http://llm", "http://rag", "/tmp/index.db")
+    assert set(prepared["functions"]) == {"rag", "wiki", "chat"}
+    assert prepared["functions"]["rag"]["base_url"] == "http://rag/v1"
+    assert prepared["functions"]["wiki"]["backend"] == "offline"
+    assert prepared["functions"]["wiki"]["offline"]["index_path"] == "/tmp/index.db"
+    assert prepared["functions"]["chat"]["api_url"] == "http://llm/v1"
+    assert prepared["llms"]["nim_llm"]["base_url"] == "http://llm/v1"
+    assert config["functions"]["rag"]["base_url"] == "http://real/v1"
+
+
+def test_summarize_per_route():
+    results = [{"route": "Research", "latency_ms": float(i), "ttft_ms": i / 2, "error": None} for i in range(1, 101)]
+    results.append({"route": "Retrieve", "latency_ms": 5.0, "ttft_ms": None, "error": "Error querying RAG server"})
+    summary = summarize(results, elapsed=10.0, concurrency=4)
+    assert summary["requests"] == 101 and summary["errors"] == 1
+    assert summary["throughput_rps"] == 10.0
+    research = summary["routes"]["Research"]
+    assert research["latency_ms"]["p50"] == 51.0
+    assert research["latency_ms"]["p99"] == 99.0
+    assert research["ttft_ms"]["p95"] == 47.5
+    assert summary["routes"]["Retrieve"] == {
+        "requests": 1,
+        "errors": 1,
+        "throughput_rps": 0.0,
+        "latency_ms": {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0},
+        "ttft_ms": {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0},
+    }
+
+
+def test_workflow_benchmark_against_fakes():
+    summary = asyncio.run(run_benchmark(CONFIG_FILE, requests=14, concurrency=4, llm=_FAST_LLM, rag=_FAST_RAG))
+    assert summary["requests"] == 14
+    assert summary["errors"] == 0
+    assert set(summary["routes"]) == {"Research", "Retrieve", "General"}
+    for route in summary["routes"].values():
+        assert 0 < route["ttft_ms"]["p50"] <= route["latency_ms"]["p50"]
+    assert summary["backend_requests"]["rag"] == summary["routes"]["Retrieve"]["requests"]
+
+
+def test_rag_search_mode_benchmark(tmp_path):
+    config = yaml.safe_load(CONFIG_FILE.read_text())
+    config["functions"]["nvbp_rag"].update(mode="search", citations=True)
+    config_file = tmp_path / "config.yml"
+    config_file.write_text(yaml.safe_dump(config))
+
+    retrieve = [q for q in DEFAULT_QUERIES if q.route == "Retrieve"]
+    summary = asyncio.run(run_benchmark(config_file, queries=retrieve, requests=4, concurrency=2, llm=_FAST_LLM,
+                                        rag=_FAST_RAG))
+    assert summary["errors"] == 0
+    # One retrieval per query and no server-side generation
+    assert summary["backend_requests"]["rag"] == 4
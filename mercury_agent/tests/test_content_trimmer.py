@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+
+import pytest
+
+from aiq_mercury_agent.content_trimmer import ContentTrimmer
+from aiq_mercury_agent.content_trimmer import TrimmingConfig
+from aiq_mercury_agent.content_trimmer import bm25_scores
+from aiq_mercury_agent.content_trimmer import split_passages
+from aiq_mercury_agent.session_store import estimate_tokens
+
+LEAD = "The Eiffel Tower is a wrought-iron lattice tower on the Champ de Mars in Paris, France."
+ARTICLE = "\n".join([
+    LEAD,
+    "== History ==",
+    *["The tower was built for the 1889 World's Fair by the company of Gustave Eiffel. " * 3] * 4,
+    "== Design ==",
+    *["The structure is made of puddled iron and weighs about seven thousand tonnes. " * 3] * 4,
+    "== Tourism ==",
+    *["Millions of visitors ride the elevators to the observation decks every year. " * 3] * 4,
+])
+
+
+class _FakeEmbedder:
+    """Embeds texts by counting a few keywords."""
+    KEYWORDS = ("iron", "visitors", "fair")
+
+    def _embed(self, text: str) -> list[float]:
+        return [float(text.lower().count(k)) for k in self.KEYWORDS]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(t) for t in texts]
+
+
+def test_split_passages_respects_size_and_headings():
+    passages = split_passages(ARTICLE, max_tokens=80)
+    assert passages[0] == LEAD
+    assert all(estimate_tokens(p) <= 80 + 5 for p in passages)
+    assert all(p.startswith("== ") for p in passages[1:])
+
+
+def test_bm25_prefers_matching_passage():
+    scores = bm25_scores("how much does the iron weigh", ["a tower in paris", "iron weighs tonnes", "visitors"])
+    assert scores.index(max(scores)) == 1
+
+
+def test_short_content_is_unchanged():
+    trimmer = ContentTrimmer(TrimmingConfig(token_budget=10_000))
+    assert asyncio.run(trimmer.trim("anything", ARTICLE)) == ARTICLE
+
+
+@pytest.mark.parametrize("method", ["bm25", "embedding", "hybrid"])
+def test_trim_keeps_relevant_passages_within_budget(method):
+    config = TrimmingConfig(token_budget=150,
+                            passage_tokens=60,
+                            method=method,
+                            embedder_name=None if method == "bm25" else "nim_embedder")
+    trimmer = ContentTrimmer(config, embedder=None if method == "bm25" else _FakeEmbedder())
+    trimmed = asyncio.run(trimmer.trim("How many visitors ride the elevators?", ARTICLE))
+    assert estimate_tokens(trimmed) <= 150
+    assert trimmed.startswith(LEAD)
+    assert "visitors" in trimmed
+    assert "puddled iron" not in trimmed
+
+
+def test_embedding_method_requires_embedder():
+    with pytest.raises(ValueError):
+        ContentTrimmer(TrimmingConfig(method="embedding", embedder_name="nim_embedder"))
+
+
+@pytest.mark.parametrize("method", ["embedding", "hybrid"])
+def test_embedding_methods_require_embedder_name_in_config(method):
+    with pytest.raises(ValueError, match="requires embedder_name"):
+        TrimmingConfig(method=method)
+    assert TrimmingConfig(method=method, enabled=False).embedder_name is None
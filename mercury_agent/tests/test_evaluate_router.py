@@ -0,0 +1,54 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+from aiq_mercury_agent.evaluate_router import evaluate
+from aiq_mercury_agent.evaluate_router import summarize
+from aiq_mercury_agent.query_router import GENERAL
+from aiq_mercury_agent.query_router import RESEARCH
+from aiq_mercury_agent.query_router import RETRIEVE
+from aiq_mercury_agent.query_router import RouterConfig
+from aiq_mercury_agent.query_router import TieredQueryRouter
+
+RECORDS = [
+    {"query": "hi", "label": GENERAL},
+    {"query": "use RAG to explain kernels", "label": RETRIEVE},
+    {"query": "look it up on wikipedia: the eiffel tower", "label": GENERAL},
+    {"query": "What is the meaning of life", "label": RESEARCH},
+]
+
+
+def test_queries_left_to_a_skipped_llm_are_not_scored():
+    results = asyncio.run(evaluate(RECORDS, TieredQueryRouter(RouterConfig()), None))
+    assert [r["tiered_route"] for r in results] == [GENERAL, RETRIEVE, RESEARCH, None]
+    summary = summarize(results)
+    assert summary["undecided"] == 1
+    assert summary["tiered_accuracy"] == 2 / 3
+    assert summary["tiers"]["rules"]["accuracy"] == 2 / 3
+    assert summary["tiers"]["llm"] == {**summary["tiers"]["llm"], "coverage": 0.25, "accuracy": None}
+    assert "llm_accuracy" not in summary
+
+
+def test_llm_tier_is_scored_when_the_llm_runs():
+
+    async def _llm(query: str) -> str:
+        return "Research"
+
+    results = asyncio.run(evaluate(RECORDS, TieredQueryRouter(RouterConfig()), _llm))
+    summary = summarize(results)
+    assert summary["undecided"] == 0
+    assert summary["tiers"]["llm"]["accuracy"] == 1.0
+    assert summary["llm_accuracy"] == 0.25
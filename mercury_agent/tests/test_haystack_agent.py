@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from aiq_mercury_agent import haystack_agent
+from aiq_mercury_agent.haystack_agent import HaystackChitchatConfig
+from aiq_mercury_agent.haystack_agent import build_chat_client
+
+LATENCY = 0.2
+
+
+async def _slow_completions(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(LATENCY)
+    body = json.loads(request.content)
+    if body["stream"]:
+        events = [f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}\n\n" for c in ("Salve", "!")]
+        return httpx.Response(200, content="".join(events + ["data: [DONE]\n\n"]).encode())
+    return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": "Salve!"}}]})
+
+
+def _use_transport(monkeypatch) -> None:
+    def _build(tool_config, transport=None):
+        return build_chat_client(tool_config, transport=httpx.MockTransport(_slow_completions))
+
+    monkeypatch.setattr(haystack_agent, "build_chat_client", _build)
+
+
+async def _run_parallel(n: int) -> tuple[list[str], list[list[str]], float]:
+    config = HaystackChitchatConfig(llm_name="test-model")
+    async with haystack_agent.haystack_chitchat_agent_as_tool(config, None) as info:
+        start = time.perf_counter()
+        answers = await asyncio.gather(*[info.single_fn(f"hello {i}") for i in range(n)])
+
+        async def _collect(i: int) -> list[str]:
+            return [chunk async for chunk in info.stream_fn(f"hello {i}")]
+
+        streams = await asyncio.gather(*[_collect(i) for i in range(n)])
+        return list(answers), list(streams), time.perf_counter() - start
+
+
+def test_parallel_calls_overlap(monkeypatch):
+    _use_transport(monkeypatch)
+    n = 8
+    answers, streams, elapsed = asyncio.run(_run_parallel(n))
+    assert answers == ["Salve!"] * n
+    assert streams == [["Salve", "!"]] * n
+    # Two rounds of n calls; serialized execution would take 2 * n * LATENCY
+    assert elapsed < 4 * LATENCY
+
+
+def test_event_loop_stays_responsive(monkeypatch):
+    _use_transport(monkeypatch)
+
+    async def _main() -> int:
+        ticks = 0
+
+        async def _ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(_ticker())
+        await _run_parallel(2)
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(_main()) >= LATENCY / 0.01
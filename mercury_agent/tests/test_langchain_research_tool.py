@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+import wikipedia
+
+from aiq_mercury_agent import langchain_research_tool as research_module
+from aiq_mercury_agent.langchain_research_tool import LangChainResearchConfig
+from aiq_mercury_agent.langchain_research_tool import WikipediaPageNotFound
+from aiq_mercury_agent.stats import runtime_stats
+from aiq_mercury_agent.wikipedia_cache import WikipediaCacheConfig
+from aiq_mercury_agent.wikipedia_cache import WikipediaPageCache
+
+URL = "https://en.wikipedia.org/wiki/Eiffel_Tower"
+
+
+class _TopicLLM:
+
+    def with_structured_output(self, schema):
+        self.schema = schema
+        return self
+
+    async def ainvoke(self, prompt):
+        return self.schema(topic="Eiffel tower")
+
+
+class _Builder:
+
+    async def get_llm(self, llm_name, wrapper_type):
+        return _TopicLLM()
+
+
+class _Backend:
+    """Backend without a page titled like the topic, whose search results come from `search_results`."""
+
+    search_results: list = []
+
+    def page(self, title):
+        if title != "Eiffel Tower":
+            raise wikipedia.exceptions.PageError(title)
+        return "Eiffel Tower", URL, "The Eiffel Tower is in Paris."
+
+    def search(self, query, results=10):
+        result = _Backend.search_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _run(monkeypatch, queries: list[str], stats: dict | None = None) -> list[str | Exception]:
+    monkeypatch.setenv("NVIDIA_API_KEY", "test")
+    monkeypatch.setattr(research_module, "LiveWikipediaBackend", _Backend)
+
+    async def _main():
+        outputs = []
+        async with research_module.langchain_research(LangChainResearchConfig(llm_name="nim_llm"), _Builder()) as info:
+            for query in queries:
+                try:
+                    outputs.append(await info.single_fn(query))
+                except Exception as e:
+                    outputs.append(e)
+            if stats is not None:
+                stats.update(runtime_stats())
+        return outputs
+
+    return asyncio.run(_main())
+
+
+def test_page_is_found_through_search_and_cached(monkeypatch):
+    _Backend.search_results = [["Eiffel Tower"]]
+    stats = {}
+    first, second = _run(monkeypatch, ["Where is the Eiffel tower?"] * 2, stats)
+    assert first == second == f"The Eiffel Tower is in Paris.\n\nSource: {URL}"
+    assert _Backend.search_results == []
+    # The hit/miss counters are published while the tool is loaded
+    assert stats["wikipedia_cache"]["hits"] == 1
+    assert "wikipedia_cache" not in runtime_stats()
+
+
+def test_empty_search_is_cached_as_no_page(monkeypatch):
+    _Backend.search_results = [[]]
+    first, second = _run(monkeypatch, ["Where is the Eiffel tower?"] * 2)
+    assert isinstance(first, WikipediaPageNotFound)
+    assert isinstance(second, WikipediaPageNotFound)
+
+
+def test_search_failure_is_raised_and_not_cached(monkeypatch):
+    _Backend.search_results = [ConnectionError("connection reset"), ["Eiffel Tower"]]
+    first, second = _run(monkeypatch, ["Where is the Eiffel tower?"] * 2)
+    assert isinstance(first, ConnectionError)
+    assert second == f"The Eiffel Tower is in Paris.\n\nSource: {URL}"
+
+
+def test_disk_tier_is_used_from_async_code(tmp_path):
+    config = WikipediaCacheConfig(persist_path=str(tmp_path / "pages.db"))
+
+    async def _main():
+        cache = WikipediaPageCache(config)
+        await cache.aput(["eiffel tower"], URL, "content")
+        cache.close()
+        cache = WikipediaPageCache(config)
+        try:
+            return await cache.aget("eiffel tower"), cache.stats()["disk_hits"]
+        finally:
+            cache.close()
+
+    entry, disk_hits = asyncio.run(_main())
+    assert entry.found and entry.content == "content"
+    assert disk_hits == 1
@@ -13,32 +13,145 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import importlib
-import importlib.resources
-import inspect
+import asyncio
 import logging
+import os
 from pathlib import Path
 
 import pytest
-from aiq_mercury_agent.register import MultiFrameworksWorkflowConfig
+import yaml
+from aiq_mercury_agent.admission import AdmissionConfig
+from aiq_mercury_agent.admission import AdmissionRejected
+from aiq_mercury_agent.admission import admission_slot
+from aiq_mercury_agent.admission import configure_admission
+from aiq_mercury_agent.benchmark import BenchmarkQuery
+from aiq_mercury_agent.benchmark import fake_workflow
+from aiq_mercury_agent.fake_backends import FakeLLMConfig
+from aiq_mercury_agent.fake_backends import FakeRAGConfig
+from aiq_mercury_agent.fake_backends import generate_tokens
+from aiq_mercury_agent.nvbp_rag_tool import RAGServerError
+from aiq_mercury_agent.query_router import RESEARCH
+from aiq_mercury_agent.query_router import RETRIEVE
+from aiq_mercury_agent.register import MercuryAgentWorkflowConfig  # noqa: F401, pylint: disable=unused-import
+from aiq_mercury_agent.session_store import session_scope
+from aiq_mercury_agent.stats import runtime_stats
 
 from aiq.runtime.loader import load_workflow
 
 logger = logging.getLogger(__name__)
 
+CONFIG_FILE = Path(__file__).resolve().parent.parent / "configs" / "config.yml"
 
-@pytest.mark.e2e
-async def test_full_workflow():
+_FAST_LLM = FakeLLMConfig(first_token_latency=0.005, tokens_per_second=2000, completion_tokens=16)
+_FAST_RAG = FakeRAGConfig(first_token_latency=0.005, tokens_per_second=2000, completion_tokens=16, search_latency=0.005)
+
+_FOUND = BenchmarkQuery("Tell me about the planet Jupiter", RESEARCH, "Jupiter")
+_NOT_FOUND = BenchmarkQuery("Zorblax Quintessor", RESEARCH)
+_RETRIEVE = BenchmarkQuery("How are kernels chosen in SPH simulations?", RETRIEVE)
+
+
+def _config_file(tmp_path: Path, **workflow_settings) -> Path:
+    config = yaml.safe_load(CONFIG_FILE.read_text())
+    config["workflow"].update(workflow_settings)
+    config_file = tmp_path / "config.yml"
+    config_file.write_text(yaml.safe_dump(config))
+    return config_file
+
+
+async def _ask(workflow, query: str, session_id: str) -> str:
+    with session_scope(session_id):
+        async with workflow.run(query) as runner:
+            return await runner.result(to_type=str)
+
+
+def test_only_successful_answers_are_cached(tmp_path):
+    config_file = _config_file(tmp_path, response_cache={"enabled": True})
+    rag = _FAST_RAG.model_copy(update={"fail_after_tokens": 4})
+
+    async def _main():
+        queries = [_FOUND, _NOT_FOUND, _RETRIEVE]
+        async with fake_workflow(config_file, queries, llm=_FAST_LLM, rag=rag) as (workflow, llm_app, rag_app):
+            llm_calls = []
+            for session_id in ("first", "second"):
+                before = llm_app.state.requests
+                for query in (_FOUND, _NOT_FOUND):
+                    answer = await _ask(workflow, query.query, f"{session_id}-{query.query}")
+                    llm_calls.append(llm_app.state.requests - before)
+                    before = llm_app.state.requests
+                    if query is _NOT_FOUND:
+                        assert answer == f"Could not find a Wikipedia page for: {_NOT_FOUND.query}"
+                    else:
+                        assert answer
+                # The RAG server fails after streaming part of the answer
+                with pytest.raises(RAGServerError):
+                    await _ask(workflow, _RETRIEVE.query, f"{session_id}-retrieve")
+            # The live hit/miss counters are published while the workflow is loaded
+            assert runtime_stats()["response_cache"]["hits"] == 1
+            return llm_calls, rag_app.state.requests
 
-    package_name = inspect.getmodule(MultiFrameworksWorkflowConfig).__package__
+    llm_calls, rag_requests = asyncio.run(_main())
+    assert "response_cache" not in runtime_stats()
+    found_first, not_found_first, found_second, not_found_second = llm_calls
+    # The summary of a found page is served from the cache the second time
+    assert found_second < found_first
+    # Neither the "not found" answer nor the failed RAG stream was cached, so both are looked up again
+    assert not_found_second == not_found_first > 0
+    assert rag_requests == 2
 
-    config_file: Path = importlib.resources.files(package_name).joinpath("configs", "config.yml").absolute()
 
-    async with load_workflow(config_file) as workflow:
+@pytest.mark.parametrize("query", [_FOUND, _RETRIEVE], ids=["research", "retrieve"])
+def test_failure_mid_stream_is_raised_after_partial_answer(query):
+    # The summary LLM or the RAG server drops the connection after four tokens of the answer
+    llm = _FAST_LLM.model_copy(update={"fail_after_tokens": 4})
+    rag = _FAST_RAG.model_copy(update={"fail_after_tokens": 4})
 
-        async with workflow.run("tell me about this workflow") as runner:
+    async def _main():
+        chunks = []
+        async with fake_workflow(CONFIG_FILE, [query], llm=llm, rag=rag) as (workflow, _, _):
+            with session_scope("stream"):
+                async with workflow.run(query.query) as runner:
+                    with pytest.raises(Exception) as error:
+                        async for chunk in runner.result_stream(to_type=str):
+                            chunks.append(chunk)
+        return chunks, error.value
+
+    chunks, error = asyncio.run(_main())
+    assert "".join(chunks) == "".join(generate_tokens(4))
+    if query is _RETRIEVE:
+        assert isinstance(error, RAGServerError)
+
+
+@pytest.mark.parametrize("query, backend", [(_FOUND, "wikipedia"), (_RETRIEVE, "rag")], ids=["research", "retrieve"])
+def test_worker_admission_rejection_is_raised(tmp_path, query, backend):
+    # The backend has one slot and no queue; the test holds the slot, the supervisor's LLM call is admitted
+    admission = {"enabled": True, "backends": {backend: {"max_concurrency": 1, "max_queue": 0}}}
+    config_file = _config_file(tmp_path, admission=admission)
+
+    async def _main():
+        async with fake_workflow(config_file, [query], llm=_FAST_LLM, rag=_FAST_RAG) as (workflow, llm_app, rag_app):
+            async with admission_slot(backend):
+                with pytest.raises(AdmissionRejected, match=backend):
+                    await _ask(workflow, query.query, "rejected")
+            return llm_app.state.requests, rag_app.state.requests
+
+    try:
+        llm_requests, rag_requests = asyncio.run(_main())
+    finally:
+        configure_admission(AdmissionConfig())
+    # The rejection is not turned into an answer: only routing, topic extraction and detail detection
+    # reach the LLM, no summary is generated and the RAG server is not called
+    assert llm_requests <= 4
+    assert rag_requests == 0
+
+
+@pytest.mark.e2e
+@pytest.mark.skipif(not os.getenv("NVIDIA_API_KEY"), reason="requires the live NIM, RAG and Wikipedia services")
+def test_full_workflow():
 
-            result = await runner.result(to_type=str)
+    async def _main() -> str:
+        async with load_workflow(CONFIG_FILE) as workflow:
+            async with workflow.run("tell me about this workflow") as runner:
+                return await runner.result(to_type=str)
 
-        result = result.lower()
-        assert "workflow" in result
+    result = asyncio.run(_main()).lower()
+    assert "workflow" in result
@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from aiq_mercury_agent import mercury_server
+from aiq_mercury_agent.admission import AdmissionRejected
+from aiq_mercury_agent.response_cache import ResponseCacheConfig
+from aiq_mercury_agent.response_cache import SemanticResponseCache
+from aiq_mercury_agent.session_store import current_session_id
+from aiq_mercury_agent.stats import register_stats
+from aiq_mercury_agent.stats import unregister_stats
+
+
+class _FakeRunner:
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+    def _answer(self) -> list[str]:
+        if self.message == "busy":
+            raise AdmissionRejected("llm queue is full")
+        if self.message == "fail":
+            raise RuntimeError("backend down")
+        return [f"[{current_session_id.get()}] ", "echo: ", self.message]
+
+    async def result(self, to_type=str) -> str:
+        return "".join(self._answer())
+
+    async def result_stream(self, to_type=str):
+        for chunk in self._answer():
+            yield chunk
+
+
+class _FakeWorkflow:
+
+    @asynccontextmanager
+    async def run(self, message: str):
+        yield _FakeRunner(message)
+
+
+@pytest.fixture(name="client")
+def client_fixture(monkeypatch):
+
+    @asynccontextmanager
+    async def _load_workflow(config_file, max_concurrency=-1):
+        yield _FakeWorkflow()
+
+    monkeypatch.setattr(mercury_server, "load_workflow", _load_workflow)
+    with TestClient(mercury_server.create_app("config.yml")) as client:
+        yield client
+
+
+def _events(body: str) -> list[tuple[str | None, str]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((fields.get("event"), fields["data"]))
+    return events
+
+
+def test_health_reports_loaded_workflow(client):
+    assert client.get("/health").json() == {"status": "ok", "workflow_loaded": True}
+
+
+def test_health_before_startup():
+    assert TestClient(mercury_server.create_app("config.yml")).get("/health").json()["workflow_loaded"] is False
+
+
+def test_metrics_include_live_cache_stats(client):
+    # Registered the way the workflow registers its response cache when it is built
+    cache = SemanticResponseCache(ResponseCacheConfig(enabled=True))
+    assert cache.get(np.ones(4, dtype=np.float32), "Research") is None
+    register_stats("response_cache", cache.stats)
+    try:
+        metrics = client.get("/metrics").json()
+    finally:
+        unregister_stats("response_cache")
+    assert "admission" in metrics
+    assert metrics["response_cache"]["misses"] == 1
+    assert metrics["response_cache"]["hit_rate"] == 0.0
+    assert "response_cache" not in client.get("/metrics").json()
+
+
+def test_chat_runs_in_the_requested_session(client):
+    response = client.post("/chat", json={"message": "hello", "session_id": "alice"})
+    assert response.status_code == 200
+    assert response.json()["text"] == "[alice] echo: hello"
+    assert response.json()["elapsed_ms"] >= 0
+    assert client.post("/chat", json={"message": "hello"}).json()["text"] == "[default] echo: hello"
+
+
+def test_chat_rejected_by_admission_control_returns_503(client):
+    response = client.post("/chat", json={"message": "busy"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert "queue is full" in response.json()["detail"]
+
+
+def test_chat_failure_returns_500(client):
+    response = client.post("/chat", json={"message": "fail"})
+    assert response.status_code == 500
+    assert "backend down" in response.json()["detail"]
+
+
+def test_chat_stream_sends_fragments_then_done(client):
+    response = client.post("/chat/stream", json={"message": "hi", "session_id": "bob"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert events[-1] == (None, "[DONE]")
+    assert [json.loads(data)["text"] for _, data in events[:-1]] == ["[bob] ", "echo: ", "hi"]
+
+
+def test_chat_stream_failure_sends_error_event(client):
+    events = _events(client.post("/chat/stream", json={"message": "fail"}).text)
+    assert events == [("error", json.dumps({"error": "backend down"})), (None, "[DONE]")]
@@ -0,0 +1,141 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+
+from aiq_mercury_agent.milvus_diagnostics import estimate_row_bytes
+from aiq_mercury_agent.milvus_diagnostics import run_diagnostics
+
+pymilvus = pytest.importorskip("pymilvus")
+DataType = pymilvus.DataType
+LoadState = pytest.importorskip("pymilvus.client.types").LoadState
+
+_FIELDS = [
+    {"name": "pk", "type": DataType.INT64, "params": {}, "is_primary": True},
+    {"name": "text", "type": DataType.VARCHAR, "params": {"max_length": 1000}},
+    {"name": "vector", "type": DataType.FLOAT_VECTOR, "params": {"dim": 8}},
+]
+
+
+class _RecordingClient:
+    """Answers the MilvusClient calls of the diagnostics from canned metadata and records them."""
+
+    def __init__(self, loaded: set[str]):
+        self.loaded = set(loaded)
+        self.calls = []
+        self.searches = []
+
+    def _record(self, name, *args):
+        self.calls.append((name, *args))
+
+    def get_server_version(self):
+        return "v2.5.4"
+
+    def list_collections(self):
+        return ["SPH", "CFD"]
+
+    def describe_collection(self, collection):
+        self._record("describe_collection", collection)
+        if collection not in ("SPH", "CFD"):
+            raise ValueError(f"collection not found[collection={collection}]")
+        return {"collection_name": collection, "description": f"{collection} docs", "fields": _FIELDS, "num_shards": 1}
+
+    def get_collection_stats(self, collection):
+        return {"row_count": 500 if collection == "SPH" else 0}
+
+    def get_load_state(self, collection):
+        return {"state": LoadState.Loaded if collection in self.loaded else LoadState.NotLoad}
+
+    def list_indexes(self, collection):
+        return ["vector_index"]
+
+    def describe_index(self, collection, index_name):
+        return {"index_name": index_name, "field_name": "vector", "index_type": "HNSW", "metric_type": "COSINE",
+                "M": "16", "efConstruction": "200", "indexed_rows": 500, "pending_index_rows": 0}
+
+    def list_persistent_segments(self, collection):
+        return [SimpleNamespace(num_rows=300, state_name="Flushed"), SimpleNamespace(num_rows=200, state_name="Flushed")]
+
+    def list_loaded_segments(self, collection):
+        return [SimpleNamespace(num_rows=500, state_name="Sealed", mem_size=64_000)]
+
+    def load_collection(self, collection):
+        self._record("load_collection", collection)
+        self.loaded.add(collection)
+
+    def release_collection(self, collection):
+        self._record("release_collection", collection)
+        self.loaded.discard(collection)
+
+    def search(self, collection, data, limit, anns_field, search_params):
+        self.searches.append((collection, len(data), len(data[0]), limit, anns_field, search_params))
+        return [[] for _ in data]
+
+
+def test_estimate_row_bytes():
+    assert estimate_row_bytes(_FIELDS) == 8 + 1000 + 8 * 4
+    assert estimate_row_bytes([{"name": "b", "type": DataType.BINARY_VECTOR, "params": {"dim": 256}}]) == 32
+
+
+def test_inspects_without_loading():
+    client = _RecordingClient(loaded=set())
+    report = run_diagnostics(client, probe_queries=0, probe=True)
+    assert [c["name"] for c in report["collections"]] == ["CFD", "SPH"]
+    sph = report["collections"][1]
+    assert sph["entities"] == 500
+    assert sph["load_state"] == "NotLoad"
+    assert sph["indexes"][0]["index_type"] == "HNSW"
+    assert sph["indexes"][0]["params"] == {"M": "16", "efConstruction": "200"}
+    assert sph["segments"] == {"count": 2, "rows": 500, "max_rows": 300, "states": {"Flushed": 2}}
+    assert sph["memory"]["estimated_raw_bytes"] == 500 * 1040
+    assert "loaded_bytes" not in sph["memory"]
+    assert "not loaded" in sph["probe"]["skipped"]
+    assert not any(call[0] == "load_collection" for call in client.calls)
+
+
+def test_probe_measures_loaded_collection():
+    client = _RecordingClient(loaded={"SPH"})
+    report = run_diagnostics(client, collections=["SPH"], queries=20, batch_size=4, top_k=5,
+                             search_params={"ef": 64}, warmup=2)
+    sph = report["collections"][0]
+    assert sph["memory"]["loaded_bytes"] == 64_000
+    assert sph["loaded_segments"]["count"] == 1
+    probe = sph["probe"]
+    assert probe["queries"] == 20
+    assert probe["latency_ms"]["p50"] <= probe["latency_ms"]["p99"] <= probe["latency_ms"]["max"]
+    assert probe["requests_per_second"] > 0
+    assert len(client.searches) == 22
+    assert client.searches[0] == ("SPH", 4, 8, 5, "vector", {"params": {"ef": 64}, "metric_type": "COSINE"})
+
+
+def test_load_option_restores_load_state():
+    client = _RecordingClient(loaded=set())
+    report = run_diagnostics(client, collections=["SPH", "CFD"], load=True, queries=3, warmup=0)
+    assert report["collections"][0]["probe"]["queries"] == 3
+    # Empty collections are never loaded
+    assert report["collections"][1]["probe"] == {"skipped": "collection is empty"}
+    assert [call for call in client.calls if call[0] != "describe_collection"] == [("load_collection", "SPH"),
+                                                                                   ("release_collection", "SPH")]
+    assert client.loaded == set()
+
+
+def test_inspection_errors_are_reported_per_collection():
+    client = _RecordingClient(loaded=set())
+    report = run_diagnostics(client, collections=["missing", "SPH"], probe=False)
+    assert report["collections"][0] == {"name": "missing", "error": "collection not found[collection=missing]"}
+    assert report["collections"][1]["entities"] == 500
+    assert "probe" not in report["collections"][1]
@@ -0,0 +1,241 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from aiq_mercury_agent import nvbp_rag_tool as rag_module
+from aiq_mercury_agent.nvbp_rag_tool import RAGServerConfig
+from aiq_mercury_agent.nvbp_rag_tool import RAGServerError
+from aiq_mercury_agent.nvbp_rag_tool import build_http_client
+
+
+def _sse_body(*contents: str) -> bytes:
+    events = [f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}\n\n" for c in contents]
+    return "".join(events).encode()
+
+
+def _use_transport(monkeypatch, handler) -> list[httpx.AsyncClient]:
+    clients = []
+
+    def _build(tool_config, transport=None):
+        clients.append(build_http_client(tool_config, transport=httpx.MockTransport(handler)))
+        return clients[-1]
+
+    monkeypatch.setattr(rag_module, "build_http_client", _build)
+    return clients
+
+
+async def _collect(tool_config: RAGServerConfig, queries: list[str]) -> tuple[list[str], list[list[str]]]:
+    async with rag_module.nvbp_rag_tool(tool_config, None) as info:
+        answers = [await info.single_fn(q) for q in queries]
+        streams = [[chunk async for chunk in info.stream_fn(q)] for q in queries]
+    return answers, streams
+
+
+def test_split_timeouts_and_pool_limits():
+    client = build_http_client(RAGServerConfig(timeout=60, connect_timeout=2, read_timeout=30))
+    try:
+        assert client.timeout.connect == 2
+        assert client.timeout.read == 30
+        assert client.timeout.write == 60
+    finally:
+        asyncio.run(client.aclose())
+
+
+def test_read_timeout_defaults_to_timeout():
+    client = build_http_client(RAGServerConfig(timeout=45))
+    try:
+        assert client.timeout.read == 45
+    finally:
+        asyncio.run(client.aclose())
+
+
+def test_queries_share_one_client(monkeypatch):
+    seen = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        return httpx.Response(200, content=_sse_body("Hello", " world"))
+
+    clients = _use_transport(monkeypatch, _handler)
+    answers, streams = asyncio.run(_collect(RAGServerConfig(base_url="http://rag.test/v1"), ["a", "b"]))
+    assert answers == ["Hello world", "Hello world"]
+    assert streams == [["Hello", " world"], ["Hello", " world"]]
+    assert seen == ["/v1/generate"] * 4
+    assert len(clients) == 1
+    assert clients[0].is_closed
+
+
+async def _stream_until_error(tool_config: RAGServerConfig, query: str) -> tuple[list[str], Exception | None]:
+    chunks = []
+    async with rag_module.nvbp_rag_tool(tool_config, None) as info:
+        try:
+            async for chunk in info.stream_fn(query):
+                chunks.append(chunk)
+        except Exception as e:
+            return chunks, e
+    return chunks, None
+
+
+def test_http_error_is_raised(monkeypatch):
+    _use_transport(monkeypatch, lambda request: httpx.Response(503))
+
+    async def _main():
+        async with rag_module.nvbp_rag_tool(RAGServerConfig(base_url="http://rag.test/v1"), None) as info:
+            await info.single_fn("a")
+
+    with pytest.raises(RAGServerError, match="Error querying RAG server"):
+        asyncio.run(_main())
+
+
+def test_error_event_mid_stream(monkeypatch):
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        body = _sse_body("Partial") + b"event: error\ndata: generation failed\n\n"
+        return httpx.Response(200, content=body)
+
+    _use_transport(monkeypatch, _handler)
+    chunks, error = asyncio.run(_stream_until_error(RAGServerConfig(base_url="http://rag.test/v1"), "a"))
+    # The partial answer is not followed by an error fragment; the failure is raised instead
+    assert chunks == ["Partial"]
+    assert isinstance(error, RAGServerError)
+    assert str(error) == "Error querying RAG server: generation failed"
+
+
+def test_empty_stream_is_raised(monkeypatch):
+    _use_transport(monkeypatch, lambda request: httpx.Response(200, content=b"data: [DONE]\n\n"))
+    chunks, error = asyncio.run(_stream_until_error(RAGServerConfig(base_url="http://rag.test/v1"), "a"))
+    assert chunks == []
+    assert isinstance(error, RAGServerError) and str(error) == "No response from RAG server"
+
+
+def test_generate_mode_passes_citations_through(monkeypatch):
+    citations = {"citations": {"results": [{"content": "c", "document_name": "sph.pdf", "score": 0.9,
+                                            "metadata": {"page_number": 4}}]}}
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=_sse_body("Answer") + f"data: {json.dumps(citations)}\n\n".encode())
+
+    _use_transport(monkeypatch, _handler)
+    answers, _ = asyncio.run(_collect(RAGServerConfig(base_url="http://rag.test/v1", citations=True), ["a"]))
+    assert answers == ["Answer\n\nSources:\n[1] sph.pdf, p. 4 (score 0.90)"]
+
+
+def test_search_mode_returns_scored_chunks(monkeypatch):
+    requests = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.url.path, json.loads(request.content)))
+        return httpx.Response(200, json={"total_results": 3, "results": [
+            {"content": "Kernels are chosen...", "score": 0.8, "document_name": "sph.pdf", "metadata": {"page": 2}},
+            {"content": "Smoothing length...", "score": "0.5", "document_id": "doc-7"},
+            {"content": "Dropped by top_k", "score": 0.1},
+        ]})
+
+    _use_transport(monkeypatch, _handler)
+
+    async def _main():
+        async with rag_module.nvbp_rag_tool(RAGServerConfig(base_url="http://rag.test/v1", mode="search", top_k=2),
+                                            None) as info:
+            return await info.single_fn("How are kernels chosen?")
+
+    result = asyncio.run(_main())
+    assert requests[0][0] == "/v1/search"
+    assert requests[0][1]["query"] == "How are kernels chosen?"
+    assert requests[0][1]["collection_name"] == "SPH"
+    assert result.error is None
+    assert [chunk.score for chunk in result.chunks] == [0.8, 0.5]
+    assert result.context() == "[1] (sph.pdf, p. 2)\nKernels are chosen...\n\n[2] (doc-7)\nSmoothing length..."
+    assert result.citations() == "Sources:\n[1] sph.pdf, p. 2 (score 0.80)\n[2] doc-7 (score 0.50)"
+
+
+def test_search_mode_reports_errors(monkeypatch):
+    _use_transport(monkeypatch, lambda request: httpx.Response(500))
+
+    async def _main():
+        async with rag_module.nvbp_rag_tool(RAGServerConfig(base_url="http://rag.test/v1", mode="search"),
+                                            None) as info:
+            return await info.single_fn("a")
+
+    result = asyncio.run(_main())
+    assert result.chunks == [] and "500" in result.error
+
+
+def test_search_fans_out_over_collections(monkeypatch):
+    delays = {"SPH": 0.0, "CFD": 0.02, "SLOW": 1.0}
+
+    async def _handler(request: httpx.Request) -> httpx.Response:
+        collection = json.loads(request.content)["collection_name"]
+        await asyncio.sleep(delays[collection])
+        return httpx.Response(200, json={"results": [
+            {"content": f"{collection} {i}", "score": 0.9 - 0.1 * i, "document_id": f"{collection}-{i}"}
+            for i in range(3)
+        ]})
+
+    _use_transport(monkeypatch, _handler)
+    tool_config = RAGServerConfig(base_url="http://rag.test/v1",
+                                  mode="search",
+                                  top_k=4,
+                                  collections=["SPH", {"name": "CFD", "description": "Fluid dynamics"},
+                                               {"name": "SLOW", "timeout": 0.1}],
+                                  collection_timeout=0.5)
+
+    async def _main():
+        async with rag_module.nvbp_rag_tool(tool_config, None) as info:
+            started = asyncio.get_running_loop().time()
+            result = await info.single_fn("How are kernels chosen?")
+            return result, asyncio.get_running_loop().time() - started
+
+    result, elapsed = asyncio.run(_main())
+    # The slow collection is dropped at its own timeout instead of stalling the answer
+    assert elapsed < 0.5
+    assert result.error is None
+    assert [chunk.content for chunk in result.chunks] == ["SPH 0", "CFD 0", "SPH 1", "CFD 1"]
+    assert {chunk.collection for chunk in result.chunks} == {"SPH", "CFD"}
+    assert result.collections["SPH"].hits == 3
+    assert result.collections["CFD"].latency_ms >= 20
+    assert result.collections["SLOW"].status == "timeout"
+    assert result.collections["SLOW"].hits == 0
+
+
+def test_search_reports_each_failed_collection(monkeypatch):
+    _use_transport(monkeypatch, lambda request: httpx.Response(503))
+    tool_config = RAGServerConfig(base_url="http://rag.test/v1", mode="search", collections=["A", "B"])
+
+    async def _main():
+        async with rag_module.nvbp_rag_tool(tool_config, None) as info:
+            return await info.single_fn("a")
+
+    result = asyncio.run(_main())
+    assert result.chunks == []
+    assert result.error.startswith("A: ") and "; B: " in result.error
+    assert {report.status for report in result.collections.values()} == {"error"}
+
+
+def test_generate_mode_passes_all_collections(monkeypatch):
+    bodies = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, content=_sse_body("ok"))
+
+    _use_transport(monkeypatch, _handler)
+    asyncio.run(_collect(RAGServerConfig(base_url="http://rag.test/v1", collections=["SPH", "CFD"]), ["a"]))
+    assert bodies[0]["collection_name"] == "SPH"
+    assert bodies[0]["collection_names"] == ["SPH", "CFD"]
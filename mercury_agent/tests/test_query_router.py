@@ -0,0 +1,133 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+
+import pytest
+
+from aiq_mercury_agent.nvbp_rag_tool import RAGServerConfig
+from aiq_mercury_agent.query_router import GENERAL
+from aiq_mercury_agent.query_router import RESEARCH
+from aiq_mercury_agent.query_router import RETRIEVE
+from aiq_mercury_agent.query_router import ROUTER_PROMPT
+from aiq_mercury_agent.query_router import RouterConfig
+from aiq_mercury_agent.query_router import TfidfCentroidClassifier
+from aiq_mercury_agent.query_router import TieredQueryRouter
+from aiq_mercury_agent.query_router import build_router_prompt
+from aiq_mercury_agent.query_router import collection_topics
+from aiq_mercury_agent.query_router import is_detail_query
+from aiq_mercury_agent.query_router import normalize_route
+
+
+async def _never_called(query: str) -> str:
+    raise AssertionError(f"LLM fallback should not be used for: {query}")
+
+
+@pytest.mark.parametrize("query, route", [
+    ("hi", GENERAL),
+    ("Hello there!", GENERAL),
+    ("thanks a lot", GENERAL),
+    ("use RAG to explain kernels", RETRIEVE),
+    ("What is SPH?", RETRIEVE),
+    ("retrieve the documentation on neighbour lists", RETRIEVE),
+    ("look it up on wikipedia: the eiffel tower", RESEARCH),
+])
+def test_rules_tier(query, route):
+    decision = asyncio.run(TieredQueryRouter(RouterConfig()).route(query, _never_called))
+    assert decision.route == route
+    assert decision.tier == "rules"
+
+
+def test_classifier_tier():
+    decision = TieredQueryRouter(RouterConfig()).route_local("describe the geography of france")
+    assert decision is not None
+    assert decision.tier == "classifier"
+    assert decision.route == RESEARCH
+
+
+@pytest.mark.parametrize("query", [
+    "What is the meaning of life",
+    "How are kernels used in machine learning?",
+    "how do I retrieve a file with curl",
+    "I need to retrieve my password",
+])
+def test_function_words_and_loose_keywords_do_not_decide(query):
+    assert TieredQueryRouter(RouterConfig()).route_local(query) is None
+
+
+def test_llm_fallback_when_local_tiers_abstain():
+    calls = []
+
+    async def _llm(query: str) -> str:
+        calls.append(query)
+        return " Research\n"
+
+    router = TieredQueryRouter(RouterConfig(min_similarity=1.1))
+    decision = asyncio.run(router.route("zzz qqq", _llm))
+    assert calls == ["zzz qqq"]
+    assert decision.route == RESEARCH
+    assert decision.tier == "llm"
+    assert decision.latency_ms >= 0
+
+
+def test_disabled_router_always_uses_llm():
+    async def _llm(query: str) -> str:
+        return "General"
+
+    decision = asyncio.run(TieredQueryRouter(RouterConfig(enabled=False)).route("use rag", _llm))
+    assert decision.tier == "llm"
+    assert decision.route == GENERAL
+
+
+def test_examples_file_extends_classifier(tmp_path):
+    path = tmp_path / "examples.jsonl"
+    path.write_text("\n".join(json.dumps({"query": q, "label": RETRIEVE}) for q in ["foo bar baz", "foo baz"]))
+    router = TieredQueryRouter(RouterConfig(examples_path=str(path)))
+    decision = router.route_local("foo bar")
+    assert decision is not None and decision.route == RETRIEVE
+
+
+def test_centroid_scores_prefer_matching_label():
+    classifier = TfidfCentroidClassifier([("apple banana", "fruit"), ("car truck", "vehicle")])
+    scores = classifier.scores("banana")
+    assert scores["fruit"] > scores["vehicle"]
+
+
+def test_normalize_route():
+    assert normalize_route("Classification: retrieve") == RETRIEVE
+    assert normalize_route("nonsense") is None
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("give me more details about the roman empire", True),
+    ("explain black holes in depth", True),
+    ("who was augustus", False),
+])
+def test_is_detail_query(query, expected):
+    assert is_detail_query(query) is expected
+
+
+def test_router_prompt_names_collection_topics():
+    prompt = build_router_prompt("SPH, CFD {solvers}")
+    assert "related to the topic of SPH, CFD {{solvers}}." in prompt
+    assert prompt.endswith("User query: {input}\n    Classifcation topic:")
+    assert "Smoothed Particle Hydrodynamics" in ROUTER_PROMPT
+
+
+def test_collection_topics():
+    assert "Smoothed Particle Hydrodynamics" in collection_topics(RAGServerConfig())
+    config = RAGServerConfig(collections=["SPH", {"name": "CFD", "description": "Fluid solvers"}])
+    assert collection_topics(config) == "SPH, Fluid solvers"
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from aiq_mercury_agent.nvbp_rag_tool import RetrievedChunk
+from aiq_mercury_agent.rag_fusion import CollectionStats
+from aiq_mercury_agent.rag_fusion import fuse
+from aiq_mercury_agent.rag_fusion import normalized_score_fusion
+from aiq_mercury_agent.rag_fusion import reciprocal_rank_fusion
+
+
+def _chunks(collection: str, *scored: tuple[str, float | None]) -> list[RetrievedChunk]:
+    return [
+        RetrievedChunk(content=content, score=score, document_id=f"{collection}-{content}", collection=collection)
+        for content, score in scored
+    ]
+
+
+def test_rrf_interleaves_collections_by_rank():
+    ranked = {
+        "SPH": _chunks("SPH", ("a1", 0.9), ("a2", 0.8), ("a3", 0.7)),
+        "CFD": _chunks("CFD", ("b1", 0.2), ("b2", 0.1)),
+    }
+    fused = reciprocal_rank_fusion(ranked, k=60)
+    assert [chunk.content for chunk, _ in fused] == ["a1", "b1", "a2", "b2", "a3"]
+    # Scores assigned by the server are kept
+    assert [chunk.score for chunk in fuse(ranked, top_k=2)] == [0.9, 0.2]
+
+
+def test_rrf_rewards_chunks_found_by_several_collections():
+    shared = RetrievedChunk(content="shared", document_id="doc")
+    ranked = {
+        "A": [RetrievedChunk(content="only a", document_id="x"), shared],
+        "B": [RetrievedChunk(content="only b", document_id="y"), shared],
+    }
+    assert fuse(ranked, top_k=1)[0].content == "shared"
+
+
+def test_score_fusion_prefers_stronger_matches():
+    ranked = {
+        "SPH": _chunks("SPH", ("a1", 0.9), ("a2", 0.85), ("a3", 0.1)),
+        "CFD": _chunks("CFD", ("b1", 0.6), ("b2", 0.5), ("b3", 0.4)),
+    }
+    assert [chunk.content for chunk in fuse(ranked, top_k=4, method="score")] == ["a1", "b1", "a2", "b2"]
+    scores = dict((chunk.content, score) for chunk, score in normalized_score_fusion(ranked))
+    assert scores["a1"] == scores["b1"] == 1.0
+    assert scores["a3"] == scores["b3"] == 0.0
+    assert scores["a2"] > scores["b2"]
+
+
+def test_score_fusion_ranks_unscored_chunks_by_position():
+    ranked = {"A": _chunks("A", ("a1", None), ("a2", None)), "B": _chunks("B", ("b1", 0.3), ("b2", 0.9))}
+    scores = dict((chunk.content, score) for chunk, score in normalized_score_fusion(ranked))
+    assert scores == {"a1": 1.0, "a2": 0.5, "b1": 0.0, "b2": 1.0}
+
+
+def test_single_collection_keeps_server_order():
+    ranked = {"SPH": _chunks("SPH", ("a1", 0.1), ("a2", 0.9), ("a3", 0.5))}
+    assert [chunk.content for chunk in fuse(ranked, top_k=2, method="score")] == ["a1", "a2"]
+
+
+def test_collection_stats():
+    stats = CollectionStats()
+    stats.record("SPH", 0.1, hits=3)
+    stats.record("SPH", 0.3, hits=2)
+    stats.record("CFD", 2.0, status="timeout")
+    stats.record("CFD", 0.05, status="error")
+    report = stats.stats()
+    assert report["SPH"]["requests"] == 2
+    assert report["SPH"]["hits"] == 5
+    assert report["SPH"]["latency_ms"]["mean"] == 200.0
+    assert report["SPH"]["latency_ms"]["max"] == 300.0
+    assert report["CFD"]["timeouts"] == 1
+    assert report["CFD"]["errors"] == 1
+    assert report["CFD"]["hits"] == 0
@@ -0,0 +1,51 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from aiq_mercury_agent.chain_benchmark import measure_chain_overhead
+from aiq_mercury_agent.research_prompts import CONCISE_SUMMARY_INSTRUCTIONS
+from aiq_mercury_agent.research_prompts import DETAILED_SUMMARY_INSTRUCTIONS
+from aiq_mercury_agent.research_prompts import SUMMARY_SYSTEM_PROMPT
+from aiq_mercury_agent.research_prompts import build_detail_chain
+from aiq_mercury_agent.research_prompts import build_summary_chain
+
+
+def test_summary_prompt_starts_with_static_system_message():
+    prompt = build_summary_chain(FakeListChatModel(responses=["ok"])).first
+    messages = [
+        prompt.format_messages(detail_instructions=instructions, content="Jupiter is a planet.", query=query)
+        for instructions, query in ((CONCISE_SUMMARY_INSTRUCTIONS, "Tell me about Jupiter"),
+                                    (DETAILED_SUMMARY_INSTRUCTIONS, "More details on Rome please"))
+    ]
+    assert messages[0][0].type == "system"
+    assert messages[0][0].content == messages[1][0].content == SUMMARY_SYSTEM_PROMPT
+    request = messages[0][1].content
+    assert request.index(CONCISE_SUMMARY_INSTRUCTIONS) < request.index("Jupiter is a planet.") < request.index(
+        "Tell me about Jupiter")
+
+
+def test_detail_chain_answers_yes_or_no():
+    chain = build_detail_chain(FakeListChatModel(responses=["yes"]))
+    assert chain.invoke({"query": "Tell me more about Rome"}).content == "yes"
+
+
+def test_chain_benchmark_reports_overhead():
+    report = measure_chain_overhead(requests=20, content_words=50)
+    assert report["before_us_per_request"] > 0 and report["after_us_per_request"] > 0
+    assert report["chain_build_us"] > 0
+    # Only the precompiled layout shares the whole system prompt between requests
+    assert report["shared_prefix_tokens"]["after"] >= report["system_prompt_tokens"]
+    assert report["shared_prefix_tokens"]["before"] < report["system_prompt_tokens"]
@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from aiq_mercury_agent.query_router import GENERAL
+from aiq_mercury_agent.query_router import RESEARCH
+from aiq_mercury_agent.query_router import RETRIEVE
+from aiq_mercury_agent.response_cache import HnswVectorIndex
+from aiq_mercury_agent.response_cache import NumpyVectorIndex
+from aiq_mercury_agent.response_cache import ResponseCacheConfig
+from aiq_mercury_agent.response_cache import SemanticResponseCache
+from aiq_mercury_agent.response_cache import normalize_query
+
+
+class _BagOfWordsEmbedder:
+    """Embeds texts as word counts over a fixed vocabulary."""
+    VOCABULARY = ("eiffel", "tower", "height", "sph", "kernel", "rome")
+
+    async def aembed_query(self, text: str) -> list[float]:
+        words = text.split()
+        return [float(words.count(w)) for w in self.VOCABULARY]
+
+
+def _cache(**kwargs) -> SemanticResponseCache:
+    return SemanticResponseCache(ResponseCacheConfig(enabled=True, **kwargs), _BagOfWordsEmbedder())
+
+
+def _embed(cache: SemanticResponseCache, query: str) -> np.ndarray:
+    return asyncio.run(cache.embed(query))
+
+
+def test_normalize_query():
+    assert normalize_query("  What's the Eiffel-Tower?? ") == "what s the eiffel tower"
+
+
+def test_similar_query_on_same_route_hits():
+    cache = _cache()
+    cache.put("eiffel tower height", _embed(cache, "eiffel tower height"), RESEARCH, "330 m")
+    assert cache.get(_embed(cache, "Eiffel Tower height?"), RESEARCH) == "330 m"
+    assert cache.get(_embed(cache, "eiffel tower height"), RETRIEVE) is None
+    assert cache.get(_embed(cache, "sph kernel"), RESEARCH) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["routes"][RESEARCH]["hit_rate"] == 0.5
+
+
+def test_routes_are_opt_in():
+    cache = _cache()
+    assert cache.enabled_for(RESEARCH) and cache.enabled_for(RETRIEVE)
+    assert not cache.enabled_for(GENERAL)
+    assert _cache(routes=["general"]).enabled_for(GENERAL)
+    assert not SemanticResponseCache(ResponseCacheConfig()).enabled_for(RESEARCH)
+
+
+def test_entries_expire():
+    cache = _cache(ttl=-1)
+    cache.put("rome", _embed(cache, "rome"), RESEARCH, "answer")
+    assert cache.get(_embed(cache, "rome"), RESEARCH) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_answer_is_evicted():
+    cache = _cache(max_entries=2)
+    for query in ("rome", "sph", "eiffel"):
+        cache.put(query, _embed(cache, query), RESEARCH, query)
+    assert cache.get(_embed(cache, "rome"), RESEARCH) is None
+    assert cache.get(_embed(cache, "eiffel"), RESEARCH) == "eiffel"
+    assert len(cache) == 2
+
+
+@pytest.mark.parametrize("index_type", [NumpyVectorIndex, HnswVectorIndex])
+def test_vector_index_returns_nearest_first(index_type):
+    if index_type is HnswVectorIndex:
+        pytest.importorskip("hnswlib")
+    index = index_type(8)
+    vectors = np.eye(4, dtype=np.float32)
+    for key, vector in enumerate(vectors):
+        index.add(key, vector)
+    index.remove(2)
+    query = np.array([0.1, 0.0, 0.9, 0.3], dtype=np.float32)
+    keys = [key for key, _ in index.search(query / np.linalg.norm(query), 2)]
+    assert keys == [3, 0]
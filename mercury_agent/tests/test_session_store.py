@@ -0,0 +1,135 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import AIMessage  # noqa: E402
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from aiq_mercury_agent.session_store import DEFAULT_SESSION_ID  # noqa: E402
+from aiq_mercury_agent.session_store import SessionConfig  # noqa: E402
+from aiq_mercury_agent.session_store import SessionHistoryStore  # noqa: E402
+from aiq_mercury_agent.session_store import current_session_id  # noqa: E402
+from aiq_mercury_agent.session_store import session_scope  # noqa: E402
+
+
+def _add_turn(history, i: int, text: str = "x") -> None:
+    history.add_messages([HumanMessage(content=f"q{i} {text}"), AIMessage(content=f"a{i}")])
+
+
+def test_sessions_are_isolated():
+    store = SessionHistoryStore(SessionConfig())
+    _add_turn(store.get("alice"), 0)
+    assert len(store.get("alice").messages) == 2
+    assert store.get("bob").messages == []
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionHistoryStore(SessionConfig(max_sessions=2))
+    store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")
+    assert "a" in store and "c" in store
+    assert "b" not in store
+    assert store.evictions == 1
+
+
+def test_turn_cap_keeps_most_recent_turns():
+    store = SessionHistoryStore(SessionConfig(max_turns=2))
+    history = store.get("s")
+    for i in range(5):
+        _add_turn(history, i)
+    contents = [m.content for m in history.messages]
+    assert contents == ["q3 x", "a3", "q4 x", "a4"]
+
+
+def test_token_cap_drops_oldest_turns():
+    store = SessionHistoryStore(SessionConfig(max_turns=100, max_tokens=50))
+    history = store.get("s")
+    for i in range(10):
+        _add_turn(history, i, text="y" * 80)
+    total = sum(len(m.content) // 4 for m in history.messages)
+    assert total <= 50
+    assert history.messages[-1].content == "a9"
+    assert isinstance(history.messages[0], HumanMessage)
+
+
+def test_token_cap_never_keeps_a_reply_without_its_question():
+    store = SessionHistoryStore(SessionConfig(max_turns=100, max_tokens=30))
+    history = store.get("s")
+    _add_turn(history, 0, text="y" * 80)
+    _add_turn(history, 1, text="y" * 80)
+    assert [m.content for m in history.messages] == ["q1 " + "y" * 80, "a1"]
+
+
+def test_idle_sessions_are_evicted():
+    store = SessionHistoryStore(SessionConfig(idle_ttl=0.0))
+    store.get("old")
+    store.get("new")
+    assert "old" not in store
+
+
+def test_persistence_survives_restart(tmp_path):
+    config = SessionConfig(persist_path=str(tmp_path / "sessions.db"))
+    store = SessionHistoryStore(config)
+    _add_turn(store.get("s"), 0)
+    store.close()
+
+    reopened = SessionHistoryStore(config)
+    assert [m.content for m in reopened.get("s").messages] == ["q0 x", "a0"]
+    reopened.close()
+
+
+def test_histories_are_written_off_the_calling_thread(tmp_path):
+    store = SessionHistoryStore(SessionConfig(persist_path=str(tmp_path / "sessions.db")))
+    writers = []
+    store._db.set_trace_callback(lambda sql: writers.append(threading.current_thread().name)
+                                 if sql.startswith("INSERT") else None)
+    _add_turn(store.get("s"), 0)
+    store.close()
+    assert writers == ["session-writer"]
+
+
+def test_persisted_sessions_are_pruned(tmp_path):
+    path = tmp_path / "sessions.db"
+    config = SessionConfig(max_sessions=2, idle_ttl=600, persist_path=str(path))
+    store = SessionHistoryStore(config)
+    for i, session_id in enumerate(["a", "b", "c"]):
+        _add_turn(store.get(session_id), i)
+        time.sleep(0.01)
+    store.close()
+    db = sqlite3.connect(str(path))
+    db.execute("INSERT INTO sessions VALUES ('stale', '[]', ?)", (time.time() - 3600, ))
+    db.commit()
+    db.close()
+
+    SessionHistoryStore(config).close()
+    db = sqlite3.connect(str(path))
+    assert {row[0] for row in db.execute("SELECT session_id FROM sessions")} == {"b", "c"}
+    db.close()
+
+
+def test_session_scope_binds_and_resets():
+    with session_scope("abc") as session_id:
+        assert session_id == "abc"
+        assert current_session_id.get() == "abc"
+    assert current_session_id.get() == DEFAULT_SESSION_ID
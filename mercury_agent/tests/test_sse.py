@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import time
+
+import pytest
+
+from aiq_mercury_agent.sse import SSEDecoder
+from aiq_mercury_agent.sse import SSEEvent
+from aiq_mercury_agent.sse import SSEStreamError
+from aiq_mercury_agent.sse import aiter_sse_json
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _decode_bytewise(stream: bytes) -> list[SSEEvent]:
+    decoder = SSEDecoder()
+    events = []
+    for i in range(len(stream)):
+        events.extend(decoder.feed(stream[i:i + 1]))
+    return events + decoder.close()
+
+
+def _json(*chunks) -> list:
+
+    async def _main():
+        return [payload async for payload in aiter_sse_json(_chunks(*chunks))]
+
+    return asyncio.run(_main())
+
+
+def test_events_split_at_every_byte():
+    stream = ("event: delta\r\nid: 7\r\ndata: {\"text\": \"Grüße\"}\r\n\r\n"
+              ": keep-alive comment\n\n"
+              "data: first line\ndata:second line\r\r").encode()
+    assert _decode_bytewise(stream) == [
+        SSEEvent("delta", '{"text": "Grüße"}', "7"),
+        SSEEvent("message", "first line\nsecond line", "7"),
+    ]
+
+
+def test_unterminated_final_event_is_dispatched():
+    decoder = SSEDecoder()
+    assert decoder.feed(b"data: {\"a\": 1}\n\ndata: {\"a\": 2}") == [SSEEvent("message", '{"a": 1}')]
+    assert decoder.close() == [SSEEvent("message", '{"a": 2}')]
+
+
+def test_json_stream_stops_at_done():
+    assert _json(b'data: {"n": 1}\n\ndata: [DO', b'NE]\n\ndata: {"n": 2}\n\n') == [{"n": 1}]
+
+
+def test_json_stream_skips_malformed_and_splits_unseparated_lines():
+    assert _json(b'data: not json\n\ndata: {"n": 1}\ndata: {"n": 2}\n\n') == [{"n": 1}, {"n": 2}]
+
+
+def test_error_events_raise():
+    with pytest.raises(SSEStreamError, match="collection not found"):
+        _json(b'data: {"n": 1}\n\nevent: error\ndata: collection not found\n\n')
+    with pytest.raises(SSEStreamError, match="rate limited"):
+        _json(b'data: {"error": {"message": "rate limited"}}\n\n')
+
+
+def test_long_line_in_small_chunks_decodes_in_linear_time():
+
+    def _decode_seconds(n_chunks: int) -> float:
+        stream = b'data: {"text": "' + b"x" * (64 * n_chunks) + b'"}\n\n'
+        decoder = SSEDecoder()
+        start = time.perf_counter()
+        events = []
+        for i in range(0, len(stream), 64):
+            events.extend(decoder.feed(stream[i:i + 64]))
+        elapsed = time.perf_counter() - start
+        assert len(events) == 1 and len(events[0].data) == 64 * n_chunks + 12
+        return elapsed
+
+    _decode_seconds(1000)  # warm up
+    small = min(_decode_seconds(2000) for _ in range(3))
+    large = min(_decode_seconds(16000) for _ in range(3))
+    # 8x the chunks takes ~8x the time; rescanning the buffer per chunk would take ~64x
+    assert large < 24 * small + 0.05
@@ -0,0 +1,31 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from aiq_mercury_agent.nvbp_rag_tool import RAGServerError
+from aiq_mercury_agent.stats import percentile
+from aiq_mercury_agent.stats import run_error
+
+
+def test_percentile_is_nearest_rank_of_unsorted_samples():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert [percentile(values, pct) for pct in (0, 50, 95, 100)] == [1.0, 3.0, 5.0, 5.0]
+    assert percentile([], 99) == 0.0
+
+
+def test_run_error_uses_the_exception_not_the_answer_text():
+    assert run_error("Error bars show one standard deviation.") is None
+    assert run_error("") == "Empty response"
+    assert run_error("Partial", RAGServerError("Error querying RAG server: boom")) == (
+        "RAGServerError: Error querying RAG server: boom")
@@ -0,0 +1,189 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from aiq_mercury_agent import nvbp_rag_tool as rag_module
+from aiq_mercury_agent.nvbp_rag_tool import RAGServerConfig
+from aiq_mercury_agent.nvbp_rag_tool import build_http_client
+from aiq_mercury_agent.tracing import TracingConfig
+from aiq_mercury_agent.tracing import add_span_exporter
+from aiq_mercury_agent.tracing import configure_tracing
+from aiq_mercury_agent.tracing import current_span
+from aiq_mercury_agent.tracing import flush_tracing
+from aiq_mercury_agent.tracing import remove_span_exporter
+from aiq_mercury_agent.tracing import shutdown_tracing
+from aiq_mercury_agent.tracing import span
+from aiq_mercury_agent.tracing import tracing_enabled
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    configure_tracing(TracingConfig(exporter="jsonl", path=str(path)))
+    yield path
+    shutdown_tracing()
+
+
+def _spans(path) -> dict[str, dict]:
+    flush_tracing()
+    return {record["name"]: record for record in map(json.loads, path.read_text().splitlines())}
+
+
+def test_disabled_by_default():
+    shutdown_tracing()
+    assert not tracing_enabled()
+    with span("request", session_id="s") as stage:
+        stage.set("route", "research")
+        assert current_span() is None
+
+
+class _ListExporter:
+
+    def __init__(self):
+        self.spans = []
+        self.closed = False
+
+    def export(self, span):
+        self.spans.append(span.name)
+
+    def close(self):
+        self.closed = True
+
+
+def test_additional_exporters(trace_file):
+    collector = _ListExporter()
+    add_span_exporter(collector)
+    with span("request"):
+        pass
+    remove_span_exporter(collector)
+    with span("after"):
+        pass
+    assert collector.spans == ["request"]
+    assert not collector.closed
+    assert set(_spans(trace_file)) == {"request", "after"}
+
+
+def test_additional_exporter_enables_tracing():
+    shutdown_tracing()
+    collector = _ListExporter()
+    add_span_exporter(collector)
+    with span("request"):
+        with span("worker"):
+            pass
+    shutdown_tracing()
+    assert collector.spans == ["worker", "request"]
+    assert collector.closed
+
+
+def test_spans_nest_across_concurrent_tasks(trace_file):
+
+    async def _stage(name: str):
+        with span(name) as stage:
+            await asyncio.sleep(0.01)
+            stage.set("tokens", 3)
+
+    async def _main():
+        with span("request", session_id="abc"):
+            with span("worker", route="research"):
+                await asyncio.gather(_stage("wikipedia_lookup"), _stage("detail_detection"))
+
+    asyncio.run(_main())
+    spans = _spans(trace_file)
+    request, worker = spans["request"], spans["worker"]
+    assert request["parent_id"] is None
+    assert worker["parent_id"] == request["span_id"]
+    for name in ("wikipedia_lookup", "detail_detection"):
+        assert spans[name]["parent_id"] == worker["span_id"]
+        assert spans[name]["request_id"] == request["request_id"]
+        assert spans[name]["session_id"] == "abc"
+        assert spans[name]["attributes"] == {"tokens": 3}
+        assert spans[name]["duration_ms"] >= 10
+    assert worker["attributes"] == {"route": "research"}
+
+
+def test_shutdown_writes_pending_spans(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    configure_tracing(TracingConfig(exporter="jsonl", path=str(path)))
+    for i in range(200):
+        with span(f"stage{i}"):
+            pass
+    shutdown_tracing()
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == [f"stage{i}" for i in range(200)]
+
+
+def test_errors_are_recorded_and_reraised(trace_file):
+    with pytest.raises(ValueError):
+        with span("summary"):
+            raise ValueError("boom")
+    record = _spans(trace_file)["summary"]
+    assert record["status"] == "error"
+    assert record["error"] == "ValueError: boom"
+
+
+def test_otlp_json_export(tmp_path):
+    path = tmp_path / "otlp.jsonl"
+    configure_tracing(TracingConfig(exporter="otlp_json", path=str(path), service_name="mercury-test"))
+    try:
+        with span("request", session_id="abc"):
+            with span("router", route_to="workers", confidence=0.5, cached=False):
+                pass
+    finally:
+        shutdown_tracing()
+
+    documents = [json.loads(line) for line in path.read_text().splitlines()]
+    router, request = (doc["resourceSpans"][0]["scopeSpans"][0]["spans"][0] for doc in documents)
+    resource = documents[0]["resourceSpans"][0]["resource"]
+    assert resource["attributes"] == [{"key": "service.name", "value": {"stringValue": "mercury-test"}}]
+    assert router["traceId"] == request["traceId"] and len(request["traceId"]) == 32
+    assert router["parentSpanId"] == request["spanId"] and len(request["spanId"]) == 16
+    assert "parentSpanId" not in request
+    assert int(router["endTimeUnixNano"]) >= int(router["startTimeUnixNano"])
+    attributes = {a["key"]: a["value"] for a in router["attributes"]}
+    assert attributes == {
+        "route_to": {"stringValue": "workers"},
+        "confidence": {"doubleValue": 0.5},
+        "cached": {"boolValue": False},
+        "session.id": {"stringValue": "abc"},
+    }
+    assert request["status"] == {"code": 1}
+
+
+def test_rag_stream_records_ttfb_and_tokens(monkeypatch, trace_file):
+    body = "".join(f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}\n\n" for c in ["Hello", " world!"])
+
+    def _build(tool_config, transport=None):
+        return build_http_client(tool_config,
+                                 transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+
+    monkeypatch.setattr(rag_module, "build_http_client", _build)
+
+    async def _main():
+        async with rag_module.nvbp_rag_tool(RAGServerConfig(base_url="http://rag.test/v1"), None) as info:
+            with span("worker"):
+                return [chunk async for chunk in info.stream_fn("What is Mercury?")]
+
+    assert asyncio.run(_main()) == ["Hello", " world!"]
+    spans = _spans(trace_file)
+    rag = spans["rag_generate"]
+    assert rag["parent_id"] == spans["worker"]["span_id"]
+    assert rag["attributes"]["http_status"] == 200
+    assert rag["attributes"]["output_tokens"] == 3
+    assert 0 <= rag["attributes"]["ttfb_ms"] <= rag["attributes"]["ttft_ms"] <= rag["duration_ms"]
@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import bz2
+import json
+
+import pytest
+import wikipedia
+
+from aiq_mercury_agent.content_trimmer import split_passages
+from aiq_mercury_agent.wikipedia_backends import OfflineWikipediaBackend
+from aiq_mercury_agent.wikipedia_backends import OfflineWikipediaConfig
+from aiq_mercury_agent.wikipedia_backends import build_index
+from aiq_mercury_agent.wikipedia_backends import iter_jsonl_dump
+from aiq_mercury_agent.wikipedia_backends import iter_xml_dump
+from aiq_mercury_agent.wikipedia_backends import strip_wikitext
+
+XML_DUMP = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/">
+  <siteinfo><sitename>Wikipedia</sitename></siteinfo>
+  <page>
+    <title>Eiffel Tower</title><ns>0</ns><id>1</id>
+    <revision><text>The '''Eiffel Tower''' is a [[wrought iron|wrought-iron]] lattice tower in [[Paris]].{{Infobox|a={{b}}}}&lt;ref&gt;cite&lt;/ref&gt;
+== History ==
+It was built for the [[Exposition Universelle (1889)|1889 World's Fair]].</text></revision>
+  </page>
+  <page>
+    <title>Tour Eiffel</title><ns>0</ns><id>2</id><redirect title="Eiffel Tower" />
+    <revision><text>#REDIRECT [[Eiffel Tower]]</text></revision>
+  </page>
+  <page>
+    <title>Talk:Eiffel Tower</title><ns>1</ns><id>3</id>
+    <revision><text>Discussion</text></revision>
+  </page>
+  <page>
+    <title>Paris</title><ns>0</ns><id>4</id>
+    <revision><text>'''Paris''' is the capital of France and home of the tower.</text></revision>
+  </page>
+</mediawiki>
+"""
+
+
+@pytest.fixture(name="backend")
+def fixture_backend(tmp_path):
+    dump = tmp_path / "dump.xml.bz2"
+    dump.write_bytes(bz2.compress(XML_DUMP.encode()))
+    index = tmp_path / "wiki.db"
+    assert build_index(iter_xml_dump(dump), index, batch_size=2) == {"pages": 2, "redirects": 1}
+    backend = OfflineWikipediaBackend(OfflineWikipediaConfig(index_path=str(index)))
+    yield backend
+    backend.close()
+
+
+def test_strip_wikitext():
+    text = strip_wikitext("A [[b|c]] {{t|{{u}}}}''d''<ref>x</ref>\n==H==")
+    assert text == "A c d\n== H =="
+
+
+def test_strip_wikitext_keeps_headings_with_mwparserfromhell():
+    pytest.importorskip("mwparserfromhell")
+    text = strip_wikitext("Intro<ref name=a/>.\n== History ==\nBuilt in [[1889]].\n=== ''Design'' ===\nIron.")
+    assert text == "Intro.\n== History ==\nBuilt in 1889.\n=== Design ===\nIron."
+    assert split_passages(text, 200) == ["Intro.", "== History ==\nBuilt in 1889.", "=== Design ===\nIron."]
+
+
+def test_xml_dump_skips_other_namespaces(tmp_path):
+    dump = tmp_path / "dump.xml"
+    dump.write_text(XML_DUMP)
+    titles = [page.title for page in iter_xml_dump(dump)]
+    assert titles == ["Eiffel Tower", "Tour Eiffel", "Paris"]
+
+
+def test_title_lookup_is_case_insensitive(backend):
+    title, url, content = backend.page("eiffel tower")
+    assert title == "Eiffel Tower"
+    assert url == "https://en.wikipedia.org/wiki/Eiffel_Tower"
+    assert content.startswith("The Eiffel Tower is a wrought-iron lattice tower in Paris.")
+    assert "== History ==" in content
+
+
+def test_redirects_are_followed(backend):
+    assert backend.page("Tour Eiffel")[0] == "Eiffel Tower"
+
+
+def test_unknown_title_raises_page_error(backend):
+    with pytest.raises(wikipedia.exceptions.PageError):
+        backend.page("Big Ben")
+
+
+def test_search_ranks_title_matches_first(backend):
+    assert backend.search("tower", results=2) == ["Eiffel Tower", "Paris"]
+    assert backend.search("capital france", results=1) == ["Paris"]
+    # No page has both terms, so any-term matches are returned
+    assert backend.search("lattice capital", results=5) != []
+    assert backend.search("", results=1) == []
+
+
+def test_jsonl_dump(tmp_path):
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text(json.dumps({"title": "Paris", "text": "Capital of France", "url": "https://x/Paris"}) + "\n")
+    index = tmp_path / "wiki.db"
+    build_index(iter_jsonl_dump(dump), index)
+    backend = OfflineWikipediaBackend(OfflineWikipediaConfig(index_path=str(index)))
+    assert backend.page("Paris") == ("Paris", "https://x/Paris", "Capital of France")
+    backend.close()
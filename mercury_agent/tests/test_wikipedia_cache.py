@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import sqlite3
+
+from aiq_mercury_agent.wikipedia_cache import WikipediaCacheConfig
+from aiq_mercury_agent.wikipedia_cache import WikipediaPageCache
+from aiq_mercury_agent.wikipedia_cache import normalize_key
+
+URL = "https://en.wikipedia.org/wiki/Eiffel_Tower"
+
+
+def test_normalize_key():
+    assert normalize_key("  Eiffel   TOWER ") == "eiffel tower"
+
+
+def test_page_is_cached_under_topic_and_title():
+    cache = WikipediaPageCache(WikipediaCacheConfig())
+    assert cache.get("the eiffel tower") is None
+    cache.put(["the eiffel tower", "eiffel tower"], URL, "content")
+    for key in ("the eiffel tower", "eiffel tower"):
+        entry = cache.get(key)
+        assert entry.found and entry.url == URL and entry.content == "content"
+    assert cache.stats() == {"hits": 2, "disk_hits": 0, "negative_hits": 0, "misses": 1, "entries": 2}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = WikipediaPageCache(WikipediaCacheConfig(max_entries=2))
+    cache.put(["a"], URL, "a")
+    cache.put(["b"], URL, "b")
+    cache.get("a")
+    cache.put(["c"], URL, "c")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_entries_expire():
+    cache = WikipediaPageCache(WikipediaCacheConfig(ttl=-1))
+    cache.put(["a"], URL, "a")
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_negative_entries():
+    cache = WikipediaPageCache(WikipediaCacheConfig())
+    cache.put_negative("zzzz")
+    entry = cache.get("zzzz")
+    assert entry is not None and not entry.found
+    assert cache.negative_hits == 1
+
+    expired = WikipediaPageCache(WikipediaCacheConfig(negative_ttl=-1))
+    expired.put_negative("zzzz")
+    assert expired.get("zzzz") is None
+
+
+def test_persistence_survives_restart_and_is_compressed(tmp_path):
+    path = tmp_path / "wiki.db"
+    config = WikipediaCacheConfig(persist_path=str(path))
+    content = "The Eiffel Tower is a wrought-iron lattice tower. " * 200
+    cache = WikipediaPageCache(config)
+    cache.put(["eiffel tower"], URL, content)
+    cache.close()
+
+    with sqlite3.connect(str(path)) as db:
+        (stored_size, ) = db.execute("SELECT length(content) FROM pages").fetchone()
+    assert stored_size < len(content) / 10
+
+    reopened = WikipediaPageCache(config)
+    entry = reopened.get("eiffel tower")
+    assert entry.content == content and entry.url == URL
+    assert reopened.disk_hits == 1
+    # Promoted to memory, so the second lookup does not touch the disk
+    reopened.get("eiffel tower")
+    assert reopened.disk_hits == 1
+    reopened.close()
@@ -20,6 +20,7 @@ document.addEventListener('DOMContentLoaded', function() {
     let mediaRecorder = null;
     let audioChunks = [];
     let isSending = false;  // Add flag to prevent double sends
+    const sessionId = getSessionId();  // Keeps this browser's conversation separate on the agent
     
     // Event Listeners
     modelDropdown.addEventListener('change', handleModelChange);
@@ -54,6 +55,28 @@ document.addEventListener('DOMContentLoaded', function() {
     micButton.addEventListener('click', toggleRecording);
     
     // Functions
+    function getSessionId() {
+        // One id per browser, kept across reloads so the agent remembers the conversation
+        let id = null;
+        try {
+            id = localStorage.getItem('mercurySessionId');
+        } catch (e) {
+            console.warn("localStorage unavailable, session id will not survive a reload:", e);
+        }
+        if (!id) {
+            // crypto.randomUUID is only available in secure contexts (HTTPS or localhost)
+            id = (window.crypto && crypto.randomUUID)
+                ? crypto.randomUUID()
+                : Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+            try {
+                localStorage.setItem('mercurySessionId', id);
+            } catch (e) {
+                // Keep the id for this page only
+            }
+        }
+        return id;
+    }
+
     function handleModelChange() {
         selectedModel = modelDropdown.value;
         console.log("Model changed to:", selectedModel);
@@ -87,7 +110,8 @@ document.addEventListener('DOMContentLoaded', function() {
         // Prepare data for API request
         const requestData = {
             model: selectedModel,
-            message: message
+            message: message,
+            sessionId: sessionId
         };
         
         // Clear input and uploaded files
@@ -327,7 +351,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 // Prepare data for API request
                 const requestData = {
                 model: selectedModel,
-                message: data.transcription
+                message: data.transcription,
+                sessionId: sessionId
                 };
                 
                 // Show loading indicator for LLM response
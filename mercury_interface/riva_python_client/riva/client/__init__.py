@@ -4,10 +4,12 @@
 from riva.client.asr import (
     AudioChunkFileIterator,
     ASRService,
+    AsyncASRService,
     add_audio_file_specs_to_config,
     add_word_boosting_to_config,
     add_speaker_diarization_to_config,
     get_wav_file_parameters,
+    get_final_transcript,
     print_offline,
     print_streaming,
     sleep_audio_length,
@@ -2,13 +2,15 @@
 # SPDX-License-Identifier: MIT
 
 import io
+import mmap
 import os
 import sys
 import time
+import typing
 import warnings
 import wave
 from pathlib import Path
-from typing import Callable, Dict, Generator, Iterable, List, Optional, TextIO, Union
+from typing import AsyncGenerator, AsyncIterable, Callable, Dict, Generator, Iterable, List, Optional, TextIO, Union
 
 from grpc._channel import _MultiThreadedRendezvous
 
@@ -48,32 +50,146 @@ class AudioChunkFileIterator:
         input_file: Union[str, os.PathLike],
         chunk_n_frames: int,
         delay_callback: Optional[Callable[[bytes, float], None]] = None,
+        use_mmap: bool = False,
+        start_frame: int = 0,
     ) -> None:
+        """
+        Iterates over chunks of an audio file.
+
+        By default chunks are :obj:`bytes` read from a file and the first chunk also contains the file header.
+
+        If :param:`use_mmap` is :obj:`True`, then a WAV file is memory mapped, its header is skipped and chunks are
+        :obj:`memoryview` slices of the mapped audio data aligned to whole frames, so the file is not read into
+        intermediate buffers. Protobuf messages only take :obj:`bytes`, so every chunk is still copied once when its
+        request is built. As the header is not sent, sample rate, channel count and encoding have to be set in a recognition
+        config, e.g. with :func:`add_audio_file_specs_to_config` and ``encoding=AudioEncoding.LINEAR_PCM``. Chunks
+        are valid until they and the iterator are released.
+
+        Args:
+            input_file (:obj:`Union[str, os.PathLike]`): a path to an audio file.
+            chunk_n_frames (:obj:`int`): a number of frames in one chunk. For files which are not WAV files it is a
+                number of bytes.
+            delay_callback (:obj:`Callable[[bytes, float], None]`, `optional`): a function called with audio data of
+                each chunk and its duration in seconds, for example :func:`sleep_audio_length`.
+            use_mmap (:obj:`bool`, defaults to :obj:`False`): whether to yield memory mapped audio data without its
+                header. Only WAV files are supported.
+            start_frame (:obj:`int`, defaults to :obj:`0`): a frame of audio data to start from, e.g.
+                :attr:`position` of an interrupted iteration. Equivalent to calling :meth:`seek`.
+
+        Raises:
+            :obj:`ValueError`: if :param:`use_mmap` is :obj:`True` or :param:`start_frame` is not :obj:`0` and
+                :param:`input_file` is not a WAV file.
+        """
         self.input_file: Path = Path(input_file).expanduser()
         self.chunk_n_frames = chunk_n_frames
         self.delay_callback = delay_callback
         self.file_parameters = get_wav_file_parameters(self.input_file)
-        self.file_object: Optional[typing.BinaryIO] = open(str(self.input_file), 'rb')
+        self.use_mmap = use_mmap
+        self.file_object: Optional[typing.BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        if self.use_mmap:
+            if self.file_parameters is None:
+                raise ValueError(f"mmap mode is supported only for WAV files, {self.input_file} is not a WAV file")
+            with open(str(self.input_file), 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+            frame_size = self.file_parameters['sampwidth'] * self.file_parameters['nchannels']
+            data_end = min(
+                self.file_parameters['data_offset'] + self.file_parameters['nframes'] * frame_size, len(self._mmap)
+            )
+            # A truncated last frame is not sent
+            self._data_end = data_end - (data_end - self.file_parameters['data_offset']) % frame_size
+            self._mmap_offset = self.file_parameters['data_offset']
+        else:
+            self.file_object = open(str(self.input_file), 'rb')
         if self.delay_callback and self.file_parameters is None:
             warnings.warn(f"delay_callback not supported for encoding other than LINEAR_PCM")
             self.delay_callback = None
         self.first_buffer = True
+        if start_frame:
+            self.seek(start_frame)
+
+    @property
+    def frame_size(self) -> int:
+        """Bytes in one frame of a WAV file, bytes in one chunk frame (one byte) for other files."""
+        if self.file_parameters is None:
+            return 1
+        return self.file_parameters['sampwidth'] * self.file_parameters['nchannels']
+
+    @property
+    def position(self) -> int:
+        """A number of frames of audio data yielded so far. Pass it to :meth:`seek` to resume iteration."""
+        if self.file_parameters is None:
+            raise ValueError(f"Position is supported only for WAV files, {self.input_file} is not a WAV file")
+        if self.use_mmap:
+            offset = self._mmap_offset
+        elif self.file_object is not None:
+            offset = self.file_object.tell()
+        else:
+            return self.file_parameters['nframes']
+        return max(0, offset - self.file_parameters['data_offset']) // self.frame_size
+
+    def seek(self, frame: int) -> None:
+        """
+        Makes the next chunk start at :param:`frame` of audio data. The file header is not sent after a seek.
+
+        Args:
+            frame (:obj:`int`): a number of a frame counted from the start of audio data.
+
+        Raises:
+            :obj:`ValueError`: if :param:`frame` is negative or the file is not a WAV file.
+        """
+        if self.file_parameters is None:
+            raise ValueError(f"Seeking is supported only for WAV files, {self.input_file} is not a WAV file")
+        if frame < 0:
+            raise ValueError(f"Frame to seek to has to be non-negative, got {frame}")
+        offset = self.file_parameters['data_offset'] + frame * self.frame_size
+        if self.use_mmap:
+            self._mmap_offset = min(offset, self._data_end)
+        elif self.file_object is not None:
+            self.file_object.seek(offset)
+            self.first_buffer = False
 
     def close(self) -> None:
-        self.file_object.close()
-        self.file_object = None
+        if self.file_object is not None:
+            self.file_object.close()
+            self.file_object = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Yielded chunks are still referenced, the file is unmapped when they are garbage collected
+                pass
+            self._mmap = None
 
     def __enter__(self):
         return self
 
     def __exit__(self, type_, value, traceback) -> None:
-        if self.file_object is not None:
-            self.file_object.close()
+        self.close()
 
     def __iter__(self):
         return self
 
-    def __next__(self) -> bytes:
+    def _next_mmap_chunk(self) -> memoryview:
+        if self._view is None or self._mmap_offset >= self._data_end:
+            self.close()
+            raise StopIteration
+        end = min(self._mmap_offset + self.chunk_n_frames * self.frame_size, self._data_end)
+        data = self._view[self._mmap_offset : end]
+        self._mmap_offset = end
+        if self.delay_callback is not None:
+            self.delay_callback(data, len(data) / self.frame_size / self.file_parameters['framerate'])
+        return data
+
+    def __next__(self) -> Union[bytes, memoryview]:
+        if self.use_mmap:
+            return self._next_mmap_chunk()
+        if self.file_object is None:
+            raise StopIteration
         if self.file_parameters:
             data = self.file_object.read(self.chunk_n_frames * self.file_parameters['sampwidth'] * self.file_parameters['nchannels'])
         else:
@@ -339,12 +455,60 @@ def print_offline(response: rasr.RecognizeResponse) -> None:
         print("Final transcript:", final_transcript)
 
 
+def get_final_transcript(
+    results: Iterable[Union[rasr.StreamingRecognitionResult, rasr.SpeechRecognitionResult]],
+) -> Dict[str, Union[str, float, List[Dict[str, Union[str, int, float]]]]]:
+    """
+    Collects the final transcript of a recognition into a JSON serializable dictionary.
+
+    Args:
+        results (:obj:`Iterable[Union[riva.client.proto.riva_asr_pb2.StreamingRecognitionResult,
+            riva.client.proto.riva_asr_pb2.SpeechRecognitionResult]]`): results of offline recognition or of all
+            streaming responses. Partial streaming results (``is_final`` is :obj:`False`) are skipped.
+
+    Returns:
+        :obj:`dict`: a dictionary with the concatenated best ``"transcript"``, its mean ``"confidence"`` and its
+        ``"words"``. Each word is a dictionary with ``"word"``, ``"start_time"`` and ``"end_time"`` in milliseconds,
+        ``"confidence"`` and ``"speaker_tag"``. Word timings are only filled if ``enable_word_time_offsets`` is set in
+        the recognition config.
+    """
+    transcripts = []
+    confidences = []
+    words = []
+    for result in results:
+        if not result.alternatives or not getattr(result, 'is_final', True):
+            continue
+        alternative = result.alternatives[0]
+        transcripts.append(alternative.transcript)
+        confidences.append(alternative.confidence)
+        for word_info in alternative.words:
+            words.append(
+                {
+                    'word': word_info.word,
+                    'start_time': word_info.start_time,
+                    'end_time': word_info.end_time,
+                    'confidence': word_info.confidence,
+                    'speaker_tag': word_info.speaker_tag,
+                }
+            )
+    return {
+        'transcript': ''.join(transcripts).strip(),
+        'confidence': sum(confidences) / len(confidences) if confidences else 0.0,
+        'words': words,
+    }
+
+
+def _chunk_bytes(chunk: Union[bytes, memoryview]) -> bytes:
+    # Protobuf messages only take `bytes`, a memoryview of a memory mapped file is copied once into the request
+    return chunk if isinstance(chunk, bytes) else bytes(chunk)
+
+
 def streaming_request_generator(
     audio_chunks: Iterable[bytes], streaming_config: rasr.StreamingRecognitionConfig
 ) -> Generator[rasr.StreamingRecognizeRequest, None, None]:
     yield rasr.StreamingRecognizeRequest(streaming_config=streaming_config)
     for chunk in audio_chunks:
-        yield rasr.StreamingRecognizeRequest(audio_content=chunk)
+        yield rasr.StreamingRecognizeRequest(audio_content=_chunk_bytes(chunk))
 
 
 class ASRService:
@@ -443,3 +607,81 @@ class ASRService:
         request = rasr.RecognizeRequest(config=config, audio=audio_bytes)
         func = self.stub.Recognize.future if future else self.stub.Recognize
         return func(request, metadata=self.auth.get_auth_metadata())
+
+
+async def async_streaming_request_generator(
+    audio_chunks: Union[AsyncIterable[bytes], Iterable[bytes]], streaming_config: rasr.StreamingRecognitionConfig
+) -> AsyncGenerator[rasr.StreamingRecognizeRequest, None]:
+    yield rasr.StreamingRecognizeRequest(streaming_config=streaming_config)
+    if isinstance(audio_chunks, AsyncIterable):
+        async for chunk in audio_chunks:
+            yield rasr.StreamingRecognizeRequest(audio_content=_chunk_bytes(chunk))
+    else:
+        for chunk in audio_chunks:
+            yield rasr.StreamingRecognizeRequest(audio_content=_chunk_bytes(chunk))
+
+
+class AsyncASRService:
+    """
+    Provides streaming and offline recognition services for asyncio programs. Calls gRPC stubs of a ``grpc.aio``
+    channel with authentication metadata, so many recognitions can share one event loop without threads.
+    """
+    def __init__(self, auth: Auth) -> None:
+        """
+        Initializes an instance of the class. Has to be called in the event loop the service is used in.
+
+        Args:
+            auth (:obj:`riva.client.auth.Auth`): an instance of :class:`riva.client.auth.Auth` which is used for
+                authentication metadata generation and provides an asyncio channel with
+                :meth:`riva.client.auth.Auth.get_aio_channel`.
+        """
+        self.auth = auth
+        self.stub = rasr_srv.RivaSpeechRecognitionStub(self.auth.get_aio_channel())
+
+    async def streaming_response_generator(
+        self,
+        audio_chunks: Union[AsyncIterable[bytes], Iterable[bytes]],
+        streaming_config: rasr.StreamingRecognitionConfig,
+    ) -> AsyncGenerator[rasr.StreamingRecognizeResponse, None]:
+        """
+        Generates speech recognition responses for fragments of speech audio in :param:`audio_chunks` as
+        :meth:`ASRService.streaming_response_generator` does. Audio chunks are read from :param:`audio_chunks` while
+        responses are received, so an asynchronous source, for example a microphone or a network stream, is
+        recognized as it produces audio.
+
+        Args:
+            audio_chunks (:obj:`Union[AsyncIterable[bytes], Iterable[bytes]]`): an asynchronous or usual iterable
+                object which contains raw audio fragments of speech.
+            streaming_config (:obj:`riva.client.proto.riva_asr_pb2.StreamingRecognitionConfig`): a config for streaming.
+
+        Yields:
+            :obj:`riva.client.proto.riva_asr_pb2.StreamingRecognizeResponse`: responses for audio chunks in
+            :param:`audio_chunks`. Use it with ``async for``.
+        """
+        call = self.stub.StreamingRecognize(
+            async_streaming_request_generator(audio_chunks, streaming_config), metadata=self.auth.get_auth_metadata()
+        )
+        try:
+            async for response in call:
+                yield response
+        finally:
+            # Stops sending audio if the consumer leaves the loop early
+            call.cancel()
+
+    async def offline_recognize(
+        self, audio_bytes: bytes, config: rasr.RecognitionConfig
+    ) -> rasr.RecognizeResponse:
+        """
+        Performs speech recognition for raw audio in :param:`audio_bytes` as :meth:`ASRService.offline_recognize`
+        does. Await it, or wrap it in a task to run several recognitions concurrently.
+
+        Args:
+            audio_bytes (:obj:`bytes`): a raw audio.
+            config (:obj:`riva.client.proto.riva_asr_pb2.RecognitionConfig`): a config for offline speech recognition.
+
+        Returns:
+            :obj:`riva.client.proto.riva_asr_pb2.RecognizeResponse`: a response with results of :param:`audio_bytes`
+            processing.
+        """
+        request = rasr.RecognizeRequest(config=config, audio=audio_bytes)
+        return await self.stub.Recognize(request, metadata=self.auth.get_auth_metadata())
@@ -5,31 +5,56 @@ import os
 from pathlib import Path
 from typing import List, Optional, Tuple, Union
 import grpc
+import grpc.aio
 
 
-def create_channel(
-    ssl_cert: Optional[Union[str, os.PathLike]] = None, use_ssl: bool = False, uri: str = "localhost:50051", metadata: Optional[List[Tuple[str, str]]] = None,
-) -> grpc.Channel:
+def _channel_credentials(
+    ssl_cert: Optional[Union[str, os.PathLike]], use_ssl: bool, metadata: Optional[List[Tuple[str, str]]],
+) -> Optional[grpc.ChannelCredentials]:
 
     def metadata_callback(context, callback):
         callback(metadata, None)
 
-    if ssl_cert is not None or use_ssl:
-        root_certificates = None
-        if ssl_cert is not None:
-            ssl_cert = Path(ssl_cert).expanduser()
-            with open(ssl_cert, 'rb') as f:
-                root_certificates = f.read()
-        creds = grpc.ssl_channel_credentials(root_certificates)
-        if metadata:
-            auth_creds = grpc.metadata_call_credentials(metadata_callback)
-            creds = grpc.composite_channel_credentials(creds, auth_creds)
+    if ssl_cert is None and not use_ssl:
+        return None
+    root_certificates = None
+    if ssl_cert is not None:
+        ssl_cert = Path(ssl_cert).expanduser()
+        with open(ssl_cert, 'rb') as f:
+            root_certificates = f.read()
+    creds = grpc.ssl_channel_credentials(root_certificates)
+    if metadata:
+        auth_creds = grpc.metadata_call_credentials(metadata_callback)
+        creds = grpc.composite_channel_credentials(creds, auth_creds)
+    return creds
+
+
+def create_channel(
+    ssl_cert: Optional[Union[str, os.PathLike]] = None, use_ssl: bool = False, uri: str = "localhost:50051", metadata: Optional[List[Tuple[str, str]]] = None,
+) -> grpc.Channel:
+    creds = _channel_credentials(ssl_cert, use_ssl, metadata)
+    if creds is not None:
         channel = grpc.secure_channel(uri, creds)
     else:
         channel = grpc.insecure_channel(uri)
     return channel
 
 
+def create_aio_channel(
+    ssl_cert: Optional[Union[str, os.PathLike]] = None, use_ssl: bool = False, uri: str = "localhost:50051", metadata: Optional[List[Tuple[str, str]]] = None,
+) -> grpc.aio.Channel:
+    """
+    Creates an asyncio channel with the same security settings as :func:`create_channel`. The channel has to be
+    created and used in one event loop.
+    """
+    creds = _channel_credentials(ssl_cert, use_ssl, metadata)
+    if creds is not None:
+        channel = grpc.aio.secure_channel(uri, creds)
+    else:
+        channel = grpc.aio.insecure_channel(uri)
+    return channel
+
+
 class Auth:
     def __init__(
         self,
@@ -58,6 +83,25 @@ class Auth:
                     raise ValueError(f"Metadata should have 2 parameters in \"key\" \"value\" pair. Receieved {len(meta)} parameters.")
                 self.metadata.append(tuple(meta))
         self.channel: grpc.Channel = create_channel(self.ssl_cert, self.use_ssl, self.uri, self.metadata)
+        self.aio_channel: Optional[grpc.aio.Channel] = None
+
+    def get_aio_channel(self) -> grpc.aio.Channel:
+        """
+        Returns an asyncio channel to the server for :class:`riva.client.asr.AsyncASRService`. The channel is created
+        on first call, which has to happen in the event loop the channel is used in, and is shared by later calls.
+
+        Returns:
+            :obj:`grpc.aio.Channel`: an asyncio channel with the same security settings as :attr:`channel`
+        """
+        if self.aio_channel is None:
+            self.aio_channel = create_aio_channel(self.ssl_cert, self.use_ssl, self.uri, self.metadata)
+        return self.aio_channel
+
+    async def close_aio_channel(self) -> None:
+        """Closes the asyncio channel if it was created. A later :meth:`get_aio_channel` call creates a new one."""
+        if self.aio_channel is not None:
+            channel, self.aio_channel = self.aio_channel, None
+            await channel.close()
 
     def get_auth_metadata(self) -> List[Tuple[str, str]]:
         """
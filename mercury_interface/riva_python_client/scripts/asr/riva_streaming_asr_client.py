@@ -45,6 +45,37 @@ def parse_args() -> argparse.Namespace:
     return args
 
 
+def streaming_config_from_args(args: argparse.Namespace) -> riva.client.StreamingRecognitionConfig:
+    config = riva.client.StreamingRecognitionConfig(
+        config=riva.client.RecognitionConfig(
+            language_code=args.language_code,
+            model=args.model_name,
+            max_alternatives=args.max_alternatives,
+            profanity_filter=args.profanity_filter,
+            enable_automatic_punctuation=args.automatic_punctuation,
+            verbatim_transcripts=not args.no_verbatim_transcripts,
+            enable_word_time_offsets=args.word_time_offsets or args.speaker_diarization,
+        ),
+        interim_results=True,
+    )
+    riva.client.add_endpoint_parameters_to_config(
+        config,
+        args.start_history,
+        args.start_threshold,
+        args.stop_history,
+        args.stop_history_eou,
+        args.stop_threshold,
+        args.stop_threshold_eou
+    )
+    riva.client.add_custom_configuration_to_config(
+        config,
+        args.custom_configuration
+    )
+    riva.client.add_word_boosting_to_config(config, args.boosted_lm_words, args.boosted_lm_score)
+    riva.client.add_speaker_diarization_to_config(config, args.speaker_diarization, args.diarization_max_speakers)
+    return config
+
+
 def streaming_transcription_worker(
     args: argparse.Namespace, output_file: Union[str, os.PathLike], thread_i: int, exception_queue: queue.Queue
 ) -> None:
@@ -52,33 +83,7 @@ def streaming_transcription_worker(
     try:
         auth = riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata)
         asr_service = riva.client.ASRService(auth)
-        config = riva.client.StreamingRecognitionConfig(
-            config=riva.client.RecognitionConfig(
-                language_code=args.language_code,
-                model=args.model_name,
-                max_alternatives=args.max_alternatives,
-                profanity_filter=args.profanity_filter,
-                enable_automatic_punctuation=args.automatic_punctuation,
-                verbatim_transcripts=not args.no_verbatim_transcripts,
-                enable_word_time_offsets=args.word_time_offsets or args.speaker_diarization,
-            ),
-            interim_results=True,
-        )
-        riva.client.add_endpoint_parameters_to_config(
-            config,
-            args.start_history,
-            args.start_threshold,
-            args.stop_history,
-            args.stop_history_eou,
-            args.stop_threshold,
-            args.stop_threshold_eou
-        )
-        riva.client.add_custom_configuration_to_config(
-            config,
-            args.custom_configuration
-        )
-        riva.client.add_word_boosting_to_config(config, args.boosted_lm_words, args.boosted_lm_score)
-        riva.client.add_speaker_diarization_to_config(config, args.speaker_diarization, args.diarization_max_speakers)
+        config = streaming_config_from_args(args)
         for _ in range(args.num_iterations):
             with riva.client.AudioChunkFileIterator(
                 args.input_file,
@@ -0,0 +1,314 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import grpc
+
+import riva.client
+from riva.client.argparse_utils import add_asr_config_argparse_parameters, add_connection_argparse_parameters
+
+try:
+    from scripts.asr.riva_streaming_asr_client import streaming_config_from_args
+except ImportError:
+    # Run as `python scripts/asr/riva_streaming_asr_load.py`, the script's directory is on the path
+    from riva_streaming_asr_client import streaming_config_from_args
+
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Streaming transcription load generator for Riva AI Services. Like "
+        "`scripts/asr/riva_streaming_asr_client.py` script it streams a file in several threads, but the number of "
+        "concurrent streams follows a ramp schedule and every stream is measured: time to the first partial "
+        "transcript, latency of the final transcript after the end of audio and throughput in audio seconds per "
+        "wall second. A percentile summary is printed and all measurements are written to a JSON report.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--input-file", required=True, type=str, help="Name of the WAV file with LINEAR_PCM encoding to transcribe."
+    )
+    parser.add_argument(
+        "--ramp",
+        default="1:10",
+        help="Ramp schedule as comma separated `<streams>:<seconds>` stages, e.g. `1:10,4:20,8:30`. During a stage "
+        "<streams> streams run concurrently, each one starting a new stream on the file when the previous one ends.",
+    )
+    parser.add_argument(
+        "--feed",
+        default="realtime",
+        choices=["realtime", "max"],
+        help="Whether audio is sent at the pace of speech or as fast as a server accepts it.",
+    )
+    parser.add_argument(
+        "--file-streaming-chunk", type=int, default=1600, help="Number of frames in one chunk sent to server."
+    )
+    parser.add_argument(
+        "--num-channels", type=int, default=1, help="Number of gRPC channels streams are spread over."
+    )
+    parser.add_argument("--report", default="asr_load_report.json", help="A path of the JSON report.")
+    parser = add_connection_argparse_parameters(parser)
+    parser = add_asr_config_argparse_parameters(parser, max_alternatives=True, profanity_filter=True, word_time_offsets=True)
+    return parser.parse_args()
+
+
+def parse_ramp(ramp: str) -> List[Tuple[int, float]]:
+    """
+    Parses a ramp schedule.
+
+    Args:
+        ramp (:obj:`str`): comma separated ``<streams>:<seconds>`` stages.
+
+    Returns:
+        :obj:`List[Tuple[int, float]]`: a number of concurrent streams and a duration of each stage.
+
+    Raises:
+        :obj:`ValueError`: if a stage is malformed or has negative values.
+    """
+    stages = []
+    for stage in ramp.split(','):
+        try:
+            streams, seconds = stage.split(':')
+            stages.append((int(streams), float(seconds)))
+        except ValueError:
+            raise ValueError(f"Invalid ramp stage '{stage}', expected <streams>:<seconds>")
+        if stages[-1][0] < 0 or stages[-1][1] < 0:
+            raise ValueError(f"Invalid ramp stage '{stage}', streams and seconds have to be non-negative")
+    return stages
+
+
+def target_streams(stages: List[Tuple[int, float]], elapsed: float) -> int:
+    """Returns a number of concurrent streams of a ramp schedule :param:`elapsed` seconds after its start."""
+    for streams, seconds in stages:
+        if elapsed < seconds:
+            return streams
+        elapsed -= seconds
+    return 0
+
+
+def _percentile(values: List[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(percentile / 100 * len(values)) - 1)]
+
+
+def _timed_chunks(chunks: Iterable[bytes], stream: Dict[str, Any]) -> Iterator[bytes]:
+    # gRPC pulls chunks when it can send them, so the iterator running dry marks the end of audio
+    yield from chunks
+    stream['audio_end'] = time.perf_counter()
+
+
+def run_stream(
+    asr_service: riva.client.ASRService,
+    streaming_config: riva.client.StreamingRecognitionConfig,
+    input_file: Union[str, os.PathLike],
+    chunk_n_frames: int = 1600,
+    realtime: bool = True,
+) -> Dict[str, Any]:
+    """
+    Streams a WAV file and measures the stream.
+
+    Audio data is memory mapped and sent without the file header, so sample rate, channel count and encoding are set
+    in a copy of :param:`streaming_config`.
+
+    Args:
+        asr_service (:obj:`riva.client.ASRService`): a service the stream is sent with.
+        streaming_config (:obj:`riva.client.proto.riva_asr_pb2.StreamingRecognitionConfig`): a config for streaming.
+            Set ``interim_results`` to receive partial transcripts.
+        input_file (:obj:`Union[str, os.PathLike]`): a WAV file with LINEAR_PCM encoding.
+        chunk_n_frames (:obj:`int`, defaults to :obj:`1600`): frames in one chunk.
+        realtime (:obj:`bool`, defaults to :obj:`True`): whether chunks are sent at the pace of speech.
+
+    Returns:
+        :obj:`Dict[str, Any]`: ``"audio_duration_s"``, ``"first_partial_ms"`` (from opening the stream to the first
+        response with a transcript), ``"final_latency_ms"`` (from the end of audio to the last final transcript),
+        ``"wall_s"``, ``"throughput"`` in audio seconds per wall second, ``"transcript"`` and ``"error"``.
+    """
+    config = riva.client.StreamingRecognitionConfig()
+    config.CopyFrom(streaming_config)
+    config.config.encoding = riva.client.AudioEncoding.LINEAR_PCM
+    riva.client.add_audio_file_specs_to_config(config, input_file)
+    duration = riva.client.get_wav_file_parameters(input_file)['duration']
+    stream: Dict[str, Any] = {'audio_end': None}
+    record: Dict[str, Any] = {
+        'audio_duration_s': duration, 'first_partial_ms': None, 'final_latency_ms': None, 'transcript': '', 'error': None
+    }
+    last_final = None
+    start = time.perf_counter()
+    try:
+        with riva.client.AudioChunkFileIterator(
+            input_file,
+            chunk_n_frames,
+            delay_callback=riva.client.sleep_audio_length if realtime else None,
+            use_mmap=True,
+        ) as audio_chunk_iterator:
+            for response in asr_service.streaming_response_generator(
+                _timed_chunks(audio_chunk_iterator, stream), config
+            ):
+                now = time.perf_counter()
+                for result in response.results:
+                    if not result.alternatives or not result.alternatives[0].transcript:
+                        continue
+                    if record['first_partial_ms'] is None:
+                        record['first_partial_ms'] = (now - start) * 1000
+                    if result.is_final:
+                        last_final = now
+                        record['transcript'] += result.alternatives[0].transcript
+    except grpc.RpcError as e:
+        record['error'] = f"{e.code().name}: {e.details()}"
+    end = time.perf_counter()
+    if stream['audio_end'] is not None and record['error'] is None:
+        # A server may end a stream without a final transcript, e.g. for silence
+        record['final_latency_ms'] = ((last_final or end) - stream['audio_end']) * 1000
+    record['transcript'] = record['transcript'].strip()
+    record['wall_s'] = end - start
+    record['throughput'] = duration / record['wall_s'] if record['wall_s'] else None
+    return record
+
+
+def run_load(
+    asr_services: List[riva.client.ASRService],
+    streaming_config: riva.client.StreamingRecognitionConfig,
+    input_file: Union[str, os.PathLike],
+    stages: List[Tuple[int, float]],
+    chunk_n_frames: int = 1600,
+    realtime: bool = True,
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Runs streams following a ramp schedule. Every stream slot is a thread which starts a new stream as soon as its
+    previous stream ends while the schedule asks for more streams than the slot's index. Streams running when their
+    stage ends are completed.
+
+    Args:
+        asr_services (:obj:`List[riva.client.ASRService]`): services streams are spread over, e.g. with own channels.
+        streaming_config (:obj:`riva.client.proto.riva_asr_pb2.StreamingRecognitionConfig`): a config for streaming.
+        input_file (:obj:`Union[str, os.PathLike]`): a WAV file with LINEAR_PCM encoding.
+        stages (:obj:`List[Tuple[int, float]]`): a ramp schedule as returned by :func:`parse_ramp`.
+        chunk_n_frames (:obj:`int`, defaults to :obj:`1600`): frames in one chunk.
+        realtime (:obj:`bool`, defaults to :obj:`True`): whether chunks are sent at the pace of speech.
+
+    Returns:
+        :obj:`Tuple[List[Dict[str, Any]], float]`: records of :func:`run_stream` with ``"stream"``, ``"slot"``,
+        ``"start_s"`` and ``"concurrency"`` (streams running when it started) added, in start order, and wall time
+        of the whole load in seconds.
+    """
+    schedule_s = sum(seconds for _, seconds in stages)
+    slots = max((streams for streams, _ in stages), default=0)
+    records: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    running = [0]
+    start = time.perf_counter()
+
+    def slot_worker(slot: int) -> None:
+        asr_service = asr_services[slot % len(asr_services)]
+        while True:
+            elapsed = time.perf_counter() - start
+            if elapsed >= schedule_s:
+                return
+            if target_streams(stages, elapsed) <= slot:
+                time.sleep(min(0.01, schedule_s - elapsed))
+                continue
+            with lock:
+                running[0] += 1
+                concurrency = running[0]
+            record = run_stream(asr_service, streaming_config, input_file, chunk_n_frames, realtime)
+            record.update(slot=slot, start_s=elapsed, concurrency=concurrency)
+            with lock:
+                running[0] -= 1
+                records.append(record)
+
+    threads = [threading.Thread(target=slot_worker, args=[slot], daemon=True) for slot in range(slots)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall_s = time.perf_counter() - start
+    records.sort(key=lambda r: r['start_s'])
+    for i, record in enumerate(records):
+        record['stream'] = i
+    return records, wall_s
+
+
+def summarize(records: List[Dict[str, Any]], wall_s: float) -> Dict[str, Any]:
+    """
+    Summarizes stream records of :func:`run_load`.
+
+    Returns:
+        :obj:`Dict[str, Any]`: counts of streams and errors, the largest concurrency, audio seconds per wall second of
+        the whole load and percentiles, mean and maximum of time to first partial, final latency and per stream
+        throughput over successful streams.
+    """
+    ok = [r for r in records if r['error'] is None]
+    summary: Dict[str, Any] = {
+        'streams': len(records),
+        'errors': len(records) - len(ok),
+        'max_concurrency': max((r['concurrency'] for r in records), default=0),
+        'wall_s': wall_s,
+        'audio_s': sum(r['audio_duration_s'] for r in ok),
+    }
+    summary['audio_s_per_wall_s'] = summary['audio_s'] / wall_s if wall_s else None
+    for metric in ('first_partial_ms', 'final_latency_ms', 'throughput'):
+        values = [r[metric] for r in ok if r[metric] is not None]
+        summary[metric] = {f'p{p}': _percentile(values, p) for p in PERCENTILES}
+        summary[metric]['mean'] = sum(values) / len(values) if values else None
+        summary[metric]['max'] = max(values, default=None)
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print(
+        f"Streams: {summary['streams']}, errors: {summary['errors']}, max concurrency: {summary['max_concurrency']}, "
+        f"wall time: {summary['wall_s']:.2f} s, audio: {summary['audio_s']:.2f} s "
+        f"({summary['audio_s_per_wall_s'] or 0:.2f} audio s per wall s)"
+    )
+    header = '{: <22s}' + '{: >10s}' * (len(PERCENTILES) + 2)
+    print(header.format('Metric', *[f'p{p}' for p in PERCENTILES], 'mean', 'max'))
+    for metric, name in (
+        ('first_partial_ms', 'First partial (ms)'),
+        ('final_latency_ms', 'Final latency (ms)'),
+        ('throughput', 'Throughput (x RT)'),
+    ):
+        values = [summary[metric][f'p{p}'] for p in PERCENTILES] + [summary[metric]['mean'], summary[metric]['max']]
+        print(f'{name: <22s}' + ''.join(f'{v: >10.2f}' if v is not None else f'{"-": >10s}' for v in values))
+
+
+def main() -> None:
+    args = parse_args()
+    stages = parse_ramp(args.ramp)
+    if riva.client.get_wav_file_parameters(args.input_file) is None:
+        print(f"Invalid input file, a WAV file is expected: {args.input_file}")
+        return
+    asr_services = [
+        riva.client.ASRService(riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata))
+        for _ in range(max(1, args.num_channels))
+    ]
+    config = streaming_config_from_args(args)
+    records, wall_s = run_load(
+        asr_services, config, args.input_file, stages, args.file_streaming_chunk, args.feed == "realtime"
+    )
+    summary = summarize(records, wall_s)
+    print_summary(summary)
+    report = {
+        'input_file': str(args.input_file),
+        'server': args.server,
+        'ramp': stages,
+        'feed': args.feed,
+        'summary': summary,
+        'streams': records,
+    }
+    Path(args.report).expanduser().write_text(json.dumps(report, indent=2))
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -43,6 +43,20 @@ def parse_args() -> argparse.Namespace:
         default=1600,
         help="A maximum number of frames in one chunk sent to server.",
     )
+    parser.add_argument(
+        "--use-mmap",
+        action='store_true',
+        help="Memory map a WAV file and stream its audio data without header instead of reading it into buffers. "
+        "Each chunk is still copied once into its request. Sample rate, channel count and encoding are sent in the "
+        "recognition config.",
+    )
+    parser.add_argument(
+        "--start-frame",
+        type=int,
+        default=0,
+        help="A frame of audio data to start streaming from, e.g. to resume an interrupted transcription of a WAV "
+        "file. The file header is not sent.",
+    )
     parser.add_argument(
         "--simulate-realtime",
         action='store_true',
@@ -101,6 +115,10 @@ def main() -> None:
         ),
         interim_results=True,
     )
+    if args.use_mmap or args.start_frame:
+        # Audio data is sent without the WAV header
+        config.config.encoding = riva.client.AudioEncoding.LINEAR_PCM
+        riva.client.add_audio_file_specs_to_config(config, args.input_file)
     riva.client.add_word_boosting_to_config(config, args.boosted_lm_words, args.boosted_lm_score)
     riva.client.add_speaker_diarization_to_config(config, args.speaker_diarization, args.diarization_max_speakers)
     riva.client.add_endpoint_parameters_to_config(
@@ -127,7 +145,7 @@ def main() -> None:
         else:
             delay_callback = riva.client.sleep_audio_length if args.simulate_realtime else None
         with riva.client.AudioChunkFileIterator(
-            args.input_file, args.file_streaming_chunk, delay_callback,
+            args.input_file, args.file_streaming_chunk, delay_callback, args.use_mmap, args.start_frame,
         ) as audio_chunk_iterator:
             riva.client.print_streaming(
                 responses=asr_service.streaming_response_generator(
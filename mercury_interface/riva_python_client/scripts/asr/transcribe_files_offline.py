@@ -0,0 +1,393 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import argparse
+import json
+import os
+import queue
+import re
+import time
+import wave
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple, Union
+
+import grpc
+
+import riva.client
+from riva.client.argparse_utils import add_asr_config_argparse_parameters, add_connection_argparse_parameters
+
+
+AUDIO_FILE_EXTENSIONS = ('.wav', '.flac', '.ogg', '.opus')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Bulk offline transcription of many files via Riva AI Services. Files are sent with offline "
+        "recognition keeping up to `--max-in-flight` requests in flight. WAV files longer than `--segment-seconds` "
+        "are split into overlapping segments whose transcripts are stitched together. A JSON line with transcript, "
+        "latency and real time factor is appended to `--output` as soon as a file is done, and files already "
+        "transcribed successfully in `--output` are skipped, so an interrupted run can be resumed by repeating it.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "--input-dir", type=Path, help=f"A directory searched recursively for {', '.join(AUDIO_FILE_EXTENSIONS)} files."
+    )
+    group.add_argument(
+        "--manifest",
+        type=Path,
+        help="A file listing audio files, either one path per line or JSON lines with an `audio_filepath` field. "
+        "Relative paths are relative to the manifest.",
+    )
+    parser.add_argument("--output", type=Path, required=True, help="A JSON lines file results are appended to.")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Maximum number of concurrent requests.")
+    parser.add_argument(
+        "--segment-seconds",
+        type=float,
+        default=300.0,
+        help="WAV files longer than this are split into segments of this length. 0 disables splitting.",
+    )
+    parser.add_argument(
+        "--segment-overlap", type=float, default=5.0, help="Seconds of audio shared by consecutive segments."
+    )
+    parser = add_connection_argparse_parameters(parser)
+    parser = add_asr_config_argparse_parameters(parser, profanity_filter=True)
+    return parser.parse_args()
+
+
+def list_audio_files(
+    input_dir: Optional[Union[str, os.PathLike]] = None, manifest: Optional[Union[str, os.PathLike]] = None
+) -> List[Path]:
+    """
+    Lists audio files of a directory or a manifest.
+
+    Args:
+        input_dir (:obj:`Union[str, os.PathLike]`, `optional`): a directory searched recursively for files with
+            extensions from :data:`AUDIO_FILE_EXTENSIONS`.
+        manifest (:obj:`Union[str, os.PathLike]`, `optional`): a file with one path per line or JSON lines with an
+            ``audio_filepath`` field. Relative paths are resolved against the directory of the manifest.
+
+    Returns:
+        :obj:`List[pathlib.Path]`: audio files in a stable order without duplicates.
+    """
+    if input_dir is not None:
+        input_dir = Path(input_dir).expanduser()
+        return sorted(p for p in input_dir.rglob('*') if p.is_file() and p.suffix.lower() in AUDIO_FILE_EXTENSIONS)
+    manifest = Path(manifest).expanduser()
+    files = []
+    with manifest.open() as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            path = Path(json.loads(line)['audio_filepath'] if line.startswith('{') else line).expanduser()
+            files.append(path if path.is_absolute() else manifest.parent / path)
+    return list(dict.fromkeys(files))
+
+
+def completed_files(output: Union[str, os.PathLike]) -> Set[str]:
+    """
+    Reads files transcribed successfully by an earlier run from its output.
+
+    Args:
+        output (:obj:`Union[str, os.PathLike]`): a JSON lines file written by :func:`transcribe_files`.
+
+    Returns:
+        :obj:`Set[str]`: ``audio_filepath`` values of records whose ``status`` is ``"ok"``. Unreadable lines, e.g. a
+        line cut off by an interrupted run, are ignored.
+    """
+    output = Path(output)
+    done = set()
+    if not output.exists():
+        return done
+    with output.open() as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('status') == 'ok':
+                done.add(record['audio_filepath'])
+    return done
+
+
+def plan_segments(nframes: int, framerate: int, segment_seconds: float, overlap_seconds: float) -> List[Tuple[int, int]]:
+    """
+    Splits audio into overlapping segments.
+
+    Args:
+        nframes (:obj:`int`): a number of frames of audio.
+        framerate (:obj:`int`): frames per second.
+        segment_seconds (:obj:`float`): a maximum length of a segment. If not positive, then audio is not split.
+        overlap_seconds (:obj:`float`): a length of audio shared by consecutive segments.
+
+    Returns:
+        :obj:`List[Tuple[int, int]]`: first frame and frame after the last one of each segment.
+
+    Raises:
+        :obj:`ValueError`: if overlap is not shorter than a segment.
+    """
+    segment = int(segment_seconds * framerate)
+    if segment <= 0 or nframes <= segment:
+        return [(0, nframes)]
+    overlap = int(overlap_seconds * framerate)
+    if not 0 <= overlap < segment:
+        raise ValueError(f"Segment overlap {overlap_seconds} s has to be shorter than a segment {segment_seconds} s")
+    return [(start, min(start + segment, nframes)) for start in range(0, nframes - overlap, segment - overlap)]
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r'[^\w]', '', word.lower())
+
+
+def merge_transcripts(first: str, second: str, max_overlap_words: int = 50) -> str:
+    """
+    Joins transcripts of overlapping audio without timings, dropping the longest run of words ending
+    :param:`first` which also starts :param:`second`.
+    """
+    first_words = first.split()
+    second_words = second.split()
+    for n in range(min(len(first_words), len(second_words), max_overlap_words), 0, -1):
+        if [_normalize_word(w) for w in first_words[-n:]] == [_normalize_word(w) for w in second_words[:n]]:
+            second_words = second_words[n:]
+            break
+    return ' '.join(first_words + second_words)
+
+
+def stitch_segments(segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Stitches transcripts of overlapping segments into a transcript of a whole file.
+
+    Every overlap is cut in its middle: a word is taken from the segment in which its middle lies before the cut, so
+    words heard in both segments are kept once. If a segment lacks word timings, then transcripts are joined by
+    :func:`merge_transcripts`.
+
+    Args:
+        segments (:obj:`List[Dict[str, Any]]`): results of :func:`riva.client.get_final_transcript` for consecutive
+            segments with added ``"start_ms"`` and ``"end_ms"`` of a segment in a file.
+
+    Returns:
+        :obj:`Dict[str, Any]`: a ``"transcript"`` and ``"words"`` with timings in milliseconds from the start of a file.
+    """
+    if len(segments) == 1:
+        return {'transcript': segments[0]['transcript'], 'words': segments[0]['words']}
+    if any(segment['transcript'] and not segment['words'] for segment in segments):
+        transcript = ''
+        for segment in segments:
+            transcript = merge_transcripts(transcript, segment['transcript'])
+        return {'transcript': transcript, 'words': []}
+    words = []
+    for i, segment in enumerate(segments):
+        cut_from = (segment['start_ms'] + segments[i - 1]['end_ms']) / 2 if i > 0 else float('-inf')
+        cut_to = (segments[i + 1]['start_ms'] + segment['end_ms']) / 2 if i + 1 < len(segments) else float('inf')
+        for word in segment['words']:
+            word = dict(
+                word, start_time=word['start_time'] + segment['start_ms'], end_time=word['end_time'] + segment['start_ms']
+            )
+            if cut_from <= (word['start_time'] + word['end_time']) / 2 < cut_to:
+                words.append(word)
+    return {'transcript': ' '.join(word['word'] for word in words), 'words': words}
+
+
+class _FileState:
+    def __init__(self, path: Path, n_segments: int, duration: Optional[float]) -> None:
+        self.path = path
+        self.duration = duration
+        self.segments: List[Optional[Dict[str, Any]]] = [None] * n_segments
+        self.pending = n_segments
+        self.error: Optional[str] = None
+        self.start = time.perf_counter()
+
+
+def _segment_requests(
+    files: List[Path],
+    config: riva.client.RecognitionConfig,
+    segment_seconds: float,
+    overlap_seconds: float,
+    on_finished: Callable[[_FileState], None],
+) -> Generator[Tuple[_FileState, int, bytes, riva.client.RecognitionConfig], None, None]:
+    # Audio is read segment by segment when a request can be sent, so long files are never held in memory at once
+    for path in files:
+        state = None
+        sent = 0
+        try:
+            wav_parameters = riva.client.get_wav_file_parameters(path)
+            if wav_parameters is None:
+                state = _FileState(path, 1, None)
+                state.segments[0] = {'start_ms': 0, 'end_ms': 0}
+                audio = path.read_bytes()
+                sent = 1
+                yield state, 0, audio, config
+                continue
+            framerate = wav_parameters['framerate']
+            segments = plan_segments(wav_parameters['nframes'], framerate, segment_seconds, overlap_seconds)
+            segment_config = riva.client.RecognitionConfig()
+            segment_config.CopyFrom(config)
+            # Segments are sent as raw audio data without a WAV header
+            segment_config.encoding = riva.client.AudioEncoding.LINEAR_PCM
+            segment_config.sample_rate_hertz = framerate
+            segment_config.audio_channel_count = wav_parameters['nchannels']
+            state = _FileState(path, len(segments), wav_parameters['duration'])
+            with wave.open(str(path), 'rb') as wf:
+                for i, (start, end) in enumerate(segments):
+                    state.segments[i] = {'start_ms': start * 1000 / framerate, 'end_ms': end * 1000 / framerate}
+                    wf.setpos(start)
+                    audio = wf.readframes(end - start)
+                    sent += 1
+                    yield state, i, audio, segment_config
+        except (OSError, wave.Error, EOFError, ValueError) as e:
+            if state is None:
+                state = _FileState(path, 0, None)
+            state.error = f"Could not read audio: {e}"
+            # Segments which were not sent will not finish
+            state.pending -= len(state.segments) - sent
+            if state.pending == 0:
+                on_finished(state)
+
+
+def _file_record(state: _FileState) -> Dict[str, Any]:
+    latency_ms = (time.perf_counter() - state.start) * 1000
+    record = {'audio_filepath': str(state.path), 'duration_s': state.duration, 'latency_ms': latency_ms}
+    if state.error is not None:
+        record.update(status='error', error=state.error)
+        return record
+    record.update(stitch_segments(state.segments))
+    record.update(
+        status='ok',
+        segments=len(state.segments),
+        real_time_factor=latency_ms / 1000 / state.duration if state.duration else None,
+    )
+    return record
+
+
+def transcribe_files(
+    asr_service: riva.client.ASRService,
+    config: riva.client.RecognitionConfig,
+    files: List[Union[str, os.PathLike]],
+    output: Union[str, os.PathLike],
+    max_in_flight: int = 8,
+    segment_seconds: float = 300.0,
+    overlap_seconds: float = 5.0,
+) -> Dict[str, Any]:
+    """
+    Transcribes files with offline recognition and appends a JSON line per file to :param:`output`.
+
+    Requests are sent with ``offline_recognize(..., future=True)`` and up to :param:`max_in_flight` of them are in
+    flight at a time. A record is written as soon as all segments of a file are recognized, so records follow the
+    order in which files finish. Latency of a file is measured from sending its first segment until its last segment
+    is recognized.
+
+    Args:
+        asr_service (:obj:`riva.client.ASRService`): a service sending requests.
+        config (:obj:`riva.client.proto.riva_asr_pb2.RecognitionConfig`): a recognition config. Set
+            ``enable_word_time_offsets`` for the stitching of segments to use word timings.
+        files (:obj:`List[Union[str, os.PathLike]]`): audio files. Files with successful records in :param:`output`
+            are skipped.
+        output (:obj:`Union[str, os.PathLike]`): a JSON lines file results are appended to.
+        max_in_flight (:obj:`int`, defaults to :obj:`8`): a maximum number of concurrent requests.
+        segment_seconds (:obj:`float`, defaults to :obj:`300.0`): a maximum length of a segment of a WAV file.
+        overlap_seconds (:obj:`float`, defaults to :obj:`5.0`): a length of audio shared by consecutive segments.
+
+    Returns:
+        :obj:`Dict[str, Any]`: counts of transcribed, failed and skipped files, audio seconds transcribed, wall time
+        and throughput in audio seconds per wall second.
+    """
+    if max_in_flight < 1:
+        raise ValueError(f"`max_in_flight` has to be positive, got {max_in_flight}")
+    output = Path(output).expanduser()
+    done = completed_files(output)
+    todo = [Path(f) for f in files if str(f) not in done]
+    summary = {'files': len(todo), 'ok': 0, 'errors': 0, 'skipped': len(files) - len(todo), 'audio_seconds': 0.0}
+    finished: queue.Queue = queue.Queue()
+    start = time.perf_counter()
+    if output.exists() and output.stat().st_size > 0:
+        with output.open('rb') as f:
+            f.seek(-1, os.SEEK_END)
+            ends_mid_line = f.read(1) != b'\n'
+    else:
+        ends_mid_line = False
+    with output.open('a') as out:
+        if ends_mid_line:
+            # An interrupted run left a partial line, the next record starts on a new one
+            out.write('\n')
+
+        def write(state: _FileState) -> None:
+            record = _file_record(state)
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+            if record['status'] == 'ok':
+                summary['ok'] += 1
+                summary['audio_seconds'] += record['duration_s'] or 0.0
+            else:
+                summary['errors'] += 1
+            print(f"{record['status']}: {record['audio_filepath']} ({record['latency_ms']:.0f} ms)")
+
+        requests = _segment_requests(todo, config, segment_seconds, overlap_seconds, write)
+        in_flight = 0
+        exhausted = False
+        while True:
+            while not exhausted and in_flight < max_in_flight:
+                request = next(requests, None)
+                if request is None:
+                    exhausted = True
+                    break
+                state, index, audio, request_config = request
+                future = asr_service.offline_recognize(audio, request_config, future=True)
+                in_flight += 1
+                future.add_done_callback(lambda f, state=state, index=index: finished.put((state, index, f)))
+            if in_flight == 0:
+                break
+            state, index, future = finished.get()
+            in_flight -= 1
+            try:
+                state.segments[index].update(riva.client.get_final_transcript(future.result().results))
+            except grpc.RpcError as e:
+                if state.error is None:
+                    state.error = f"Segment {index}: {e.details()}"
+            state.pending -= 1
+            if state.pending == 0:
+                write(state)
+    summary['wall_seconds'] = time.perf_counter() - start
+    summary['audio_seconds_per_second'] = (
+        summary['audio_seconds'] / summary['wall_seconds'] if summary['wall_seconds'] else 0.0
+    )
+    return summary
+
+
+def main() -> None:
+    args = parse_args()
+    files = list_audio_files(args.input_dir, args.manifest)
+    auth = riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata)
+    asr_service = riva.client.ASRService(auth)
+    config = riva.client.RecognitionConfig(
+        language_code=args.language_code,
+        model=args.model_name,
+        max_alternatives=1,
+        profanity_filter=args.profanity_filter,
+        enable_automatic_punctuation=args.automatic_punctuation,
+        verbatim_transcripts=not args.no_verbatim_transcripts,
+        enable_word_time_offsets=True,
+    )
+    riva.client.add_word_boosting_to_config(config, args.boosted_lm_words, args.boosted_lm_score)
+    riva.client.add_speaker_diarization_to_config(config, args.speaker_diarization, args.diarization_max_speakers)
+    riva.client.add_endpoint_parameters_to_config(
+        config,
+        args.start_history,
+        args.start_threshold,
+        args.stop_history,
+        args.stop_history_eou,
+        args.stop_threshold,
+        args.stop_threshold_eou
+    )
+    riva.client.add_custom_configuration_to_config(
+        config,
+        args.custom_configuration
+    )
+    summary = transcribe_files(
+        asr_service, config, files, args.output, args.max_in_flight, args.segment_seconds, args.segment_overlap
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
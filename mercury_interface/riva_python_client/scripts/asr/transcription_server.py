@@ -0,0 +1,334 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import argparse
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import grpc
+
+import riva.client
+from riva.client.argparse_utils import add_asr_config_argparse_parameters, add_connection_argparse_parameters
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Resident transcription service. Unlike `scripts/asr/transcribe_file.py` script, this script "
+        "keeps one warm channel to Riva AI Services and transcribes audio files posted to it over HTTP (TCP or a "
+        "Unix socket), returning the final transcript, word timings and request timings as JSON. "
+        "`POST /transcribe` accepts either a WAV file as request body or a JSON body `{\"path\": \"...\"}` naming a "
+        "local file. Paths are accepted only on a Unix socket or inside `--allowed-dir`. `GET /health` reports the "
+        "state of the service.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address the HTTP server listens on.")
+    parser.add_argument("--port", default=8766, type=int, help="Port the HTTP server listens on.")
+    parser.add_argument(
+        "--unix-socket", help="Path of a Unix socket to listen on instead of `--host` and `--port`."
+    )
+    parser.add_argument(
+        "--allowed-dir",
+        help="A directory whose files can be transcribed by `path`. Without it, `path` requests are accepted only on "
+        "`--unix-socket`, and then for any file readable by the service.",
+    )
+    parser.add_argument(
+        "--mode",
+        default="streaming",
+        choices=["streaming", "offline"],
+        help="Whether audio is sent to a server with streaming or offline recognition.",
+    )
+    parser.add_argument(
+        "--file-streaming-chunk",
+        type=int,
+        default=1600,
+        help="A maximum number of frames in one chunk sent to server in streaming mode.",
+    )
+    parser.add_argument(
+        "--warmup-timeout",
+        type=float,
+        default=10.0,
+        help="Seconds to wait for the channel to a server to connect on start. 0 disables waiting.",
+    )
+    parser = add_connection_argparse_parameters(parser)
+    parser = add_asr_config_argparse_parameters(parser, profanity_filter=True)
+    return parser.parse_args()
+
+
+def _wav_parameters(audio: bytes) -> Optional[Dict[str, int]]:
+    try:
+        with wave.open(io.BytesIO(audio), 'rb') as wf:
+            return {
+                'nframes': wf.getnframes(),
+                'framerate': wf.getframerate(),
+                'nchannels': wf.getnchannels(),
+                'sampwidth': wf.getsampwidth(),
+            }
+    except (wave.Error, EOFError):
+        # Not a WAV file, a server has to detect the encoding itself
+        return None
+
+
+class TranscriptionService:
+    """Transcribes audio with one :class:`riva.client.ASRService` shared by all requests."""
+    def __init__(
+        self,
+        asr_service: riva.client.ASRService,
+        config: riva.client.RecognitionConfig,
+        mode: str = "streaming",
+        chunk_n_frames: int = 1600,
+    ) -> None:
+        """
+        Initializes an instance of the class.
+
+        Args:
+            asr_service (:obj:`riva.client.ASRService`): a service whose channel is reused by every request.
+            config (:obj:`riva.client.proto.riva_asr_pb2.RecognitionConfig`): a recognition config. Sample rate and
+                channel count are taken from the header of every WAV file.
+            mode (:obj:`str`, defaults to :obj:`"streaming"`): :obj:`"streaming"` or :obj:`"offline"` recognition.
+            chunk_n_frames (:obj:`int`, defaults to :obj:`1600`): frames in one chunk of streaming recognition.
+        """
+        if mode not in ("streaming", "offline"):
+            raise ValueError(f"Not allowed value '{mode}' of parameter `mode`. Allowed values are streaming, offline")
+        self.asr_service = asr_service
+        self.config = config
+        self.mode = mode
+        self.chunk_n_frames = chunk_n_frames
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _request_config(self, wav_parameters: Optional[Dict[str, int]]) -> riva.client.RecognitionConfig:
+        config = riva.client.RecognitionConfig()
+        config.CopyFrom(self.config)
+        if wav_parameters is not None:
+            config.sample_rate_hertz = wav_parameters['framerate']
+            config.audio_channel_count = wav_parameters['nchannels']
+        return config
+
+    def transcribe(self, audio: bytes) -> Dict[str, Any]:
+        """
+        Transcribes audio file contents.
+
+        Args:
+            audio (:obj:`bytes`): contents of an audio file, for example a WAV file with LINEAR_PCM encoding.
+
+        Returns:
+            :obj:`dict`: the final transcript, its confidence and words as returned by
+            :func:`riva.client.get_final_transcript` and ``"timings"``: audio duration, time to the first response,
+            total processing time and real time factor (processing time divided by audio duration).
+
+        Raises:
+            :obj:`grpc.RpcError`: if recognition fails on a server.
+        """
+        first_response_ms = None
+        start = time.perf_counter()
+        try:
+            wav_parameters = _wav_parameters(audio)
+            config = self._request_config(wav_parameters)
+            if self.mode == "offline":
+                response = self.asr_service.offline_recognize(audio, config)
+                first_response_ms = (time.perf_counter() - start) * 1000
+                result = riva.client.get_final_transcript(response.results)
+            else:
+                if wav_parameters is not None:
+                    chunk_size = self.chunk_n_frames * wav_parameters['sampwidth'] * wav_parameters['nchannels']
+                else:
+                    chunk_size = self.chunk_n_frames
+                # As in `AudioChunkFileIterator` the first chunk carries the file header
+                chunks = (audio[i : i + chunk_size] for i in range(0, len(audio), chunk_size))
+                streaming_config = riva.client.StreamingRecognitionConfig(config=config, interim_results=False)
+                results = []
+                for response in self.asr_service.streaming_response_generator(chunks, streaming_config):
+                    if first_response_ms is None:
+                        first_response_ms = (time.perf_counter() - start) * 1000
+                    results.extend(response.results)
+                result = riva.client.get_final_transcript(results)
+        except Exception:
+            with self._lock:
+                self.requests += 1
+                self.errors += 1
+            raise
+        processing_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.requests += 1
+        duration = wav_parameters['nframes'] / wav_parameters['framerate'] if wav_parameters else None
+        result['timings'] = {
+            'audio_duration_s': duration,
+            'first_response_ms': first_response_ms,
+            'processing_ms': processing_ms,
+            'real_time_factor': processing_ms / 1000 / duration if duration else None,
+        }
+        return result
+
+
+class TranscriptionRequestHandler(BaseHTTPRequestHandler):
+    service: TranscriptionService = None
+    allowed_dir: Optional[Path] = None
+
+    def address_string(self) -> str:
+        # Clients of a Unix socket have no address
+        return self.client_address[0] if self.client_address else self.server.server_address
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _path_allowed(self, path: Path) -> bool:
+        if self.allowed_dir is not None:
+            return self.allowed_dir in path.parents
+        # Only local users can reach a Unix socket, and its file permissions say which ones
+        return isinstance(self.server, socketserver.UnixStreamServer)
+
+    def do_GET(self) -> None:
+        if self.path != '/health':
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        self._send_json(
+            200,
+            {
+                'status': 'ok',
+                'mode': self.service.mode,
+                'requests': self.service.requests,
+                'errors': self.service.errors,
+            },
+        )
+
+    def do_POST(self) -> None:
+        if self.path != '/transcribe':
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            try:
+                path = Path(json.loads(body)['path']).expanduser().resolve()
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {'error': f"Expected a JSON body with a `path` field: {e}"})
+                return
+            if not self._path_allowed(path):
+                self._send_json(403, {'error': f"Reading {path} is not allowed"})
+                return
+            try:
+                audio = path.read_bytes()
+            except OSError as e:
+                self._send_json(400, {'error': f"Could not read audio file: {e}"})
+                return
+        else:
+            audio = body
+        if not audio:
+            self._send_json(400, {'error': "Empty audio"})
+            return
+        try:
+            result = self.service.transcribe(audio)
+        except grpc.RpcError as e:
+            self._send_json(502, {'error': f"Recognition failed: {e.details()}"})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f"Transcription failed: {e}"})
+            return
+        self._send_json(200, result)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    service: TranscriptionService,
+    host: str = "127.0.0.1",
+    port: int = 8766,
+    unix_socket: Optional[Union[str, os.PathLike]] = None,
+    allowed_dir: Optional[Union[str, os.PathLike]] = None,
+) -> socketserver.BaseServer:
+    """
+    Creates an HTTP server which answers requests with :param:`service`. Requests are handled in threads.
+
+    Args:
+        service (:obj:`TranscriptionService`): a service transcribing posted audio.
+        host (:obj:`str`, defaults to :obj:`"127.0.0.1"`): an address to listen on.
+        port (:obj:`int`, defaults to :obj:`8766`): a port to listen on. If :obj:`0`, then a free port is chosen.
+        unix_socket (:obj:`Union[str, os.PathLike]`, `optional`): a path of a Unix socket to listen on instead of
+            :param:`host` and :param:`port`. A stale socket file is replaced.
+        allowed_dir (:obj:`Union[str, os.PathLike]`, `optional`): a directory whose files can be transcribed by
+            ``path``. If not set, ``path`` requests are only accepted on :param:`unix_socket`.
+
+    Returns:
+        :obj:`socketserver.BaseServer`: a server ready for ``serve_forever()``.
+    """
+    if allowed_dir is not None:
+        allowed_dir = Path(allowed_dir).expanduser().resolve()
+    handler = type(
+        'BoundTranscriptionRequestHandler',
+        (TranscriptionRequestHandler,),
+        {'service': service, 'allowed_dir': allowed_dir},
+    )
+    if unix_socket is not None:
+        unix_socket = Path(unix_socket).expanduser()
+        if unix_socket.exists():
+            unix_socket.unlink()
+        return ThreadingUnixHTTPServer(str(unix_socket), handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main() -> None:
+    args = parse_args()
+    auth = riva.client.Auth(args.ssl_cert, args.use_ssl, args.server, args.metadata)
+    if args.warmup_timeout > 0:
+        try:
+            grpc.channel_ready_future(auth.channel).result(timeout=args.warmup_timeout)
+        except grpc.FutureTimeoutError:
+            print(f"Could not connect to {args.server} in {args.warmup_timeout} s, will retry on first request")
+    asr_service = riva.client.ASRService(auth)
+    config = riva.client.RecognitionConfig(
+        language_code=args.language_code,
+        model=args.model_name,
+        max_alternatives=1,
+        profanity_filter=args.profanity_filter,
+        enable_automatic_punctuation=args.automatic_punctuation,
+        verbatim_transcripts=not args.no_verbatim_transcripts,
+        enable_word_time_offsets=True,
+    )
+    riva.client.add_word_boosting_to_config(config, args.boosted_lm_words, args.boosted_lm_score)
+    riva.client.add_speaker_diarization_to_config(config, args.speaker_diarization, args.diarization_max_speakers)
+    riva.client.add_endpoint_parameters_to_config(
+        config,
+        args.start_history,
+        args.start_threshold,
+        args.stop_history,
+        args.stop_history_eou,
+        args.stop_threshold,
+        args.stop_threshold_eou
+    )
+    riva.client.add_custom_configuration_to_config(
+        config,
+        args.custom_configuration
+    )
+    service = TranscriptionService(asr_service, config, args.mode, args.file_streaming_chunk)
+    server = make_server(service, args.host, args.port, args.unix_socket, args.allowed_dir)
+    address = args.unix_socket if args.unix_socket is not None else f"http://{args.host}:{args.port}"
+    print(f"Transcription service listening on {address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.unix_socket is not None:
+            Path(args.unix_socket).expanduser().unlink(missing_ok=True)
+        print(f"Served {service.requests} requests, {service.errors} failed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
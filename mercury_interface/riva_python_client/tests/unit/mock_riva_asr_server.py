@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+"""
+A mock Riva speech recognition server for tests and for trying load generation without a GPU. It recognizes one
+word per second of received audio, answers with partial transcripts while audio arrives and with a final transcript
+after the end of audio.
+
+Run it with ``python -m tests.unit.mock_riva_asr_server --port 50051`` from the repository root.
+"""
+
+import argparse
+import threading
+import time
+from concurrent import futures
+from typing import Tuple
+
+import grpc
+
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_asr_pb2_grpc as rasr_srv
+
+
+class MockRivaASRServicer(rasr_srv.RivaSpeechRecognitionServicer):
+    def __init__(self, partial_interval: float = 0.1, final_delay: float = 0.0, fail_every: int = 0) -> None:
+        """
+        Args:
+            partial_interval (:obj:`float`, defaults to :obj:`0.1`): seconds of received audio between partial
+                transcripts.
+            final_delay (:obj:`float`, defaults to :obj:`0.0`): seconds the final transcript is delayed after the end
+                of audio, a stand-in for decoding time.
+            fail_every (:obj:`int`, defaults to :obj:`0`): if positive, every ``fail_every``-th stream is aborted.
+        """
+        self.partial_interval = partial_interval
+        self.final_delay = final_delay
+        self.fail_every = fail_every
+        self.streams = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _transcript(seconds: float) -> str:
+        return ' '.join(f'word{i}' for i in range(int(seconds) + 1))
+
+    def StreamingRecognize(self, request_iterator, context):
+        with self._lock:
+            self.streams += 1
+            stream = self.streams
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            config = next(request_iterator).streaming_config.config
+            bytes_per_second = config.sample_rate_hertz * max(1, config.audio_channel_count) * 2
+            received = 0
+            next_partial = self.partial_interval
+            for request in request_iterator:
+                received += len(request.audio_content)
+                seconds = received / bytes_per_second
+                if seconds >= next_partial:
+                    next_partial += self.partial_interval
+                    yield rasr.StreamingRecognizeResponse(
+                        results=[
+                            rasr.StreamingRecognitionResult(
+                                alternatives=[{'transcript': self._transcript(seconds)}],
+                                stability=0.5,
+                                audio_processed=seconds,
+                            )
+                        ]
+                    )
+            if self.fail_every and stream % self.fail_every == 0:
+                context.abort(grpc.StatusCode.UNAVAILABLE, 'mock failure')
+            time.sleep(self.final_delay)
+            seconds = received / bytes_per_second
+            yield rasr.StreamingRecognizeResponse(
+                results=[
+                    rasr.StreamingRecognitionResult(
+                        alternatives=[{'transcript': self._transcript(seconds) + ' ', 'confidence': 1.0}],
+                        is_final=True,
+                        audio_processed=seconds,
+                    )
+                ]
+            )
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def Recognize(self, request, context):
+        seconds = len(request.audio) / (request.config.sample_rate_hertz or 16000) / 2
+        return rasr.RecognizeResponse(
+            results=[rasr.SpeechRecognitionResult(alternatives=[{'transcript': self._transcript(seconds)}])]
+        )
+
+
+def serve(port: int = 0, max_workers: int = 32, **servicer_kwargs) -> Tuple[grpc.Server, int, MockRivaASRServicer]:
+    """Starts a mock server on localhost and returns it, its port and its servicer."""
+    servicer = MockRivaASRServicer(**servicer_kwargs)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    rasr_srv.add_RivaSpeechRecognitionServicer_to_server(servicer, server)
+    port = server.add_insecure_port(f'127.0.0.1:{port}')
+    server.start()
+    return server, port, servicer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--port", type=int, default=50051, help="Port to listen on.")
+    parser.add_argument("--final-delay", type=float, default=0.05, help="Seconds a final transcript is delayed.")
+    parser.add_argument("--partial-interval", type=float, default=0.1, help="Audio seconds between partials.")
+    args = parser.parse_args()
+    server, port, _ = serve(args.port, partial_interval=args.partial_interval, final_delay=args.final_delay)
+    print(f"Mock Riva ASR server listening on 127.0.0.1:{port}")
+    server.wait_for_termination()
+
+
+if __name__ == "__main__":
+    main()
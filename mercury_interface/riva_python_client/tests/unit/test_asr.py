@@ -1,13 +1,16 @@
 # SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
 # SPDX-License-Identifier: MIT
 
+import wave
 from math import ceil
 from typing import Any, Generator, List, Union
 from unittest.mock import patch, Mock
 
+import pytest
+
 import riva.client.proto.riva_asr_pb2 as rasr
-from riva.client import ASRService
-from riva.client.asr import streaming_request_generator
+from riva.client import ASRService, AudioChunkFileIterator
+from riva.client.asr import get_final_transcript, streaming_request_generator
 
 from .helpers import set_auth_mock
 
@@ -92,3 +95,96 @@ class TestSpeechSynthesisService:
         assert len(STREAMING_RECOGNIZE_MOCK.call_args.kwargs) == 1
         assert 'metadata' in STREAMING_RECOGNIZE_MOCK.call_args.kwargs
         assert STREAMING_RECOGNIZE_MOCK.call_args.kwargs['metadata'] == return_value_of_get_auth_metadata
+
+
+def test_get_final_transcript() -> None:
+    results = [
+        rasr.StreamingRecognitionResult(is_final=False, alternatives=[{'transcript': 'partial'}]),
+        rasr.StreamingRecognitionResult(
+            is_final=True,
+            alternatives=[{'transcript': 'hello ', 'confidence': 0.25, 'words': [{'word': 'hello', 'start_time': 10, 'end_time': 300}]}],
+        ),
+        rasr.StreamingRecognitionResult(is_final=True),
+        rasr.StreamingRecognitionResult(is_final=True, alternatives=[{'transcript': 'world ', 'confidence': 0.75}]),
+    ]
+    transcript = get_final_transcript(results)
+    assert transcript['transcript'] == 'hello world'
+    assert transcript['confidence'] == 0.5
+    assert transcript['words'] == [{'word': 'hello', 'start_time': 10, 'end_time': 300, 'confidence': 0.0, 'speaker_tag': 0}]
+    offline = [rasr.SpeechRecognitionResult(alternatives=[{'transcript': 'offline'}])]
+    assert get_final_transcript(offline)['transcript'] == 'offline'
+    assert get_final_transcript([]) == {'transcript': '', 'confidence': 0.0, 'words': []}
+
+
+def write_wav(path, n_frames: int, nchannels: int = 2, sampwidth: int = 2, framerate: int = 8000) -> bytes:
+    frames = bytes(i % 251 for i in range(n_frames * nchannels * sampwidth))
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(nchannels)
+        wf.setsampwidth(sampwidth)
+        wf.setframerate(framerate)
+        wf.writeframes(frames)
+    return frames
+
+
+class TestAudioChunkFileIteratorMmap:
+    def test_chunks_are_frame_aligned_views_without_header(self, tmp_path) -> None:
+        frames = write_wav(tmp_path / 'audio.wav', 1000)
+        with AudioChunkFileIterator(tmp_path / 'audio.wav', 300, use_mmap=True) as iterator:
+            chunks = list(iterator)
+        assert all(isinstance(chunk, memoryview) for chunk in chunks)
+        assert [len(chunk) for chunk in chunks] == [1200, 1200, 1200, 400]
+        assert b''.join(chunks) == frames
+
+    def test_file_mode_keeps_header(self, tmp_path) -> None:
+        frames = write_wav(tmp_path / 'audio.wav', 1000)
+        with AudioChunkFileIterator(tmp_path / 'audio.wav', 300) as iterator:
+            data = b''.join(iterator)
+        assert data.endswith(frames) and len(data) > len(frames)
+
+    def test_start_frame_and_resume(self, tmp_path) -> None:
+        frames = write_wav(tmp_path / 'audio.wav', 1000)
+        iterator = AudioChunkFileIterator(tmp_path / 'audio.wav', 300, use_mmap=True)
+        next(iterator)
+        assert iterator.position == 300
+        resumed = AudioChunkFileIterator(tmp_path / 'audio.wav', 300, use_mmap=True, start_frame=iterator.position)
+        assert b''.join(resumed) == frames[300 * 4 :]
+        iterator.seek(950)
+        assert bytes(next(iterator)) == frames[950 * 4 :]
+        iterator.seek(5000)
+        assert list(iterator) == []
+        iterator.close()
+
+    def test_file_mode_seek(self, tmp_path) -> None:
+        frames = write_wav(tmp_path / 'audio.wav', 1000)
+        with AudioChunkFileIterator(tmp_path / 'audio.wav', 300, start_frame=700) as iterator:
+            assert next(iterator) == frames[700 * 4 :]
+            assert iterator.position == 1000
+
+    def test_delay_callback_gets_chunk_duration(self, tmp_path) -> None:
+        write_wav(tmp_path / 'audio.wav', 1000)
+        delay_callback = Mock()
+        with AudioChunkFileIterator(tmp_path / 'audio.wav', 800, delay_callback, use_mmap=True) as iterator:
+            list(iterator)
+        assert [c.args[1] for c in delay_callback.call_args_list] == [0.1, 0.025]
+
+    def test_not_wav_file(self, tmp_path) -> None:
+        (tmp_path / 'audio.raw').write_bytes(b'a' * 100)
+        with pytest.raises(ValueError):
+            AudioChunkFileIterator(tmp_path / 'audio.raw', 10, use_mmap=True)
+        with pytest.raises(ValueError):
+            AudioChunkFileIterator(tmp_path / 'audio.raw', 10, start_frame=5)
+
+    def test_close_with_referenced_chunks(self, tmp_path) -> None:
+        frames = write_wav(tmp_path / 'audio.wav', 1000)
+        iterator = AudioChunkFileIterator(tmp_path / 'audio.wav', 300, use_mmap=True)
+        chunk = next(iterator)
+        iterator.close()
+        assert bytes(chunk) == frames[: 300 * 4]
+        with pytest.raises(StopIteration):
+            next(iterator)
+
+    def test_request_generator_copies_views(self, tmp_path) -> None:
+        frames = write_wav(tmp_path / 'audio.wav', 1000)
+        with AudioChunkFileIterator(tmp_path / 'audio.wav', 300, use_mmap=True) as iterator:
+            requests = list(streaming_request_generator(iterator, STREAMING_RECOGNITION_CONFIG))
+        assert b''.join(r.audio_content for r in requests[1:]) == frames
@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from typing import AsyncGenerator, List
+
+import grpc
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_asr_pb2_grpc as rasr_srv
+from riva.client import AsyncASRService, Auth
+
+
+AUDIO_CHUNKS = [bytes([i]) * 320 for i in range(10)]
+STREAMING_RECOGNITION_CONFIG = rasr.StreamingRecognitionConfig(config=rasr.RecognitionConfig(language_code='en-US'))
+
+
+class EchoASRServicer(rasr_srv.RivaSpeechRecognitionServicer):
+    """Answers every audio chunk with a partial result and the end of audio with a final one."""
+    def __init__(self) -> None:
+        self.metadata: List = []
+        self.requests: List[rasr.StreamingRecognizeRequest] = []
+
+    async def Recognize(self, request, context):
+        self.metadata.append(context.invocation_metadata())
+        if request.config.language_code != 'en-US':
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'unsupported language')
+        return rasr.RecognizeResponse(
+            results=[rasr.SpeechRecognitionResult(alternatives=[{'transcript': f'{len(request.audio)} bytes'}])]
+        )
+
+    async def StreamingRecognize(self, request_iterator, context):
+        self.metadata.append(context.invocation_metadata())
+        n_bytes = 0
+        async for request in request_iterator:
+            self.requests.append(request)
+            if request.audio_content:
+                n_bytes += len(request.audio_content)
+                yield rasr.StreamingRecognizeResponse(
+                    results=[rasr.StreamingRecognitionResult(alternatives=[{'transcript': f'{n_bytes}'}])]
+                )
+        yield rasr.StreamingRecognizeResponse(
+            results=[rasr.StreamingRecognitionResult(is_final=True, alternatives=[{'transcript': f'{n_bytes} bytes'}])]
+        )
+
+
+async def start_server(servicer: EchoASRServicer) -> tuple:
+    server = grpc.aio.server()
+    rasr_srv.add_RivaSpeechRecognitionServicer_to_server(servicer, server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    await server.start()
+    return server, port
+
+
+async def audio_source() -> AsyncGenerator[bytes, None]:
+    for chunk in AUDIO_CHUNKS:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+class TestAsyncASRService:
+    def test_streaming_response_generator(self) -> None:
+        async def run():
+            servicer = EchoASRServicer()
+            server, port = await start_server(servicer)
+            auth = Auth(uri=f'127.0.0.1:{port}', metadata_args=[['key', 'value']])
+            try:
+                service = AsyncASRService(auth)
+                responses = [r async for r in service.streaming_response_generator(audio_source(), STREAMING_RECOGNITION_CONFIG)]
+            finally:
+                await auth.close_aio_channel()
+                await server.stop(None)
+            return servicer, responses
+
+        servicer, responses = asyncio.run(run())
+        assert len(responses) == len(AUDIO_CHUNKS) + 1
+        assert responses[-1].results[0].is_final
+        assert responses[-1].results[0].alternatives[0].transcript == f'{320 * len(AUDIO_CHUNKS)} bytes'
+        assert servicer.requests[0].streaming_config == STREAMING_RECOGNITION_CONFIG
+        assert [r.audio_content for r in servicer.requests[1:]] == AUDIO_CHUNKS
+        assert ('key', 'value') in servicer.metadata[0]
+
+    def test_streaming_from_iterable(self) -> None:
+        async def run():
+            servicer = EchoASRServicer()
+            server, port = await start_server(servicer)
+            auth = Auth(uri=f'127.0.0.1:{port}')
+            try:
+                service = AsyncASRService(auth)
+                responses = [r async for r in service.streaming_response_generator(AUDIO_CHUNKS, STREAMING_RECOGNITION_CONFIG)]
+            finally:
+                await auth.close_aio_channel()
+                await server.stop(None)
+            return responses
+
+        assert len(asyncio.run(run())) == len(AUDIO_CHUNKS) + 1
+
+    def test_offline_recognize_concurrently(self) -> None:
+        async def run():
+            servicer = EchoASRServicer()
+            server, port = await start_server(servicer)
+            auth = Auth(uri=f'127.0.0.1:{port}')
+            try:
+                service = AsyncASRService(auth)
+                config = rasr.RecognitionConfig(language_code='en-US')
+                responses = await asyncio.gather(*[service.offline_recognize(b'a' * n, config) for n in (1, 2, 3)])
+                with pytest.raises(grpc.aio.AioRpcError) as error:
+                    await service.offline_recognize(b'a', rasr.RecognitionConfig(language_code='xx'))
+            finally:
+                await auth.close_aio_channel()
+                await server.stop(None)
+            return responses, error.value
+
+        responses, error = asyncio.run(run())
+        assert [r.results[0].alternatives[0].transcript for r in responses] == ['1 bytes', '2 bytes', '3 bytes']
+        assert error.code() == grpc.StatusCode.INVALID_ARGUMENT
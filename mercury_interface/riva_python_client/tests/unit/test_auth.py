@@ -1,11 +1,12 @@
 # SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
 # SPDX-License-Identifier: MIT
 
+import asyncio
 from unittest.mock import Mock, patch
 
 import grpc
 
-from riva.client.auth import create_channel, Auth
+from riva.client.auth import create_aio_channel, create_channel, Auth
 
 
 @patch("grpc.insecure_channel", Mock(return_value="insecure_channel"))
@@ -24,3 +25,23 @@ class TestAuth:
         auth = Auth()
         metadata = auth.get_auth_metadata()
         assert metadata == []
+
+
+@patch("grpc.aio.insecure_channel", Mock(return_value="aio_insecure_channel"))
+def test_create_aio_channel() -> None:
+    channel = create_aio_channel()
+    assert channel == "aio_insecure_channel"
+
+
+class TestAuthAioChannel:
+    def test_aio_channel_is_created_once(self) -> None:
+        async def run():
+            auth = Auth()
+            assert auth.aio_channel is None
+            channel = auth.get_aio_channel()
+            assert isinstance(channel, grpc.aio.Channel)
+            assert auth.get_aio_channel() is channel
+            await auth.close_aio_channel()
+            assert auth.aio_channel is None
+
+        asyncio.run(run())
@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import json
+import sys
+import wave
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from riva.client import ASRService, Auth, RecognitionConfig, StreamingRecognitionConfig
+from scripts.asr import riva_streaming_asr_load
+from scripts.asr.riva_streaming_asr_load import parse_ramp, run_load, run_stream, summarize, target_streams
+
+from .mock_riva_asr_server import serve
+
+
+SAMPLE_RATE_HZ = 16000
+STREAMING_CONFIG = StreamingRecognitionConfig(config=RecognitionConfig(language_code='en-US'), interim_results=True)
+
+
+def write_wav(path: Path, seconds: float) -> Path:
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE_HZ)
+        wf.writeframes(b'\x01\x00' * int(SAMPLE_RATE_HZ * seconds))
+    return path
+
+
+@pytest.fixture
+def mock_server(request):
+    kwargs = getattr(request, 'param', {})
+    server, port, servicer = serve(final_delay=0.05, **kwargs)
+    yield port, servicer
+    server.stop(None)
+
+
+def asr_service(port: int) -> ASRService:
+    return ASRService(Auth(uri=f'127.0.0.1:{port}'))
+
+
+def test_ramp_schedule() -> None:
+    stages = parse_ramp('1:10,4:20, 0:5')
+    assert stages == [(1, 10.0), (4, 20.0), (0, 5.0)]
+    assert [target_streams(stages, t) for t in (0, 9.9, 10, 29.9, 30, 35)] == [1, 1, 4, 4, 0, 0]
+    for ramp in ('4', '4:x', '-1:5'):
+        with pytest.raises(ValueError):
+            parse_ramp(ramp)
+
+
+def test_realtime_stream(mock_server, tmp_path: Path) -> None:
+    port, _ = mock_server
+    audio = write_wav(tmp_path / 'audio.wav', 0.3)
+    record = run_stream(asr_service(port), STREAMING_CONFIG, audio, chunk_n_frames=800, realtime=True)
+    assert record['error'] is None
+    assert record['transcript'] == 'word0'
+    assert record['audio_duration_s'] == pytest.approx(0.3)
+    # Partials arrive every 0.1 s of audio, the final one 0.05 s after the end of audio
+    assert 90 <= record['first_partial_ms'] < 300
+    assert record['final_latency_ms'] >= 50
+    assert record['wall_s'] >= 0.3
+    assert record['throughput'] < 1.0
+
+
+def test_ramped_load_at_max_speed(mock_server, tmp_path: Path) -> None:
+    port, servicer = mock_server
+    audio = write_wav(tmp_path / 'audio.wav', 2.0)
+    records, wall_s = run_load(
+        [asr_service(port), asr_service(port)], STREAMING_CONFIG, audio, [(1, 0.2), (3, 0.3)], realtime=False
+    )
+    assert records and all(r['error'] is None for r in records)
+    assert [r['stream'] for r in records] == list(range(len(records)))
+    assert {r['slot'] for r in records} == {0, 1, 2}
+    assert all(r['slot'] == 0 for r in records if r['start_s'] < 0.2)
+    assert max(r['concurrency'] for r in records) <= 3
+    assert 2 <= servicer.max_active <= 3
+    assert all(r['transcript'] == 'word0 word1 word2' for r in records)
+    # Audio is sent faster than real time, the final transcript waits for the mock's decoding delay
+    assert all(r['throughput'] > 1.0 and r['final_latency_ms'] >= 50 for r in records)
+    summary = summarize(records, wall_s)
+    assert summary['streams'] == len(records) and summary['errors'] == 0
+    assert summary['audio_s'] == pytest.approx(2.0 * len(records))
+    assert summary['final_latency_ms']['p50'] <= summary['final_latency_ms']['p99'] <= summary['final_latency_ms']['max']
+    assert summary['audio_s_per_wall_s'] > 1.0
+
+
+@pytest.mark.parametrize('mock_server', [{'fail_every': 2}], indirect=True)
+def test_failed_streams_are_reported(mock_server, tmp_path: Path) -> None:
+    port, _ = mock_server
+    audio = write_wav(tmp_path / 'audio.wav', 0.5)
+    records, wall_s = run_load([asr_service(port)], STREAMING_CONFIG, audio, [(1, 0.3)], realtime=False)
+    failed = [r for r in records if r['error'] is not None]
+    assert failed and failed[0]['error'] == 'UNAVAILABLE: mock failure'
+    assert failed[0]['final_latency_ms'] is None
+    summary = summarize(records, wall_s)
+    assert summary['errors'] == len(failed)
+    assert summary['audio_s'] == pytest.approx(0.5 * (len(records) - len(failed)))
+
+
+def test_main_writes_report(mock_server, tmp_path: Path, capsys) -> None:
+    port, _ = mock_server
+    audio = write_wav(tmp_path / 'audio.wav', 0.5)
+    report = tmp_path / 'report.json'
+    argv = [
+        'riva_streaming_asr_load.py', '--input-file', str(audio), '--server', f'127.0.0.1:{port}',
+        '--ramp', '2:0.2', '--feed', 'max', '--report', str(report),
+    ]
+    with patch.object(sys, 'argv', argv):
+        riva_streaming_asr_load.main()
+    output = capsys.readouterr().out
+    assert 'First partial (ms)' in output and 'p99' in output
+    data = json.loads(report.read_text())
+    assert data['ramp'] == [[2, 0.2]] and data['feed'] == 'max'
+    assert data['summary']['streams'] == len(data['streams']) > 0
+    assert set(data['streams'][0]) >= {'first_partial_ms', 'final_latency_ms', 'throughput', 'concurrency'}
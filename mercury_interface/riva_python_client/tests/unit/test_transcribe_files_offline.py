@@ -0,0 +1,160 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import json
+import struct
+import threading
+import wave
+from concurrent import futures
+from pathlib import Path
+
+import grpc
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+import riva.client.proto.riva_asr_pb2_grpc as rasr_srv
+from riva.client import ASRService, AudioEncoding, Auth, RecognitionConfig
+from scripts.asr.transcribe_files_offline import (
+    completed_files,
+    list_audio_files,
+    merge_transcripts,
+    plan_segments,
+    stitch_segments,
+    transcribe_files,
+)
+
+
+FRAMERATE = 1000
+
+
+def write_wav(path: Path, seconds: int) -> None:
+    """Writes a WAV file whose samples in second ``i`` all have value ``i``, or -1 for a failing file."""
+    value = (lambda i: -1) if 'fail' in path.name else (lambda i: i)
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(FRAMERATE)
+        wf.writeframes(b''.join(struct.pack('<h', value(i)) * FRAMERATE for i in range(seconds)))
+
+
+class SecondsASRServicer(rasr_srv.RivaSpeechRecognitionServicer):
+    """Recognizes a word ``w<i>`` in the middle of every second of audio, ``i`` being the value of its samples."""
+    def __init__(self) -> None:
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def Recognize(self, request, context):
+        with self.lock:
+            self.requests.append(request)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            assert request.config.encoding == AudioEncoding.LINEAR_PCM
+            rate = request.config.sample_rate_hertz
+            words = []
+            for second in range(len(request.audio) // 2 // rate):
+                (value,) = struct.unpack_from('<h', request.audio, second * rate * 2)
+                if value < 0:
+                    context.abort(grpc.StatusCode.INTERNAL, 'decoder failed')
+                start = second * 1000
+                words.append(rasr.WordInfo(word=f'w{value}', start_time=start + 200, end_time=start + 700))
+            transcript = ' '.join(w.word for w in words)
+            alternative = rasr.SpeechRecognitionAlternative(transcript=transcript, words=words)
+            return rasr.RecognizeResponse(results=[rasr.SpeechRecognitionResult(alternatives=[alternative])])
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def asr():
+    servicer = SecondsASRServicer()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    rasr_srv.add_RivaSpeechRecognitionServicer_to_server(servicer, server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    yield ASRService(Auth(uri=f'127.0.0.1:{port}')), servicer
+    server.stop(None)
+
+
+def read_records(path: Path) -> dict:
+    return {r['audio_filepath']: r for r in map(json.loads, path.read_text().splitlines())}
+
+
+def test_plan_segments() -> None:
+    assert plan_segments(1000, 100, 0, 1) == [(0, 1000)]
+    assert plan_segments(1000, 100, 20, 1) == [(0, 1000)]
+    assert plan_segments(1000, 100, 3, 0.5) == [(0, 300), (250, 550), (500, 800), (750, 1000)]
+    with pytest.raises(ValueError):
+        plan_segments(1000, 100, 3, 3)
+
+
+def test_stitch_segments_by_word_timings() -> None:
+    segments = [
+        {'start_ms': 0, 'end_ms': 4000, 'transcript': 'a b', 'words': [
+            {'word': 'a', 'start_time': 1000, 'end_time': 1500}, {'word': 'b', 'start_time': 3300, 'end_time': 3600}]},
+        {'start_ms': 3000, 'end_ms': 7000, 'transcript': 'b c', 'words': [
+            {'word': 'b', 'start_time': 300, 'end_time': 600}, {'word': 'c', 'start_time': 1000, 'end_time': 1200}]},
+    ]
+    stitched = stitch_segments(segments)
+    assert stitched['transcript'] == 'a b c'
+    assert [(w['start_time'], w['end_time']) for w in stitched['words']] == [(1000, 1500), (3300, 3600), (4000, 4200)]
+
+
+def test_merge_transcripts_without_timings() -> None:
+    assert merge_transcripts('the quick brown fox', 'Brown fox jumps over') == 'the quick brown fox jumps over'
+    assert merge_transcripts('one two', 'three four') == 'one two three four'
+    assert merge_transcripts('', 'three four') == 'three four'
+
+
+def test_list_audio_files(tmp_path: Path) -> None:
+    (tmp_path / 'sub').mkdir()
+    for name in ('b.wav', 'sub/a.WAV', 'notes.txt'):
+        (tmp_path / name).write_bytes(b'')
+    assert list_audio_files(input_dir=tmp_path) == [tmp_path / 'b.wav', tmp_path / 'sub/a.WAV']
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text('{"audio_filepath": "b.wav", "duration": 1.0}\n\n/abs/c.wav\nb.wav\n')
+    assert list_audio_files(manifest=manifest) == [tmp_path / 'b.wav', Path('/abs/c.wav')]
+
+
+def test_transcribe_files_segments_and_resumes(asr, tmp_path: Path) -> None:
+    asr_service, servicer = asr
+    files = [tmp_path / f'{i}.wav' for i in range(6)]
+    for i, path in enumerate(files):
+        write_wav(path, 10 if i == 0 else 2)
+    write_wav(tmp_path / 'fail.wav', 2)
+    files.append(tmp_path / 'fail.wav')
+    files.append(tmp_path / 'missing.wav')
+    output = tmp_path / 'out.jsonl'
+    config = RecognitionConfig(enable_word_time_offsets=True)
+
+    summary = transcribe_files(asr_service, config, files, output, max_in_flight=2, segment_seconds=4, overlap_seconds=1)
+    assert summary['files'] == 8 and summary['ok'] == 6 and summary['errors'] == 2 and summary['skipped'] == 0
+    assert summary['audio_seconds'] == 20.0
+    assert servicer.max_in_flight <= 2
+    records = read_records(output)
+    long_file = records[str(files[0])]
+    assert long_file['status'] == 'ok'
+    assert long_file['segments'] == 3
+    assert long_file['transcript'] == ' '.join(f'w{i}' for i in range(10))
+    assert [w['start_time'] for w in long_file['words']] == [i * 1000 + 200 for i in range(10)]
+    assert long_file['duration_s'] == 10.0
+    assert long_file['latency_ms'] > 0 and long_file['real_time_factor'] > 0
+    assert records[str(files[1])]['transcript'] == 'w0 w1'
+    assert records[str(tmp_path / 'fail.wav')]['error'] == 'Segment 0: decoder failed'
+    assert records[str(tmp_path / 'missing.wav')]['error'].startswith('Could not read audio')
+    assert completed_files(output) == {str(f) for f in files[:6]}
+
+    # A rerun after an interrupted write only retries files without a successful record
+    with output.open('a') as f:
+        f.write('{"audio_filepath": "trunc')
+    write_wav(tmp_path / 'missing.wav', 2)
+    n_requests = len(servicer.requests)
+    summary = transcribe_files(asr_service, config, files, output, max_in_flight=2, segment_seconds=4, overlap_seconds=1)
+    assert summary['skipped'] == 6 and summary['files'] == 2 and summary['ok'] == 1 and summary['errors'] == 1
+    assert len(servicer.requests) == n_requests + 2
+    lines = output.read_text().splitlines()
+    assert lines[-3] == '{"audio_filepath": "trunc'
+    assert {json.loads(line)['audio_filepath'] for line in lines[-2:]} == {str(files[6]), str(files[7])}
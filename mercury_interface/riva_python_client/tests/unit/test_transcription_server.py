@@ -0,0 +1,219 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: MIT
+
+import http.client
+import io
+import json
+import socket
+import threading
+import wave
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+import grpc
+import pytest
+
+import riva.client.proto.riva_asr_pb2 as rasr
+from riva.client import ASRService, RecognitionConfig
+from scripts.asr.transcription_server import TranscriptionService, make_server
+
+from .helpers import set_auth_mock
+
+
+SAMPLE_RATE_HZ = 16000
+CHUNK_N_FRAMES = 1600
+
+
+def make_wav(n_frames: int = SAMPLE_RATE_HZ) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE_HZ)
+        wf.writeframes(b'\x00\x00' * n_frames)
+    return buffer.getvalue()
+
+
+def final_result(transcript: str, words: list) -> rasr.StreamingRecognitionResult:
+    return rasr.StreamingRecognitionResult(
+        is_final=True,
+        alternatives=[
+            rasr.SpeechRecognitionAlternative(
+                transcript=transcript,
+                confidence=0.5,
+                words=[rasr.WordInfo(word=w, start_time=s, end_time=e, confidence=0.5) for w, s, e in words],
+            )
+        ],
+    )
+
+
+def streaming_recognize(requests, metadata=None):
+    requests = list(requests)
+    STREAMING_RECOGNIZE_MOCK.requests = requests
+    yield rasr.StreamingRecognizeResponse(
+        results=[rasr.StreamingRecognitionResult(is_final=False, alternatives=[{'transcript': 'hello'}])]
+    )
+    yield rasr.StreamingRecognizeResponse(results=[final_result('hello world ', [('hello', 0, 400), ('world', 500, 900)])])
+    yield rasr.StreamingRecognizeResponse(results=[final_result('again ', [('again', 1000, 1300)])])
+
+
+STREAMING_RECOGNIZE_MOCK = Mock(side_effect=streaming_recognize)
+RECOGNIZE_MOCK = Mock(
+    return_value=rasr.RecognizeResponse(
+        results=[rasr.SpeechRecognitionResult(alternatives=[{'transcript': 'offline transcript', 'confidence': 1.0}])]
+    )
+)
+
+
+def riva_asr_stub_init_patch(self, channel):
+    self.Recognize = RECOGNIZE_MOCK
+    self.StreamingRecognize = STREAMING_RECOGNIZE_MOCK
+
+
+@pytest.fixture
+def http_server():
+    servers = []
+
+    def start(service: TranscriptionService, **kwargs):
+        server = make_server(service, port=0, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str) -> None:
+        super().__init__('localhost')
+        self.unix_socket = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_socket)
+
+
+def post(connection: http.client.HTTPConnection, body: bytes, content_type: str = 'audio/wav'):
+    connection.request('POST', '/transcribe', body=body, headers={'Content-Type': content_type})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+@patch("riva.client.proto.riva_asr_pb2_grpc.RivaSpeechRecognitionStub.__init__", riva_asr_stub_init_patch)
+class TestTranscriptionService:
+    def test_streaming_transcribe(self) -> None:
+        auth, return_value_of_get_auth_metadata = set_auth_mock()
+        service = TranscriptionService(ASRService(auth), RecognitionConfig(language_code='en-US'), "streaming", CHUNK_N_FRAMES)
+        audio = make_wav()
+        result = service.transcribe(audio)
+        assert result['transcript'] == 'hello world again'
+        assert [w['word'] for w in result['words']] == ['hello', 'world', 'again']
+        assert result['words'][1] == {'word': 'world', 'start_time': 500, 'end_time': 900, 'confidence': 0.5, 'speaker_tag': 0}
+        assert result['timings']['audio_duration_s'] == 1.0
+        assert result['timings']['first_response_ms'] <= result['timings']['processing_ms']
+        requests = STREAMING_RECOGNIZE_MOCK.requests
+        config = requests[0].streaming_config.config
+        assert config.sample_rate_hertz == SAMPLE_RATE_HZ
+        assert config.audio_channel_count == 1
+        assert config.language_code == 'en-US'
+        # The header travels in the first chunk, every chunk holds at most `CHUNK_N_FRAMES` frames
+        assert b''.join(r.audio_content for r in requests[1:]) == audio
+        assert len(requests[1].audio_content) == CHUNK_N_FRAMES * 2
+        assert STREAMING_RECOGNIZE_MOCK.call_args.kwargs['metadata'] == return_value_of_get_auth_metadata
+        assert service.requests == 1 and service.errors == 0
+
+    def test_offline_transcribe(self) -> None:
+        auth, _ = set_auth_mock()
+        RECOGNIZE_MOCK.reset_mock()
+        service = TranscriptionService(ASRService(auth), RecognitionConfig(), "offline")
+        audio = make_wav()
+        result = service.transcribe(audio)
+        assert result['transcript'] == 'offline transcript'
+        assert result['confidence'] == 1.0
+        request = RECOGNIZE_MOCK.call_args.args[0]
+        assert request.audio == audio
+        assert request.config.sample_rate_hertz == SAMPLE_RATE_HZ
+
+    def test_http_body_and_path(self, http_server, tmp_path: Path) -> None:
+        auth, _ = set_auth_mock()
+        service = TranscriptionService(ASRService(auth), RecognitionConfig())
+        server = http_server(service, allowed_dir=tmp_path)
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+        status, result = post(connection, make_wav())
+        assert status == 200
+        assert result['transcript'] == 'hello world again'
+        audio_file = tmp_path / 'recording.wav'
+        audio_file.write_bytes(make_wav())
+        status, result = post(connection, json.dumps({'path': str(audio_file)}).encode(), 'application/json')
+        assert status == 200
+        assert len(result['words']) == 3
+        status, result = post(connection, json.dumps({'path': str(tmp_path / 'missing.wav')}).encode(), 'application/json')
+        assert status == 400
+        connection.request('GET', '/health')
+        health = json.loads(connection.getresponse().read())
+        assert health == {'status': 'ok', 'mode': 'streaming', 'requests': 2, 'errors': 0}
+
+    def test_unix_socket(self, http_server, tmp_path: Path) -> None:
+        auth, _ = set_auth_mock()
+        service = TranscriptionService(ASRService(auth), RecognitionConfig())
+        socket_path = tmp_path / 'asr.sock'
+        http_server(service, unix_socket=socket_path)
+        status, result = post(UnixHTTPConnection(str(socket_path)), make_wav())
+        assert status == 200
+        assert result['transcript'] == 'hello world again'
+        audio_file = tmp_path / 'recording.wav'
+        audio_file.write_bytes(make_wav())
+        body = json.dumps({'path': str(audio_file)}).encode()
+        status, result = post(UnixHTTPConnection(str(socket_path)), body, 'application/json')
+        assert status == 200
+        assert len(result['words']) == 3
+
+    def test_paths_outside_allowed_dir_are_rejected(self, http_server, tmp_path: Path) -> None:
+        auth, _ = set_auth_mock()
+        service = TranscriptionService(ASRService(auth), RecognitionConfig())
+        allowed_dir = tmp_path / 'audio'
+        allowed_dir.mkdir()
+        audio_file = tmp_path / 'recording.wav'
+        audio_file.write_bytes(make_wav())
+        tcp_server = http_server(service)
+        restricted_server = http_server(service, allowed_dir=allowed_dir)
+        for server, path in [
+            (tcp_server, audio_file),
+            (restricted_server, audio_file),
+            (restricted_server, allowed_dir / '..' / 'recording.wav'),
+        ]:
+            connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+            status, result = post(connection, json.dumps({'path': str(path)}).encode(), 'application/json')
+            assert status == 403
+            assert result == {'error': f"Reading {audio_file} is not allowed"}
+        assert service.requests == 0
+
+    def test_recognition_error(self, http_server) -> None:
+        auth, _ = set_auth_mock()
+        error = grpc.RpcError()
+        error.details = Mock(return_value='model not found')
+        service = TranscriptionService(ASRService(auth), RecognitionConfig(), "offline")
+        server = http_server(service)
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+        with patch.object(RECOGNIZE_MOCK, 'side_effect', error):
+            status, result = post(connection, make_wav())
+        assert status == 502
+        assert result == {'error': 'Recognition failed: model not found'}
+        assert service.errors == 1
+
+    def test_unexpected_error(self, http_server) -> None:
+        auth, _ = set_auth_mock()
+        service = TranscriptionService(ASRService(auth), RecognitionConfig(), "offline")
+        server = http_server(service)
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+        RECOGNIZE_MOCK.side_effect = ValueError('bad response')
+        try:
+            status, result = post(connection, make_wav())
+        finally:
+            RECOGNIZE_MOCK.side_effect = None
+        assert status == 500
+        assert result == {'error': 'Transcription failed: bad response'}
+        assert service.requests == 1 and service.errors == 1
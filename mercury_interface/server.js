@@ -13,6 +13,12 @@ let openaiConfig = {
 };
 let modelToUse = 'gpt-3.5-turbo'; // Default model
 
+// Address of the resident Mercury Agent server (see "Running Mercury Agent as a Resident Server" in README.md)
+const mercuryAgentUrl = process.env.MERCURY_AGENT_URL || 'http://127.0.0.1:8765';
+
+// Address of the resident transcription service (see README.md)
+const asrServiceUrl = process.env.ASR_SERVICE_URL || 'http://127.0.0.1:8766';
+
 // Set up middleware
 app.use(express.json());
 app.use(express.static(path.join(__dirname, 'public')));
@@ -78,70 +84,66 @@ app.post('/api/start-recording', (req, res) => {
 });
 
 // API endpoint to stop recording and transcribe
-app.post('/api/stop-recording', (req, res) => {
+app.post('/api/stop-recording', async (req, res) => {
   try {
-    // Stop the recording process
+    // Stop the recording process and wait until Sox has exited, it completes the WAV header on exit
     if (recordProcess) {
-      recordProcess.kill();
+      const finished = recordProcess;
       recordProcess = null;
+      if (finished.exitCode === null && finished.signalCode === null) {
+        await new Promise((resolve) => {
+          finished.once('close', resolve);
+          finished.kill();
+        });
+      }
       console.log('Recording stopped');
     }
-    
-    // Wait a moment for the file to be properly saved
-    setTimeout(() => {
-      // Check if the file exists
-      if (!fs.existsSync(outputFilePath)) {
-        return res.status(500).json({ error: 'Recording file not found' });
-      }
-      
-      // Run the transcription script with the correct absolute path
-      const transcribeProcess = spawn('python', [
-        '/home/milos/mercury-assistant/mercury_interface/riva_python_client/scripts/asr/transcribe_file.py',
-        '--server', 'grpc.nvcf.nvidia.com:443',
-        '--use-ssl',
-        '--metadata', 'function-id', 'e6fa172c-79bf-4b9c-bb37-14fe17b4226c',
-        '--metadata', 'authorization', `Bearer ${process.env.NVIDIA_API_KEY}`,
-        '--language-code', 'en-US',
-        '--input-file', outputFilePath
-      ]);
-      
-      let transcriptionData = '';
-      let errorData = '';
-      
-      transcribeProcess.stdout.on('data', (data) => {
-        transcriptionData += data.toString();
+
+    // Check if the file exists
+    if (!fs.existsSync(outputFilePath)) {
+      return res.status(500).json({ error: 'Recording file not found' });
+    }
+
+    // Transcribe with the resident transcription service (riva_python_client/scripts/asr/transcription_server.py),
+    // which keeps its channel to Riva open instead of starting a Python process for every recording
+    let response;
+    try {
+      response = await fetch(`${asrServiceUrl}/transcribe`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'audio/wav',
+          'Accept': 'application/json'
+        },
+        body: fs.readFileSync(outputFilePath)
       });
-      
-      transcribeProcess.stderr.on('data', (data) => {
-        errorData += data.toString();
-        console.error(`Transcription stderr: ${data}`);
+    } catch (error) {
+      console.error('Error contacting transcription service:', error);
+      return res.status(500).json({
+        error: `Failed to reach transcription service at ${asrServiceUrl}: ${error.message}`
       });
-      
-      transcribeProcess.on('close', (code) => {
-        if (code !== 0) {
-          console.error(`Transcription process exited with code ${code}`);
-          return res.status(500).json({
-            error: 'Transcription failed',
-            details: errorData
-          });
-        }
-        
-        // Extract the transcription text from the output
-        let transcription = transcriptionData.trim();
-        
-        // Remove the "# #" prefix if present
-        transcription = transcription.replace(/##\s*/g, '');
+    }
 
-        // Clean up the output file
-        try {
-          fs.unlinkSync(outputFilePath);
-        } catch (err) {
-          console.error('Error deleting recording file:', err);
-        }
-        
-        res.json({ success: true, transcription });
+    if (!response.ok) {
+      const errorText = await response.text();
+      console.error(`Transcription error status: ${response.status}`);
+      console.error(`Transcription error response: ${errorText}`);
+      return res.status(500).json({
+        error: 'Transcription failed',
+        details: errorText
       });
-    }, 1000); // Wait 1 second for the file to be properly saved
+    }
+
+    const data = await response.json();
+    console.log(`Transcription received in ${data.timings.processing_ms.toFixed(0)} ms`);
+
+    // Clean up the output file
+    try {
+      fs.unlinkSync(outputFilePath);
+    } catch (err) {
+      console.error('Error deleting recording file:', err);
+    }
+
+    res.json({ success: true, transcription: data.transcript, words: data.words, timings: data.timings });
   } catch (error) {
     console.error('Error stopping recording or transcribing:', error);
     res.status(500).json({ error: 'Failed to process recording' });
@@ -151,7 +153,7 @@ app.post('/api/stop-recording', (req, res) => {
 // Regular API endpoint for non-streaming responses
 app.post('/api/chat', async (req, res) => {
   console.log('Received request to /api/chat');
-  const { model, message } = req.body;
+  const { model, message, sessionId } = req.body;
   console.log(`Model: ${model}, Message: ${message}`);
   
   try {
@@ -211,94 +213,34 @@ app.post('/api/chat', async (req, res) => {
         return res.status(500).json({ error: 'NVIDIA API key not configured' });
       }
       
-      console.log('Starting Mercury Agent process...');
-      // Execute Mercury Agent process
-      const mercuryProcess = spawn('aiq', [
-        'run',
-        '--config_file=/home/milos/mercury-assistant/mercury_agent/configs/config.yml',
-        '--input',
-        message
-      ]);
-
-      let output = '';
-      let error = '';
-
-      mercuryProcess.stdout.on('data', (data) => {
-        const chunk = data.toString();
-        console.log('Mercury Agent stdout chunk:', chunk);
-        output += chunk;
-      });
-
-      mercuryProcess.stderr.on('data', (data) => {
-        const chunk = data.toString();
-        console.log('Mercury Agent stderr chunk:', chunk);
-        error += chunk;
-      });
-
-      mercuryProcess.on('close', (code) => {
-        console.log('Mercury Agent process closed with code:', code);
-        console.log('Full output:', output);
-        console.log('Full error:', error);
-
-        if (code !== 0) {
-          console.error('Mercury Agent process exited with code:', code);
-          console.error('Error:', error);
-          return res.status(500).json({ error: 'Mercury Agent process failed' });
-        }
-
-        // Combine stdout and stderr for processing
-        // Note: Mercury Agent can output responses in either stream
-        const combinedOutput = output + error;
-
-        // Clean the output by removing ANSI color codes and other control characters
-        // This ensures consistent parsing regardless of terminal formatting
-        const cleanOutput = combinedOutput
-          .replace(/\x1B\[[0-9;]*[a-zA-Z]/g, '') // Remove ANSI color codes
-          .replace(/\x1B\]0;/g, '')              // Remove other ANSI escape sequences
-          .replace(/\r/g, '')                    // Remove carriage returns
-          .trim();
-
-        console.log('Cleaned output:', cleanOutput);
-
-        // Parse Mercury Agent responses
-        // The agent can return responses in two formats:
-        // 1. Standard format: Workflow Result: ["content"] or Workflow Result: ['content']
-        // 2. Research tool format: Workflow Result: ['<Document>content</Document>']
-        
-        // First try to find the standard Workflow Result format
-        // The pattern matches both single and double quotes: ['content'] or ["content"]
-        // Also handles escaped quotes within the content
-        const workflowResultMatch = cleanOutput.match(/Workflow Result:\s*\[['"](.*?)['"]\]/s);
-        if (workflowResultMatch && workflowResultMatch[1]) {
-          const cleanContent = workflowResultMatch[1]
-            .replace(/\\n/g, '\n')  // Replace escaped newlines with actual newlines
-            .replace(/\\'/g, "'")   // Replace escaped single quotes
-            .replace(/\\"/g, '"')   // Replace escaped double quotes
-            .trim();                // Remove extra whitespace
-          
-          console.log('Extracted content:', cleanContent);
-          return res.json({ text: cleanContent });
-        }
+      // Forward the message to the resident Mercury Agent server (mercury-agent-server),
+      // which keeps the workflow loaded instead of spawning `aiq run` for every message
+      try {
+        const response = await fetch(`${mercuryAgentUrl}/chat`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+          },
+          body: JSON.stringify({ message, session_id: sessionId })
+        });
 
-        // If that fails, try to find the Research tool's document format
-        // This format includes XML-like document tags and is used for Wikipedia research
-        const researchResultMatch = cleanOutput.match(/Workflow Result:\s*\['<Document[^>]*>\\n(.*?)\\n<\/Document>'\]/s);
-        if (researchResultMatch && researchResultMatch[1]) {
-          const cleanContent = researchResultMatch[1]
-            .replace(/\\n/g, '\n')  // Replace escaped newlines with actual newlines
-            .replace(/\\'/g, "'")   // Replace escaped single quotes
-            .replace(/\\"/g, '"')   // Replace escaped double quotes
-            .trim();                // Remove extra whitespace
-          
-          console.log('Extracted content from Research tool:', cleanContent);
-          return res.json({ text: cleanContent });
+        if (!response.ok) {
+          const errorText = await response.text();
+          console.error(`Mercury Agent error status: ${response.status}`);
+          console.error(`Mercury Agent error response: ${errorText}`);
+          return res.status(500).json({ error: `Mercury Agent error: ${response.status} - ${errorText}` });
         }
 
-        // If we couldn't find either format, return an error
-        console.error('Could not find Workflow Result with expected format');
-        return res.status(500).json({ error: 'Could not parse Mercury Agent response' });
-      });
-      return; // Important: return here to prevent further execution
+        const data = await response.json();
+        console.log(`Mercury Agent response received in ${data.elapsed_ms.toFixed(0)} ms`);
+        return res.json({ text: data.text });
+      } catch (error) {
+        console.error('Error contacting Mercury Agent server:', error);
+        return res.status(500).json({
+          error: `Failed to reach Mercury Agent server at ${mercuryAgentUrl}: ${error.message}`
+        });
+      }
     }
     
     // Configure OpenAI client after setting the configuration